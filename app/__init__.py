@@ -34,6 +34,12 @@ from app.va.mpi import MpiClient
 from app.va.vetext import VETextClient
 from app.encryption import Encryption
 from app.attachments.store import AttachmentStore
+from app.authentication.service_api_key_cache import ServiceApiKeyCache
+from app.template.template_cache import TemplateCache
+from app.callback.webhook_session_pool import WebhookSessionPool
+from app.delivery.provider_routing_cache import ProviderRoutingCache
+from app.notifications.notification_stats_counter import NotificationStatsCounter
+from app.va.recipient_lookup_cache import RecipientLookupCache
 from app.db import db
 
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
@@ -70,6 +76,13 @@ vetext_client = VETextClient()
 
 attachment_store = AttachmentStore()
 
+service_api_key_cache = ServiceApiKeyCache()
+template_cache = TemplateCache()
+webhook_session_pool = WebhookSessionPool()
+provider_routing_cache = ProviderRoutingCache()
+notification_stats_counter = NotificationStatsCounter()
+recipient_lookup_cache = RecipientLookupCache()
+
 clients = Clients()
 
 from app.oauth.jwt_manager import jwt  # noqa
@@ -130,26 +143,39 @@ def create_app(application):
     sqs_client.init_app(
         application.config['AWS_REGION'],
         application.logger,
-        statsd_client
+        statsd_client,
+        endpoint_url=application.config['SQS_ENDPOINT_URL'],
+        batch_max_attempts=application.config['SQS_BATCH_MAX_ATTEMPTS']
     )
     va_onsite_client.init_app(
         application.logger,
         application.config['VA_ONSITE_URL'],
-        application.config['VA_ONSITE_SECRET']
+        application.config['VA_ONSITE_SECRET'],
+        timeout=(application.config['VA_ONSITE_CONNECT_TIMEOUT'], application.config['VA_ONSITE_READ_TIMEOUT']),
+        failure_threshold=application.config['VA_ONSITE_FAILURE_THRESHOLD'],
+        reset_seconds=application.config['VA_ONSITE_RESET_SECONDS']
     )
+    va_mtls_session_options = {
+        'pool_size': application.config['VA_MTLS_POOL_SIZE'],
+        'timeout': (application.config['VA_MTLS_CONNECT_TIMEOUT'], application.config['VA_MTLS_READ_TIMEOUT']),
+        'max_retries': application.config['VA_MTLS_MAX_RETRIES'],
+        'retry_backoff': application.config['VA_MTLS_RETRY_BACKOFF'],
+    }
     va_profile_client.init_app(
         application.logger,
         application.config['VA_PROFILE_URL'],
         application.config['VANOTIFY_SSL_CERT_PATH'],
         application.config['VANOTIFY_SSL_KEY_PATH'],
-        statsd_client
+        statsd_client,
+        **va_mtls_session_options
     )
     mpi_client.init_app(
         application.logger,
         application.config['MPI_URL'],
         application.config['VANOTIFY_SSL_CERT_PATH'],
         application.config['VANOTIFY_SSL_KEY_PATH'],
-        statsd_client
+        statsd_client,
+        **va_mtls_session_options
     )
     vetext_client.init_app(
         application.config['VETEXT_URL'],
@@ -188,6 +214,13 @@ def create_app(application):
         statsd_client=statsd_client
     )
 
+    service_api_key_cache.init_app(application, statsd_client, redis_store)
+    template_cache.init_app(application, statsd_client)
+    webhook_session_pool.init_app(application, statsd_client, redis_store)
+    provider_routing_cache.init_app(application, statsd_client, redis_store)
+    notification_stats_counter.init_app(application, statsd_client, redis_store)
+    recipient_lookup_cache.init_app(application, statsd_client, redis_store)
+
     jwt.init_app(application)
 
     register_blueprint(application)
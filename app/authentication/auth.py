@@ -13,6 +13,7 @@ from sqlalchemy.exc import DataError
 from sqlalchemy.orm.exc import NoResultFound
 
 
+from app import db, service_api_key_cache
 from app.dao.services_dao import dao_fetch_service_by_id_with_api_keys
 
 
@@ -143,6 +144,18 @@ def requires_admin_auth():
     return decorator
 
 
+def _fetch_service_for_cache(service_id):
+    """
+    Fetch a service with its API keys, and detach them from the session, so that the copy that is cached is not
+    expired when this request's transaction commits.
+    """
+    service = dao_fetch_service_by_id_with_api_keys(service_id)
+    for api_key in service.api_keys:
+        db.session.expunge(api_key)
+    db.session.expunge(service)
+    return service
+
+
 def validate_service_api_key_auth():
     request_helper.check_proxy_header_before_request()
 
@@ -150,19 +163,26 @@ def validate_service_api_key_auth():
     client = __get_token_issuer(auth_token)
 
     try:
-        service = dao_fetch_service_by_id_with_api_keys(client)
+        service = service_api_key_cache.get_service(client, _fetch_service_for_cache)
     except DataError:
         raise AuthError("Invalid token: service id is not the right data type", 403)
     except NoResultFound:
         raise AuthError("Invalid token: service not found", 403)
 
+    # Attach a copy of the detached service to this request's session without querying the database.
+    service = db.session.merge(service, load=False)
+
     if not service.api_keys:
         raise AuthError("Invalid token: service has no API keys", 403, service_id=service.id)
 
     if not service.active:
         raise AuthError("Invalid token: service is archived", 403, service_id=service.id)
 
-    for api_key in service.api_keys:
+    # Try the key that last matched for this service first, so usually only one signature is checked.
+    matched_api_key_id = service_api_key_cache.get_matched_api_key_id(service.id)
+    api_keys = sorted(service.api_keys, key=lambda api_key: api_key.id != matched_api_key_id)
+
+    for api_key in api_keys:
         try:
             decode_jwt_token(auth_token, api_key.secret)
         except TokenDecodeError:
@@ -176,6 +196,8 @@ def validate_service_api_key_auth():
         if api_key.expiry_date:
             raise AuthError("Invalid token: API key revoked", 403, service_id=service.id, api_key_id=api_key.id)
 
+        service_api_key_cache.set_matched_api_key_id(service.id, api_key.id)
+
         g.service_id = api_key.service_id
         g.api_user = api_key
         g.authenticated_service = service
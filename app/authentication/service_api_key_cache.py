@@ -0,0 +1,119 @@
+from time import monotonic
+
+from cachelib import SimpleCache
+from sqlalchemy import event
+
+from app.db import db
+
+
+class ServiceApiKeyCache:
+    """
+    A per-process cache of services, with their API keys, used to authenticate API requests.
+
+    Each process has its own cache.  Changes to API keys or services made through the DAO increment the service's
+    version number in Redis once they are committed, and every process checks the version before using its cached
+    service, so a revoked key is rejected everywhere as soon as the revocation commits.  If Redis is unavailable,
+    processes see the change when their entry expires.
+    """
+
+    STATSD_PREFIX = 'authentication.service-api-key-cache'
+    VERSION_KEY = 'service-api-key-cache-version-{}'
+
+    def __init__(self):
+        self.enabled = False
+        self.statsd_client = None
+        self.redis_store = None
+        self._services = SimpleCache()
+        self._matched_api_key_ids = SimpleCache()
+        self._average_fetch_time = None
+
+    def init_app(self, app, statsd_client, redis_store):
+        self.enabled = app.config['SERVICE_API_KEY_CACHE_ENABLED']
+        self.statsd_client = statsd_client
+        self.redis_store = redis_store
+        self._services = SimpleCache(
+            threshold=app.config['SERVICE_API_KEY_CACHE_MAX_SIZE'],
+            default_timeout=app.config['SERVICE_API_KEY_CACHE_TTL']
+        )
+        self._matched_api_key_ids = SimpleCache(
+            threshold=app.config['SERVICE_API_KEY_CACHE_MAX_SIZE'],
+            default_timeout=app.config['SERVICE_API_KEY_CACHE_TTL']
+        )
+
+        if not event.contains(db.session, 'after_commit', self._invalidate_pending):
+            event.listen(db.session, 'after_commit', self._invalidate_pending)
+            event.listen(db.session, 'after_transaction_end', self._discard_pending)
+
+    def get_service(self, service_id, fetch):
+        """
+        Return the cached service for the given ID, or call fetch(service_id) and cache the result.  Cached services
+        are detached from any database session.
+        """
+
+        if not self.enabled:
+            return fetch(service_id)
+
+        start = monotonic()
+        version = self._get_version(service_id)
+        cached = self._services.get(str(service_id))
+
+        if cached is None or cached[0] != version:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.miss')
+            # The matched API key may have been revoked, so it is only trusted for the service fetched now.
+            self._matched_api_key_ids.delete(str(service_id))
+            service = fetch(service_id)
+            self._services.set(str(service_id), (version, service))
+            self._record_fetch_time(monotonic() - start)
+        else:
+            service = cached[1]
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.hit')
+            if self._average_fetch_time is not None:
+                saved = self._average_fetch_time - (monotonic() - start)
+                self.statsd_client.timing(f'{self.STATSD_PREFIX}.latency-saved', saved * 1000)
+
+        return service
+
+    def get_matched_api_key_id(self, service_id):
+        if not self.enabled:
+            return None
+        return self._matched_api_key_ids.get(str(service_id))
+
+    def set_matched_api_key_id(self, service_id, api_key_id):
+        if self.enabled:
+            self._matched_api_key_ids.set(str(service_id), api_key_id)
+
+    def invalidate(self, service_id):
+        """
+        Tell every process to fetch the service again once the current transaction commits.  Call this when changing
+        the service or its API keys.  Until the change is committed, a process fetching the service would still see
+        it as it was, so the version is only incremented after the commit.
+        """
+        db.session.info.setdefault(self, set()).add(str(service_id))
+
+    def _invalidate_pending(self, session):
+        for service_id in session.info.pop(self, ()):
+            self._services.delete(service_id)
+            self._matched_api_key_ids.delete(service_id)
+            if self.redis_store is not None and self.redis_store.active:
+                self.redis_store.incr(self.VERSION_KEY.format(service_id))
+
+    def _discard_pending(self, session, transaction):
+        # Invalidations still pending when the outermost transaction ends were rolled back
+        if transaction.parent is None:
+            session.info.pop(self, None)
+
+    def clear(self):
+        self._services.clear()
+        self._matched_api_key_ids.clear()
+
+    def _get_version(self, service_id):
+        if self.redis_store is None or not self.redis_store.active:
+            return None
+        return self.redis_store.get(self.VERSION_KEY.format(service_id))
+
+    def _record_fetch_time(self, elapsed):
+        # An exponentially weighted moving average of the time spent loading a service on a cache miss.
+        if self._average_fetch_time is None:
+            self._average_fetch_time = elapsed
+        else:
+            self._average_fetch_time = 0.9 * self._average_fetch_time + 0.1 * elapsed
@@ -42,6 +42,30 @@ def get_job_from_s3(service_id, job_id):
     return obj.get()['Body'].read().decode('utf-8')
 
 
+def stream_job_from_s3(service_id, job_id, start_byte=0):
+    """
+    Return an iterator over the lines of a job's CSV file, as bytes, that reads the file from S3 as it goes rather
+    than loading the whole file into memory.  Reading starts start_byte bytes into the file.
+    """
+    obj = get_s3_object(*get_job_location(service_id, job_id))
+    if start_byte:
+        body = obj.get(Range='bytes={}-'.format(start_byte))['Body']
+    else:
+        body = obj.get()['Body']
+    return _iter_lines(body)
+
+
+def _iter_lines(body):
+    pending = b''
+    for chunk in body.iter_chunks():
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        for line in lines:
+            yield line + b'\n'
+    if pending:
+        yield pending
+
+
 def get_job_metadata_from_s3(service_id, job_id):
     obj = get_s3_object(*get_job_location(service_id, job_id))
     return obj.get()['Metadata']
@@ -5,7 +5,7 @@ from app.callback.service_callback_strategy_interface import ServiceCallbackStra
 
 from flask import current_app
 
-from app.celery.exceptions import NonRetryableException
+from app.celery.exceptions import NonRetryableException, PartialBatchException
 from app.models import ServiceCallback
 from app import statsd_client
 
@@ -29,3 +29,28 @@ class QueueCallbackStrategy(ServiceCallbackStrategyInterface):
         else:
             current_app.logger.info(f"Callback sent to {callback.url}, {tags}")
             statsd_client.incr(f"callback.queue.{callback.callback_type}.success")
+
+    @staticmethod
+    def send_callback_batch(callback: ServiceCallback, payloads: list, logging_tags: dict) -> None:
+        tags = ', '.join([f"{key}: {value}" for key, value in logging_tags.items()])
+
+        try:
+            failed = sqs_client.send_message_batch(
+                url=callback.url,
+                message_bodies=payloads,
+                message_attributes={
+                    "CallbackType": {"StringValue": callback.callback_type, "DataType": "String"}
+                }
+            )
+        except ClientError as e:
+            statsd_client.incr(f"callback.queue.{callback.callback_type}.non_retryable_error")
+            raise NonRetryableException(e)
+
+        if failed:
+            statsd_client.incr(f"callback.queue.{callback.callback_type}.retryable_error")
+            raise PartialBatchException(
+                f"{len(failed)} of {len(payloads)} messages were not sent to {callback.url}", failed
+            )
+
+        current_app.logger.info(f"Callback batch of {len(payloads)} sent to {callback.url}, {tags}")
+        statsd_client.incr(f"callback.queue.{callback.callback_type}.success")
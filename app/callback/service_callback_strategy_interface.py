@@ -5,3 +5,7 @@ class ServiceCallbackStrategyInterface:
     @staticmethod
     def send_callback(callback: ServiceCallback, payload: dict, logging_tags: dict) -> None:
         raise NotImplementedError
+
+    @staticmethod
+    def send_callback_batch(callback: ServiceCallback, payloads: list, logging_tags: dict) -> None:
+        raise NotImplementedError
@@ -3,16 +3,23 @@ import json
 import boto3
 from botocore.exceptions import ClientError
 
+# The most entries SQS accepts in one SendMessageBatch request.
+MAX_BATCH_ENTRIES = 10
+
 
 class SQSClient:
     def __init__(self):
         self.name = 'sqs'
 
-    def init_app(self, aws_region, logger, statsd_client):
-        self._client = boto3.client('sqs', region_name=aws_region)
+    def init_app(
+            self, aws_region, logger, statsd_client, endpoint_url=None, batch_max_attempts=3
+    ):
+        # endpoint_url points the client at a local SQS stand-in such as ElasticMQ or moto.
+        self._client = boto3.client('sqs', region_name=aws_region, endpoint_url=endpoint_url)
         self.aws_region = aws_region
         self.statsd_client = statsd_client
         self.logger = logger
+        self.batch_max_attempts = batch_max_attempts
 
     def get_name(self):
         return self.name
@@ -41,3 +48,63 @@ class SQSClient:
             raise e
         else:
             return response
+
+    def send_message_batch(self, url: str, message_bodies: list, message_attributes: dict = None) -> list:
+        """
+        Send messages to a queue with SendMessageBatch, ten at a time.  Entries that SQS rejects are sent again, up
+        to batch_max_attempts times in all.  Returns the message bodies that still could not be sent.
+
+        Rejected entries are not sent again to a FIFO queue, as they would arrive after the entries sent with them;
+        they are returned, with the messages after them that were not sent yet, for the caller to retry in order.
+        """
+        entries = [self._create_entry(url, message_body, message_attributes) for message_body in message_bodies]
+        max_attempts = 1 if 'fifo' in url else self.batch_max_attempts
+
+        failed = []
+        for start in range(0, len(entries), MAX_BATCH_ENTRIES):
+            if failed and 'fifo' in url:
+                failed.extend(entries[start:])
+                break
+
+            pending = [(entry, 0) for entry in entries[start:start + MAX_BATCH_ENTRIES]]
+            while pending:
+                # Raises ClientError if the request as a whole fails.
+                retry = self._send_entries(url, pending)
+                failed.extend(entry for entry, attempts in retry if attempts >= max_attempts)
+                pending = [(entry, attempts) for entry, attempts in retry if attempts < max_attempts]
+
+        return [json.loads(entry['MessageBody']) for entry in failed]
+
+    @staticmethod
+    def _create_entry(url, message_body, message_attributes):
+        attributes = dict(message_attributes or {})
+        attributes["ContentType"] = {"StringValue": "application/json", "DataType": "String"}
+        entry = {
+            'MessageBody': json.dumps(message_body),
+            'MessageAttributes': attributes,
+        }
+        # if SQS is fifo then
+        if 'fifo' in url:
+            entry['MessageGroupId'] = url
+        return entry
+
+    def _send_entries(self, url, batch):
+        """
+        Send up to ten (entry, attempts) pairs in one request, returning the pairs that failed with their attempts
+        incremented.
+        """
+        request_entries = [{'Id': str(i), **entry} for i, (entry, _) in enumerate(batch)]
+
+        try:
+            response = self._client.send_message_batch(QueueUrl=url, Entries=request_entries)
+        except ClientError as e:
+            self.logger.error("SQS client failed to send message batch to %s: %s", url, e)
+            raise e
+
+        failed_ids = {failure['Id'] for failure in response.get('Failed', [])}
+
+        self.statsd_client.incr('clients.sqs.batch.sent', len(batch) - len(failed_ids))
+        if failed_ids:
+            self.statsd_client.incr('clients.sqs.batch.entry-errors', len(failed_ids))
+
+        return [(entry, attempts + 1) for i, (entry, attempts) in enumerate(batch) if str(i) in failed_ids]
@@ -4,11 +4,11 @@ import json
 
 from flask import current_app
 
-from requests.api import request
 from requests.exceptions import RequestException, HTTPError
 
-from app import statsd_client
-from app.celery.exceptions import RetryableException, NonRetryableException
+from app import statsd_client, webhook_session_pool
+from app.callback.webhook_session_pool import WebhookHostBusyError
+from app.celery.exceptions import HostBusyException, RetryableException, NonRetryableException
 from app.models import ServiceCallback
 
 
@@ -17,19 +17,21 @@ class WebhookCallbackStrategy(ServiceCallbackStrategyInterface):
     def send_callback(callback: ServiceCallback, payload: dict, logging_tags: dict) -> None:
         tags = ', '.join([f"{key}: {value}" for key, value in logging_tags.items()])
         try:
-            response = request(
-                method="POST",
+            response = webhook_session_pool.post(
                 url=callback.url,
                 data=json.dumps(payload),
                 headers={
                     'Content-Type': 'application/json',
                     'Authorization': 'Bearer {}'.format(callback.bearer_token)
-                },
-                timeout=60
+                }
             )
             current_app.logger.info(f"Callback sent to {callback.url}, response {response.status_code}, {tags}")
             response.raise_for_status()
 
+        except WebhookHostBusyError as e:
+            current_app.logger.warning(f"Callback to {callback.url} deferred: {e}, {tags}")
+            raise HostBusyException(e)
+
         except RequestException as e:
             if not isinstance(e, HTTPError) or e.response.status_code >= 500:
                 statsd_client.incr(f"callback.webhook.{callback.callback_type}.retryable_error")
@@ -39,3 +41,8 @@ class WebhookCallbackStrategy(ServiceCallbackStrategyInterface):
                 raise NonRetryableException(e)
         else:
             statsd_client.incr(f"callback.webhook.{callback.callback_type}.success")
+
+    @staticmethod
+    def send_callback_batch(callback: ServiceCallback, payloads: list, logging_tags: dict) -> None:
+        # A batch is posted as a single JSON array of the individual payloads.
+        WebhookCallbackStrategy.send_callback(callback, payloads, logging_tags)
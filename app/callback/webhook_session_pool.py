@@ -0,0 +1,132 @@
+from contextlib import contextmanager
+from threading import Lock
+from time import monotonic, time
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+
+class WebhookHostBusyError(Exception):
+    pass
+
+
+class WebhookSessionPool:
+    """
+    Keep-alive HTTP sessions for service callbacks, one per callback host, so that callbacks reuse connections
+    instead of opening a new TCP and TLS connection each time.
+
+    The number of callbacks in flight to each host, across all processes, is capped using Redis.  A callback to a host
+    that is at its cap raises WebhookHostBusyError straight away rather than waiting, so that a slow host cannot tie up
+    the workers sending callbacks to other services.  If Redis can't be reached, callbacks are sent without the cap.
+    """
+
+    STATSD_PREFIX = 'callback.webhook'
+
+    def __init__(self):
+        self.logger = None
+        self.statsd_client = None
+        self.redis_store = None
+        self.pool_size = 10
+        self.timeout = (5, 60)
+        self.max_in_flight_per_host = 0
+        self._sessions = {}
+        self._lock = Lock()
+
+    def init_app(self, app, statsd_client, redis_store):
+        self.logger = app.logger
+        self.statsd_client = statsd_client
+        self.redis_store = redis_store
+        self.pool_size = app.config['WEBHOOK_POOL_SIZE']
+        self.timeout = (app.config['WEBHOOK_CONNECT_TIMEOUT'], app.config['WEBHOOK_READ_TIMEOUT'])
+        self.max_in_flight_per_host = app.config['WEBHOOK_MAX_IN_FLIGHT_PER_HOST']
+        self.close()
+
+    def post(self, url, data, headers):
+        host = self._host(url)
+        session, adapter = self._get_session(host)
+        connections_before = self._connection_count(adapter)
+
+        with self._in_flight_slot(host):
+            response = session.post(url, data=data, headers=headers, timeout=self.timeout)
+
+        if self._connection_count(adapter) > connections_before:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.connection.new')
+        else:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.connection.reused')
+        self.statsd_client.timing(f'{self.STATSD_PREFIX}.response-time', response.elapsed.total_seconds() * 1000)
+
+        return response
+
+    def close(self):
+        with self._lock:
+            for session, _ in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    @staticmethod
+    def _host(url):
+        parts = urlsplit(url)
+        return f'{parts.scheme}://{parts.netloc}'
+
+    @staticmethod
+    def _connection_count(adapter):
+        # The number of connections opened by the adapter's connection pools, for working out the reuse ratio.
+        pools = adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def _get_session(self, host):
+        with self._lock:
+            if host not in self._sessions:
+                session = Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount(host, adapter)
+                self._sessions[host] = (session, adapter)
+            return self._sessions[host]
+
+    @contextmanager
+    def _in_flight_slot(self, host):
+        if not self.max_in_flight_per_host or not self.redis_store.active:
+            yield
+            return
+
+        # A sorted set of in-flight callbacks scored by start time.  Entries older than the longest a callback can
+        # take are removed, so a worker that dies mid-callback does not hold its slot forever.
+        key = f'webhook-in-flight-{host}'
+        token = str(uuid4())
+        slot_timeout = sum(self.timeout)
+
+        start = monotonic()
+        try:
+            pipeline = self.redis_store.redis_store.pipeline()
+            pipeline.zremrangebyscore(key, '-inf', time() - slot_timeout)
+            pipeline.zadd(key, {token: time()})
+            pipeline.zcard(key)
+            pipeline.expire(key, int(slot_timeout) + 1)
+            in_flight = pipeline.execute()[2]
+        except Exception as e:
+            self.logger.warning(f'Sending callback to {host} without an in-flight limit, as Redis failed: {e}')
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.host-limit-unavailable')
+            in_flight = None
+        # The time spent in Redis counting the callbacks in flight; a busy host is not waited for.
+        self.statsd_client.timing(f'{self.STATSD_PREFIX}.slot-check-time', (monotonic() - start) * 1000)
+
+        if in_flight is None:
+            yield
+            return
+
+        try:
+            if in_flight > self.max_in_flight_per_host:
+                self.statsd_client.incr(f'{self.STATSD_PREFIX}.host-limit-reached')
+                raise WebhookHostBusyError(f'{in_flight - 1} callbacks already in flight to {host}')
+            yield
+        finally:
+            self._release_in_flight_slot(key, token)
+
+    def _release_in_flight_slot(self, key, token):
+        try:
+            self.redis_store.redis_store.zrem(key, token)
+        except Exception as e:
+            # The slot is freed once it is older than the longest a callback can take.
+            self.logger.warning(f'Failed to release in-flight callback slot {key}: {e}')
@@ -1,7 +1,7 @@
 from flask import current_app
 from notifications_utils.statsd_decorators import statsd
 
-from app import notify_celery, va_profile_client
+from app import notify_celery, recipient_lookup_cache, va_profile_client
 from app.va.identifier import IdentifierType
 from app.va.va_profile import VAProfileRetryableException, VAProfileNonRetryableException, NoContactInfoException
 from app.config import QueueNames
@@ -21,14 +21,7 @@ def lookup_contact_info(self, notification_id):
     va_profile_id = notification.recipient_identifiers[IdentifierType.VA_PROFILE_ID.value].id_value
 
     try:
-        if EMAIL_TYPE == notification.notification_type:
-            recipient = va_profile_client.get_email(va_profile_id)
-        elif SMS_TYPE == notification.notification_type:
-            recipient = va_profile_client.get_telephone(va_profile_id)
-        else:
-            raise NotImplementedError(
-                f"The task lookup_contact_info failed for notification {notification_id}. "
-                f"{notification.notification_type} is not supported")
+        recipient = get_contact_info(va_profile_id, notification.notification_type, notification_id)
 
     except VAProfileRetryableException as e:
         current_app.logger.exception(e)
@@ -72,3 +65,21 @@ def lookup_contact_info(self, notification_id):
     else:
         notification.to = recipient
         dao_update_notification(notification)
+
+
+def get_contact_info(va_profile_id, notification_type, notification_id):
+    """
+    Return the email address or phone number, by notification_type, for a VA Profile ID from VA Profile.
+    """
+    if EMAIL_TYPE == notification_type:
+        return recipient_lookup_cache.get_contact_info(
+            va_profile_id, EMAIL_TYPE, lambda: va_profile_client.get_email(va_profile_id)
+        )
+    elif SMS_TYPE == notification_type:
+        return recipient_lookup_cache.get_contact_info(
+            va_profile_id, SMS_TYPE, lambda: va_profile_client.get_telephone(va_profile_id)
+        )
+    else:
+        raise NotImplementedError(
+            f"The task lookup_contact_info failed for notification {notification_id}. "
+            f"{notification_type} is not supported")
@@ -4,3 +4,17 @@ class RetryableException(Exception):
 
 class NonRetryableException(Exception):
     pass
+
+
+class HostBusyException(RetryableException):
+    pass
+
+
+class PartialBatchException(RetryableException):
+    """
+    Some of the payloads in a batch of callbacks were not sent.  Only failed_payloads should be sent again.
+    """
+
+    def __init__(self, message, failed_payloads):
+        super().__init__(message)
+        self.failed_payloads = failed_payloads
@@ -7,8 +7,10 @@ from app.config import QueueNames
 from app.dao.communication_item_dao import get_communication_item
 from app.dao.notifications_dao import get_notification_by_id, update_notification_status_by_id
 from app.exceptions import NotificationTechnicalFailureException
+from app.feature_flags import is_feature_enabled, FeatureFlag
 from app.models import RecipientIdentifier, NOTIFICATION_PREFERENCES_DECLINED, NOTIFICATION_TECHNICAL_FAILURE
 from app.va.va_profile import VAProfileRetryableException
+from app.va.va_profile.communication_permissions import is_communication_allowed
 from app.va.va_profile.va_profile_client import CommunicationItemNotFoundException
 from app.va.identifier import IdentifierType
 
@@ -59,17 +61,12 @@ def recipient_has_given_permission(
         notification_type: str,
         communication_item_id: str
 ) -> bool:
-    identifier = RecipientIdentifier(id_type=id_type, id_value=id_value)
-
     communication_item = get_communication_item(communication_item_id)
 
     try:
-        is_allowed = va_profile_client.get_is_communication_allowed(
-            identifier, communication_item.va_profile_item_id, notification_id, notification_type
+        return get_recipient_permission(
+            id_type, id_value, notification_id, notification_type, communication_item.va_profile_item_id
         )
-        current_app.logger.info(f'Value of permission for item {communication_item.va_profile_item_id} for recipient '
-                                f'{id_value} for notification {notification_id}: {is_allowed}')
-        return is_allowed
     except VAProfileRetryableException as e:
         current_app.logger.exception(e)
         try:
@@ -85,6 +82,34 @@ def recipient_has_given_permission(
                 notification_id, NOTIFICATION_TECHNICAL_FAILURE, status_reason=e.failure_reason
             )
             raise NotificationTechnicalFailureException(message) from e
+
+
+def get_recipient_permission(
+        id_type: str,
+        id_value: str,
+        notification_id: str,
+        notification_type: str,
+        va_profile_item_id: int
+) -> bool:
+    """
+    Return whether a recipient allows a communication item on the channel for notification_type.  A recipient with no
+    permission for the communication item is allowed.
+    """
+    identifier = RecipientIdentifier(id_type=id_type, id_value=id_value)
+
+    try:
+        if (
+            is_feature_enabled(FeatureFlag.VA_PROFILE_LOCAL_CACHE_PERMISSIONS_ENABLED)
+            and id_type == IdentifierType.VA_PROFILE_ID.value
+        ):
+            is_allowed = is_communication_allowed(id_value, va_profile_item_id, notification_id, notification_type)
+        else:
+            is_allowed = va_profile_client.get_is_communication_allowed(
+                identifier, va_profile_item_id, notification_id, notification_type
+            )
+        current_app.logger.info(f'Value of permission for item {va_profile_item_id} for recipient '
+                                f'{id_value} for notification {notification_id}: {is_allowed}')
+        return is_allowed
     except CommunicationItemNotFoundException:
         current_app.logger.info(f'Communication item for recipient {id_value} not found on notification '
                                 f'{notification_id}')
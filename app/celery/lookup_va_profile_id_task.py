@@ -6,7 +6,7 @@ from flask import current_app
 from notifications_utils.statsd_decorators import statsd
 from app import notify_celery
 from app.dao import notifications_dao
-from app import mpi_client
+from app import mpi_client, recipient_lookup_cache
 from app.va.identifier import IdentifierType, UnsupportedIdentifierException
 from app.va.mpi import MpiRetryableException, BeneficiaryDeceasedException, \
     IdentifierNotFound, MultipleActiveVaProfileIdsException, IncorrectNumberOfIdentifiersException, \
@@ -20,14 +20,7 @@ def lookup_va_profile_id(self, notification_id):
     notification = notifications_dao.get_notification_by_id(notification_id)
 
     try:
-        va_profile_id = mpi_client.get_va_profile_id(notification)
-        notification.recipient_identifiers.set(
-            RecipientIdentifier(
-                notification_id=notification.id,
-                id_type=IdentifierType.VA_PROFILE_ID.value,
-                id_value=va_profile_id
-            ))
-        notifications_dao.dao_update_notification(notification)
+        va_profile_id = set_va_profile_id(notification)
         current_app.logger.info(
             f"Successfully updated notification {notification_id} with VA PROFILE ID {va_profile_id}"
         )
@@ -70,3 +63,32 @@ def lookup_va_profile_id(self, notification_id):
             notification_id, NOTIFICATION_TECHNICAL_FAILURE, status_reason=status_reason
         )
         raise NotificationTechnicalFailureException(message) from e
+
+
+def set_va_profile_id(notification):
+    """
+    Look up the VA Profile ID for a notification's recipient in MPI, save it as a recipient identifier on the
+    notification, and return it.
+    """
+    va_profile_id = _get_va_profile_id(notification)
+    notification.recipient_identifiers.set(
+        RecipientIdentifier(
+            notification_id=notification.id,
+            id_type=IdentifierType.VA_PROFILE_ID.value,
+            id_value=va_profile_id
+        ))
+    notifications_dao.dao_update_notification(notification)
+    return va_profile_id
+
+
+def _get_va_profile_id(notification):
+    # MPI is only asked for the VA Profile ID of a notification with one recipient identifier, which is the cache key
+    if len(notification.recipient_identifiers) != 1:
+        return mpi_client.get_va_profile_id(notification)
+
+    recipient_identifier = next(iter(notification.recipient_identifiers.values()))
+    return recipient_lookup_cache.get_va_profile_id(
+        recipient_identifier.id_type,
+        recipient_identifier.id_value,
+        lambda: mpi_client.get_va_profile_id(notification)
+    )
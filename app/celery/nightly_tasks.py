@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import (
     datetime,
     timedelta
@@ -6,10 +7,11 @@ from datetime import (
 import pytz
 from flask import current_app
 from notifications_utils.statsd_decorators import statsd
+from notifications_utils.timezones import convert_utc_to_local_timezone
 from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 
-from app import notify_celery, performance_platform_client, zendesk_client
+from app import notify_celery, notification_stats_counter, performance_platform_client, zendesk_client
 from app.aws import s3
 from app.celery.service_callback_tasks import (
     send_delivery_status_to_service,
@@ -21,15 +23,27 @@ from app.dao.jobs_dao import (
     dao_get_jobs_older_than_data_retention,
     dao_archive_job
 )
+from app.dao.notification_partitions_dao import (
+    dao_create_partitions,
+    dao_drop_partition,
+    dao_get_partitions,
+    dao_is_partitioned,
+)
 from app.dao.notifications_dao import (
     dao_timeout_notifications,
     delete_notifications_older_than_retention_by_type,
+    drop_notification_partitions_older_than_retention,
+    purge_notifications_older_than_retention_by_type,
 )
 from app.dao.service_callback_api_dao import get_service_delivery_status_callback_api_for_service
+from app.dao.services_dao import dao_fetch_notification_stats_by_hour
 from app.exceptions import NotificationTechnicalFailureException
+from app.feature_flags import is_feature_enabled, FeatureFlag
 from app.models import (
     Notification,
+    NotificationHistory,
     NOTIFICATION_SENDING,
+    NOTIFICATION_TECHNICAL_FAILURE,
     EMAIL_TYPE,
     SMS_TYPE,
     LETTER_TYPE,
@@ -62,13 +76,19 @@ def _remove_csv_files(job_types):
         current_app.logger.info("Job ID {} has been removed from s3.".format(job.id))
 
 
+def _delete_notifications_older_than_retention(notification_type):
+    if is_feature_enabled(FeatureFlag.BATCHED_RETENTION_PURGE_ENABLED):
+        return purge_notifications_older_than_retention_by_type(notification_type)
+    return delete_notifications_older_than_retention_by_type(notification_type)
+
+
 @notify_celery.task(name="delete-sms-notifications")
 @cronitor("delete-sms-notifications")
 @statsd(namespace="tasks")
 def delete_sms_notifications_older_than_retention():
     try:
         start = datetime.utcnow()
-        deleted = delete_notifications_older_than_retention_by_type('sms')
+        deleted = _delete_notifications_older_than_retention('sms')
         current_app.logger.info(
             "Delete {} job started {} finished {} deleted {} sms notifications".format(
                 'sms',
@@ -88,7 +108,7 @@ def delete_sms_notifications_older_than_retention():
 def delete_email_notifications_older_than_retention():
     try:
         start = datetime.utcnow()
-        deleted = delete_notifications_older_than_retention_by_type('email')
+        deleted = _delete_notifications_older_than_retention('email')
         current_app.logger.info(
             "Delete {} job started {} finished {} deleted {} email notifications".format(
                 'email',
@@ -108,7 +128,7 @@ def delete_email_notifications_older_than_retention():
 def delete_letter_notifications_older_than_retention():
     try:
         start = datetime.utcnow()
-        deleted = delete_notifications_older_than_retention_by_type('letter')
+        deleted = _delete_notifications_older_than_retention('letter')
         current_app.logger.info(
             "Delete {} job started {} finished {} deleted {} letter notifications".format(
                 'letter',
@@ -126,31 +146,55 @@ def delete_letter_notifications_older_than_retention():
 @cronitor('timeout-sending-notifications')
 @statsd(namespace="tasks")
 def timeout_notifications():
-    technical_failure_notifications, temporary_failure_notifications = \
-        dao_timeout_notifications(current_app.config.get('SENDING_NOTIFICATIONS_TIMEOUT_PERIOD'))
+    batch_size = current_app.config['TIMEOUT_NOTIFICATIONS_BATCH_SIZE']
+    callback_apis = {}
+    timed_out_count = 0
+    technical_failure_ids = []
+
+    for status, notifications in dao_timeout_notifications(
+        current_app.config.get('SENDING_NOTIFICATIONS_TIMEOUT_PERIOD'), batch_size
+    ):
+        timed_out_count += len(notifications)
+        if status == NOTIFICATION_TECHNICAL_FAILURE:
+            technical_failure_ids.extend(str(notification.id) for notification in notifications)
+        _send_delivery_status_callbacks(status, notifications, callback_apis)
+
+    current_app.logger.info(
+        "Timeout period reached for {} notifications, status has been updated.".format(timed_out_count))
+    if technical_failure_ids:
+        message = "{} notifications have been updated to technical-failure because they " \
+                  "have timed out and are still in created.Notification ids: {}".format(
+                      len(technical_failure_ids), technical_failure_ids[:batch_size])
+        raise NotificationTechnicalFailureException(message)
 
-    notifications = technical_failure_notifications + temporary_failure_notifications
+
+def _send_delivery_status_callbacks(status, notifications, callback_apis):
+    """
+    Queue delivery status callbacks for a batch of timed out notifications.  Callback APIs are looked up once per
+    service and status, in callback_apis, and only notifications of services with a callback API are loaded.
+    """
+    notification_ids_by_service = defaultdict(list)
     for notification in notifications:
-        # queue callback task only if the service_callback_api exists
-        service_callback_api = get_service_delivery_status_callback_api_for_service(
-            service_id=notification.service_id,
-            notification_status=notification.status
-        )
-        if service_callback_api:
+        notification_ids_by_service[notification.service_id].append(notification.id)
+
+    for service_id, notification_ids in notification_ids_by_service.items():
+        if (service_id, status) not in callback_apis:
+            # queue callback task only if the service_callback_api exists
+            callback_apis[(service_id, status)] = get_service_delivery_status_callback_api_for_service(
+                service_id=service_id,
+                notification_status=status
+            )
+        service_callback_api = callback_apis[(service_id, status)]
+        if not service_callback_api:
+            continue
+
+        for notification in Notification.query.filter(Notification.id.in_(notification_ids)):
             encrypted_notification = create_delivery_status_callback_data(notification, service_callback_api)
             send_delivery_status_to_service.apply_async(
                 [service_callback_api.id, str(notification.id), encrypted_notification],
                 queue=QueueNames.CALLBACKS
             )
 
-    current_app.logger.info(
-        "Timeout period reached for {} notifications, status has been updated.".format(len(notifications)))
-    if technical_failure_notifications:
-        message = "{} notifications have been updated to technical-failure because they " \
-                  "have timed out and are still in created.Notification ids: {}".format(
-                      len(technical_failure_notifications), [str(x.id) for x in technical_failure_notifications])
-        raise NotificationTechnicalFailureException(message)
-
 
 @notify_celery.task(name='send-daily-performance-platform-stats')
 @cronitor('send-daily-performance-platform-stats')
@@ -343,3 +387,58 @@ def letter_raise_alert_if_no_ack_file_for_zip():
         current_app.logger.info(
             "letter ack contains zip that is not for today: {}".format(ack_file_set - zip_file_set)
         )
+
+
+@notify_celery.task(name='reconcile-notification-stats-counters')
+@statsd(namespace="tasks")
+def reconcile_notification_stats_counters():
+    """
+    Correct the notification stats counters for yesterday and today, local time, from the notifications table.
+    """
+    if not notification_stats_counter.active:
+        return
+
+    now = datetime.utcnow()
+    start_date = get_local_timezone_midnight_in_utc(convert_utc_to_local_timezone(now).date() - timedelta(days=1))
+    end_date = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+    rows = notification_stats_counter.reconcile(
+        start_date, end_date, lambda: dao_fetch_notification_stats_by_hour(start_date, end_date)
+    )
+
+    current_app.logger.info(
+        "Reconciled notification stats counters from {} to {}: {} rows".format(start_date, end_date, len(rows))
+    )
+
+
+@notify_celery.task(name='maintain-notification-partitions')
+@statsd(namespace="tasks")
+def maintain_notification_partitions():
+    """
+    For notifications and notification_history once they are partitioned by created_at: create partitions ahead of
+    time, and drop partitions that are past retention.
+    """
+    until = datetime.utcnow() + timedelta(days=current_app.config['NOTIFICATION_PARTITIONS_AHEAD_DAYS'])
+
+    for table_name in (Notification.__tablename__, NotificationHistory.__tablename__):
+        if not dao_is_partitioned(table_name):
+            continue
+        created = dao_create_partitions(table_name, until)
+        current_app.logger.info("Created {} partitions: {}".format(table_name, created))
+
+    if dao_is_partitioned(Notification.__tablename__):
+        dropped = drop_notification_partitions_older_than_retention()
+        current_app.logger.info("Dropped {} partitions: {}".format(Notification.__tablename__, dropped))
+
+    history_retention_days = current_app.config['NOTIFICATION_HISTORY_PARTITION_RETENTION_DAYS']
+    if history_retention_days and dao_is_partitioned(NotificationHistory.__tablename__):
+        cutoff = get_local_timezone_midnight_in_utc(
+            convert_utc_to_local_timezone(datetime.utcnow()).date()
+        ) - timedelta(days=history_retention_days)
+        for partition in dao_get_partitions(NotificationHistory.__tablename__):
+            if partition.end is None or partition.end > cutoff:
+                break
+            dao_drop_partition(NotificationHistory.__tablename__, partition.name)
+            current_app.logger.info(
+                "Dropped {} partition: {}".format(NotificationHistory.__tablename__, partition.name)
+            )
@@ -10,7 +10,11 @@ from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 
 from app import notify_celery, statsd_client
 from app.config import QueueNames
-from app.dao.notifications_dao import update_notification_status_by_id, dao_get_notification_by_reference
+from app.dao.notifications_dao import (
+    update_notification_status_by_id,
+    dao_get_notification_by_reference,
+    country_records_delivery
+)
 from app.feature_flags import FeatureFlag, is_feature_enabled
 from app.models import (
     NOTIFICATION_DELIVERED,
@@ -21,6 +25,7 @@ from app.models import (
     NOTIFICATION_SENT, Notification, NOTIFICATION_PREFERENCES_DECLINED
 )
 from app.celery.service_callback_tasks import check_and_queue_callback_task
+from app.notifications.process_client_response import DeliveryReceipt, process_delivery_receipts
 
 FINAL_STATUS_STATES = [NOTIFICATION_DELIVERED, NOTIFICATION_PERMANENT_FAILURE, NOTIFICATION_TECHNICAL_FAILURE,
                        NOTIFICATION_PREFERENCES_DECLINED]
@@ -108,6 +113,59 @@ def process_pinpoint_results(self, response):
         self.retry(queue=QueueNames.RETRY)
 
 
+@notify_celery.task(bind=True, name="process-pinpoint-results-batch", max_retries=5, default_retry_delay=300)
+@statsd(namespace="tasks")
+def process_pinpoint_results_batch(self, responses):
+    """
+    Process a batch of Pinpoint receipts together.  Receipts for notifications that have not been saved yet, and
+    receipts that could not be processed, are retried as a smaller batch.
+    """
+    if not is_feature_enabled(FeatureFlag.PINPOINT_RECEIPTS_ENABLED):
+        current_app.logger.info('Pinpoint receipts toggle is disabled, skipping callback task')
+        return True
+
+    receipts = []
+    responses_to_retry = []
+
+    for response in responses:
+        try:
+            pinpoint_message = json.loads(base64.b64decode(response['Message']))
+            reference = pinpoint_message['attributes']['message_id']
+            event_type = pinpoint_message.get('event_type')
+            record_status = pinpoint_message['attributes']['record_status']
+
+            receipts.append(DeliveryReceipt(
+                reference=reference,
+                status=get_notification_status(event_type, record_status, reference),
+                message_time=datetime.datetime.fromtimestamp(int(pinpoint_message['event_timestamp']) / 1000),
+                response=response
+            ))
+        except Exception as e:
+            current_app.logger.exception(f"Error processing Pinpoint results: {type(e)}")
+            responses_to_retry.append(response)
+
+    # Receipts can arrive out of order; apply them in the order the events happened.
+    receipts.sort(key=lambda receipt: receipt.message_time)
+
+    try:
+        receipts_to_retry = process_delivery_receipts(receipts, 'pinpoint', _can_update_from_pinpoint_receipt)
+        responses_to_retry.extend(receipt.response for receipt in receipts_to_retry)
+    except Exception as e:
+        current_app.logger.exception(f"Error processing Pinpoint results: {type(e)}")
+        responses_to_retry.extend(receipt.response for receipt in receipts)
+
+    if responses_to_retry:
+        self.retry(args=[responses_to_retry], queue=QueueNames.RETRY)
+
+    return True
+
+
+def _can_update_from_pinpoint_receipt(notification: Notification, notification_status: str) -> bool:
+    if check_notification_status(notification, notification_status):
+        return False
+    return not (notification.international and not country_records_delivery(notification.phone_prefix))
+
+
 def get_notification_status(event_type: str, record_status: str, reference: str) -> str:
     if event_type_is_optout(event_type, reference):
         statsd_client.incr(f"callback.pinpoint.optout")
@@ -21,6 +21,7 @@ from app.dao import notifications_dao, services_dao, templates_dao
 from app.models import NOTIFICATION_SENDING, NOTIFICATION_PENDING, EMAIL_TYPE, KEY_TYPE_NORMAL
 from json import decoder
 from app.notifications import process_notifications
+from app.notifications.process_client_response import DeliveryReceipt, process_delivery_receipts
 from app.notifications.notifications_ses_callback import (
     determine_notification_bounce_type,
     handle_ses_complaint,
@@ -219,6 +220,58 @@ def process_ses_results(self, response):
         self.retry(queue=QueueNames.RETRY)
 
 
+@notify_celery.task(bind=True, name="process-ses-results-batch", max_retries=5, default_retry_delay=300)
+@statsd(namespace="tasks")
+def process_ses_results_batch(self, responses):
+    """
+    Process a batch of SES receipts together.  Receipts for notifications that have not been saved yet, and receipts
+    that could not be processed, are retried as a smaller batch.
+    """
+    receipts = []
+    responses_to_retry = []
+
+    for response in responses:
+        try:
+            ses_message = json.loads(response['Message'])
+            notification_type = ses_message.get('eventType')
+
+            if notification_type == 'Complaint':
+                publish_complaint(*handle_ses_complaint(ses_message))
+                continue
+
+            if notification_type == 'Bounce':
+                notification_type = determine_notification_bounce_type(notification_type, ses_message)
+
+            receipts.append(DeliveryReceipt(
+                reference=ses_message['mail']['messageId'],
+                status=get_aws_responses(notification_type)['notification_status'],
+                message_time=iso8601.parse_date(ses_message['mail']['timestamp']).replace(tzinfo=None),
+                response=response
+            ))
+        except Exception as e:
+            current_app.logger.exception('Error processing SES results: {}'.format(type(e)))
+            responses_to_retry.append(response)
+
+    try:
+        receipts_to_retry = process_delivery_receipts(receipts, 'ses', _can_update_from_ses_receipt)
+        responses_to_retry.extend(receipt.response for receipt in receipts_to_retry)
+    except Exception as e:
+        current_app.logger.exception('Error processing SES results: {}'.format(type(e)))
+        responses_to_retry.extend(receipt.response for receipt in receipts)
+
+    if responses_to_retry:
+        self.retry(args=[responses_to_retry], queue=QueueNames.RETRY)
+
+    return True
+
+
+def _can_update_from_ses_receipt(notification, status):
+    if notification.status not in {NOTIFICATION_SENDING, NOTIFICATION_PENDING}:
+        notifications_dao.duplicate_update_warning(notification, status)
+        return False
+    return True
+
+
 @notify_celery.task(bind=True, name="process-ses-smtp-results", max_retries=5, default_retry_delay=300)
 @statsd(namespace="tasks")
 def process_ses_smtp_results(self, response):
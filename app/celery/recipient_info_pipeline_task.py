@@ -0,0 +1,241 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from notifications_utils.statsd_decorators import statsd
+
+from app import db, notify_celery
+from app.celery.contact_information_tasks import get_contact_info
+from app.celery.lookup_recipient_communication_permissions_task import get_recipient_permission
+from app.celery.lookup_va_profile_id_task import set_va_profile_id
+from app.celery.onsite_notification_tasks import send_va_onsite_notification_task
+from app.config import QueueNames
+from app.dao.communication_item_dao import get_communication_item
+from app.dao.notifications_dao import dao_update_notification, get_notification_by_id, update_notification_status_by_id
+from app.exceptions import NotificationPermanentFailureException, NotificationTechnicalFailureException
+from app.models import NOTIFICATION_PERMANENT_FAILURE, NOTIFICATION_PREFERENCES_DECLINED, NOTIFICATION_TECHNICAL_FAILURE
+from app.va.identifier import IdentifierType, UnsupportedIdentifierException
+from app.va.mpi import (
+    BeneficiaryDeceasedException,
+    IdentifierNotFound,
+    IncorrectNumberOfIdentifiersException,
+    MpiRetryableException,
+    MultipleActiveVaProfileIdsException,
+    NoSuchIdentifierException,
+)
+from app.va.va_profile import NoContactInfoException, VAProfileNonRetryableException, VAProfileRetryableException
+from app.va.va_profile.exceptions import VAProfileIDNotFoundException
+
+MPI_STAGE = 'lookup-va-profile-id'
+ONSITE_STAGE = 'send-onsite-notification'
+CONTACT_INFO_STAGE = 'lookup-contact-info'
+PERMISSIONS_STAGE = 'lookup-communication-permissions'
+
+# Each stage is retried as many times as the task it replaces
+STAGE_MAX_RETRIES = {
+    MPI_STAGE: 48,
+    CONTACT_INFO_STAGE: 48,
+    PERMISSIONS_STAGE: 5,
+}
+
+
+@notify_celery.task(bind=True, name="lookup-recipient-info-tasks", max_retries=None, default_retry_delay=300)
+@statsd(namespace="tasks")
+def lookup_recipient_info(
+    self, notification_id, onsite_enabled=False, check_permissions=False, completed_stages=(), stage_retries=None
+):
+    """
+    Look up everything needed to deliver a notification sent to a recipient identifier, in one task, instead of a
+    chain of a task per lookup: the VA Profile ID from MPI, then concurrently the VA Profile contact information and
+    communication permission.  The onsite notification is posted from its own queue, once the VA Profile ID is known.
+
+    Each stage is retried, and fails the notification, as the task it replaces does.  The VA Profile ID is saved on
+    the notification once it is found, and the other stages that have completed are passed on to retries of this task
+    in completed_stages, so that no stage is repeated.  Each stage's retries are counted separately in stage_retries.
+    The delivery task chained after this one is stopped if the notification fails or the recipient has declined it.
+    """
+    current_app.logger.info(f"Looking up recipient information for notification {notification_id}")
+
+    options = {'onsite_enabled': onsite_enabled, 'check_permissions': check_permissions}
+    completed_stages = set(completed_stages)
+    stage_retries = dict(stage_retries or {})
+    notification = get_notification_by_id(notification_id)
+
+    if IdentifierType.VA_PROFILE_ID.value not in notification.recipient_identifiers:
+        _lookup_va_profile_id(self, notification, stage_retries, options)
+
+    va_profile_id = notification.recipient_identifiers[IdentifierType.VA_PROFILE_ID.value].id_value
+    notification_type = notification.notification_type
+
+    va_profile_item_id = None
+    if check_permissions and PERMISSIONS_STAGE not in completed_stages:
+        va_profile_item_id = get_communication_item(notification.template.communication_item_id).va_profile_item_id
+
+    if onsite_enabled and ONSITE_STAGE not in completed_stages:
+        send_va_onsite_notification_task.apply_async(
+            args=(va_profile_id, notification.template.id, onsite_enabled), queue=QueueNames.SEND_ONSITE_NOTIFICATION
+        )
+        completed_stages.add(ONSITE_STAGE)
+
+    app = current_app._get_current_object()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        contact_info = None
+        if CONTACT_INFO_STAGE not in completed_stages:
+            contact_info = executor.submit(
+                _in_app_context, app, get_contact_info, va_profile_id, notification_type, notification_id
+            )
+
+        permission = None
+        if va_profile_item_id is not None:
+            permission = executor.submit(
+                _in_app_context, app, get_recipient_permission, IdentifierType.VA_PROFILE_ID.value, va_profile_id,
+                notification_id, notification_type, va_profile_item_id
+            )
+
+    # The handlers return None for a stage to be retried, and False to stop.  Contact information is handled first, as
+    # it was looked up before the permission when these were separate tasks.
+    retry_stages = []
+    for stage, future, handler in (
+        (CONTACT_INFO_STAGE, contact_info, _handle_contact_info),
+        (PERMISSIONS_STAGE, permission, _handle_permission),
+    ):
+        if future is None:
+            continue
+
+        result = handler(self, notification, future, retry_stages)
+        if result:
+            completed_stages.add(stage)
+        elif result is not None:
+            return
+
+    if retry_stages:
+        _retry_stages(self, notification_id, retry_stages, completed_stages, stage_retries, options)
+
+
+def _lookup_va_profile_id(task, notification, stage_retries, options):
+    notification_id = notification.id
+
+    try:
+        va_profile_id = set_va_profile_id(notification)
+        current_app.logger.info(
+            f"Successfully updated notification {notification_id} with VA PROFILE ID {va_profile_id}"
+        )
+
+    except MpiRetryableException as e:
+        current_app.logger.warning(f"Received {str(e)} for notification {notification_id}.")
+        _retry_stages(task, notification_id, [(MPI_STAGE, e)], set(), stage_retries, options)
+
+    except (BeneficiaryDeceasedException, IdentifierNotFound, MultipleActiveVaProfileIdsException,
+            UnsupportedIdentifierException, IncorrectNumberOfIdentifiersException, NoSuchIdentifierException) as e:
+        message = f"{e.__class__.__name__} - {str(e)}: " \
+                  f"Can't proceed after querying MPI for VA Profile ID for {notification_id}. " \
+                  "Stopping execution of following tasks. Notification has been updated to permanent-failure."
+        current_app.logger.warning(message)
+        task.request.chain = None
+        update_notification_status_by_id(
+            notification_id, NOTIFICATION_PERMANENT_FAILURE, status_reason=e.failure_reason
+        )
+        raise NotificationPermanentFailureException(message) from e
+
+    except Exception as e:
+        message = f"Failed to retrieve VA Profile ID from MPI for notification: {notification_id} " \
+                  "Notification has been updated to technical-failure"
+        current_app.logger.exception(message)
+
+        status_reason = e.failure_reason if hasattr(e, 'failure_reason') else 'Unknown error from MPI'
+        update_notification_status_by_id(
+            notification_id, NOTIFICATION_TECHNICAL_FAILURE, status_reason=status_reason
+        )
+        raise NotificationTechnicalFailureException(message) from e
+
+
+def _handle_contact_info(task, notification, future, retry_stages):
+    notification_id = notification.id
+
+    try:
+        recipient = future.result()
+
+    except VAProfileRetryableException as e:
+        current_app.logger.exception(e)
+        retry_stages.append((CONTACT_INFO_STAGE, e))
+        return None
+
+    except NoContactInfoException as e:
+        message = (
+            f'Can\'t proceed after querying VA Profile for contact information for {notification_id}. '
+            'Stopping execution of following tasks. Notification has been updated to permanent-failure.'
+        )
+        current_app.logger.warning(f'{e.__class__.__name__} - {str(e)}: ' + message)
+        task.request.chain = None
+
+        update_notification_status_by_id(
+            notification_id, NOTIFICATION_PERMANENT_FAILURE, status_reason=e.failure_reason
+        )
+        return False
+
+    except (VAProfileIDNotFoundException, VAProfileNonRetryableException) as e:
+        current_app.logger.exception(e)
+        message = (
+            f'The task lookup_recipient_info failed to look up contact information for notification '
+            f'{notification_id}. Notification has been updated to permanent-failure'
+        )
+        task.request.chain = None
+        update_notification_status_by_id(
+            notification_id, NOTIFICATION_PERMANENT_FAILURE, status_reason=e.failure_reason
+        )
+        raise NotificationPermanentFailureException(message) from e
+
+    notification.to = recipient
+    dao_update_notification(notification)
+    return True
+
+
+def _handle_permission(task, notification, future, retry_stages):
+    notification_id = notification.id
+
+    try:
+        is_allowed = future.result()
+    except VAProfileRetryableException as e:
+        current_app.logger.exception(e)
+        retry_stages.append((PERMISSIONS_STAGE, e))
+        return None
+
+    if not is_allowed:
+        update_notification_status_by_id(notification_id, NOTIFICATION_PREFERENCES_DECLINED,
+                                         status_reason="Contact preferences set to false")
+        current_app.logger.info(f"Recipient for notification {notification_id}"
+                                f"has declined permission to receive notifications")
+        task.request.chain = None
+
+    return is_allowed
+
+
+def _retry_stages(task, notification_id, retry_stages, completed_stages, stage_retries, options):
+    for stage, e in retry_stages:
+        if stage_retries.get(stage, 0) >= STAGE_MAX_RETRIES[stage]:
+            message = (
+                'RETRY FAILED: Max retries reached. '
+                f'The stage {stage} of the task lookup_recipient_info failed for notification {notification_id}. '
+                'Notification has been updated to technical-failure'
+            )
+            task.request.chain = None
+            update_notification_status_by_id(
+                notification_id, NOTIFICATION_TECHNICAL_FAILURE, status_reason=e.failure_reason
+            )
+            raise NotificationTechnicalFailureException(message) from e
+
+    for stage, _ in retry_stages:
+        stage_retries[stage] = stage_retries.get(stage, 0) + 1
+
+    task.retry(
+        queue=QueueNames.RETRY,
+        args=[notification_id],
+        kwargs={**options, 'completed_stages': sorted(completed_stages), 'stage_retries': stage_retries}
+    )
+
+
+def _in_app_context(app, function, *args):
+    with app.app_context():
+        try:
+            return function(*args)
+        finally:
+            db.session.remove()
@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from time import monotonic
 import io
 import boto3
 import csv
@@ -8,17 +9,20 @@ from celery import chain
 from notifications_utils.statsd_decorators import statsd
 from notifications_utils.timezones import convert_utc_to_local_timezone
 
-from app import notify_celery
+from app import notify_celery, statsd_client
 from app.config import QueueNames
 from app.cronitor import cronitor
 from app.dao.fact_billing_dao import (
     fetch_billing_data_for_day,
-    update_fact_billing
+    upsert_fact_billing_for_day
 )
 from app.dao.fact_notification_status_dao import (
     fetch_notification_status_for_day,
     update_fact_notification_status,
-    fetch_notification_statuses_per_service_and_template_for_date)
+    fetch_notification_statuses_per_service_and_template_for_date,
+    rebuild_fact_notification_status_for_day,
+    rebuild_fact_notification_status_for_day_in_chunks,
+    refresh_fact_notification_status_hourly)
 from app.feature_flags import is_feature_enabled, FeatureFlag
 
 
@@ -56,12 +60,11 @@ def create_nightly_billing_for_day(process_day):
         (end - start).seconds)
     )
 
-    for data in transit_data:
-        update_fact_billing(data, process_day)
+    rows_updated = upsert_fact_billing_for_day(transit_data, process_day)
 
     current_app.logger.info(
         "create-nightly-billing-for-day task complete. {} rows updated for day: {}".format(
-            len(transit_data),
+            rows_updated,
             process_day
         )
     )
@@ -103,19 +106,45 @@ def create_nightly_notification_status(day_start=None):
 def create_nightly_notification_status_for_day(process_day):
     process_day = datetime.strptime(process_day, "%Y-%m-%d").date()
 
-    start = datetime.utcnow()
-    transit_data = fetch_notification_status_for_day(process_day=process_day)
-    end = datetime.utcnow()
-    current_app.logger.info('create-nightly-notification-status-for-day {} fetched in {} seconds'.format(
-        process_day,
-        (end - start).seconds)
+    start = monotonic()
+    if is_feature_enabled(FeatureFlag.NIGHTLY_NOTIFICATION_STATUS_SET_BASED_ENABLED):
+        chunk_size = current_app.config['NIGHTLY_NOTIFICATION_STATUS_SERVICE_CHUNK_SIZE']
+        if chunk_size:
+            path = 'set-based-chunked'
+            rows = rebuild_fact_notification_status_for_day_in_chunks(process_day, chunk_size)
+        else:
+            path = 'set-based'
+            rows = rebuild_fact_notification_status_for_day(process_day)
+    else:
+        path = 'per-service'
+        transit_data = fetch_notification_status_for_day(process_day=process_day)
+        current_app.logger.info('create-nightly-notification-status-for-day {} fetched in {} seconds'.format(
+            process_day,
+            round(monotonic() - start, 3))
+        )
+        update_fact_notification_status(transit_data, process_day)
+        rows = len(transit_data)
+
+    elapsed = monotonic() - start
+    statsd_client.timing(f'tasks.create-nightly-notification-status-for-day.{path}', elapsed * 1000)
+
+    current_app.logger.info(
+        "create-nightly-notification-status-for-day task complete: {} rows updated for day: {} "
+        "in {} seconds ({})".format(
+            rows, process_day, round(elapsed, 3), path
+        )
     )
 
-    update_fact_notification_status(transit_data, process_day)
+
+@notify_celery.task(name="refresh-ft-notification-status-hourly")
+@statsd(namespace="tasks")
+def refresh_ft_notification_status_hourly():
+    start = monotonic()
+    hours = refresh_fact_notification_status_hourly()
 
     current_app.logger.info(
-        "create-nightly-notification-status-for-day task complete: {} rows updated for day: {}".format(
-            len(transit_data), process_day
+        "refresh-ft-notification-status-hourly complete: {} hours recounted in {} seconds".format(
+            hours, round(monotonic() - start, 3)
         )
     )
 
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import (
     datetime,
     timedelta
@@ -19,7 +20,7 @@ from app.dao.notifications_dao import (
     is_delivery_slow_for_provider,
     dao_get_scheduled_notifications,
     set_scheduled_notification_to_processed,
-    notifications_not_yet_sent,
+    dao_claim_notifications_not_yet_sent,
     dao_precompiled_letters_still_pending_virus_check,
     dao_old_letters_with_created_status,
 )
@@ -35,7 +36,7 @@ from app.models import (
     SMS_TYPE,
     EMAIL_TYPE,
 )
-from app.notifications.process_notifications import send_notification_to_queue
+from app.notifications.process_notifications import send_notification_to_queue, send_notifications_to_queue
 from app.v2.errors import JobIncompleteError
 
 
@@ -173,18 +174,26 @@ def replay_created_notifications():
     # if the notification has not be send after 4 hours + 15 minutes, then try to resend.
     resend_created_notifications_older_than = (60 * 60 * 4) + (60 * 15)
     for notification_type in (EMAIL_TYPE, SMS_TYPE):
-        notifications_to_resend = notifications_not_yet_sent(
+        replayed = 0
+        for notifications in dao_claim_notifications_not_yet_sent(
             resend_created_notifications_older_than,
-            notification_type
-        )
-
-        if len(notifications_to_resend) > 0:
-            current_app.logger.info("Sending {} {} notifications "
+            notification_type,
+            batch_size=current_app.config['REPLAY_CREATED_NOTIFICATIONS_BATCH_SIZE'],
+            claim_seconds=current_app.config['REPLAY_CREATED_NOTIFICATIONS_CLAIM_SECONDS'],
+        ):
+            # The delivery task, and for SMS the sender, is resolved once for each group of notifications that share it.
+            groups = defaultdict(list)
+            for n in notifications:
+                groups[(n.service, n.reply_to_text, n.key_type)].append(n)
+
+            for (service, _, _), group in groups.items():
+                failed = send_notifications_to_queue(group, research_mode=service.research_mode)
+                replayed += len(group) - len(failed)
+
+        if replayed > 0:
+            current_app.logger.info("Sent {} {} notifications "
                                     "to the delivery queue because the notification "
-                                    "status was created.".format(len(notifications_to_resend), notification_type))
-
-        for n in notifications_to_resend:
-            send_notification_to_queue(notification=n, research_mode=n.service.research_mode)
+                                    "status was created.".format(replayed, notification_type))
 
 
 @notify_celery.task(name='check-precompiled-letter-state')
@@ -1,13 +1,23 @@
+import uuid
+
+from celery.exceptions import Retry
 from flask import current_app
 from notifications_utils.statsd_decorators import statsd
 
 from app import (
     notify_celery,
     encryption,
+    redis_store,
     statsd_client,
     DATETIME_FORMAT
 )
-from app.celery.exceptions import RetryableException, NonRetryableException
+from app.callback.sqs_client import MAX_BATCH_ENTRIES
+from app.celery.exceptions import (
+    HostBusyException,
+    NonRetryableException,
+    PartialBatchException,
+    RetryableException,
+)
 from app.config import QueueNames
 from app.dao.complaint_dao import fetch_complaint_by_id
 from app.dao.inbound_sms_dao import dao_get_inbound_sms_by_id
@@ -17,7 +27,18 @@ from app.dao.service_callback_api_dao import (
     get_service_inbound_sms_callback_api_for_service, get_service_callback
 )
 from app.dao.service_sms_sender_dao import dao_get_service_sms_sender_by_service_id_and_number
-from app.models import Complaint, Notification
+from app.models import QUEUE_CHANNEL_TYPE, Complaint, Notification
+
+# Longer than sending a batch can take, so that the lock on a buffer outlives the task holding it unless it dies
+STATUS_UPDATE_BUFFER_LOCK_SECONDS = 300
+
+# Deletes a lock only if it still holds the token of the task releasing it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
 
 
 @notify_celery.task(bind=True, name="send-delivery-status", max_retries=5, default_retry_delay=300)
@@ -28,16 +49,7 @@ def send_delivery_status_to_service(
     service_callback = get_service_callback(service_callback_id)
     status_update = encryption.decrypt(encrypted_status_update)
 
-    payload = {
-        "id": str(notification_id),
-        "reference": status_update['notification_client_reference'],
-        "to": status_update['notification_to'],
-        "status": status_update['notification_status'],
-        "created_at": status_update['notification_created_at'],
-        "completed_at": status_update['notification_updated_at'],
-        "sent_at": status_update['notification_sent_at'],
-        "notification_type": status_update['notification_type']
-    }
+    payload = create_delivery_status_payload(notification_id, status_update)
     logging_tags = {
         "notification_id": str(notification_id)
     }
@@ -46,6 +58,8 @@ def send_delivery_status_to_service(
             payload=payload,
             logging_tags=logging_tags
         )
+    except HostBusyException as e:
+        _defer_for_busy_host(self, [service_callback_id, notification_id, encrypted_status_update], logging_tags, e)
     except RetryableException as e:
         try:
             current_app.logger.warning(
@@ -66,6 +80,66 @@ def send_delivery_status_to_service(
         raise e
 
 
+@notify_celery.task(bind=True, name="send-delivery-status-batch", max_retries=5, default_retry_delay=300)
+@statsd(namespace="tasks")
+def send_delivery_status_batch_to_service(self, service_callback_id, encrypted_status_updates=None):
+    """
+    Send the status updates buffered for a batched service callback as one callback.  When
+    encrypted_status_updates is given (on a retry), that exact batch is sent again.
+    """
+    if encrypted_status_updates is None:
+        _send_buffered_status_updates(self, service_callback_id)
+    elif encrypted_status_updates:
+        _send_status_update_batch(self, service_callback_id, encrypted_status_updates)
+
+
+def _send_status_update_batch(task, service_callback_id, encrypted_status_updates):
+    service_callback = get_service_callback(service_callback_id)
+    status_updates = [encryption.decrypt(status_update) for status_update in encrypted_status_updates]
+
+    payloads = [
+        create_delivery_status_payload(status_update['notification_id'], status_update)
+        for status_update in status_updates
+    ]
+    logging_tags = {
+        "service_callback_id": str(service_callback_id),
+        "notification_ids": ",".join(payload['id'] for payload in payloads)
+    }
+    try:
+        service_callback.send_batch(
+            payloads=payloads,
+            logging_tags=logging_tags
+        )
+    except HostBusyException as e:
+        _defer_for_busy_host(task, [service_callback_id, encrypted_status_updates], logging_tags, e)
+    except RetryableException as e:
+        if isinstance(e, PartialBatchException):
+            # Only the status updates that were not sent are sent again
+            failed_ids = {payload['id'] for payload in e.failed_payloads}
+            encrypted_status_updates = [
+                encrypted_status_update
+                for encrypted_status_update, payload in zip(encrypted_status_updates, payloads)
+                if payload['id'] in failed_ids
+            ]
+        try:
+            current_app.logger.warning(
+                f"Retrying: {task.name} failed for {logging_tags}, url {service_callback.url}. "
+                f"exc: {e}"
+            )
+            task.retry(args=[service_callback_id, encrypted_status_updates], queue=QueueNames.RETRY)
+        except task.MaxRetriesExceededError:
+            current_app.logger.error(
+                f"Retry: {task.name} has retried the max num of times for {logging_tags}, url "
+                f"{service_callback.url}. exc: {e}")
+            raise e
+    except NonRetryableException as e:
+        current_app.logger.error(
+            f"Not retrying: {task.name} failed for {logging_tags}, url: {service_callback.url}. "
+            f"exc: {e}"
+        )
+        raise e
+
+
 @notify_celery.task(bind=True, name="send-complaint", max_retries=5, default_retry_delay=300)
 @statsd(namespace="tasks")
 def send_complaint_to_service(self, service_callback_id, complaint_data):
@@ -88,6 +162,8 @@ def send_complaint_to_service(self, service_callback_id, complaint_data):
             payload=payload,
             logging_tags=logging_tags
         )
+    except HostBusyException as e:
+        _defer_for_busy_host(self, [service_callback_id, complaint_data], logging_tags, e)
     except RetryableException as e:
         try:
             current_app.logger.warning(
@@ -171,6 +247,8 @@ def send_inbound_sms_to_service(self, inbound_sms_id, service_id):
             payload=payload,
             logging_tags=logging_tags
         )
+    except HostBusyException as e:
+        _defer_for_busy_host(self, [inbound_sms_id, service_id], logging_tags, e)
     except RetryableException as e:
         try:
             current_app.logger.warning(
@@ -191,6 +269,20 @@ def send_inbound_sms_to_service(self, inbound_sms_id, service_id):
         raise e
 
 
+def _defer_for_busy_host(task, args, logging_tags, e):
+    """
+    Send a callback again after WEBHOOK_HOST_BUSY_RETRY_DELAY seconds, when its host already has as many callbacks
+    in flight as it is allowed.  The callback didn't fail, so this is not counted against the task's max_retries.
+    """
+    current_app.logger.info(f"Deferring: {task.name} for {logging_tags}. exc: {e}")
+    task.apply_async(
+        args,
+        queue=QueueNames.RETRY,
+        countdown=current_app.config['WEBHOOK_HOST_BUSY_RETRY_DELAY'],
+        retries=task.request.retries
+    )
+
+
 def create_delivery_status_callback_data(notification, service_callback_api):
     from app import DATETIME_FORMAT, encryption
     data = {
@@ -223,6 +315,19 @@ def create_complaint_callback_data(complaint, notification, service_callback_api
     return encryption.encrypt(data)
 
 
+def create_delivery_status_payload(notification_id, status_update):
+    return {
+        "id": str(notification_id),
+        "reference": status_update['notification_client_reference'],
+        "to": status_update['notification_to'],
+        "status": status_update['notification_status'],
+        "created_at": status_update['notification_created_at'],
+        "completed_at": status_update['notification_updated_at'],
+        "sent_at": status_update['notification_sent_at'],
+        "notification_type": status_update['notification_type']
+    }
+
+
 def check_and_queue_callback_task(notification):
     # queue callback task only if the service_callback_api exists
     service_callback_api = get_service_delivery_status_callback_api_for_service(
@@ -230,8 +335,162 @@ def check_and_queue_callback_task(notification):
     )
     if service_callback_api:
         notification_data = create_delivery_status_callback_data(notification, service_callback_api)
-        send_delivery_status_to_service.apply_async([service_callback_api.id, str(notification.id), notification_data],
-                                                    queue=QueueNames.CALLBACKS)
+        if not (_should_batch(service_callback_api) and _buffer_status_update(service_callback_api, notification_data)):
+            send_delivery_status_to_service.apply_async(
+                [service_callback_api.id, str(notification.id), notification_data],
+                queue=QueueNames.CALLBACKS
+            )
+
+
+def check_and_queue_callback_tasks(notifications):
+    """
+    Queue delivery status callbacks for many notifications.  Each service's callback is looked up once per status, and
+    every task is published on one broker connection.  Callbacks to a queue are sent in batches of up to
+    MAX_BATCH_ENTRIES, the most that SQS takes in one SendMessageBatch request.
+    """
+    service_callback_apis = {}
+    queue_batches = {}
+
+    with notify_celery.producer_or_acquire() as producer:
+        for notification in notifications:
+            key = (notification.service_id, notification.status)
+            if key not in service_callback_apis:
+                service_callback_apis[key] = get_service_delivery_status_callback_api_for_service(
+                    service_id=notification.service_id, notification_status=notification.status
+                )
+
+            service_callback_api = service_callback_apis[key]
+            if not service_callback_api:
+                continue
+
+            notification_data = create_delivery_status_callback_data(notification, service_callback_api)
+            if _should_batch(service_callback_api) and _buffer_status_update(
+                service_callback_api, notification_data, producer
+            ):
+                continue
+
+            if service_callback_api.callback_channel == QUEUE_CHANNEL_TYPE:
+                queue_batches.setdefault(service_callback_api.id, []).append(notification_data)
+            else:
+                send_delivery_status_to_service.apply_async(
+                    [service_callback_api.id, str(notification.id), notification_data],
+                    queue=QueueNames.CALLBACKS,
+                    producer=producer
+                )
+
+        for service_callback_id, status_updates in queue_batches.items():
+            for start in range(0, len(status_updates), MAX_BATCH_ENTRIES):
+                send_delivery_status_batch_to_service.apply_async(
+                    [str(service_callback_id), status_updates[start:start + MAX_BATCH_ENTRIES]],
+                    queue=QueueNames.CALLBACKS,
+                    producer=producer
+                )
+
+
+def _should_batch(service_callback_api):
+    # The batch buffer is held in Redis; without it, callbacks are sent one at a time.
+    return service_callback_api.batch_callbacks and redis_store.active
+
+
+def _status_update_buffer_key(service_callback_id):
+    return f'service-callback-batch-{service_callback_id}'
+
+
+def _buffer_status_update(service_callback_api, encrypted_status_update, producer=None):
+    """
+    Add a status update to a batched service callback's buffer.  The first update in the buffer schedules a batch to
+    be sent after SERVICE_CALLBACK_BATCH_LINGER_MS; a full batch is sent straight away.
+
+    Returns False if Redis couldn't be reached, for the status update to be sent on its own instead.
+    """
+    try:
+        buffered = redis_store.redis_store.rpush(
+            _status_update_buffer_key(service_callback_api.id), encrypted_status_update
+        )
+    except Exception as e:
+        current_app.logger.warning(
+            f"Sending status update for service callback {service_callback_api.id} on its own, as Redis failed: {e}"
+        )
+        return False
+
+    if buffered == 1:
+        countdown = current_app.config['SERVICE_CALLBACK_BATCH_LINGER_MS'] / 1000
+    elif buffered % current_app.config['SERVICE_CALLBACK_BATCH_SIZE'] == 0:
+        countdown = 0
+    else:
+        return True
+
+    send_delivery_status_batch_to_service.apply_async(
+        [str(service_callback_api.id)],
+        queue=QueueNames.CALLBACKS,
+        countdown=countdown,
+        producer=producer
+    )
+    return True
+
+
+def _send_buffered_status_updates(task, service_callback_id):
+    """
+    Send the oldest SERVICE_CALLBACK_BATCH_SIZE status updates in a service callback's buffer, and only then remove
+    them from it, so that updates are not lost if the task dies.  Updates are also removed once they have been handed
+    to a retry of the task, or can't be sent.
+
+    Only one task sends from a buffer at a time, so that the updates it removes are the ones it read.  A task that
+    finds the buffer locked leaves it to the task holding the lock.  However the task holding the lock ends, it queues
+    another batch if any updates are left, after the task's retry delay if the batch wasn't sent or Redis failed.
+    """
+    key = _status_update_buffer_key(service_callback_id)
+    lock_key = f'{key}-lock'
+    lock_token = str(uuid.uuid4())
+
+    try:
+        if not redis_store.redis_store.set(lock_key, lock_token, nx=True, ex=STATUS_UPDATE_BUFFER_LOCK_SECONDS):
+            return
+    except Exception as e:
+        current_app.logger.warning(
+            f"Not sending buffered status updates for service callback {service_callback_id} yet, as Redis failed: {e}"
+        )
+        _queue_buffered_status_updates(service_callback_id, countdown=task.default_retry_delay)
+        return
+
+    done = False
+    try:
+        batch_size = current_app.config['SERVICE_CALLBACK_BATCH_SIZE']
+        encrypted_status_updates = [
+            status_update.decode('utf-8') for status_update in redis_store.redis_store.lrange(key, 0, batch_size - 1)
+        ]
+        if encrypted_status_updates:
+            try:
+                _send_status_update_batch(task, service_callback_id, encrypted_status_updates)
+            except (Retry, RetryableException, NonRetryableException):
+                redis_store.redis_store.ltrim(key, len(encrypted_status_updates), -1)
+                done = True
+                raise
+            redis_store.redis_store.ltrim(key, len(encrypted_status_updates), -1)
+        done = True
+    finally:
+        _release_status_update_buffer(task, service_callback_id, key, lock_key, lock_token, done)
+
+
+def _release_status_update_buffer(task, service_callback_id, key, lock_key, lock_token, done):
+    try:
+        # Only the lock this task took is released, in case the task outlived it and another task has taken it since
+        redis_store.redis_store.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, lock_token)
+        remaining = redis_store.redis_store.llen(key)
+    except Exception as e:
+        current_app.logger.warning(
+            f"Failed to release buffered status updates for service callback {service_callback_id}: {e}"
+        )
+        remaining, done = True, False
+
+    if remaining:
+        _queue_buffered_status_updates(service_callback_id, countdown=0 if done else task.default_retry_delay)
+
+
+def _queue_buffered_status_updates(service_callback_id, countdown=0):
+    send_delivery_status_batch_to_service.apply_async(
+        [str(service_callback_id)], queue=QueueNames.CALLBACKS, countdown=countdown
+    )
 
 
 def _check_and_queue_complaint_callback_task(complaint, notification, recipient):
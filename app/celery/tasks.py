@@ -1,3 +1,5 @@
+import csv
+import io
 from datetime import datetime
 from collections import namedtuple, defaultdict
 
@@ -25,12 +27,14 @@ from app.config import QueueNames
 from app.dao.daily_sorted_letter_dao import dao_create_or_update_daily_sorted_letter
 from app.dao.jobs_dao import (
     dao_update_job,
+    dao_update_job_checkpoint,
     dao_get_job_by_id,
 )
 from app.dao.notifications_dao import (
     get_notification_by_id,
     dao_update_notifications_by_reference,
     dao_get_last_notification_added_for_job_id,
+    dao_get_job_row_numbers_with_notifications,
     update_notification_status_by_reference,
     dao_get_notification_history_by_reference,
 )
@@ -62,7 +66,12 @@ from app.models import (
     SMS_TYPE,
     DailySortedLetter,
 )
-from app.notifications.process_notifications import persist_notification
+from app.notifications.process_notifications import (
+    build_notification,
+    persist_notification,
+    persist_notifications,
+    send_notifications_to_queue,
+)
 from app.service.utils import service_allowed_to_send_to
 
 
@@ -98,6 +107,11 @@ def process_job(job_id, sender_id=None):
 
     current_app.logger.debug("Starting job {} processing {} notifications".format(job_id, job.notification_count))
 
+    if _chunked_processing_enabled(template):
+        process_job_chunks(job, template, service, sender_id=sender_id)
+        job_complete(job, start=start)
+        return
+
     for row in RecipientCSV(
             s3.get_job_from_s3(str(service.id), str(job_id)),
             template_type=template.template_type,
@@ -159,6 +173,142 @@ def process_row(row, template, job, service, sender_id=None):
     )
 
 
+def _chunked_processing_enabled(template):
+    # Letter jobs are still saved one row at a time by save-letter.
+    return is_feature_enabled(FeatureFlag.JOB_CHUNKED_PROCESSING_ENABLED) and template.template_type != LETTER_TYPE
+
+
+JobChunk = namedtuple('JobChunk', ['first_row_number', 'row_count', 'csv_data', 'end_offset'])
+
+
+class _ByteCountingLines:
+    """
+    Decode the lines of a job's CSV file, counting the bytes read so far.
+    """
+
+    def __init__(self, lines, offset=0):
+        self._lines = iter(lines)
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self._lines)
+        self.offset += len(line)
+        return line.decode('utf-8')
+
+
+def get_job_chunks(lines, chunk_size, header=None, first_row_number=0, offset=0):
+    """
+    Split the lines of a job's CSV file, as bytes, into chunks of up to chunk_size rows without reading the whole
+    file first.  Each chunk is CSV starting with the file's header row, and records the byte offset in the file of
+    the end of its last row.
+
+    To start part way through the file, pass lines starting at that offset, with the file's header row and the row
+    number of the first row in lines.
+    """
+    counted_lines = _ByteCountingLines(lines, offset)
+    reader = csv.reader(counted_lines)
+
+    if header is None:
+        header = next(reader, None)
+        if header is None:
+            return
+
+    rows = []
+    for row in reader:
+        rows.append(row)
+        if len(rows) == chunk_size:
+            yield JobChunk(first_row_number, len(rows), _to_csv(header, rows), counted_lines.offset)
+            first_row_number += len(rows)
+            rows = []
+
+    if rows:
+        yield JobChunk(first_row_number, len(rows), _to_csv(header, rows), counted_lines.offset)
+
+
+def _to_csv(header, rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+def _get_job_header(job):
+    lines = _ByteCountingLines(s3.stream_job_from_s3(str(job.service_id), str(job.id)))
+    return next(csv.reader(lines), None)
+
+
+def process_job_chunks(job, template, service, sender_id=None, resume=False):
+    """
+    Stream the job's CSV file from S3 and send each chunk of JOB_CHUNK_SIZE rows to a save-batch task, recording a
+    checkpoint on the job after each chunk.  When resuming, the file is read from the job's last checkpoint.
+    """
+    chunk_size = current_app.config['JOB_CHUNK_SIZE']
+    job_id = job.id
+
+    if resume and job.bytes_processed:
+        current_app.logger.info("Resuming job {} from row {}".format(job_id, job.rows_processed))
+        chunks = get_job_chunks(
+            s3.stream_job_from_s3(str(service.id), str(job_id), start_byte=job.bytes_processed),
+            chunk_size,
+            header=_get_job_header(job),
+            first_row_number=job.rows_processed,
+            offset=job.bytes_processed
+        )
+    else:
+        chunks = get_job_chunks(s3.stream_job_from_s3(str(service.id), str(job_id)), chunk_size)
+
+    with notify_celery.producer_or_acquire() as producer:
+        for chunk in chunks:
+            rows = list(RecipientCSV(
+                chunk.csv_data,
+                template_type=template.template_type,
+                placeholders=template.placeholders
+            ).get_rows())
+
+            process_chunk(rows, chunk.first_row_number, template, job, service, sender_id=sender_id, producer=producer)
+
+            # A chunk sent again after a failure here is harmless, because save-batch skips rows that are saved.
+            dao_update_job_checkpoint(job_id, chunk.first_row_number + chunk.row_count, chunk.end_offset)
+
+
+def process_chunk(rows, first_row_number, template, job, service, sender_id=None, producer=None):
+    if not rows:
+        return
+
+    encrypted = encryption.encrypt({
+        'template': str(template.id),
+        'template_version': job.template_version,
+        'job': str(job.id),
+        'notifications': [
+            {
+                'id': create_uuid(),
+                'to': row.recipient,
+                'row_number': first_row_number + row.index,
+                'personalisation': dict(row.personalisation)
+            }
+            for row in rows
+        ]
+    })
+
+    task_kwargs = {}
+    if sender_id:
+        task_kwargs['sender_id'] = sender_id
+
+    save_batch.apply_async(
+        (
+            str(service.id),
+            encrypted,
+        ),
+        task_kwargs,
+        queue=QueueNames.DATABASE if not service.research_mode else QueueNames.RESEARCH_MODE,
+        producer=producer
+    )
+
+
 def __sending_limits_for_job_exceeded(service, job, job_id):
     total_sent = fetch_todays_total_message_count(service.id)
 
@@ -286,6 +436,88 @@ def save_email(self,
         handle_exception(self, notification, notification_id, e)
 
 
+@notify_celery.task(bind=True, name="save-batch", max_retries=5, default_retry_delay=300)
+@statsd(namespace="tasks")
+def save_batch(self,
+               service_id,
+               encrypted_batch,
+               sender_id=None):
+    """
+    Save the notifications for a chunk of a job's rows with a single INSERT, then enqueue their delivery.  Rows that
+    already have a notification, from an earlier attempt or a resumed job, are skipped, so the task can be retried.
+    """
+    batch = encryption.decrypt(encrypted_batch)
+    service = dao_fetch_service_by_id(service_id)
+    template = dao_get_template_by_id(batch['template'], version=batch['template_version'])
+    notification_type = template.template_type
+
+    if sender_id and notification_type == SMS_TYPE:
+        reply_to_text = dao_get_service_sms_sender_by_id(service_id, sender_id).sms_sender
+    elif sender_id and notification_type == EMAIL_TYPE:
+        reply_to_text = dao_get_reply_to_by_id(service_id, sender_id).email_address
+    else:
+        reply_to_text = template.get_reply_to_text()
+
+    rows = batch['notifications']
+    saved_row_numbers = dao_get_job_row_numbers_with_notifications(
+        batch['job'], [row['row_number'] for row in rows]
+    )
+
+    notifications = []
+    created_at = datetime.utcnow()
+    for row in rows:
+        if row['row_number'] in saved_row_numbers:
+            continue
+
+        if not service_allowed_to_send_to(row['to'], service, KEY_TYPE_NORMAL):
+            current_app.logger.debug(
+                "{} {} failed as restricted service".format(notification_type, row['id'])
+            )
+            continue
+
+        notifications.append(build_notification(
+            template_id=batch['template'],
+            template_version=batch['template_version'],
+            recipient=row['to'],
+            service=service,
+            personalisation=row.get('personalisation'),
+            notification_type=notification_type,
+            api_key_id=None,
+            key_type=KEY_TYPE_NORMAL,
+            created_at=created_at,
+            job_id=batch['job'],
+            job_row_number=row['row_number'],
+            notification_id=row['id'],
+            reply_to_text=reply_to_text
+        ))
+
+    retry_msg = 'save-batch for job {} rows {} to {}'.format(
+        batch['job'], rows[0]['row_number'], rows[-1]['row_number']
+    )
+
+    try:
+        persist_notifications(notifications)
+    except SQLAlchemyError as e:
+        current_app.logger.exception('Retry ' + retry_msg)
+        try:
+            self.retry(queue=QueueNames.RETRY, exc=e)
+        except self.MaxRetriesExceededError:
+            current_app.logger.error('Max retry failed ' + retry_msg)
+        return
+
+    failed = send_notifications_to_queue(notifications, service.research_mode, sms_sender_id=sender_id)
+
+    if failed:
+        # The notifications that could not be enqueued have been deleted, so a retry saves them again.
+        current_app.logger.error(
+            "{} of {} notifications were not enqueued. Retry {}".format(len(failed), len(notifications), retry_msg)
+        )
+        try:
+            self.retry(queue=QueueNames.RETRY)
+        except self.MaxRetriesExceededError:
+            current_app.logger.error('Max retry failed ' + retry_msg)
+
+
 @notify_celery.task(bind=True, name="save-letter", max_retries=5, default_retry_delay=300)
 @statsd(namespace="tasks")
 def save_letter(
@@ -530,6 +762,16 @@ def process_incomplete_jobs(job_ids):
 def process_incomplete_job(job_id):
     job = dao_get_job_by_id(job_id)
 
+    db_template = dao_get_template_by_id(job.template_id, job.template_version)
+
+    TemplateClass = get_template_class(db_template.template_type)
+    template = TemplateClass(db_template.__dict__)
+
+    if _chunked_processing_enabled(template):
+        process_job_chunks(job, template, job.service, resume=True)
+        job_complete(job, resumed=True)
+        return
+
     last_notification_added = dao_get_last_notification_added_for_job_id(job_id)
 
     if last_notification_added:
@@ -539,11 +781,6 @@ def process_incomplete_job(job_id):
 
     current_app.logger.info("Resuming job {} from row {}".format(job_id, resume_from_row))
 
-    db_template = dao_get_template_by_id(job.template_id, job.template_version)
-
-    TemplateClass = get_template_class(db_template.template_type)
-    template = TemplateClass(db_template.__dict__)
-
     for row in RecipientCSV(
             s3.get_job_from_s3(str(job.service_id), str(job.id)),
             template_type=template.template_type,
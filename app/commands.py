@@ -10,11 +10,12 @@ import itertools
 from click_datetime import Datetime as click_dt
 from flask import current_app, json
 from notifications_utils.template import SMSMessageTemplate
+from notifications_utils.timezones import convert_utc_to_local_timezone
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import NoResultFound
 from notifications_utils.statsd_decorators import statsd
 
-from app import db, DATETIME_FORMAT, encryption
+from app import db, DATETIME_FORMAT, encryption, recipient_lookup_cache
 from app.aws import s3
 from app.celery.tasks import record_daily_sorted_counts
 from app.celery.nightly_tasks import send_total_sent_notifications_to_performance_platform
@@ -26,8 +27,9 @@ from app.dao.fact_billing_dao import (
     delete_billing_data_for_service_for_day,
     fetch_billing_data_for_day,
     get_service_ids_that_need_billing_populated,
-    update_fact_billing,
+    upsert_fact_billing_for_day,
 )
+from app.dao.notification_partitions_dao import dao_partition_table
 from app.dao.organisation_dao import dao_get_organisation_by_email_address, dao_add_service_to_organisation
 
 from app.dao.provider_rates_dao import create_provider_rates as dao_create_provider_rates
@@ -50,6 +52,7 @@ from app.models import (
 from app.model import User
 from app.performance_platform.processing_time import send_processing_time_for_start_and_end
 from app.utils import get_local_timezone_midnight_in_utc, get_midnight_for_day_before
+from app.va.identifier import IdentifierType
 
 
 @click.group(name='command', help='Additional commands')
@@ -384,9 +387,7 @@ def rebuild_ft_billing_for_day(service_id, day):
         ))
         transit_data = fetch_billing_data_for_day(process_day=process_day, service_id=service)
         # transit_data = every row that should exist
-        for data in transit_data:
-            # upsert existing rows
-            update_fact_billing(data, process_day)
+        upsert_fact_billing_for_day(transit_data, process_day)
         current_app.logger.info('added/updated {} billing rows for {} on {}'.format(
             len(transit_data),
             service,
@@ -406,6 +407,34 @@ def rebuild_ft_billing_for_day(service_id, day):
             rebuild_ft_data(day, row.service_id)
 
 
+@notify_command(name='partition-notification-table')
+@click.option('-t', '--table_name', required=True, type=click.Choice(['notifications', 'notification_history']))
+@click.option('-c', '--cutover', help="The local date that the first new partition starts, as YYYY-MM-DD. Must be "
+              "later than today", required=True, type=click_dt(format='%Y-%m-%d'))
+def partition_notification_table(table_name, cutover):
+    """
+    Convert notifications or notification_history to a table partitioned by created_at. The existing table becomes
+    the partition for everything created before the cutover date.
+    """
+    if cutover.date() <= convert_utc_to_local_timezone(datetime.utcnow()).date():
+        raise click.BadParameter('The cutover date must be later than today')
+
+    created = dao_partition_table(table_name, get_local_timezone_midnight_in_utc(cutover))
+    current_app.logger.info('Partitioned {}, created partitions: {}'.format(table_name, created))
+
+
+@notify_command(name='evict-recipient-lookup-cache')
+@click.option('-t', '--id_type', required=True, type=click.Choice([id_type.value for id_type in IdentifierType]))
+@click.option('-v', '--id_value', required=True, help="The recipient identifier's value")
+def evict_recipient_lookup_cache(id_type, id_value):
+    """
+    Remove a recipient's cached VA Profile ID and, for a VA Profile ID, contact information, so that the next
+    notification to them looks them up again.
+    """
+    recipient_lookup_cache.evict(id_type, id_value)
+    current_app.logger.info('Evicted the recipient lookup cache for a {} identifier'.format(id_type))
+
+
 @notify_command(name='migrate-data-to-ft-notification-status')
 @click.option('-s', '--start_date', required=True, help="start date inclusive", type=click_dt(format='%Y-%m-%d'))
 @click.option('-e', '--end_date', required=True, help="end date inclusive", type=click_dt(format='%Y-%m-%d'))
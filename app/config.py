@@ -130,6 +130,61 @@ class Config(object):
     API_RATE_LIMIT_ENABLED = os.getenv('API_RATE_LIMIT_ENABLED', 'False') == 'True'
     API_MESSAGE_LIMIT_ENABLED = os.getenv('API_MESSAGE_LIMIT_ENABLED', 'False') == 'True'
     EXPIRE_CACHE_TEN_MINUTES = 600
+    SERVICE_API_KEY_CACHE_ENABLED = os.getenv('SERVICE_API_KEY_CACHE_ENABLED', 'True') == 'True'
+    SERVICE_API_KEY_CACHE_MAX_SIZE = int(os.getenv('SERVICE_API_KEY_CACHE_MAX_SIZE', 1000))
+    SERVICE_API_KEY_CACHE_TTL = int(os.getenv('SERVICE_API_KEY_CACHE_TTL', 30))
+    TEMPLATE_CACHE_ENABLED = os.getenv('TEMPLATE_CACHE_ENABLED', 'True') == 'True'
+    TEMPLATE_CACHE_MAX_SIZE = int(os.getenv('TEMPLATE_CACHE_MAX_SIZE', 1000))
+    WEBHOOK_POOL_SIZE = int(os.getenv('WEBHOOK_POOL_SIZE', 10))
+    WEBHOOK_CONNECT_TIMEOUT = float(os.getenv('WEBHOOK_CONNECT_TIMEOUT', 5))
+    WEBHOOK_READ_TIMEOUT = float(os.getenv('WEBHOOK_READ_TIMEOUT', 60))
+    WEBHOOK_MAX_IN_FLIGHT_PER_HOST = int(os.getenv('WEBHOOK_MAX_IN_FLIGHT_PER_HOST', 20))
+    WEBHOOK_HOST_BUSY_RETRY_DELAY = int(os.getenv('WEBHOOK_HOST_BUSY_RETRY_DELAY', 30))
+    SERVICE_CALLBACK_BATCH_SIZE = int(os.getenv('SERVICE_CALLBACK_BATCH_SIZE', 100))
+    SERVICE_CALLBACK_BATCH_LINGER_MS = int(os.getenv('SERVICE_CALLBACK_BATCH_LINGER_MS', 1000))
+    SQS_ENDPOINT_URL = os.getenv('SQS_ENDPOINT_URL')
+    SQS_BATCH_MAX_ATTEMPTS = int(os.getenv('SQS_BATCH_MAX_ATTEMPTS', 3))
+    # Each chunk of a job is sent to a save-batch task in one message, so chunks must stay within the SQS message size
+    # limit of 256 KB.
+    JOB_CHUNK_SIZE = int(os.getenv('JOB_CHUNK_SIZE', 100))
+    PROVIDER_ROUTING_CACHE_ENABLED = os.getenv('PROVIDER_ROUTING_CACHE_ENABLED', 'True') == 'True'
+    PROVIDER_ROUTING_CACHE_TTL = int(os.getenv('PROVIDER_ROUTING_CACHE_TTL', 60))
+    PROVIDER_ROUTING_VERSION_CHECK_INTERVAL = int(os.getenv('PROVIDER_ROUTING_VERSION_CHECK_INTERVAL', 5))
+    # The number of services whose ft_notification_status rows are rebuilt per transaction by the nightly task, or 0
+    # to rebuild the whole day in one statement.
+    NIGHTLY_NOTIFICATION_STATUS_SERVICE_CHUNK_SIZE = int(os.getenv('NIGHTLY_NOTIFICATION_STATUS_SERVICE_CHUNK_SIZE', 0))
+    FT_NOTIFICATION_STATUS_HOURLY_LATE_COMMIT_SECONDS = int(
+        os.getenv('FT_NOTIFICATION_STATUS_HOURLY_LATE_COMMIT_SECONDS', 300)
+    )
+    NOTIFICATION_PURGE_SLICE_MINUTES = int(os.getenv('NOTIFICATION_PURGE_SLICE_MINUTES', 60))
+    NOTIFICATION_PURGE_PARALLELISM = int(os.getenv('NOTIFICATION_PURGE_PARALLELISM', 4))
+    # Only used once notifications and notification_history are partitioned by created_at: the length of each
+    # partition ('day' or 'week'), how far ahead partitions are created, and how long notification_history partitions
+    # are kept, or 0 to keep them forever.
+    NOTIFICATION_PARTITION_INTERVAL = os.getenv('NOTIFICATION_PARTITION_INTERVAL', 'day')
+    NOTIFICATION_PARTITIONS_AHEAD_DAYS = int(os.getenv('NOTIFICATION_PARTITIONS_AHEAD_DAYS', 14))
+    NOTIFICATION_HISTORY_PARTITION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_HISTORY_PARTITION_RETENTION_DAYS', 0))
+    NOTIFICATION_STATS_COUNTERS_ENABLED = os.getenv('NOTIFICATION_STATS_COUNTERS_ENABLED', 'True') == 'True'
+    NOTIFICATION_STATS_COUNTERS_TTL = int(os.getenv('NOTIFICATION_STATS_COUNTERS_TTL', 2 * 24 * 60 * 60))
+    # The most notifications a search by recipient returns when it isn't paged by cursor, and whether the query plan of
+    # each search is logged.
+    NOTIFICATION_SEARCH_MAX_RESULTS = int(os.getenv('NOTIFICATION_SEARCH_MAX_RESULTS', 1000))
+    NOTIFICATION_SEARCH_LOG_QUERY_PLAN = os.getenv('NOTIFICATION_SEARCH_LOG_QUERY_PLAN', 'False') == 'True'
+    # The number of notifications timed out per transaction by the timeout-sending-notifications task.
+    TIMEOUT_NOTIFICATIONS_BATCH_SIZE = int(os.getenv('TIMEOUT_NOTIFICATIONS_BATCH_SIZE', 5000))
+    # The number of notifications replayed per page by the replay-created-notifications task, and how long a replayed
+    # notification is left before it can be replayed again.  This is less than the task's schedule, so that overlapping
+    # runs do not replay the same notification but a notification that is still in created is replayed by the next run.
+    REPLAY_CREATED_NOTIFICATIONS_BATCH_SIZE = int(os.getenv('REPLAY_CREATED_NOTIFICATIONS_BATCH_SIZE', 1000))
+    REPLAY_CREATED_NOTIFICATIONS_CLAIM_SECONDS = int(os.getenv('REPLAY_CREATED_NOTIFICATIONS_CLAIM_SECONDS', 10 * 60))
+    # How old a communication permission in va_profile_local_cache can be before VA Profile is asked for it again.
+    VA_PROFILE_LOCAL_CACHE_MAX_AGE_DAYS = int(os.getenv('VA_PROFILE_LOCAL_CACHE_MAX_AGE_DAYS', 30))
+    # Caches the VA Profile ID of a recipient identifier and the contact information of a VA Profile ID, encrypted, in
+    # Redis for RECIPIENT_LOOKUP_CACHE_TTL seconds.  A lookup waits up to RECIPIENT_LOOKUP_COALESCE_TIMEOUT seconds for
+    # another process that is looking up the same recipient.
+    RECIPIENT_LOOKUP_CACHE_ENABLED = os.getenv('RECIPIENT_LOOKUP_CACHE_ENABLED', 'False') == 'True'
+    RECIPIENT_LOOKUP_CACHE_TTL = int(os.getenv('RECIPIENT_LOOKUP_CACHE_TTL', 5 * 60))
+    RECIPIENT_LOOKUP_COALESCE_TIMEOUT = int(os.getenv('RECIPIENT_LOOKUP_COALESCE_TIMEOUT', 10))
     EXPIRE_CACHE_EIGHT_DAYS = 8 * 24 * 60 * 60
 
     # Performance platform
@@ -190,6 +245,7 @@ class Config(object):
     SQLALCHEMY_STATEMENT_TIMEOUT = 1200
     PAGE_SIZE = 50
     API_PAGE_SIZE = 250
+    BULK_NOTIFICATIONS_MAX_RECIPIENTS = int(os.getenv('BULK_NOTIFICATIONS_MAX_RECIPIENTS', 1000))
     TEST_MESSAGE_FILENAME = 'Test message'
     ONE_OFF_MESSAGE_FILENAME = 'Report'
     MAX_VERIFY_CODE_COUNT = 10
@@ -292,6 +348,16 @@ class Config(object):
                 'schedule': crontab(hour=0, minute=5),
                 'options': {'queue': QueueNames.PERIODIC}
             },
+            'reconcile-notification-stats-counters': {
+                'task': 'reconcile-notification-stats-counters',
+                'schedule': crontab(hour=0, minute=10),
+                'options': {'queue': QueueNames.PERIODIC}
+            },
+            'refresh-ft-notification-status-hourly': {
+                'task': 'refresh-ft-notification-status-hourly',
+                'schedule': crontab(minute='*/5'),
+                'options': {'queue': QueueNames.REPORTING}
+            },
             'create-nightly-billing': {
                 'task': 'create-nightly-billing',
                 'schedule': crontab(hour=0, minute=15),
@@ -302,6 +368,11 @@ class Config(object):
                 'schedule': crontab(hour=0, minute=30),
                 'options': {'queue': QueueNames.REPORTING}
             },
+            'maintain-notification-partitions': {
+                'task': 'maintain-notification-partitions',
+                'schedule': crontab(hour=4, minute=5),  # after 'create-nightly-notification-status'
+                'options': {'queue': QueueNames.PERIODIC}
+            },
             'delete-sms-notifications': {
                 'task': 'delete-sms-notifications',
                 'schedule': crontab(hour=4, minute=15),  # after 'create-nightly-notification-status'
@@ -413,9 +484,21 @@ class Config(object):
     GRANICUS_URL = os.environ.get('GRANICUS_URL', 'https://tms.govdelivery.com')
     VA_PROFILE_URL = os.environ.get('VA_PROFILE_URL', 'https://int.vaprofile.va.gov')
     MPI_URL = os.environ.get('MPI_URL', 'https://ps.dev.iam.va.gov')
+    # Keep-alive, mutual TLS sessions to MPI and VA Profile, per worker process
+    VA_MTLS_POOL_SIZE = int(os.getenv('VA_MTLS_POOL_SIZE', 10))
+    VA_MTLS_CONNECT_TIMEOUT = float(os.getenv('VA_MTLS_CONNECT_TIMEOUT', 5))
+    VA_MTLS_READ_TIMEOUT = float(os.getenv('VA_MTLS_READ_TIMEOUT', 30))
+    # Retries of failed connections and 429 or 5xx responses, with jittered backoff starting from this many seconds
+    VA_MTLS_MAX_RETRIES = int(os.getenv('VA_MTLS_MAX_RETRIES', 2))
+    VA_MTLS_RETRY_BACKOFF = float(os.getenv('VA_MTLS_RETRY_BACKOFF', 0.5))
 
     VA_ONSITE_URL = os.environ.get('VA_ONSITE_URL', 'https://staging-api.va.gov')
     VA_ONSITE_SECRET = os.environ.get('VA_ONSITE_SECRET', '')
+    VA_ONSITE_CONNECT_TIMEOUT = float(os.getenv('VA_ONSITE_CONNECT_TIMEOUT', 3))
+    VA_ONSITE_READ_TIMEOUT = float(os.getenv('VA_ONSITE_READ_TIMEOUT', 10))
+    # POSTs to VA Onsite are skipped for VA_ONSITE_RESET_SECONDS after this many fail in a row
+    VA_ONSITE_FAILURE_THRESHOLD = int(os.getenv('VA_ONSITE_FAILURE_THRESHOLD', 5))
+    VA_ONSITE_RESET_SECONDS = int(os.getenv('VA_ONSITE_RESET_SECONDS', 60))
 
     VETEXT_URL = os.environ.get('VETEXT_URL', 'https://staging.api.vetext.va.gov/api/vetext/pub')
     VETEXT_USERNAME = os.environ.get('VETEXT_USERNAME', '')
@@ -531,6 +614,12 @@ class Test(Development):
     NOTIFY_ENVIRONMENT = 'test'
     TESTING = True
 
+    SERVICE_API_KEY_CACHE_ENABLED = False
+    TEMPLATE_CACHE_ENABLED = False
+    PROVIDER_ROUTING_CACHE_ENABLED = False
+    NOTIFICATION_STATS_COUNTERS_ENABLED = False
+    NOTIFICATION_PURGE_PARALLELISM = 1
+
     # CSV_UPLOAD_BUCKET_NAME = 'test-notifications-csv-upload'
     TEST_LETTERS_BUCKET_NAME = 'test-test-letters'
     DVLA_RESPONSE_BUCKET_NAME = 'test.notify.com-ftp'
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, time, date
 from flask import current_app
 from notifications_utils.timezones import convert_local_timezone_to_utc, convert_utc_to_local_timezone
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import func, case, desc, Date, Integer, and_
+from sqlalchemy import func, case, desc, Date, Integer, and_, or_
 
 from app import db
 from app.dao.date_util import (
@@ -237,8 +237,7 @@ def fetch_monthly_billing_for_year(service_id, year):
         yesterday = today - timedelta(days=1)
         for day in [yesterday, today]:
             data = fetch_billing_data_for_day(process_day=day, service_id=service_id)
-            for d in data:
-                update_fact_billing(data=d, process_day=day)
+            upsert_fact_billing_for_day(data, process_day=day)
 
     email_and_letters = db.session.query(
         func.date_trunc('month', FactBilling.bst_date).cast(Date).label("month"),
@@ -302,44 +301,52 @@ def delete_billing_data_for_service_for_day(process_day, service_id):
 def fetch_billing_data_for_day(process_day, service_id=None):
     start_date = convert_local_timezone_to_utc(datetime.combine(process_day, time.min))
     end_date = convert_local_timezone_to_utc(datetime.combine(process_day + timedelta(days=1), time.min))
-    # use notification_history if process day is older than 7 days
-    # this is useful if we need to rebuild the ft_billing table for a date older than 7 days ago.
     current_app.logger.info("Populate ft_billing for {} to {}".format(start_date, end_date))
-    transit_data = []
-    if not service_id:
-        service_ids = [x.id for x in Service.query.all()]
-    else:
-        service_ids = [service_id]
-    for id_of_service in service_ids:
-        for notification_type in (SMS_TYPE, EMAIL_TYPE, LETTER_TYPE):
-            results = _query_for_billing_data(
-                table=Notification,
-                notification_type=notification_type,
-                start_date=start_date,
-                end_date=end_date,
-                service_id=id_of_service
-            )
-            # If data has been purged from Notification then use NotificationHistory
-            if len(results) == 0:
-                results = _query_for_billing_data(
-                    table=NotificationHistory,
-                    notification_type=notification_type,
-                    start_date=start_date,
-                    end_date=end_date,
-                    service_id=id_of_service
-                )
-
-            transit_data = transit_data + results
-
-    return transit_data
-
-
-def _query_for_billing_data(table, notification_type, start_date, end_date, service_id):
-    billable_type_list = {
-        SMS_TYPE: NOTIFICATION_STATUS_TYPES_BILLABLE,
-        EMAIL_TYPE: NOTIFICATION_STATUS_TYPES_BILLABLE,
-        LETTER_TYPE: NOTIFICATION_STATUS_TYPES_BILLABLE_FOR_LETTERS
-    }
+
+    transit_data = _query_for_billing_data(
+        table=Notification,
+        start_date=start_date,
+        end_date=end_date,
+        service_id=service_id
+    )
+
+    # If data has been purged from Notification then use NotificationHistory, for each service and notification type
+    # that has no billable notifications left in Notification.
+    # This is useful if we need to rebuild the ft_billing table for a date older than 7 days ago.
+    found = {(row.service_id, row.notification_type) for row in transit_data}
+    history_data = _query_for_billing_data(
+        table=NotificationHistory,
+        start_date=start_date,
+        end_date=end_date,
+        service_id=service_id
+    )
+
+    return transit_data + [row for row in history_data if (row.service_id, row.notification_type) not in found]
+
+
+def _query_for_billing_data(table, start_date, end_date, service_id=None):
+    """
+    Billing data for every service and notification type in one grouped query, or for one service if service_id is
+    given.
+    """
+    filters = [
+        or_(
+            and_(
+                table.notification_type.in_([SMS_TYPE, EMAIL_TYPE]),
+                table.status.in_(NOTIFICATION_STATUS_TYPES_BILLABLE)
+            ),
+            and_(
+                table.notification_type == LETTER_TYPE,
+                table.status.in_(NOTIFICATION_STATUS_TYPES_BILLABLE_FOR_LETTERS)
+            ),
+        ),
+        table.key_type != KEY_TYPE_TEST,
+        table.created_at >= start_date,
+        table.created_at < end_date,
+    ]
+    if service_id:
+        filters.append(table.service_id == service_id)
+
     query = db.session.query(
         table.template_id,
         table.service_id,
@@ -364,12 +371,7 @@ def _query_for_billing_data(table, notification_type, start_date, end_date, serv
         Service.crown,
         func.coalesce(table.postage, 'none').label('postage')
     ).filter(
-        table.status.in_(billable_type_list[notification_type]),
-        table.key_type != KEY_TYPE_TEST,
-        table.created_at >= start_date,
-        table.created_at < end_date,
-        table.notification_type == notification_type,
-        table.service_id == service_id
+        *filters
     ).group_by(
         table.template_id,
         table.service_id,
@@ -432,16 +434,51 @@ def get_rate(
         return 0
 
 
-def update_fact_billing(data, process_day):
+def upsert_fact_billing_for_day(transit_data, process_day):
+    """
+    Insert or update the ft_billing rows for a day's billing data, from fetch_billing_data_for_day, with a single
+    statement.  Rates are loaded once, and billing data that maps to the same ft_billing row is added together.
+
+    Returns the number of ft_billing rows upserted.
+    """
+    if not transit_data:
+        return 0
+
     non_letter_rates, letter_rates = get_rates_for_billing()
-    rate = get_rate(non_letter_rates,
-                    letter_rates,
-                    data.notification_type,
-                    process_day,
-                    data.crown,
-                    data.letter_page_count,
-                    data.postage)
-    billing_record = create_billing_record(data, rate, process_day)
+    rates = {}
+    billing_records = {}
+
+    for data in transit_data:
+        rate_key = (data.notification_type, data.crown, data.letter_page_count, data.postage)
+        if rate_key not in rates:
+            rates[rate_key] = get_rate(
+                non_letter_rates,
+                letter_rates,
+                data.notification_type,
+                process_day,
+                data.crown,
+                data.letter_page_count,
+                data.postage
+            )
+
+        billing_record = create_billing_record(data, rates[rate_key], process_day)
+        key = (
+            billing_record.template_id,
+            billing_record.service_id,
+            billing_record.notification_type,
+            billing_record.provider,
+            billing_record.rate_multiplier,
+            billing_record.international,
+            billing_record.rate,
+            billing_record.postage,
+        )
+
+        if key in billing_records:
+            existing = billing_records[key]
+            existing.billable_units = (existing.billable_units or 0) + (billing_record.billable_units or 0)
+            existing.notifications_sent += billing_record.notifications_sent
+        else:
+            billing_records[key] = billing_record
 
     table = FactBilling.__table__
     '''
@@ -450,19 +487,22 @@ def update_fact_billing(data, process_day):
        rejected.
        http://docs.sqlalchemy.org/en/latest/dialects/postgresql.html#insert-on-conflict-upsert
     '''
-    stmt = insert(table).values(
-        bst_date=billing_record.bst_date,
-        template_id=billing_record.template_id,
-        service_id=billing_record.service_id,
-        provider=billing_record.provider,
-        rate_multiplier=billing_record.rate_multiplier,
-        notification_type=billing_record.notification_type,
-        international=billing_record.international,
-        billable_units=billing_record.billable_units,
-        notifications_sent=billing_record.notifications_sent,
-        rate=billing_record.rate,
-        postage=billing_record.postage,
-    )
+    stmt = insert(table).values([
+        {
+            'bst_date': billing_record.bst_date,
+            'template_id': billing_record.template_id,
+            'service_id': billing_record.service_id,
+            'provider': billing_record.provider,
+            'rate_multiplier': billing_record.rate_multiplier,
+            'notification_type': billing_record.notification_type,
+            'international': billing_record.international,
+            'billable_units': billing_record.billable_units,
+            'notifications_sent': billing_record.notifications_sent,
+            'rate': billing_record.rate,
+            'postage': billing_record.postage,
+        }
+        for billing_record in billing_records.values()
+    ])
 
     stmt = stmt.on_conflict_do_update(
         constraint="ft_billing_pkey",
@@ -474,6 +514,8 @@ def update_fact_billing(data, process_day):
     db.session.connection().execute(stmt)
     db.session.commit()
 
+    return len(billing_records)
+
 
 def create_billing_record(data, rate, process_day):
     billing_record = FactBilling(
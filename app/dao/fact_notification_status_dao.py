@@ -1,17 +1,21 @@
 from datetime import datetime, timedelta, time
 
 from flask import current_app
-from notifications_utils.timezones import convert_local_timezone_to_utc
-from sqlalchemy import case, func, Date
+from notifications_utils.statsd_decorators import statsd
+from notifications_utils.timezones import convert_local_timezone_to_utc, convert_utc_to_local_timezone
+from sqlalchemy import and_, case, func, or_, text, Date
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql.expression import literal, extract
 from sqlalchemy.types import DateTime, Integer
 
 from app import db
+from app.dao.dao_utils import transactional
 from app.models import (
     ApiKey,
     EMAIL_TYPE,
     FactNotificationStatus,
+    FactNotificationStatusHourly,
+    FactNotificationStatusHourlyWatermark,
     KEY_TYPE_NORMAL,
     KEY_TYPE_TEST,
     LETTER_TYPE,
@@ -36,6 +40,9 @@ from app.utils import (
     get_local_timezone_month_from_utc_column, get_local_timezone_midnight
 )
 
+# Key of the transaction-level advisory lock held while ft_notification_status_hourly is refreshed
+FT_NOTIFICATION_STATUS_HOURLY_LOCK_ID = 314159
+
 
 def fetch_notification_status_for_day(process_day, service_id=None):
     start_date = convert_local_timezone_to_utc(datetime.combine(process_day, time.min))
@@ -123,6 +130,113 @@ def update_fact_notification_status(data, process_day):
         db.session.commit()
 
 
+@statsd(namespace="dao")
+@transactional
+def rebuild_fact_notification_status_for_day(process_day, service_ids=None):
+    """
+    Replace the ft_notification_status rows for a day with one INSERT ... SELECT ... GROUP BY, in a single
+    transaction.  If service_ids is given only the rows for those services are replaced.
+
+    As with fetch_notification_status_for_day, notification_history is used for each service and notification type
+    that has no notifications left in notifications for the day.
+
+    Returns the number of ft_notification_status rows inserted.
+    """
+    start_date = convert_local_timezone_to_utc(datetime.combine(process_day, time.min))
+    end_date = convert_local_timezone_to_utc(datetime.combine(process_day + timedelta(days=1), time.min))
+
+    notifications = _query_for_fact_status_rows(Notification, start_date, end_date, service_ids)
+    history = _query_for_fact_status_rows(NotificationHistory, start_date, end_date, service_ids).filter(
+        ~db.session.query(Notification.id).filter(
+            Notification.service_id == NotificationHistory.service_id,
+            Notification.notification_type == NotificationHistory.notification_type,
+            Notification.created_at >= start_date,
+            Notification.created_at < end_date,
+            Notification.key_type != KEY_TYPE_TEST
+        ).exists()
+    )
+    all_rows = notifications.union_all(history).subquery()
+
+    # status_reason is not part of the primary key, so rows that differ only by status_reason are counted together.
+    select_stmt = db.session.query(
+        literal(process_day, type_=Date).label('bst_date'),
+        all_rows.c.template_id,
+        all_rows.c.service_id,
+        all_rows.c.job_id,
+        all_rows.c.notification_type,
+        all_rows.c.key_type,
+        all_rows.c.notification_status,
+        func.max(all_rows.c.status_reason).label('status_reason'),
+        func.count().label('notification_count'),
+        literal(datetime.utcnow(), type_=DateTime).label('created_at')
+    ).group_by(
+        all_rows.c.template_id,
+        all_rows.c.service_id,
+        all_rows.c.job_id,
+        all_rows.c.notification_type,
+        all_rows.c.key_type,
+        all_rows.c.notification_status
+    ).statement
+
+    delete_query = FactNotificationStatus.query.filter(FactNotificationStatus.bst_date == process_day)
+    if service_ids is not None:
+        delete_query = delete_query.filter(FactNotificationStatus.service_id.in_(service_ids))
+    delete_query.delete(synchronize_session=False)
+
+    insert_stmt = insert(FactNotificationStatus.__table__).from_select(
+        [
+            'bst_date',
+            'template_id',
+            'service_id',
+            'job_id',
+            'notification_type',
+            'key_type',
+            'notification_status',
+            'status_reason',
+            'notification_count',
+            'created_at',
+        ],
+        select_stmt
+    )
+    return db.session.execute(insert_stmt).rowcount
+
+
+def rebuild_fact_notification_status_for_day_in_chunks(process_day, chunk_size):
+    """
+    Rebuild the ft_notification_status rows for a day chunk_size services at a time, committing after each chunk, so
+    that very large days do not hold locks for the whole rebuild.
+
+    Returns the number of ft_notification_status rows inserted.
+    """
+    service_ids = [row.id for row in db.session.query(Service.id).order_by(Service.id).all()]
+
+    total = 0
+    for start in range(0, len(service_ids), chunk_size):
+        total += rebuild_fact_notification_status_for_day(process_day, service_ids[start:start + chunk_size])
+
+    return total
+
+
+def _query_for_fact_status_rows(table, start_date, end_date, service_ids=None):
+    filters = [
+        table.created_at >= start_date,
+        table.created_at < end_date,
+        table.key_type != KEY_TYPE_TEST
+    ]
+    if service_ids is not None:
+        filters.append(table.service_id.in_(service_ids))
+
+    return db.session.query(
+        table.template_id.label('template_id'),
+        table.service_id.label('service_id'),
+        func.coalesce(table.job_id, '00000000-0000-0000-0000-000000000000').label('job_id'),
+        table.notification_type.cast(db.Text).label('notification_type'),
+        table.key_type.label('key_type'),
+        table.status.label('notification_status'),
+        func.coalesce(table.status_reason, '').label('status_reason')
+    ).filter(*filters)
+
+
 def fetch_notification_status_for_service_by_month(start_date, end_date, service_id):
     return db.session.query(
         func.date_trunc('month', FactNotificationStatus.bst_date).label('month'),
@@ -192,19 +306,8 @@ def fetch_notification_status_for_service_for_today_and_7_previous_days(service_
         FactNotificationStatus.key_type != KEY_TYPE_TEST
     )
 
-    stats_for_today = db.session.query(
-        Notification.notification_type.cast(db.Text),
-        Notification.status,
-        *([Notification.template_id] if by_template else []),
-        func.count().label('count')
-    ).filter(
-        Notification.created_at >= get_local_timezone_midnight(now),
-        Notification.service_id == service_id,
-        Notification.key_type != KEY_TYPE_TEST
-    ).group_by(
-        Notification.notification_type,
-        *([Notification.template_id] if by_template else []),
-        Notification.status
+    stats_for_today = _fetch_todays_notification_status_for_service(
+        service_id, get_local_timezone_midnight(now), by_template
     )
 
     all_stats_table = stats_for_7_days.union_all(stats_for_today).subquery()
@@ -230,6 +333,151 @@ def fetch_notification_status_for_service_for_today_and_7_previous_days(service_
     ).all()
 
 
+def _fetch_todays_notification_status_for_service(service_id, day_start, by_template=False):
+    """
+    Today's notification counts for a service, from ft_notification_status_hourly for the notifications created
+    before today's refresh watermark, plus the notifications created since.  The watermark is read in the same
+    statement, so a refresh cannot be counted twice.
+    """
+    bst_date = convert_utc_to_local_timezone(day_start).date()
+    watermark = db.session.query(
+        FactNotificationStatusHourlyWatermark.watermark
+    ).filter(
+        FactNotificationStatusHourlyWatermark.bst_date == bst_date
+    ).as_scalar()
+
+    hourly_stats = db.session.query(
+        FactNotificationStatusHourly.notification_type.label('notification_type'),
+        FactNotificationStatusHourly.notification_status.label('status'),
+        *([FactNotificationStatusHourly.template_id.label('template_id')] if by_template else []),
+        FactNotificationStatusHourly.notification_count.label('count')
+    ).filter(
+        FactNotificationStatusHourly.service_id == service_id,
+        FactNotificationStatusHourly.hour >= day_start,
+        FactNotificationStatusHourly.key_type != KEY_TYPE_TEST
+    )
+
+    stats_since_watermark = db.session.query(
+        Notification.notification_type.cast(db.Text),
+        Notification.status,
+        *([Notification.template_id] if by_template else []),
+        func.count().label('count')
+    ).filter(
+        Notification.created_at >= func.coalesce(watermark, day_start),
+        Notification.service_id == service_id,
+        Notification.key_type != KEY_TYPE_TEST
+    ).group_by(
+        Notification.notification_type,
+        *([Notification.template_id] if by_template else []),
+        Notification.status
+    )
+
+    return hourly_stats.union_all(stats_since_watermark)
+
+
+@statsd(namespace="dao")
+@transactional
+def refresh_fact_notification_status_hourly():
+    """
+    Bring ft_notification_status_hourly up to date for today, local time, by recounting each hour with notifications
+    created or updated since the last refresh, and move today's watermark on to now.  Rows for previous days are
+    removed.
+
+    Hours are also recounted for notifications created up to FT_NOTIFICATION_STATUS_HOURLY_LATE_COMMIT_SECONDS before
+    the last refresh, to pick up notifications that were committed after it with an earlier created_at.
+
+    Only one refresh runs at a time; another waits for it to commit, so that they don't insert the same hours twice.
+
+    Returns the number of hours recounted.
+    """
+    # The watermark row may not exist yet, so a lock is taken on its own key rather than on the row
+    db.session.execute(
+        text('SELECT pg_advisory_xact_lock(:lock_id)'), {'lock_id': FT_NOTIFICATION_STATUS_HOURLY_LOCK_ID}
+    )
+    now = datetime.utcnow()
+    bst_date = convert_utc_to_local_timezone(now).date()
+    day_start = get_local_timezone_midnight_in_utc(bst_date)
+
+    previous_watermark = db.session.query(
+        FactNotificationStatusHourlyWatermark.watermark
+    ).filter(
+        FactNotificationStatusHourlyWatermark.bst_date == bst_date
+    ).scalar()
+
+    hour = func.date_trunc('hour', Notification.created_at)
+    hours_query = db.session.query(hour.label('hour')).filter(
+        Notification.created_at >= day_start,
+        Notification.created_at < now
+    ).distinct()
+    if previous_watermark is not None:
+        late_commit_seconds = current_app.config['FT_NOTIFICATION_STATUS_HOURLY_LATE_COMMIT_SECONDS']
+        hours_query = hours_query.filter(or_(
+            Notification.created_at >= previous_watermark - timedelta(seconds=late_commit_seconds),
+            Notification.updated_at >= previous_watermark
+        ))
+    hours = [row.hour for row in hours_query.all()]
+
+    if hours:
+        FactNotificationStatusHourly.query.filter(
+            FactNotificationStatusHourly.hour.in_(hours)
+        ).delete(synchronize_session=False)
+
+        select_stmt = db.session.query(
+            Notification.service_id,
+            hour,
+            Notification.template_id,
+            Notification.notification_type.cast(db.Text),
+            Notification.key_type,
+            Notification.status,
+            func.count(),
+            literal(now, type_=DateTime)
+        ).filter(
+            Notification.created_at < now,
+            or_(*[
+                and_(Notification.created_at >= start, Notification.created_at < start + timedelta(hours=1))
+                for start in hours
+            ])
+        ).group_by(
+            Notification.service_id,
+            hour,
+            Notification.template_id,
+            Notification.notification_type,
+            Notification.key_type,
+            Notification.status
+        ).statement
+
+        db.session.execute(insert(FactNotificationStatusHourly.__table__).from_select(
+            [
+                'service_id',
+                'hour',
+                'template_id',
+                'notification_type',
+                'key_type',
+                'notification_status',
+                'notification_count',
+                'created_at',
+            ],
+            select_stmt
+        ))
+
+    db.session.execute(insert(FactNotificationStatusHourlyWatermark.__table__).values(
+        bst_date=bst_date,
+        watermark=now
+    ).on_conflict_do_update(
+        index_elements=['bst_date'],
+        set_={'watermark': now}
+    ))
+
+    FactNotificationStatusHourly.query.filter(
+        FactNotificationStatusHourly.hour < day_start
+    ).delete(synchronize_session=False)
+    FactNotificationStatusHourlyWatermark.query.filter(
+        FactNotificationStatusHourlyWatermark.bst_date < bst_date
+    ).delete(synchronize_session=False)
+
+    return len(hours)
+
+
 def get_total_notifications_sent_for_api_key(api_key_id):
     """
     SELECT count(*) as total_send_attempts, notification_type
@@ -12,6 +12,7 @@ from sqlalchemy import (
 
 from app import db
 from app.dao.dao_utils import transactional
+from app.dao.notifications_dao import lock_notifications_for_status_change
 from app.dao.templates_dao import dao_get_template_by_id
 from app.utils import midnight_n_days_ago
 
@@ -124,6 +125,20 @@ def dao_update_job(job):
     db.session.commit()
 
 
+@statsd(namespace="dao")
+@transactional
+def dao_update_job_checkpoint(job_id, rows_processed, bytes_processed):
+    """
+    Record how far through its CSV file a job has got, without loading or dirtying the job in the session.
+    """
+    db.session.query(Job).filter(
+        Job.id == job_id
+    ).update({
+        Job.rows_processed: rows_processed,
+        Job.bytes_processed: bytes_processed
+    }, synchronize_session=False)
+
+
 def dao_get_jobs_older_than_data_retention(notification_types):
     flexible_data_retention = ServiceDataRetention.query.filter(
         ServiceDataRetention.notification_type.in_(notification_types)
@@ -157,11 +172,12 @@ def dao_get_jobs_older_than_data_retention(notification_types):
 
 @transactional
 def dao_cancel_letter_job(job):
-    number_of_notifications_cancelled = Notification.query.filter(
-        Notification.job_id == job.id
-    ).update({'status': NOTIFICATION_CANCELLED,
-              'updated_at': datetime.utcnow(),
-              'billable_units': 0})
+    query = Notification.query.filter(Notification.job_id == job.id)
+    lock_notifications_for_status_change(query, NOTIFICATION_CANCELLED)
+
+    number_of_notifications_cancelled = query.update({'status': NOTIFICATION_CANCELLED,
+                                                      'updated_at': datetime.utcnow(),
+                                                      'billable_units': 0})
     job.job_status = JOB_STATUS_CANCELLED
     dao_update_job(job)
     return number_of_notifications_cancelled
@@ -0,0 +1,224 @@
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from flask import current_app
+from notifications_utils.statsd_decorators import statsd
+from notifications_utils.timezones import convert_utc_to_local_timezone
+from sqlalchemy import text
+
+from app import db
+from app.dao.dao_utils import transactional
+from app.utils import get_local_timezone_midnight_in_utc
+
+# A range partition of a table partitioned by created_at.  start is None for a partition from MINVALUE.
+NotificationPartition = namedtuple('NotificationPartition', ['name', 'start', 'end'])
+
+_PARTITION_BOUND = re.compile(r"FOR VALUES FROM \((MINVALUE|'[^']+')\) TO \((MAXVALUE|'[^']+')\)")
+
+
+@statsd(namespace="dao")
+def dao_is_partitioned(table_name):
+    return db.session.execute(text(
+        "SELECT EXISTS ("
+        "    SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid"
+        "    WHERE pg_class.relname = :table_name"
+        ")"
+    ), {'table_name': table_name}).scalar()
+
+
+@statsd(namespace="dao")
+def dao_get_partitions(table_name):
+    """
+    Return the range partitions of a table, ordered by created_at.  The default partition is not included.
+    """
+    rows = db.session.execute(text(
+        "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+        "FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table_name"
+    ), {'table_name': table_name}).fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = _PARTITION_BOUND.match(bound)
+        if match:
+            partitions.append(NotificationPartition(name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+
+    return sorted(partitions, key=lambda partition: partition.start or datetime.min)
+
+
+@statsd(namespace="dao")
+@transactional
+def dao_create_partitions(table_name, until):
+    """
+    Create partitions of a table from the end of its latest partition until at least the given date.  Partitions
+    are NOTIFICATION_PARTITION_INTERVAL long and start at local midnight, so that each local day is in one partition.
+
+    Returns the names of the partitions created.
+    """
+    partitions = dao_get_partitions(table_name)
+    if partitions:
+        start = partitions[-1].end
+    else:
+        start = next(_partition_boundaries(datetime.utcnow(), until))
+
+    boundaries = [start] + [boundary for boundary in _partition_boundaries(start, until) if boundary > start]
+
+    created = []
+    for lower, upper in zip(boundaries, boundaries[1:]):
+        partition_name = '{}_p{}'.format(table_name, convert_utc_to_local_timezone(lower).strftime('%Y%m%d'))
+        db.session.execute(text(
+            "CREATE TABLE {} PARTITION OF {} FOR VALUES FROM ('{}') TO ('{}')".format(  # nosec
+                partition_name, table_name, lower, upper
+            )
+        ))
+        created.append(partition_name)
+
+    return created
+
+
+@statsd(namespace="dao")
+@transactional
+def dao_drop_partition(table_name, partition_name):
+    db.session.execute(text('ALTER TABLE {} DETACH PARTITION {}'.format(table_name, partition_name)))  # nosec
+    db.session.execute(text('DROP TABLE {}'.format(partition_name)))  # nosec
+
+
+def dao_partition_table(table_name, cutover):
+    """
+    Convert notifications or notification_history to a table partitioned by created_at, without rewriting it.
+
+    The existing table becomes the partition for everything created before cutover, which must be later than this
+    runs, and is dropped once all of its rows are past retention.  Partitions from cutover onwards and a default
+    partition are created alongside it.
+
+    The unique index and check constraint that let the existing table be attached without scanning it are added
+    first, outside a transaction and without blocking writes.  The table is then swapped for the partitioned table in
+    one short transaction.  The primary key of a partitioned table must include created_at, so it becomes
+    (id, created_at) and foreign keys that reference the table are dropped.  Those that cascaded deletes are replaced
+    by triggers, so that deleting notifications still deletes their recipient_identifiers.  The existing table's
+    other indexes and foreign keys are recreated on the partitioned table.
+    """
+    legacy_name = '{}_legacy'.format(table_name)
+
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text(
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {}_id_created_at ON {} (id, created_at)'.format(  # nosec
+                legacy_name, table_name
+            )
+        ))
+        connection.execute(text(
+            "ALTER TABLE {0} DROP CONSTRAINT IF EXISTS {1}_partition_check, "  # nosec
+            "ADD CONSTRAINT {1}_partition_check CHECK (created_at IS NOT NULL AND created_at < '{2}') NOT VALID".format(
+                table_name, legacy_name, cutover
+            )
+        ))
+        connection.execute(text(
+            'ALTER TABLE {} VALIDATE CONSTRAINT {}_partition_check'.format(table_name, legacy_name)  # nosec
+        ))
+
+    _swap_for_partitioned_table(table_name, legacy_name, cutover)
+
+    return dao_create_partitions(
+        table_name, cutover + timedelta(days=current_app.config['NOTIFICATION_PARTITIONS_AHEAD_DAYS'])
+    )
+
+
+@transactional
+def _swap_for_partitioned_table(table_name, legacy_name, cutover):
+    foreign_keys = db.session.execute(text(
+        "SELECT conrelid::regclass::text, conname, confdeltype = 'c', "
+        "    (SELECT attname FROM pg_attribute WHERE attrelid = conrelid AND attnum = conkey[1]) "
+        "FROM pg_constraint "
+        "WHERE contype = 'f' AND confrelid = CAST(:table_name AS regclass)"
+    ), {'table_name': table_name}).fetchall()
+    outgoing_foreign_keys = db.session.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE contype = 'f' AND conrelid = CAST(:table_name AS regclass)"
+    ), {'table_name': table_name}).fetchall()
+    indexes = db.session.execute(text(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE tablename = :table_name AND indexname NOT IN (:primary_key, :id_created_at)"
+    ), {
+        'table_name': table_name,
+        'primary_key': '{}_pkey'.format(table_name),
+        'id_created_at': '{}_id_created_at'.format(legacy_name),
+    }).fetchall()
+
+    for referencing_table, constraint_name, _, _ in foreign_keys:
+        db.session.execute(text(
+            'ALTER TABLE {} DROP CONSTRAINT {}'.format(referencing_table, constraint_name)  # nosec
+        ))
+
+    db.session.execute(text('ALTER TABLE {} RENAME TO {}'.format(table_name, legacy_name)))  # nosec
+    db.session.execute(text(
+        'ALTER TABLE {} RENAME CONSTRAINT {}_pkey TO {}_pkey'.format(legacy_name, table_name, legacy_name)  # nosec
+    ))
+    for index_name, _ in indexes:
+        db.session.execute(text('ALTER INDEX {0} RENAME TO {0}_legacy'.format(index_name)))  # nosec
+
+    db.session.execute(text(
+        'CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)'.format(  # nosec
+            table_name, legacy_name
+        )
+    ))
+    db.session.execute(text(
+        'ALTER TABLE {0} ADD CONSTRAINT {0}_pkey PRIMARY KEY (id, created_at)'.format(table_name)  # nosec
+    ))
+    for constraint_name, constraint_definition in outgoing_foreign_keys:
+        db.session.execute(text(
+            'ALTER TABLE {} ADD CONSTRAINT {} {}'.format(table_name, constraint_name, constraint_definition)  # nosec
+        ))
+    # The definitions still name the original table, so they recreate each index on the partitioned table.  Attaching
+    # the legacy table then uses its existing indexes and foreign keys rather than building and validating new ones.
+    for _, index_definition in indexes:
+        db.session.execute(text(index_definition))
+    # A trigger stands in for each dropped foreign key that cascaded deletes, such as recipient_identifiers'.  It is
+    # cloned to each partition, including the legacy table when it is attached.
+    for referencing_table, constraint_name, cascades, column_name in foreign_keys:
+        if cascades:
+            _create_cascade_delete_trigger(table_name, referencing_table, column_name, constraint_name)
+
+    db.session.execute(text(
+        "ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (MINVALUE) TO ('{}')".format(  # nosec
+            table_name, legacy_name, cutover
+        )
+    ))
+    db.session.execute(text('CREATE TABLE {0}_default PARTITION OF {0} DEFAULT'.format(table_name)))  # nosec
+
+
+def _create_cascade_delete_trigger(table_name, referencing_table, column_name, name):
+    db.session.execute(text(
+        "CREATE OR REPLACE FUNCTION {0}() RETURNS trigger AS $$ "  # nosec
+        "BEGIN DELETE FROM {1} WHERE {2} = OLD.id; RETURN NULL; END; "
+        "$$ LANGUAGE plpgsql".format(name, referencing_table, column_name)
+    ))
+    db.session.execute(text(
+        'CREATE TRIGGER {0} AFTER DELETE ON {1} FOR EACH ROW EXECUTE PROCEDURE {0}()'.format(  # nosec
+            name, table_name
+        )
+    ))
+
+
+def _partition_boundaries(start_date, end_date):
+    interval = current_app.config['NOTIFICATION_PARTITION_INTERVAL']
+    step = timedelta(days=7 if interval == 'week' else 1)
+
+    day = convert_utc_to_local_timezone(start_date).date()
+    if interval == 'week':
+        day -= timedelta(days=day.weekday())
+
+    boundary = get_local_timezone_midnight_in_utc(day)
+    yield boundary
+    while boundary < end_date:
+        day += step
+        boundary = get_local_timezone_midnight_in_utc(day)
+        yield boundary
+
+
+def _parse_bound(bound):
+    if bound in ('MINVALUE', 'MAXVALUE'):
+        return None
+    return datetime.fromisoformat(bound.strip("'"))
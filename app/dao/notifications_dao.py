@@ -1,6 +1,8 @@
 import functools
 import string
 import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import (
     datetime,
     timedelta,
@@ -12,27 +14,34 @@ from notifications_utils.international_billing_rates import INTERNATIONAL_BILLIN
 from notifications_utils.recipients import (
     validate_and_format_email_address,
     InvalidEmailError,
-    try_validate_and_format_phone_number
+    InvalidPhoneError,
+    try_validate_and_format_phone_number,
+    validate_and_format_phone_number,
 )
 from notifications_utils.statsd_decorators import statsd
 from notifications_utils.timezones import convert_local_timezone_to_utc, convert_utc_to_local_timezone
-from sqlalchemy import (desc, func, asc)
+from sqlalchemy import (MetaData, and_, desc, false, func, asc, inspect, not_, or_, select, text, tuple_)
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql import functions
-from sqlalchemy.sql.expression import case
+from sqlalchemy.sql.expression import ClauseElement, Executable, case
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.compiler import compiles
 from werkzeug.datastructures import MultiDict
 
-from app import db, create_uuid
+from app import db, create_uuid, notification_stats_counter, statsd_client
 from app.aws.s3 import remove_s3_object, get_s3_bucket_objects
 from app.dao.dao_utils import transactional
+from app.dao.notification_partitions_dao import dao_get_partitions
 from app.errors import InvalidRequest
 from app.feature_flags import is_feature_enabled, FeatureFlag
 from app.letters.utils import LETTERS_PDF_FILE_LOCATION_STRUCTURE
 from app.models import (
     Notification,
     NotificationHistory,
+    NotificationPurgeCheckpoint,
+    RecipientIdentifier,
     ScheduledNotification,
     KEY_TYPE_TEST,
     LETTER_TYPE,
@@ -51,7 +60,16 @@ from app.models import (
     Service
 )
 from app.utils import get_local_timezone_midnight_in_utc
-from app.utils import midnight_n_days_ago, escape_special_characters
+from app.utils import midnight_n_days_ago, escape_special_characters, encode_cursor, decode_cursor
+
+# A page of notifications from keyset pagination.  total is None unless the notifications were counted.
+NotificationsPage = namedtuple('NotificationsPage', ['items', 'total', 'next_cursor'])
+
+_CURSOR_VALUE_TYPES = {
+    'created_at': datetime.fromisoformat,
+    'id': uuid.UUID,
+    'job_row_number': int,
+}
 
 TRANSIENT_NOTIFICATION_STATUSES = {
     NOTIFICATION_CREATED,
@@ -88,6 +106,40 @@ def dao_create_notification(notification):
         notification.status = NOTIFICATION_CREATED
 
     db.session.add(notification)
+    notification_stats_counter.record_created([notification])
+
+
+@statsd(namespace="dao")
+@transactional
+def dao_create_notifications(notifications):
+    """
+    Insert many notifications with a single multi-row INSERT statement.  The notifications are not added to the
+    session, so relationships on them are not loaded or persisted.
+    """
+    if not notifications:
+        return
+
+    rows = []
+    for notification in notifications:
+        if not notification.id:
+            notification.id = create_uuid()
+        if not notification.status:
+            notification.status = NOTIFICATION_CREATED
+        rows.append(_notification_to_row(notification))
+
+    db.session.execute(insert(Notification.__table__).values(rows))
+    notification_stats_counter.record_created(notifications)
+
+
+def _notification_to_row(notification):
+    row = {}
+    for column in Notification.__table__.columns:
+        value = getattr(notification, column.key)
+        if value is None and column.default is not None and column.default.is_scalar:
+            # Column defaults are only applied by the ORM on flush, so apply them here.
+            value = column.default.arg
+        row[column.key] = value
+    return row
 
 
 def _decide_permanent_temporary_failure(current_status, status):
@@ -142,6 +194,52 @@ def update_notification_status_by_id(
     )
 
 
+@statsd(namespace="dao")
+@transactional
+def dao_update_notification_statuses(updates):
+    """
+    Update the status of many notifications with a single UPDATE statement.  updates is a list of (notification, status)
+    pairs.  A notification is only updated if its status is still transient when the statement runs.  The updated
+    notifications are returned with their new status and updated_at, without being marked as changed in the session.
+    """
+    if not updates:
+        return []
+
+    statuses = {
+        notification.id: _decide_permanent_temporary_failure(current_status=notification.status, status=status)
+        for notification, status in updates
+    }
+    updated_at = datetime.utcnow()
+    table = Notification.__table__
+
+    result = db.session.execute(
+        table.update().where(
+            table.c.id.in_(list(statuses))
+        ).where(
+            table.c.status.in_(list(TRANSIENT_NOTIFICATION_STATUSES))
+        ).values(
+            status=case(
+                [(table.c.id == notification_id, status) for notification_id, status in statuses.items()],
+                else_=table.c.status
+            ),
+            updated_at=updated_at
+        ).returning(table.c.id)
+    )
+    updated_ids = {row.id for row in result}
+
+    updated = []
+    status_changes = []
+    for notification, _ in updates:
+        if notification.id in updated_ids:
+            status_changes.append((notification, notification.status, statuses[notification.id]))
+            set_committed_value(notification, 'status', statuses[notification.id])
+            set_committed_value(notification, 'updated_at', updated_at)
+            updated.append(notification)
+
+    notification_stats_counter.record_status_changes(status_changes)
+    return updated
+
+
 @statsd(namespace="dao")
 @transactional
 def update_notification_status_by_reference(reference, status):
@@ -171,6 +269,12 @@ def dao_update_notification(notification):
     notification.updated_at = datetime.utcnow()
     db.session.add(notification)
 
+    status_history = inspect(notification).attrs.status.history
+    if status_history.deleted:
+        notification_stats_counter.record_status_changes(
+            [(notification, status_history.deleted[0], notification.status)]
+        )
+
 
 @statsd(namespace="dao")
 def get_notification_for_job(service_id, job_id, notification_id):
@@ -178,14 +282,23 @@ def get_notification_for_job(service_id, job_id, notification_id):
 
 
 @statsd(namespace="dao")
-def get_notifications_for_job(service_id, job_id, filter_dict=None, page=1, page_size=None):
+def get_notifications_for_job(
+        service_id, job_id, filter_dict=None, page=1, page_size=None, count_pages=True, keyset=False, cursor=None
+):
     if page_size is None:
         page_size = current_app.config['PAGE_SIZE']
     query = Notification.query.filter_by(service_id=service_id, job_id=job_id)
     query = _filter_query(query, filter_dict)
+
+    if keyset:
+        return _get_keyset_page(
+            query, [Notification.job_row_number, Notification.id], cursor, page_size, count_pages, descending=False
+        )
+
     return query.order_by(asc(Notification.job_row_number)).paginate(
         page=page,
-        per_page=page_size
+        per_page=page_size,
+        count=count_pages
     )
 
 
@@ -228,8 +341,16 @@ def get_notifications_for_service(
         include_from_test_key=False,
         older_than=None,
         client_reference=None,
-        include_one_off=True
+        include_one_off=True,
+        keyset=False,
+        cursor=None
 ):
+    """
+    Return a page of a service's notifications, newest first.
+
+    With keyset, pages are found by created_at and id rather than by page number, and a NotificationsPage is returned
+    instead of a Pagination.  Its next_cursor is passed back as cursor to get the next page.
+    """
     if page_size is None:
         page_size = current_app.config['PAGE_SIZE']
 
@@ -264,6 +385,11 @@ def get_notifications_for_service(
             joinedload('template')
         )
 
+    if keyset:
+        return _get_keyset_page(
+            query, [Notification.created_at, Notification.id], cursor, page_size, count_pages, descending=True
+        )
+
     return query.order_by(desc(Notification.created_at)).paginate(
         page=page,
         per_page=page_size,
@@ -271,6 +397,37 @@ def get_notifications_for_service(
     )
 
 
+def _get_keyset_page(query, sort_columns, cursor, page_size, count_pages, descending):
+    """
+    Return a NotificationsPage of the rows after the one that cursor was made from, in the order of sort_columns, which
+    together must identify a row.  Rows are skipped by comparing sort keys rather than with OFFSET, so later pages are
+    as quick to get as the first.  The total is only counted if count_pages is set.
+    """
+    total = query.order_by(None).count() if count_pages else None
+
+    if cursor:
+        sort_key = tuple_(*sort_columns)
+        cursor_key = tuple_(*_decode_notifications_cursor(cursor, sort_columns))
+        query = query.filter(sort_key < cursor_key if descending else sort_key > cursor_key)
+
+    order = desc if descending else asc
+    items = query.order_by(*[order(column) for column in sort_columns]).limit(page_size).all()
+
+    next_cursor = encode_cursor([getattr(items[-1], column.key) for column in sort_columns]) if items else None
+
+    return NotificationsPage(items=items, total=total, next_cursor=next_cursor)
+
+
+def _decode_notifications_cursor(cursor, sort_columns):
+    try:
+        values = decode_cursor(cursor)
+        if len(values) != len(sort_columns):
+            raise ValueError('Invalid cursor')
+        return [_CURSOR_VALUE_TYPES[column.key](value) for column, value in zip(sort_columns, values)]
+    except ValueError:
+        raise InvalidRequest('Invalid cursor', status_code=400)
+
+
 def _filter_query(query, filter_dict=None):
     if filter_dict is None:
         return query
@@ -375,13 +532,20 @@ def _delete_for_query(subquery):
 
 
 def insert_update_notification_history(notification_type, date_to_delete_from, service_id):
-    notifications = db.session.query(
-        *[x.name for x in NotificationHistory.__table__.c]
-    ).filter(
+    _upsert_notification_history([
         Notification.notification_type == notification_type,
         Notification.service_id == service_id,
         Notification.created_at < date_to_delete_from,
-        Notification.key_type != KEY_TYPE_TEST
+    ])
+    db.session.commit()
+
+
+def _upsert_notification_history(filters, source=Notification.__table__):
+    notifications = db.session.query(
+        *[source.c[x.key] for x in NotificationHistory.__table__.c]
+    ).filter(
+        *filters,
+        source.c.key_type != KEY_TYPE_TEST
     )
     stmt = insert(NotificationHistory).from_select(
         NotificationHistory.__table__.c,
@@ -400,7 +564,6 @@ def insert_update_notification_history(notification_type, date_to_delete_from, s
               }
     )
     db.session.connection().execute(stmt)
-    db.session.commit()
 
 
 def _delete_letters_from_s3(
@@ -413,7 +576,11 @@ def _delete_letters_from_s3(
         Notification.created_at < date_to_delete_from,
         Notification.service_id == service_id
     ).limit(query_limit).all()
-    for letter in letters_to_delete_from_s3:
+    _remove_letter_pdfs_from_s3(letters_to_delete_from_s3)
+
+
+def _remove_letter_pdfs_from_s3(letters):
+    for letter in letters:
         bucket_name = current_app.config['LETTERS_PDF_BUCKET_NAME']
         if letter.sent_at:
             sent_at = str(letter.sent_at.date())
@@ -435,6 +602,246 @@ def _delete_letters_from_s3(
                         "Could not delete S3 object with filename: {}".format(s3_object['Key']))
 
 
+@statsd(namespace="dao")
+def purge_notifications_older_than_retention_by_type(notification_type):
+    """
+    Move notifications older than their service's data retention to notification_history and delete them, in slices of
+    NOTIFICATION_PURGE_SLICE_MINUTES by created_at across all services at once.  Each slice is copied and deleted in
+    its own transaction, and NOTIFICATION_PURGE_PARALLELISM slices are purged at a time.
+
+    Services with their own data retention for the notification type are purged separately, each with its own cutoff.
+    Progress is recorded in notification_purge_checkpoints after each slice, so a purge that is interrupted resumes
+    where it stopped.
+
+    Returns the number of notifications deleted.
+    """
+    today = get_local_timezone_midnight_in_utc(convert_utc_to_local_timezone(datetime.utcnow()).date())
+
+    flexible_data_retention = ServiceDataRetention.query.filter(
+        ServiceDataRetention.notification_type == notification_type
+    ).all()
+
+    deleted = 0
+    for f in flexible_data_retention:
+        deleted += _purge_notifications_for_scope(
+            notification_type,
+            scope=str(f.service_id),
+            scope_filters=[Notification.service_id == f.service_id],
+            cutoff=today - timedelta(days=f.days_of_retention)
+        )
+
+    deleted += _purge_notifications_for_scope(
+        notification_type,
+        scope='default',
+        scope_filters=[Notification.service_id.notin_([f.service_id for f in flexible_data_retention])],
+        cutoff=today - timedelta(days=7)
+    )
+
+    return deleted
+
+
+def _purge_notifications_for_scope(notification_type, scope, scope_filters, cutoff):
+    filters = [Notification.notification_type == notification_type, *scope_filters]
+
+    checkpoint = NotificationPurgeCheckpoint.query.get((notification_type, scope))
+    if checkpoint is not None and checkpoint.cutoff == cutoff:
+        start = checkpoint.purged_to
+    else:
+        start = db.session.query(func.min(Notification.created_at)).filter(
+            *filters,
+            Notification.created_at < cutoff
+        ).scalar()
+
+    if start is None or start >= cutoff:
+        _save_purge_checkpoint(notification_type, scope, cutoff, cutoff)
+        return 0
+
+    slice_length = timedelta(minutes=current_app.config['NOTIFICATION_PURGE_SLICE_MINUTES'])
+    slice_start = start.replace(minute=0, second=0, microsecond=0)
+    slices = []
+    while slice_start < cutoff:
+        slices.append((slice_start, min(slice_start + slice_length, cutoff)))
+        slice_start += slice_length
+
+    current_app.logger.info("Purging {} notifications for scope {} from {} to {} in {} slices".format(
+        notification_type, scope, slices[0][0], cutoff, len(slices)
+    ))
+
+    timer_start = datetime.utcnow()
+    deleted = 0
+    parallelism = current_app.config['NOTIFICATION_PURGE_PARALLELISM']
+
+    if parallelism > 1:
+        app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            results = executor.map(
+                lambda time_slice: _purge_notification_slice_in_app_context(
+                    app, filters, notification_type, *time_slice
+                ),
+                slices
+            )
+            deleted = _record_purged_slices(notification_type, scope, cutoff, slices, results)
+    else:
+        results = (_purge_notification_slice(filters, notification_type, *time_slice) for time_slice in slices)
+        deleted = _record_purged_slices(notification_type, scope, cutoff, slices, results)
+
+    elapsed = (datetime.utcnow() - timer_start).total_seconds()
+    statsd_client.incr(f'purge.{notification_type}.deleted', deleted)
+    statsd_client.gauge(f'purge.{notification_type}.rows-per-second', int(deleted / elapsed) if elapsed else deleted)
+    current_app.logger.info("Purged {} {} notifications for scope {} in {} seconds".format(
+        deleted, notification_type, scope, round(elapsed, 3)
+    ))
+
+    return deleted
+
+
+def _record_purged_slices(notification_type, scope, cutoff, slices, results):
+    # Results arrive in slice order, so the checkpoint only moves past slices that have all been purged.
+    deleted = 0
+    for (_, slice_end), slice_deleted in zip(slices, results):
+        deleted += slice_deleted
+        _save_purge_checkpoint(notification_type, scope, cutoff, slice_end)
+    return deleted
+
+
+def _purge_notification_slice_in_app_context(app, filters, notification_type, slice_start, slice_end):
+    with app.app_context():
+        try:
+            return _purge_notification_slice(filters, notification_type, slice_start, slice_end)
+        finally:
+            db.session.remove()
+
+
+@transactional
+def _purge_notification_slice(filters, notification_type, slice_start, slice_end):
+    filters = [*filters, Notification.created_at >= slice_start, Notification.created_at < slice_end]
+
+    if notification_type == LETTER_TYPE:
+        _remove_letter_pdfs_from_s3(Notification.query.filter(*filters).all())
+
+    _upsert_notification_history(filters)
+
+    # Test key notifications are not copied to notification_history, and every other notification in the slice now is.
+    return db.session.execute(
+        Notification.__table__.delete().where(and_(*filters))
+    ).rowcount
+
+
+@transactional
+def _save_purge_checkpoint(notification_type, scope, cutoff, purged_to):
+    stmt = insert(NotificationPurgeCheckpoint.__table__).values(
+        notification_type=notification_type,
+        scope=scope,
+        cutoff=cutoff,
+        purged_to=purged_to,
+        updated_at=datetime.utcnow()
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['notification_type', 'scope'],
+        set_={
+            'cutoff': stmt.excluded.cutoff,
+            'purged_to': stmt.excluded.purged_to,
+            'updated_at': stmt.excluded.updated_at,
+        }
+    ))
+
+
+@statsd(namespace="dao")
+def drop_notification_partitions_older_than_retention():
+    """
+    Once notifications is partitioned by created_at, drop each partition that only holds notifications older than the
+    default data retention of 7 days, after copying its notifications to notification_history.
+
+    Notifications of services whose own data retention keeps them for longer are moved to the default partition
+    instead, and purged from there by the nightly delete tasks once they expire.  Services with a shorter data
+    retention have already been purged by those tasks.
+
+    Returns the names of the partitions dropped.
+    """
+    today = get_local_timezone_midnight_in_utc(convert_utc_to_local_timezone(datetime.utcnow()).date())
+
+    longer_retention = [
+        (f.service_id, f.notification_type, today - timedelta(days=f.days_of_retention))
+        for f in ServiceDataRetention.query.filter(ServiceDataRetention.days_of_retention > 7).all()
+    ]
+
+    dropped = []
+    for partition in dao_get_partitions(Notification.__tablename__):
+        if partition.end is None or partition.end > today - timedelta(days=7):
+            break
+        _drop_notification_partition(partition, longer_retention)
+        dropped.append(partition.name)
+
+    return dropped
+
+
+def _retained(table, longer_retention):
+    if not longer_retention:
+        return false()
+    return or_(*[
+        and_(
+            table.c.service_id == service_id,
+            table.c.notification_type == notification_type,
+            table.c.created_at >= cutoff
+        )
+        for service_id, notification_type, cutoff in longer_retention
+    ])
+
+
+def _drop_notification_partition(partition, longer_retention):
+    """
+    Copy a partition's notifications to notification_history while it is still attached, then detach and drop it in
+    a separate, short transaction, as detaching it locks notifications against reads and writes until the transaction
+    ends.
+    """
+    partition_table = Notification.__table__.tometadata(MetaData(), name=partition.name)
+    retained = _retained(partition_table, longer_retention)
+
+    _copy_notification_partition(partition, partition_table, retained, longer_retention)
+    _detach_and_drop_notification_partition(partition, partition_table, retained, longer_retention)
+
+
+@transactional
+def _copy_notification_partition(partition, partition_table, retained, longer_retention):
+    partition_filters = [Notification.created_at < partition.end]
+    if partition.start is not None:
+        partition_filters.append(Notification.created_at >= partition.start)
+
+    _remove_letter_pdfs_from_s3(Notification.query.filter(
+        *partition_filters,
+        Notification.notification_type == LETTER_TYPE,
+        not_(_retained(Notification.__table__, longer_retention))
+    ).all())
+
+    _upsert_notification_history([not_(retained)], source=partition_table)
+
+    # Dropping the partition doesn't delete rows that refer to its notifications, as foreign keys can't reference a
+    # partitioned table and the cascade trigger that replaces them only fires on DELETE, so they are deleted here.
+    expired_ids = select([partition_table.c.id]).where(not_(retained))
+    db.session.execute(
+        RecipientIdentifier.__table__.delete().where(RecipientIdentifier.notification_id.in_(expired_ids))
+    )
+    db.session.execute(
+        ScheduledNotification.__table__.delete().where(ScheduledNotification.notification_id.in_(expired_ids))
+    )
+
+
+@transactional
+def _detach_and_drop_notification_partition(partition, partition_table, retained, longer_retention):
+    db.session.execute(text('ALTER TABLE {} DETACH PARTITION {}'.format(  # nosec
+        Notification.__tablename__, partition.name
+    )))
+
+    if longer_retention:
+        # The partition's range is detached, so these rows are inserted into the default partition.
+        db.session.execute(insert(Notification.__table__).from_select(
+            Notification.__table__.c,
+            select(list(partition_table.c)).where(retained)
+        ))
+
+    db.session.execute(text('DROP TABLE {}'.format(partition.name)))  # nosec
+
+
 @statsd(namespace="dao")
 @transactional
 def dao_delete_notification_by_id(notification_id):
@@ -443,24 +850,49 @@ def dao_delete_notification_by_id(notification_id):
         db.session.delete(notification)
 
 
-def _timeout_notifications(current_statuses, new_status, timeout_start, updated_at):
-    notifications = Notification.query.filter(
-        Notification.created_at < timeout_start,
-        Notification.status.in_(current_statuses),
-        Notification.notification_type != LETTER_TYPE
-    ).all()
-    Notification.query.filter(
+def _timeout_notifications(current_status, new_status, timeout_start, updated_at, batch_size):
+    """
+    Set notifications in current_status created before timeout_start to new_status, batch_size at a time, committing
+    each batch.  Yields the id, service_id, notification_type, key_type and created_at of the notifications in each
+    batch, so that they are never all in memory and no batch holds its row locks for long.
+
+    Rows locked by another transaction, such as a delivery receipt being processed, are skipped, and are left for the
+    next run if they are still locked once every other row has been timed out.
+    """
+    notifications = Notification.__table__
+    batch = db.session.query(Notification.id).filter(
         Notification.created_at < timeout_start,
-        Notification.status.in_(current_statuses),
+        Notification.status == current_status,
         Notification.notification_type != LETTER_TYPE
-    ).update(
-        {'status': new_status, 'updated_at': updated_at},
-        synchronize_session=False
-    )
-    return notifications
+    ).limit(batch_size).with_for_update(skip_locked=True).subquery()
+
+    while True:
+        timed_out = db.session.execute(
+            notifications.update().where(
+                notifications.c.id.in_(batch)
+            ).values(
+                status=new_status, updated_at=updated_at
+            ).returning(
+                notifications.c.id,
+                notifications.c.service_id,
+                notifications.c.notification_type,
+                notifications.c.key_type,
+                notifications.c.created_at,
+            )
+        ).fetchall()
+
+        notification_stats_counter.record_status_changes([
+            (notification, current_status, new_status) for notification in timed_out
+        ])
+        db.session.commit()
+
+        # A short batch doesn't mean there are none left, as locked rows are skipped, so stop at an empty one
+        if not timed_out:
+            return
+        yield timed_out
 
 
-def dao_timeout_notifications(timeout_period_in_seconds):
+def dao_timeout_notifications(timeout_period_in_seconds, batch_size):
     """
     Timeout SMS and email notifications by the following rules:
 
@@ -472,21 +904,25 @@ def dao_timeout_notifications(timeout_period_in_seconds):
         pending -> temporary-failure
 
     Letter notifications are not timed out
+
+    Notifications are updated in committed batches of batch_size.  Yields (new_status, notifications) for each batch,
+    where notifications are rows of id, service_id, notification_type, key_type and created_at.
     """
     timeout_start = datetime.utcnow() - timedelta(seconds=timeout_period_in_seconds)
     updated_at = datetime.utcnow()
-    timeout = functools.partial(_timeout_notifications, timeout_start=timeout_start, updated_at=updated_at)
-
-    # Notifications still in created status are marked with a technical-failure:
-    technical_failure_notifications = timeout([NOTIFICATION_CREATED], NOTIFICATION_TECHNICAL_FAILURE)
-
-    # Notifications still in sending or pending status are marked with a temporary-failure:
-    temporary_failure_notifications = timeout([NOTIFICATION_SENDING, NOTIFICATION_PENDING],
-                                              NOTIFICATION_TEMPORARY_FAILURE)
-
-    db.session.commit()
+    timeout = functools.partial(
+        _timeout_notifications, timeout_start=timeout_start, updated_at=updated_at, batch_size=batch_size
+    )
 
-    return technical_failure_notifications, temporary_failure_notifications
+    for current_status, new_status in (
+        # Notifications still in created status are marked with a technical-failure:
+        (NOTIFICATION_CREATED, NOTIFICATION_TECHNICAL_FAILURE),
+        # Notifications still in sending or pending status are marked with a temporary-failure:
+        (NOTIFICATION_SENDING, NOTIFICATION_TEMPORARY_FAILURE),
+        (NOTIFICATION_PENDING, NOTIFICATION_TEMPORARY_FAILURE),
+    ):
+        for notifications in timeout(current_status, new_status):
+            yield new_status, notifications
 
 
 def is_delivery_slow_for_provider(
@@ -528,9 +964,11 @@ def is_delivery_slow_for_provider(
 @statsd(namespace="dao")
 @transactional
 def dao_update_notifications_by_reference(references, update_dict):
-    updated_count = Notification.query.filter(
-        Notification.reference.in_(references)
-    ).update(
+    query = Notification.query.filter(Notification.reference.in_(references))
+    if 'status' in update_dict:
+        lock_notifications_for_status_change(query, update_dict['status'])
+
+    updated_count = query.update(
         update_dict,
         synchronize_session=False
     )
@@ -547,8 +985,41 @@ def dao_update_notifications_by_reference(references, update_dict):
     return updated_count, updated_history_count
 
 
+def lock_notifications_for_status_change(query, status):
+    """
+    Lock the notifications matched by query, which are about to be updated to status in bulk, and move them to status
+    in the notification stats counters.
+    """
+    if not notification_stats_counter.active:
+        return
+
+    notifications = query.with_entities(
+        Notification.service_id,
+        Notification.notification_type,
+        Notification.key_type,
+        Notification.created_at,
+        Notification.status,
+    ).with_for_update().all()
+
+    notification_stats_counter.record_status_changes([
+        (notification, notification.status, status) for notification in notifications
+    ])
+
+
 @statsd(namespace="dao")
-def dao_get_notifications_by_to_field(service_id, search_term, notification_type=None, statuses=None):
+def dao_get_notifications_by_to_field(
+    service_id, search_term, notification_type=None, statuses=None, keyset=False, cursor=None, page_size=None,
+    exact_match=False
+):
+    """
+    Search a service's notifications by recipient, newest first.  The search term is matched anywhere in
+    normalised_to, which the trigram index on normalised_to serves, so that a search for bob@example.com also finds
+    jimbob@example.com.  If exact_match is set and the search term is a complete phone number or email address, it is
+    instead looked up by equality on normalised_to.
+
+    Returns at most NOTIFICATION_SEARCH_MAX_RESULTS notifications, or if keyset is set a NotificationsPage of the
+    page_size notifications after the one that cursor was made from.
+    """
     if notification_type is None:
         notification_type = guess_notification_type(search_term)
 
@@ -560,11 +1031,17 @@ def dao_get_notifications_by_to_field(service_id, search_term, notification_type
 
         normalised = normalised.lstrip('+0')
 
+        try:
+            recipient = validate_and_format_phone_number(search_term, international=True)
+        except InvalidPhoneError:
+            recipient = None
+
     elif notification_type == EMAIL_TYPE:
         try:
-            normalised = validate_and_format_email_address(search_term)
+            normalised = recipient = validate_and_format_email_address(search_term)
         except InvalidEmailError:
             normalised = search_term.lower()
+            recipient = None
 
     else:
         raise InvalidRequest("Only email and SMS can use search by recipient", 400)
@@ -573,7 +1050,6 @@ def dao_get_notifications_by_to_field(service_id, search_term, notification_type
 
     filters = [
         Notification.service_id == service_id,
-        Notification.normalised_to.like("%{}%".format(normalised)),
         Notification.key_type != KEY_TYPE_TEST,
     ]
 
@@ -582,8 +1058,41 @@ def dao_get_notifications_by_to_field(service_id, search_term, notification_type
     if notification_type:
         filters.append(Notification.notification_type == notification_type)
 
-    results = db.session.query(Notification).filter(*filters).order_by(desc(Notification.created_at)).all()
-    return results
+    query = db.session.query(Notification).filter(*filters)
+
+    if exact_match and recipient:
+        query, search = query.filter(Notification.normalised_to == recipient), 'exact'
+    else:
+        query, search = query.filter(Notification.normalised_to.like("%{}%".format(normalised))), 'substring'
+
+    statsd_client.incr('dao.notifications-search-by-recipient.{}'.format(search))
+    if current_app.config['NOTIFICATION_SEARCH_LOG_QUERY_PLAN']:
+        _log_query_plan('Search by recipient ({})'.format(search), query.order_by(desc(Notification.created_at)))
+
+    if keyset:
+        return _get_keyset_page(
+            query, [Notification.created_at, Notification.id], cursor, page_size, count_pages=False, descending=True
+        )
+
+    return query.order_by(desc(Notification.created_at)).limit(
+        current_app.config['NOTIFICATION_SEARCH_MAX_RESULTS']
+    ).all()
+
+
+class _Explain(Executable, ClauseElement):
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kwargs):
+    return 'EXPLAIN {}'.format(compiler.process(element.statement, **kwargs))
+
+
+def _log_query_plan(description, query):
+    plan = db.session.execute(_Explain(query.statement)).fetchall()
+    current_app.logger.info('{} query plan:\n{}'.format(description, '\n'.join(row[0] for row in plan)))
 
 
 @statsd(namespace="dao")
@@ -686,16 +1195,71 @@ def dao_get_last_notification_added_for_job_id(job_id):
     return last_notification_added
 
 
-def notifications_not_yet_sent(should_be_sending_after_seconds, notification_type):
-    older_than_date = datetime.utcnow() - timedelta(seconds=should_be_sending_after_seconds)
+@statsd(namespace="dao")
+def dao_get_job_row_numbers_with_notifications(job_id, row_numbers):
+    """
+    Return the subset of the given row numbers for which the job already has a notification.
+    """
+    rows = db.session.query(
+        Notification.job_row_number
+    ).filter(
+        Notification.job_id == job_id,
+        Notification.job_row_number.in_(row_numbers)
+    ).all()
 
-    notifications = Notification.query.filter(
+    return {row.job_row_number for row in rows}
+
+
+@statsd(namespace="dao")
+def dao_claim_notifications_not_yet_sent(should_be_sending_after_seconds, notification_type, batch_size, claim_seconds):
+    """
+    Yield the notifications of notification_type still in created status should_be_sending_after_seconds after they
+    were created, in pages of up to batch_size by id, with their services loaded.
+
+    Each page is claimed by setting updated_at before it is yielded.  Notifications claimed in the last claim_seconds
+    are left out, so that runs which overlap do not both return the same notification.
+    """
+    notifications = Notification.__table__
+    older_than_date = datetime.utcnow() - timedelta(seconds=should_be_sending_after_seconds)
+    query = db.session.query(Notification.id).filter(
         Notification.created_at <= older_than_date,
         Notification.notification_type == notification_type,
         Notification.status == NOTIFICATION_CREATED,
-        Notification.to is not None
-    ).all()
-    return notifications
+    ).order_by(Notification.id).limit(batch_size)
+
+    last_id = None
+    while True:
+        page = [row.id for row in (query.filter(Notification.id > last_id) if last_id else query)]
+        if not page:
+            return
+        last_id = page[-1]
+
+        claimed_at = datetime.utcnow()
+        claimed_ids = [row.id for row in db.session.execute(
+            notifications.update().where(and_(
+                notifications.c.id.in_(page),
+                notifications.c.status == NOTIFICATION_CREATED,
+                or_(
+                    notifications.c.updated_at.is_(None),
+                    notifications.c.updated_at < claimed_at - timedelta(seconds=claim_seconds),
+                ),
+            )).values(
+                updated_at=claimed_at
+            ).returning(
+                notifications.c.id
+            )
+        )]
+        db.session.commit()
+
+        if claimed_ids:
+            yield Notification.query.options(
+                joinedload('service')
+            ).filter(
+                Notification.id.in_(claimed_ids)
+            ).all()
+
+        if len(page) < batch_size:
+            return
 
 
 def dao_old_letters_with_created_status():
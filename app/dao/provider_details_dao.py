@@ -14,13 +14,17 @@ from app.provider_details.switch_providers import (
 )
 from app.models import FactBilling, ProviderDetails, ProviderDetailsHistory, SMS_TYPE
 from app.model import User
-from app import db
+from app import db, provider_routing_cache
 
 
 def get_provider_details_by_id(provider_details_id) -> Optional[ProviderDetails]:
     return ProviderDetails.query.get(provider_details_id)
 
 
+def get_all_provider_details() -> List[ProviderDetails]:
+    return ProviderDetails.query.all()
+
+
 def get_provider_details_by_identifier(identifier):
     return ProviderDetails.query.filter_by(identifier=identifier).one()
 
@@ -58,6 +62,8 @@ def dao_toggle_sms_provider(identifier):
     alternate_provider = get_alternative_sms_provider(identifier)
     if alternate_provider:
         dao_switch_sms_provider_to_provider_with_identifier(alternate_provider.identifier)
+        # The switch has been committed, so workers rebuilding their routing tables will see it.
+        provider_routing_cache.invalidate()
     else:
         current_app.logger.warning('Cancelling switch from {} as there is no alternative provider'.format(
             identifier,
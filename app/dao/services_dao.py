@@ -1,5 +1,6 @@
 import uuid
-from datetime import date, datetime, timedelta
+from collections import Counter, namedtuple
+from datetime import datetime, time, timedelta
 
 from notifications_utils.statsd_decorators import statsd
 from notifications_utils.timezones import convert_utc_to_local_timezone
@@ -7,7 +8,7 @@ from sqlalchemy.sql.expression import asc, case, and_, func
 from sqlalchemy.orm import joinedload
 from flask import current_app
 
-from app import db
+from app import db, notification_stats_counter, service_api_key_cache
 from app.dao.date_util import get_current_financial_year
 from app.dao.dao_utils import (
     transactional,
@@ -53,6 +54,11 @@ DEFAULT_SERVICE_PERMISSIONS = [
     INTERNATIONAL_SMS_TYPE,
 ]
 
+TodaysStatsRow = namedtuple('TodaysStatsRow', ['notification_type', 'status', 'count'])
+TodaysServiceStatsRow = namedtuple('TodaysServiceStatsRow', [
+    'service_id', 'name', 'restricted', 'research_mode', 'active', 'created_at', 'notification_type', 'status', 'count'
+])
+
 
 def dao_fetch_all_services(only_active=False):
     query = Service.query.order_by(
@@ -249,6 +255,8 @@ def dao_archive_service(service_id):
         if not api_key.expiry_date:
             api_key.expiry_date = datetime.utcnow()
 
+    service_api_key_cache.invalidate(service_id)
+
 
 def dao_fetch_service_by_id_and_user(service_id, user_id):
     return Service.query.filter(
@@ -313,6 +321,7 @@ def dao_create_service(
 @version_class(Service)
 def dao_update_service(service):
     db.session.add(service)
+    service_api_key_cache.invalidate(service.id)
 
 
 def dao_add_user_to_service(service, user, permissions=None, folder_permissions=None):
@@ -397,23 +406,77 @@ def dao_fetch_stats_for_service(service_id, limit_days):
 
 @statsd(namespace="dao")
 def dao_fetch_todays_stats_for_service(service_id):
+    start_date, end_date = _utc_today()
+
+    counts = notification_stats_counter.get_counts(start_date, end_date, service_ids=[service_id])
+    if counts is not None:
+        return _stats_rows_from_counts(counts[str(service_id)], include_from_test_key=False)
+
     return _stats_for_service_query(service_id).filter(
-        func.date(Notification.created_at) == date.today()
+        Notification.created_at >= start_date,
+        Notification.created_at < end_date
     ).all()
 
 
 def fetch_todays_total_message_count(service_id):
-    result = db.session.query(
-        func.count(Notification.id).label('count')
+    start_date, end_date = _utc_today()
+
+    counts = notification_stats_counter.get_counts(start_date, end_date, service_ids=[service_id])
+    if counts is not None:
+        return sum(row.count for row in _stats_rows_from_counts(counts[str(service_id)], include_from_test_key=False))
+
+    return db.session.query(
+        func.count(Notification.id)
     ).filter(
         Notification.service_id == service_id,
         Notification.key_type != KEY_TYPE_TEST,
-        func.date(Notification.created_at) == date.today()
-    ).group_by(
+        Notification.created_at >= start_date,
+        Notification.created_at < end_date
+    ).scalar()
+
+
+@statsd(namespace="dao")
+def dao_fetch_notification_stats_by_hour(start_date, end_date):
+    """
+    Counts of notifications created between start_date and end_date by service, hour created, notification type, key
+    type and status, for reconciling the notification stats counters.
+    """
+    hour = func.date_trunc('hour', Notification.created_at)
+    return db.session.query(
+        Notification.service_id,
+        hour.label('hour'),
         Notification.notification_type,
+        Notification.key_type,
         Notification.status,
-    ).first()
-    return 0 if result is None else result.count
+        func.count(Notification.id).label('count')
+    ).filter(
+        Notification.created_at >= start_date,
+        Notification.created_at < end_date
+    ).group_by(
+        Notification.service_id,
+        hour,
+        Notification.notification_type,
+        Notification.key_type,
+        Notification.status
+    ).all()
+
+
+def _utc_today():
+    start_date = datetime.combine(datetime.utcnow().date(), time.min)
+    return start_date, start_date + timedelta(days=1)
+
+
+def _stats_rows_from_counts(counts, include_from_test_key):
+    totals = Counter()
+    for (notification_type, key_type, status), count in counts.items():
+        if include_from_test_key or key_type != KEY_TYPE_TEST:
+            totals[(notification_type, status)] += count
+
+    return [
+        TodaysStatsRow(notification_type, status, count)
+        for (notification_type, status), count in sorted(totals.items())
+        if count > 0
+    ]
 
 
 def _stats_for_service_query(service_id):
@@ -436,6 +499,10 @@ def dao_fetch_todays_stats_for_all_services(include_from_test_key=True, only_act
     start_date = get_local_timezone_midnight_in_utc(today)
     end_date = get_local_timezone_midnight_in_utc(today + timedelta(days=1))
 
+    counts = notification_stats_counter.get_counts(start_date, end_date)
+    if counts is not None:
+        return _todays_stats_for_all_services_from_counts(counts, include_from_test_key, only_active)
+
     subquery = db.session.query(
         Notification.notification_type,
         Notification.status,
@@ -476,6 +543,28 @@ def dao_fetch_todays_stats_for_all_services(include_from_test_key=True, only_act
     return query.all()
 
 
+def _todays_stats_for_all_services_from_counts(counts, include_from_test_key, only_active):
+    query = db.session.query(
+        Service.id.label('service_id'),
+        Service.name,
+        Service.restricted,
+        Service.research_mode,
+        Service.active,
+        Service.created_at,
+    ).order_by(Service.id)
+
+    if only_active:
+        query = query.filter(Service.active)
+
+    # Services without any notifications today have one row, without a notification type, as with an outer join.
+    rows = []
+    for service in query.all():
+        stats = _stats_rows_from_counts(counts.get(str(service.service_id), {}), include_from_test_key)
+        for stat in stats or [TodaysStatsRow(None, None, None)]:
+            rows.append(TodaysServiceStatsRow(*service, *stat))
+    return rows
+
+
 @transactional
 @version_class(
     VersionOptions(ApiKey, must_write_history=False),
@@ -493,6 +582,7 @@ def dao_suspend_service(service_id):
             api_key.expiry_date = datetime.utcnow()
 
     service.active = False
+    service_api_key_cache.invalidate(service_id)
 
 
 @transactional
@@ -500,6 +590,7 @@ def dao_suspend_service(service_id):
 def dao_resume_service(service_id):
     service = Service.query.get(service_id)
     service.active = True
+    service_api_key_cache.invalidate(service_id)
 
 
 def dao_fetch_active_users_for_service(service_id):
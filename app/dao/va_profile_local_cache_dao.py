@@ -0,0 +1,60 @@
+from sqlalchemy import text, tuple_
+
+from app import db
+from app.dao.dao_utils import transactional
+from app.models import VAProfileLocalCache
+
+
+def get_va_profile_local_cache_permissions(keys):
+    """
+    Return the cached permissions for (va_profile_id, communication_item_id, communication_channel_id) keys, in one
+    query, as a dictionary keyed the same way.  Keys with no cached permission are left out.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    permissions = VAProfileLocalCache.query.filter(
+        tuple_(
+            VAProfileLocalCache.va_profile_id,
+            VAProfileLocalCache.communication_item_id,
+            VAProfileLocalCache.communication_channel_id,
+        ).in_(keys)
+    ).all()
+
+    return {
+        (permission.va_profile_id, permission.communication_item_id, permission.communication_channel_id): permission
+        for permission in permissions
+    }
+
+
+@transactional
+def save_va_profile_local_cache_permission(
+    va_profile_id, communication_item_id, communication_channel_id, allowed, source_datetime
+):
+    """
+    Save a permission with va_profile_opt_in_out, as the VA Profile opt in/out lambda does, so that it does not replace
+    a newer permission.  The cached permission is marked as confirmed now, whether or not it was replaced.
+    """
+    params = {
+        'va_profile_id': va_profile_id,
+        'communication_item_id': communication_item_id,
+        'communication_channel_id': communication_channel_id,
+        'allowed': allowed,
+        'source_datetime': source_datetime,
+    }
+    db.session.execute(
+        text(
+            "SELECT va_profile_opt_in_out("
+            ":va_profile_id, :communication_item_id, :communication_channel_id, :allowed, :source_datetime)"
+        ),
+        params
+    )
+    db.session.execute(
+        text(
+            "UPDATE va_profile_local_cache SET cached_at = timezone('utc', now()) "
+            "WHERE va_profile_id = :va_profile_id AND communication_item_id = :communication_item_id "
+            "AND communication_channel_id = :communication_channel_id"
+        ),
+        params
+    )
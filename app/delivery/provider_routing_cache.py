@@ -0,0 +1,143 @@
+from collections import namedtuple
+from threading import Lock
+from time import monotonic
+
+from flask import current_app
+
+from app.feature_flags import is_provider_enabled
+
+ProviderRoute = namedtuple(
+    'ProviderRoute',
+    ['id', 'identifier', 'notification_type', 'priority', 'active', 'supports_international']
+)
+
+
+class ProviderRoutingCache:
+    """
+    A per-process routing table of the providers to use for each notification type, built from provider_details.
+
+    Changes to provider details increment a version number in Redis.  Each process checks the version at most every
+    PROVIDER_ROUTING_VERSION_CHECK_INTERVAL seconds and rebuilds its table when the version has changed, so a provider
+    switch takes effect everywhere within seconds.  The table is also rebuilt once it is PROVIDER_ROUTING_CACHE_TTL
+    seconds old, in case Redis is unavailable or a change was made without going through the DAO.
+    """
+
+    STATSD_PREFIX = 'provider-routing-cache'
+    VERSION_KEY = 'provider-details-version'
+
+    def __init__(self):
+        self.enabled = False
+        self.statsd_client = None
+        self.redis_store = None
+        self.ttl = 60
+        self.version_check_interval = 5
+        self._routes = None
+        self._version = None
+        self._built_at = 0
+        self._version_checked_at = 0
+        self._lock = Lock()
+
+    def init_app(self, app, statsd_client, redis_store):
+        self.enabled = app.config['PROVIDER_ROUTING_CACHE_ENABLED']
+        self.ttl = app.config['PROVIDER_ROUTING_CACHE_TTL']
+        self.version_check_interval = app.config['PROVIDER_ROUTING_VERSION_CHECK_INTERVAL']
+        self.statsd_client = statsd_client
+        self.redis_store = redis_store
+        self.clear()
+
+    def get_active_providers(self, notification_type, international, fetch):
+        """
+        Return the active and enabled providers for the notification type, in priority order.  Only providers that
+        support international messages are returned for international notifications.  fetch() is called to load
+        every ProviderDetails when the routing table needs to be built.
+        """
+        return self._get_routes(fetch)['by_type'].get((notification_type, bool(international)), [])
+
+    def get_provider(self, provider_id, fetch):
+        """
+        Return the provider with the given ID, whether or not it is active, or None if there is no such provider.
+        """
+        return self._get_routes(fetch)['by_id'].get(str(provider_id))
+
+    def invalidate(self):
+        """
+        Tell every process to rebuild its routing table.  Call this after a change to provider details is committed.
+        A Redis failure is logged rather than raised, as the change has been made, and other processes pick it up
+        once their tables reach PROVIDER_ROUTING_CACHE_TTL.
+        """
+        self.clear()
+        if self.redis_store is not None:
+            self.redis_store.incr(self.VERSION_KEY)
+
+    def clear(self):
+        with self._lock:
+            self._routes = None
+            self._version = None
+            self._built_at = 0
+            self._version_checked_at = 0
+
+    def _get_routes(self, fetch):
+        now = monotonic()
+
+        with self._lock:
+            routes = self._routes
+            expired = routes is None or now - self._built_at >= self.ttl
+            check_version = not expired and now - self._version_checked_at >= self.version_check_interval
+            if check_version:
+                self._version_checked_at = now
+
+        if check_version and self._get_version() != self._version:
+            expired = True
+
+        if not expired:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.hit')
+            return routes
+
+        self.statsd_client.incr(f'{self.STATSD_PREFIX}.rebuild')
+
+        # Read the version before the providers, so that a change made while the table is built causes another build.
+        version = self._get_version()
+        routes = self._build_routes(fetch())
+
+        with self._lock:
+            self._routes = routes
+            self._version = version
+            self._built_at = now
+            self._version_checked_at = now
+
+        return routes
+
+    def _get_version(self):
+        if self.redis_store is None or not self.redis_store.active:
+            return None
+        return self.redis_store.get(self.VERSION_KEY)
+
+    @staticmethod
+    def _build_routes(providers):
+        routes = [
+            ProviderRoute(
+                id=str(provider.id),
+                identifier=provider.identifier,
+                notification_type=provider.notification_type,
+                priority=provider.priority,
+                active=provider.active,
+                supports_international=provider.supports_international
+            )
+            for provider in providers
+        ]
+
+        usable = sorted(
+            (route for route in routes if route.active and is_provider_enabled(current_app, route.identifier)),
+            key=lambda route: route.priority
+        )
+
+        by_type = {}
+        for route in usable:
+            by_type.setdefault((route.notification_type, False), []).append(route)
+            if route.supports_international:
+                by_type.setdefault((route.notification_type, True), []).append(route)
+
+        return {
+            'by_id': {route.id: route for route in routes},
+            'by_type': by_type,
+        }
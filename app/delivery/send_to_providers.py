@@ -1,5 +1,6 @@
 import re
 from datetime import datetime
+from typing import Union
 
 import app.googleanalytics.pixels as gapixels
 from flask import current_app
@@ -10,17 +11,19 @@ from notifications_utils.recipients import (
 from notifications_utils.template import HTMLEmailTemplate, PlainTextEmailTemplate, SMSMessageTemplate
 
 from app import attachment_store
-from app import clients, statsd_client, create_uuid, provider_service
+from app import clients, statsd_client, create_uuid, provider_service, provider_routing_cache, template_cache
 from app.attachments.types import UploadedAttachmentMetadata
 from app.celery.research_mode_tasks import send_sms_response, send_email_response
 from app.dao.notifications_dao import (
     dao_update_notification
 )
 from app.dao.provider_details_dao import (
+    get_all_provider_details,
     get_provider_details_by_notification_type,
     dao_toggle_sms_provider, get_provider_details_by_id
 )
 from app.dao.templates_dao import dao_get_template_by_id
+from app.delivery.provider_routing_cache import ProviderRoute
 from app.exceptions import NotificationTechnicalFailureException, InvalidProviderException
 from app.feature_flags import (
     is_provider_enabled,
@@ -63,10 +66,10 @@ def send_sms_to_provider(notification, sms_sender_id=None):
     # This is an instance of one of the classes defined in app/clients/.
     provider = provider_to_use(notification)
 
-    template_model = dao_get_template_by_id(notification.template_id, notification.template_version)
+    template_dict = get_template_dict(notification)
 
     template = SMSMessageTemplate(
-        template_model.__dict__,
+        template_dict,
         values=notification.personalisation,
         prefix=service.name,
         show_prefix=service.prefix_sms,
@@ -139,7 +142,7 @@ def send_email_to_provider(notification):
             else:
                 personalisation_data[key] = personalisation_data[key]['url']
 
-        template_dict = dao_get_template_by_id(notification.template_id, notification.template_version).__dict__
+        template_dict = get_template_dict(notification)
 
         html_email = HTMLEmailTemplate(
             template_dict,
@@ -179,6 +182,14 @@ def send_email_to_provider(notification):
         statsd_client.timing("email.total-time", delta_milliseconds)
 
 
+def get_template_dict(notification):
+    return template_cache.get_template_dict(
+        notification.template_id,
+        notification.template_version,
+        lambda: dao_get_template_by_id(notification.template_id, notification.template_version)
+    )
+
+
 def update_notification_to_sending(notification, provider):
     notification.sent_at = datetime.utcnow()
     notification.sent_by = provider.get_name()
@@ -191,8 +202,16 @@ def should_use_provider(provider):
     return provider.active and is_provider_enabled(current_app, provider.identifier)
 
 
-def load_provider(provider_id: str) -> ProviderDetails:
-    provider_details = get_provider_details_by_id(provider_id)
+def load_provider(provider_id: str) -> Union[ProviderDetails, ProviderRoute]:
+    """
+    Return the active provider with the given id.  When the provider routing cache is enabled this is the cached
+    ProviderRoute, which has the same id, identifier, notification_type, priority and active attributes as
+    ProviderDetails, instead of the ProviderDetails row.
+    """
+    if provider_routing_cache.enabled:
+        provider_details = provider_routing_cache.get_provider(provider_id, get_all_provider_details)
+    else:
+        provider_details = get_provider_details_by_id(provider_id)
     if provider_details is None:
         raise InvalidProviderException(f'provider {provider_id} could not be found')
     elif not provider_details.active:
@@ -216,11 +235,11 @@ def provider_to_use(notification: Notification):
                 notification.notification_type
             )
 
-    # This is a list of ProviderDetails instances sorted by their "priority" attribute.
-    active_providers_in_order = [
-        p for p in get_provider_details_by_notification_type(notification.notification_type, notification.international)
-        if should_use_provider(p)
-    ]
+    # This is a list of providers sorted by their "priority" attribute.
+    active_providers_in_order = get_active_providers_in_order(
+        notification.notification_type,
+        notification.international
+    )
 
     if not active_providers_in_order:
         current_app.logger.error(
@@ -232,6 +251,16 @@ def provider_to_use(notification: Notification):
     return clients.get_client_by_name_and_type(active_providers_in_order[0].identifier, notification.notification_type)
 
 
+def get_active_providers_in_order(notification_type, international):
+    if provider_routing_cache.enabled:
+        return provider_routing_cache.get_active_providers(notification_type, international, get_all_provider_details)
+
+    return [
+        p for p in get_provider_details_by_notification_type(notification_type, international)
+        if should_use_provider(p)
+    ]
+
+
 def get_provider_id(notification: Notification) -> str:
     # the provider from template has highest priority, so if it is valid we'll use that one
     providers = [
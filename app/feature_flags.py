@@ -25,6 +25,12 @@ class FeatureFlag(Enum):
     PUSH_NOTIFICATIONS_ENABLED = 'PUSH_NOTIFICATIONS_ENABLED'
     PLATFORM_STATS_ENABLED = 'PLATFORM_STATS_ENABLED'
     VA_SSO_ENABLED = 'VA_SSO_ENABLED'
+    BULK_NOTIFICATIONS_ENABLED = 'BULK_NOTIFICATIONS_ENABLED'
+    JOB_CHUNKED_PROCESSING_ENABLED = 'JOB_CHUNKED_PROCESSING_ENABLED'
+    NIGHTLY_NOTIFICATION_STATUS_SET_BASED_ENABLED = 'NIGHTLY_NOTIFICATION_STATUS_SET_BASED_ENABLED'
+    BATCHED_RETENTION_PURGE_ENABLED = 'BATCHED_RETENTION_PURGE_ENABLED'
+    VA_PROFILE_LOCAL_CACHE_PERMISSIONS_ENABLED = 'VA_PROFILE_LOCAL_CACHE_PERMISSIONS_ENABLED'
+    RECIPIENT_INFO_PIPELINE_ENABLED = 'RECIPIENT_INFO_PIPELINE_ENABLED'
 
 
 def is_provider_enabled(current_app, provider_identifier):
@@ -29,7 +29,7 @@ from app.schemas import (
 )
 from app.celery.tasks import process_job
 from app.models import JOB_STATUS_SCHEDULED, JOB_STATUS_PENDING, JOB_STATUS_CANCELLED, LETTER_TYPE
-from app.utils import pagination_links, midnight_n_days_ago
+from app.utils import cursor_pagination_links, pagination_links, midnight_n_days_ago
 from app.config import QueueNames
 from app.errors import (
     register_errors,
@@ -79,12 +79,17 @@ def get_all_notifications_for_service_job(service_id, job_id):
     data = notifications_filter_schema.load(request.args).data
     page = data['page'] if 'page' in data else 1
     page_size = data['page_size'] if 'page_size' in data else current_app.config.get('PAGE_SIZE')
+    count_pages = data.get('count_pages', True)
+    keyset = 'cursor' in data
     paginated_notifications = get_notifications_for_job(
         service_id,
         job_id,
         filter_dict=data,
         page=page,
-        page_size=page_size)
+        page_size=page_size,
+        count_pages=count_pages,
+        keyset=keyset,
+        cursor=data.get('cursor'))
 
     kwargs = request.args.to_dict()
     kwargs['service_id'] = service_id
@@ -100,10 +105,12 @@ def get_all_notifications_for_service_job(service_id, job_id):
         notifications=notifications,
         page_size=page_size,
         total=paginated_notifications.total,
-        links=pagination_links(
-            paginated_notifications,
-            '.get_all_notifications_for_service_job',
-            **kwargs
+        links=(
+            cursor_pagination_links(
+                paginated_notifications.next_cursor, '.get_all_notifications_for_service_job', **kwargs
+            )
+            if keyset else
+            pagination_links(paginated_notifications, '.get_all_notifications_for_service_job', **kwargs)
         )
     ), 200
 
@@ -47,6 +47,12 @@ VA_NOTIFY_TO_VA_PROFILE_NOTIFICATION_TYPES = {
     SMS_TYPE: 'Text',
 }
 
+# The communicationChannelId of each VA Profile channel, as stored in va_profile_local_cache
+VA_NOTIFY_TO_VA_PROFILE_COMMUNICATION_CHANNEL_IDS = {
+    SMS_TYPE: 1,
+    EMAIL_TYPE: 2,
+}
+
 TEMPLATE_TYPES = [SMS_TYPE, EMAIL_TYPE, LETTER_TYPE]
 
 template_types = db.Enum(*TEMPLATE_TYPES, name='template_type')
@@ -645,6 +651,7 @@ class ServiceCallback(db.Model, Versioned):
     updated_by_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), index=True, nullable=False)
     notification_statuses = db.Column('notification_statuses', JSONB, nullable=True)
     callback_channel = db.Column(db.String(), db.ForeignKey('service_callback_channel.channel'), nullable=False)
+    batch_callbacks = db.Column(db.Boolean, nullable=False, default=False)
 
     __table_args__ = (
         UniqueConstraint('service_id', 'callback_type', name='uix_service_callback_type'),
@@ -663,6 +670,12 @@ class ServiceCallback(db.Model, Versioned):
             self._bearer_token = encryption.encrypt(str(bearer_token))
 
     def send(self, payload: dict, logging_tags: dict):
+        self._get_callback_strategy().send_callback(self, payload, logging_tags)
+
+    def send_batch(self, payloads: list, logging_tags: dict):
+        self._get_callback_strategy().send_callback_batch(self, payloads, logging_tags)
+
+    def _get_callback_strategy(self):
         from app.callback.queue_callback_strategy import QueueCallbackStrategy
         from app.callback.webhook_callback_strategy import WebhookCallbackStrategy
 
@@ -671,8 +684,7 @@ class ServiceCallback(db.Model, Versioned):
             QUEUE_CHANNEL_TYPE: QueueCallbackStrategy
         }
 
-        strategy = callback_strategies[self.callback_channel]
-        strategy.send_callback(self, payload, logging_tags)
+        return callback_strategies[self.callback_channel]
 
 
 class ServiceCallbackType(db.Model):
@@ -1144,6 +1156,9 @@ class Job(db.Model):
         db.String(255), db.ForeignKey('job_status.name'), index=True, nullable=False, default='pending'
     )
     archived = db.Column(db.Boolean, nullable=False, default=False)
+    # A checkpoint for resuming the job: the number of rows sent to be saved, and where in the CSV file they end.
+    rows_processed = db.Column(db.Integer, nullable=False, default=0)
+    bytes_processed = db.Column(db.BigInteger, nullable=False, default=0)
 
 
 VERIFY_CODE_TYPES = [EMAIL_TYPE, SMS_TYPE]
@@ -2012,6 +2027,44 @@ class FactNotificationStatus(db.Model):
     updated_at = db.Column(db.DateTime, nullable=True, onupdate=datetime.datetime.utcnow)
 
 
+class FactNotificationStatusHourly(db.Model):
+    """
+    Counts of today's notifications by the hour they were created, refreshed every few minutes, for the notifications
+    created before the day's FactNotificationStatusHourlyWatermark.
+    """
+    __tablename__ = "ft_notification_status_hourly"
+
+    service_id = db.Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    hour = db.Column(db.DateTime, primary_key=True, nullable=False)
+    template_id = db.Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    notification_type = db.Column(db.Text, primary_key=True, nullable=False)
+    key_type = db.Column(db.Text, primary_key=True, nullable=False)
+    notification_status = db.Column(db.Text, primary_key=True, nullable=False)
+    notification_count = db.Column(db.Integer(), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+
+class FactNotificationStatusHourlyWatermark(db.Model):
+    __tablename__ = "ft_notification_status_hourly_watermark"
+
+    bst_date = db.Column(db.Date, primary_key=True, nullable=False)
+    watermark = db.Column(db.DateTime, nullable=False)
+
+
+class NotificationPurgeCheckpoint(db.Model):
+    """
+    How far the retention purge has got for a notification type and scope, which is either a service with its own data
+    retention or "default" for every other service.  A purge with the same cutoff resumes from purged_to.
+    """
+    __tablename__ = "notification_purge_checkpoints"
+
+    notification_type = db.Column(db.Text, primary_key=True, nullable=False)
+    scope = db.Column(db.Text, primary_key=True, nullable=False)
+    cutoff = db.Column(db.DateTime, nullable=False)
+    purged_to = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+
 class Complaint(db.Model):
     __tablename__ = 'complaints'
 
@@ -2135,7 +2188,10 @@ class VAProfileLocalCache(db.Model):
     va_profile_id = db.Column(db.Integer, nullable=False)
     communication_item_id = db.Column(db.Integer, nullable=False)
     communication_channel_id = db.Column(db.Integer, nullable=False)
+    # When VA Profile recorded the permission
     source_datetime = db.Column(db.DateTime, nullable=False)
+    # When VA Notify last wrote or confirmed the permission
+    cached_at = db.Column(db.DateTime, nullable=False, server_default=db.text("timezone('utc', now())"))
 
     __table_args__ = (
         UniqueConstraint('va_profile_id', 'communication_item_id', 'communication_channel_id', name='uix_veteran_id'),
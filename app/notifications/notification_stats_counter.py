@@ -0,0 +1,226 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app.db import db
+
+
+class NotificationStatsCounter:
+    """
+    Counts of notifications per service, notification type, key type and status, kept in Redis in hourly buckets by
+    the hour each notification was created, so that today's statistics and daily limit checks can be read without
+    scanning the notifications table.
+
+    Counts are incremented when notifications are persisted and moved between statuses when a notification's status
+    changes.  Increments are held on the database session and only written to Redis once its transaction commits, so
+    that rolled back changes are never counted.  reconcile() corrects a range of buckets from the notifications table,
+    and records the earliest hour from which the counts are complete; counts for earlier hours are never returned.
+    """
+
+    STATSD_PREFIX = 'notification-stats-counter'
+    COMPLETE_FROM_KEY = 'notification-stats-complete-from'
+
+    def __init__(self):
+        self.enabled = False
+        self.statsd_client = None
+        self.redis_store = None
+        self.ttl = 0
+        self.logger = None
+
+    def init_app(self, app, statsd_client, redis_store):
+        self.enabled = app.config['NOTIFICATION_STATS_COUNTERS_ENABLED']
+        self.ttl = app.config['NOTIFICATION_STATS_COUNTERS_TTL']
+        self.statsd_client = statsd_client
+        self.redis_store = redis_store
+        self.logger = app.logger
+
+        if not event.contains(db.session, 'after_commit', self._write_pending):
+            event.listen(db.session, 'after_commit', self._write_pending)
+            event.listen(db.session, 'after_transaction_end', self._discard_pending)
+
+    @property
+    def active(self):
+        return self.enabled and self.redis_store is not None and self.redis_store.active
+
+    def record_created(self, notifications):
+        """
+        Count newly persisted notifications.
+        """
+        self._increment(
+            (notification, notification.status, 1) for notification in notifications
+        )
+
+    def record_status_changes(self, changes):
+        """
+        Move notifications between statuses.  changes is a list of (notification, old_status, new_status) tuples.
+        """
+        self._increment(
+            (notification, status, increment)
+            for notification, old_status, new_status in changes
+            if old_status != new_status
+            for status, increment in ((old_status, -1), (new_status, 1))
+        )
+
+    def get_counts(self, start_date, end_date, service_ids=None):
+        """
+        Return the counts for notifications created between start_date and end_date, both UTC and on the hour, as a
+        dictionary of service id to a Counter keyed by (notification_type, key_type, status).  service_ids limits the
+        services returned, otherwise every service with a count is returned.
+
+        Returns None if the counts are not available for the whole range, in which case the caller should query the
+        notifications table.
+        """
+        if not self.active:
+            return None
+
+        buckets = list(_hour_buckets(start_date, end_date))
+
+        try:
+            complete_from = self.redis_store.get(self.COMPLETE_FROM_KEY)
+            if complete_from is None or complete_from.decode('utf-8') > buckets[0]:
+                self.statsd_client.incr(f'{self.STATSD_PREFIX}.incomplete')
+                return None
+
+            if service_ids is None:
+                service_ids = self.redis_store.redis_store.sunion(
+                    [self._services_key(bucket) for bucket in buckets]
+                )
+            service_ids = [
+                service_id.decode('utf-8') if isinstance(service_id, bytes) else str(service_id)
+                for service_id in service_ids
+            ]
+
+            pipeline = self.redis_store.redis_store.pipeline(transaction=False)
+            for service_id in service_ids:
+                for bucket in buckets:
+                    pipeline.hgetall(self._counts_key(service_id, bucket))
+            results = iter(pipeline.execute())
+        except Exception as e:
+            self.logger.exception('Failed to read notification stats counters: %s', e)
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.error')
+            return None
+
+        counts = {}
+        for service_id in service_ids:
+            service_counts = Counter()
+            for _ in buckets:
+                for field, value in next(results).items():
+                    service_counts[tuple(field.decode('utf-8').split(':'))] += int(value)
+            counts[service_id] = service_counts
+
+        self.statsd_client.incr(f'{self.STATSD_PREFIX}.hit')
+        return counts
+
+    def reconcile(self, start_date, end_date, fetch_rows):
+        """
+        Correct the counts for notifications created between start_date and end_date, both UTC and on the hour, to
+        the rows of (service_id, hour, notification_type, key_type, status, count) returned by fetch_rows from the
+        notifications table.
+
+        The counts are read before fetch_rows is called, and each is then moved by its difference from its row, rather
+        than overwritten, so that increments made while the rows are fetched are kept.  A change committed as the
+        counts are read can be counted twice, until the next reconciliation.  Returns the rows.
+        """
+        if not self.active:
+            return []
+
+        buckets = list(_hour_buckets(start_date, end_date))
+        redis = self.redis_store.redis_store
+
+        counts_keys = [
+            (self._counts_key(service_id.decode('utf-8'), bucket), bucket)
+            for bucket in buckets
+            for service_id in redis.smembers(self._services_key(bucket))
+        ]
+        pipeline = redis.pipeline(transaction=False)
+        for counts_key, _ in counts_keys:
+            pipeline.hgetall(counts_key)
+        differences = defaultdict(Counter)
+        for (counts_key, _), counts in zip(counts_keys, pipeline.execute()):
+            for field, value in counts.items():
+                differences[counts_key][field.decode('utf-8')] -= int(value)
+
+        rows = fetch_rows()
+        services = defaultdict(set)
+        for service_id, hour, notification_type, key_type, status, count in rows:
+            bucket = _hour_bucket(hour)
+            differences[self._counts_key(service_id, bucket)][self._field(notification_type, key_type, status)] += count
+            services[bucket].add(str(service_id))
+
+        pipeline = redis.pipeline(transaction=True)
+        for counts_key, counts in differences.items():
+            for field, difference in counts.items():
+                if difference:
+                    pipeline.hincrby(counts_key, field, difference)
+            pipeline.expire(counts_key, self.ttl)
+        for bucket, service_ids in services.items():
+            pipeline.sadd(self._services_key(bucket), *service_ids)
+            pipeline.expire(self._services_key(bucket), self.ttl)
+        pipeline.execute()
+
+        complete_from = redis.get(self.COMPLETE_FROM_KEY)
+        if complete_from is None or complete_from.decode('utf-8') > buckets[0]:
+            redis.set(self.COMPLETE_FROM_KEY, buckets[0])
+        redis.expire(self.COMPLETE_FROM_KEY, self.ttl)
+        return rows
+
+    def _increment(self, increments):
+        if not self.active:
+            return
+
+        # The notifications' attributes are read now, as they are expired once the transaction commits
+        db.session.info.setdefault(self, []).extend(
+            (
+                notification.service_id, _hour_bucket(notification.created_at),
+                self._field(notification.notification_type, notification.key_type, status), increment
+            )
+            for notification, status, increment in increments
+        )
+
+    def _discard_pending(self, session, transaction):
+        # Increments still pending when the outermost transaction ends were rolled back
+        if transaction.parent is None:
+            session.info.pop(self, None)
+
+    def _write_pending(self, session):
+        increments = session.info.pop(self, None)
+        if not increments:
+            return
+
+        try:
+            pipeline = self.redis_store.redis_store.pipeline(transaction=False)
+            for service_id, bucket, field, increment in increments:
+                counts_key = self._counts_key(service_id, bucket)
+                pipeline.hincrby(counts_key, field, increment)
+                pipeline.expire(counts_key, self.ttl)
+                pipeline.sadd(self._services_key(bucket), str(service_id))
+                pipeline.expire(self._services_key(bucket), self.ttl)
+            pipeline.execute()
+        except Exception as e:
+            # The counts are corrected by the next reconciliation.
+            self.logger.exception('Failed to update notification stats counters: %s', e)
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.error')
+
+    @staticmethod
+    def _counts_key(service_id, bucket):
+        return f'notification-stats-{service_id}-{bucket}'
+
+    @staticmethod
+    def _services_key(bucket):
+        return f'notification-stats-services-{bucket}'
+
+    @staticmethod
+    def _field(notification_type, key_type, status):
+        return f'{notification_type}:{key_type}:{status}'
+
+
+def _hour_bucket(created_at):
+    return created_at.strftime('%Y-%m-%dT%H')
+
+
+def _hour_buckets(start_date, end_date):
+    hour = start_date.replace(minute=0, second=0, microsecond=0)
+    while hour < end_date:
+        yield _hour_bucket(hour)
+        hour += timedelta(hours=1)
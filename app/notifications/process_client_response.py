@@ -1,6 +1,9 @@
 import uuid
 
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, List, NamedTuple
+
 from flask import current_app
 from notifications_utils.template import SMSMessageTemplate
 
@@ -13,6 +16,7 @@ from app.clients.sms.mmg import get_mmg_responses
 from app.celery.service_callback_tasks import (
     send_delivery_status_to_service,
     create_delivery_status_callback_data,
+    check_and_queue_callback_tasks,
 )
 from app.config import QueueNames
 from app.dao.notifications_dao import dao_update_notification
@@ -141,3 +145,69 @@ def process_service_callback(notification):
 def set_notification_sent_by(notification, client_name):
     notification.sent_by = client_name
     dao_update_notification(notification)
+
+
+class DeliveryReceipt(NamedTuple):
+    reference: str
+    status: str
+    message_time: datetime
+    response: dict
+
+
+def process_delivery_receipts(
+        receipts: List[DeliveryReceipt],
+        provider_name: str,
+        can_update: Callable[[object, str], bool]
+) -> List[DeliveryReceipt]:
+    """
+    Apply a batch of delivery receipts from a provider.  All references are resolved with one query, the statuses are
+    set with one UPDATE and the service callbacks are queued together.  can_update(notification, status) decides
+    whether a receipt may change its notification.
+
+    Returns the receipts for which no notification was found and which are less than five minutes old; the
+    notification may not have been saved yet, so the caller should retry them.
+    """
+
+    # A later receipt for the same reference supersedes an earlier one.
+    latest_receipts = {receipt.reference: receipt for receipt in receipts}
+
+    notifications_by_reference = defaultdict(list)
+    for notification in notifications_dao.dao_get_notifications_by_references(list(latest_receipts)):
+        notifications_by_reference[notification.reference].append(notification)
+
+    receipts_to_retry = []
+    updates = []
+
+    for reference, receipt in latest_receipts.items():
+        notifications = notifications_by_reference[reference]
+
+        if not notifications:
+            if datetime.utcnow() - receipt.message_time < timedelta(minutes=5):
+                receipts_to_retry.append(receipt)
+            else:
+                current_app.logger.warning(
+                    f'notification not found for reference: {reference} (update to {receipt.status})'
+                )
+            statsd_client.incr(f'callback.{provider_name}.no_notification_found')
+        elif len(notifications) > 1:
+            current_app.logger.warning(
+                f'multiple notifications found for reference: {reference} (update to {receipt.status})'
+            )
+            statsd_client.incr(f'callback.{provider_name}.multiple_notifications_found')
+        elif can_update(notifications[0], receipt.status):
+            updates.append((notifications[0], receipt.status))
+
+    updated_notifications = notifications_dao.dao_update_notification_statuses(updates)
+
+    now = datetime.utcnow()
+    for notification in updated_notifications:
+        current_app.logger.info(
+            f'{provider_name} callback return status of {notification.status} for notification: {notification.id}'
+        )
+        statsd_client.incr(f'callback.{provider_name}.{notification.status}')
+        if notification.sent_at:
+            statsd_client.timing_with_dates(f'callback.{provider_name}.elapsed-time', now, notification.sent_at)
+
+    check_and_queue_callback_tasks(updated_notifications)
+
+    return receipts_to_retry
@@ -12,12 +12,13 @@ from notifications_utils.recipients import (
 )
 from notifications_utils.timezones import convert_local_timezone_to_utc
 
-from app import redis_store
+from app import notify_celery, redis_store, template_cache
 from app.celery import provider_tasks
 from app.celery.lookup_recipient_communication_permissions_task import lookup_recipient_communication_permissions
 from app.celery.contact_information_tasks import lookup_contact_info
 from app.celery.lookup_va_profile_id_task import lookup_va_profile_id
 from app.celery.onsite_notification_tasks import send_va_onsite_notification_task
+from app.celery.recipient_info_pipeline_task import lookup_recipient_info
 from app.celery.letters_pdf_tasks import create_letters_pdf
 from app.config import QueueNames
 from app.dao.service_sms_sender_dao import (
@@ -37,6 +38,7 @@ from app.models import (
     RecipientIdentifier)
 from app.dao.notifications_dao import (
     dao_create_notification,
+    dao_create_notifications,
     dao_delete_notification_by_id,
     dao_created_scheduled_notification)
 
@@ -45,8 +47,17 @@ from app.utils import get_template_instance
 from app.va.identifier import IdentifierType
 
 
+def get_cached_template_dict(template):
+    """
+    Return the column values of the given template version from the template cache, which is shared with the
+    delivery tasks.
+    """
+
+    return template_cache.get_template_dict(template.id, template.version, lambda: template)
+
+
 def create_content_for_notification(template, personalisation):
-    template_object = get_template_instance(template.__dict__, personalisation)
+    template_object = get_template_instance(get_cached_template_dict(template), personalisation)
     check_placeholders(template_object)
 
     return template_object
@@ -58,7 +69,7 @@ def check_placeholders(template_object):
         raise BadRequestError(fields=[{'template': message}], message=message)
 
 
-def persist_notification(
+def build_notification(
         *,
         template_id,
         template_version,
@@ -74,7 +85,6 @@ def persist_notification(
         reference=None,
         client_reference=None,
         notification_id=None,
-        simulated=False,
         created_by_id=None,
         status=NOTIFICATION_CREATED,
         reply_to_text=None,
@@ -83,7 +93,11 @@ def persist_notification(
         template_postage=None,
         recipient_identifier=None,
         billing_code=None
-):
+) -> Notification:
+    """
+    Create a Notification instance, with its normalised recipient fields set, without persisting it.
+    """
+
     notification_created_at = created_at or datetime.utcnow()
 
     if notification_id is None:
@@ -133,20 +147,57 @@ def persist_notification(
     elif notification_type == LETTER_TYPE:
         notification.postage = postage or template_postage
 
+    return notification
+
+
+def persist_notification(
+        *,
+        simulated=False,
+        **kwargs
+):
+    notification = build_notification(**kwargs)
+
     if not simulated:
         # Persist the Notification in the database.
         dao_create_notification(notification)
-        if key_type != KEY_TYPE_TEST:
-            if redis_store.get(redis.daily_limit_cache_key(service.id)):
-                redis_store.incr(redis.daily_limit_cache_key(service.id))
+        if notification.key_type != KEY_TYPE_TEST:
+            if redis_store.get(redis.daily_limit_cache_key(notification.service_id)):
+                redis_store.incr(redis.daily_limit_cache_key(notification.service_id))
 
         current_app.logger.info(
-            f"{notification_type} {notification_id} created at {notification_created_at}"
+            f"{notification.notification_type} {notification.id} created at {notification.created_at}"
         )
 
     return notification
 
 
+def persist_notifications(notifications):
+    """
+    Persist notifications created by build_notification with a single multi-row INSERT.  All of the notifications
+    must belong to the same service and use the same key type.
+    """
+    if not notifications:
+        return notifications
+
+    dao_create_notifications(notifications)
+
+    service_id = notifications[0].service_id
+    if notifications[0].key_type != KEY_TYPE_TEST:
+        cache_key = redis.daily_limit_cache_key(service_id)
+        if redis_store.get(cache_key):
+            # The client's incr only adds one, so the count is added with the Redis client it wraps.
+            try:
+                redis_store.redis_store.incrby(cache_key, len(notifications))
+            except Exception as e:
+                current_app.logger.exception(f"Redis error performing incrby on {cache_key}: {e}")
+
+    current_app.logger.info(
+        f"{len(notifications)} {notifications[0].notification_type} notifications created for service {service_id}"
+    )
+
+    return notifications
+
+
 def send_notification_to_queue(
         notification,
         research_mode,
@@ -195,6 +246,47 @@ def send_notification_to_queue(
                                                          queue))
 
 
+def send_notifications_to_queue(
+        notifications,
+        research_mode,
+        queue=None,
+        sms_sender_id=None
+):
+    """
+    Enqueue the delivery tasks for notifications that share a service, notification type, and sender.  The
+    delivery task is resolved once, and all tasks are published over a single broker connection.
+
+    Notifications that could not be enqueued are deleted and returned, as send_notification_to_queue does for a
+    single notification.
+    """
+    if not notifications:
+        return []
+
+    deliver_task, queue = _get_delivery_task(notifications[0], research_mode, queue, sms_sender_id)
+    failed = []
+
+    with notify_celery.producer_or_acquire() as producer:
+        for notification in notifications:
+            try:
+                deliver_task.apply_async((str(notification.id), sms_sender_id), queue=queue, producer=producer)
+            except Exception:
+                current_app.logger.exception(f"Failed to enqueue notification {notification.id} for delivery")
+                failed.append(notification)
+
+    for notification in failed:
+        dao_delete_notification_by_id(notification.id)
+
+    current_app.logger.debug(
+        "{} {} notifications sent to the {} queue for delivery".format(
+            len(notifications) - len(failed),
+            notifications[0].notification_type,
+            queue
+        )
+    )
+
+    return failed
+
+
 def _get_delivery_task(notification, research_mode=False, queue=None, sms_sender_id=None):
     """
     The return value "deliver_task" is a function decorated to be a Celery task.
@@ -248,10 +340,23 @@ def send_to_queue_for_recipient_info_based_on_recipient_identifier(
         onsite_enabled: bool = False
 ) -> None:
     deliver_task, deliver_queue = _get_delivery_task(notification)
-    if id_type == IdentifierType.VA_PROFILE_ID.value:
+    if is_feature_enabled(FeatureFlag.RECIPIENT_INFO_PIPELINE_ENABLED):
+        check_permissions = bool(
+            is_feature_enabled(FeatureFlag.CHECK_RECIPIENT_COMMUNICATION_PERMISSIONS_ENABLED) and communication_item_id
+        )
+        tasks = [
+            lookup_recipient_info.si(notification.id, onsite_enabled, check_permissions)
+                                 .set(queue=QueueNames.LOOKUP_VA_PROFILE_ID),
+            deliver_task.si(notification.id).set(queue=deliver_queue)
+        ]
+
+    elif id_type == IdentifierType.VA_PROFILE_ID.value:
+        # The onsite notification is posted from its own queue, so that delivery never waits on VA Onsite
+        if onsite_enabled:
+            send_va_onsite_notification_task.apply_async(
+                args=(id_value, notification.template.id, onsite_enabled), queue=QueueNames.SEND_ONSITE_NOTIFICATION
+            )
         tasks = [
-            send_va_onsite_notification_task.s(id_value, notification.template.id, onsite_enabled)
-                                            .set(queue=QueueNames.SEND_ONSITE_NOTIFICATION),
             lookup_contact_info.si(notification.id).set(queue=QueueNames.LOOKUP_CONTACT_INFO),
             deliver_task.si(notification.id).set(queue=deliver_queue)
         ]
@@ -264,10 +369,16 @@ def send_to_queue_for_recipient_info_based_on_recipient_identifier(
             )
 
     else:
+        lookup_task = lookup_va_profile_id.si(notification.id).set(queue=QueueNames.LOOKUP_VA_PROFILE_ID)
+        # Linked to the VA Profile ID lookup, which it is sent the result of, rather than in the chain, so that
+        # delivery never waits on VA Onsite
+        if onsite_enabled:
+            lookup_task.link(
+                send_va_onsite_notification_task.s(notification.template.id, onsite_enabled)
+                                                .set(queue=QueueNames.SEND_ONSITE_NOTIFICATION)
+            )
         tasks = [
-            lookup_va_profile_id.si(notification.id).set(queue=QueueNames.LOOKUP_VA_PROFILE_ID),
-            send_va_onsite_notification_task.s(notification.template.id, onsite_enabled)
-                                            .set(queue=QueueNames.SEND_ONSITE_NOTIFICATION),
+            lookup_task,
             lookup_contact_info.si(notification.id).set(queue=QueueNames.LOOKUP_CONTACT_INFO),
             deliver_task.si(notification.id).set(queue=deliver_queue)
         ]
@@ -22,7 +22,7 @@ from app.models import (
 from app.service.utils import service_allowed_to_send_to
 from app.v2.errors import TooManyRequestsError, BadRequestError, RateLimitError
 from app import redis_store
-from app.notifications.process_notifications import create_content_for_notification
+from app.notifications.process_notifications import create_content_for_notification, check_placeholders
 from app.utils import get_public_notify_type_text
 from app.dao.service_email_reply_to_dao import dao_get_reply_to_by_id
 from app.dao.service_letter_contact_dao import dao_get_letter_contact_by_id
@@ -38,7 +38,7 @@ def check_service_over_api_rate_limit(service, api_key):
             raise RateLimitError(rate_limit, interval, key_type=api_key.key_type)
 
 
-def check_service_over_daily_message_limit(key_type, service):
+def check_service_over_daily_message_limit(key_type, service, notification_count=1):
     if current_app.config['API_MESSAGE_LIMIT_ENABLED'] \
             and key_type != KEY_TYPE_TEST \
             and current_app.config['REDIS_ENABLED']:
@@ -52,7 +52,7 @@ def check_service_over_daily_message_limit(key_type, service):
             current_app.logger.info(f'service {service.id} nearing daily limit'
                                     f'{service.message_limit} - {service_stats}')
 
-        if int(service_stats) >= service.message_limit:
+        if int(service_stats) + notification_count > service.message_limit:
             current_app.logger.info(
                 f"service {service.id} has been rate limited for daily use sent"
                 f"{int(service_stats)} limit {service.message_limit}"
@@ -79,9 +79,14 @@ def check_sms_sender_over_rate_limit(service_id, sms_sender_id):
             raise RateLimitError(rate_limit, interval)
 
 
-def check_rate_limiting(service, api_key):
+def check_rate_limiting(service, api_key, notification_count=1):
+    """
+    The API rate limit counts requests, so a bulk request counts once.  The daily message limit counts
+    notifications, so a bulk request is rejected if sending all of its notifications would exceed the limit.
+    """
+
     check_service_over_api_rate_limit(service, api_key)
-    check_service_over_daily_message_limit(api_key.key_type, service)
+    check_service_over_daily_message_limit(api_key.key_type, service, notification_count)
 
 
 def check_template_is_for_notification_type(notification_type, template_type):
@@ -153,6 +158,14 @@ def check_sms_content_char_count(content_count):
 
 
 def validate_template(template_id, personalisation, service, notification_type):
+    template = validate_template_for_service(template_id, service, notification_type)
+    template_with_content = create_content_for_notification(template, personalisation)
+    if template.template_type == SMS_TYPE:
+        check_sms_content_char_count(template_with_content.content_count)
+    return template, template_with_content
+
+
+def validate_template_for_service(template_id, service, notification_type):
     try:
         template = templates_dao.dao_get_template_by_id_and_service_id(
             template_id=template_id,
@@ -165,10 +178,20 @@ def validate_template(template_id, personalisation, service, notification_type):
 
     check_template_is_for_notification_type(notification_type, template.template_type)
     check_template_is_active(template)
-    template_with_content = create_content_for_notification(template, personalisation)
-    if template.template_type == SMS_TYPE:
+    return template
+
+
+def validate_personalisation(template_with_content, personalisation):
+    """
+    Substitute personalisation into an already built template instance, so a template can be validated once and
+    rendered for many recipients.
+    """
+
+    template_with_content.values = personalisation
+    check_placeholders(template_with_content)
+    if template_with_content.template_type == SMS_TYPE:
         check_sms_content_char_count(template_with_content.content_count)
-    return template, template_with_content
+    return template_with_content
 
 
 def check_reply_to(service_id, reply_to_id, type_):
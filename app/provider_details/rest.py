@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 
+from app import provider_routing_cache
 from app.schemas import provider_details_schema, provider_details_history_schema
 from app.dao.provider_details_dao import (
     get_provider_details_by_id,
@@ -77,5 +78,6 @@ def update_provider_details(provider_details_id):
     for key in req_json:
         setattr(provider, key, req_json[key])
     dao_update_provider_details(provider)
+    provider_routing_cache.invalidate()
 
     return jsonify(provider_details=provider_details_schema.dump(provider).data), 200
@@ -301,7 +301,8 @@ class ServiceCallbackSchema(BaseSchema):
             'updated_at',
             'bearer_token',
             'callback_type',
-            'callback_channel'
+            'callback_channel',
+            'batch_callbacks'
         )
         load_only = ['_bearer_token', 'bearer_token']
         strict = True
@@ -473,6 +474,16 @@ class JobSchema(BaseSchema):
     service_name = fields.Nested(
         ServiceSchema, attribute="service", dump_to="service_name", only=["name"], dump_only=True)
 
+    processing_progress = fields.Method('get_processing_progress', dump_only=True)
+
+    def get_processing_progress(self, job):
+        # The percentage of the job's rows that have been sent to be saved.
+        if job.job_status == models.JOB_STATUS_FINISHED:
+            return 100
+        if not job.notification_count or not job.rows_processed:
+            return 0
+        return min(100, int(job.rows_processed * 100 / job.notification_count))
+
     @validates('scheduled_for')
     def validate_scheduled_for(self, value):
         _validate_datetime_not_in_past(value)
@@ -484,7 +495,9 @@ class JobSchema(BaseSchema):
             'notifications',
             'notifications_sent',
             'notifications_delivered',
-            'notifications_failed')
+            'notifications_failed',
+            'bytes_processed')
+        dump_only = ['rows_processed']
         strict = True
 
 
@@ -715,8 +728,10 @@ class NotificationsFilterSchema(ma.Schema):
     older_than = fields.UUID(required=False)
     format_for_csv = fields.String()
     to = fields.String()
+    exact_match = fields.Boolean(required=False)
     include_one_off = fields.Boolean(required=False)
     count_pages = fields.Boolean(required=False)
+    cursor = fields.String(required=False)
 
     @pre_load
     def handle_multidict(self, in_data):
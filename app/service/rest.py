@@ -98,7 +98,7 @@ from app.schemas import (
     email_data_request_schema
 )
 from app.user.users_schema import post_set_permissions_schema
-from app.utils import pagination_links
+from app.utils import cursor_pagination_links, pagination_links
 
 from app.smtp.aws import (smtp_add, smtp_get_user_key, smtp_remove)
 from nanoid import generate
@@ -379,7 +379,11 @@ def get_all_notifications_for_service(service_id):
         return search_for_notification_by_to_field(service_id=service_id,
                                                    search_term=data['to'],
                                                    statuses=data.get('status'),
-                                                   notification_type=notification_type)
+                                                   notification_type=notification_type,
+                                                   keyset='cursor' in data,
+                                                   cursor=data.get('cursor'),
+                                                   page_size=data.get('page_size'),
+                                                   exact_match=data.get('exact_match', False))
     page = data['page'] if 'page' in data else 1
     page_size = data['page_size'] if 'page_size' in data else current_app.config.get('PAGE_SIZE')
     limit_days = data.get('limit_days')
@@ -388,6 +392,9 @@ def get_all_notifications_for_service(service_id):
     include_one_off = data.get('include_one_off', True)
 
     count_pages = data.get('count_pages', True)
+    # Passing a cursor, which is empty for the first page, pages through the notifications by cursor instead of by
+    # page number.
+    keyset = 'cursor' in data
 
     pagination = notifications_dao.get_notifications_for_service(
         service_id,
@@ -398,7 +405,9 @@ def get_all_notifications_for_service(service_id):
         limit_days=limit_days,
         include_jobs=include_jobs,
         include_from_test_key=include_from_test_key,
-        include_one_off=include_one_off
+        include_one_off=include_one_off,
+        keyset=keyset,
+        cursor=data.get('cursor')
     )
 
     kwargs = request.args.to_dict()
@@ -412,10 +421,10 @@ def get_all_notifications_for_service(service_id):
         notifications=notifications,
         page_size=page_size,
         total=pagination.total,
-        links=pagination_links(
-            pagination,
-            '.get_all_notifications_for_service',
-            **kwargs
+        links=(
+            cursor_pagination_links(pagination.next_cursor, '.get_all_notifications_for_service', **kwargs)
+            if keyset else
+            pagination_links(pagination, '.get_all_notifications_for_service', **kwargs)
         )
     ), 200
 
@@ -460,15 +469,40 @@ def cancel_notification_for_service(service_id, notification_id):
     ), 200
 
 
-def search_for_notification_by_to_field(service_id, search_term, statuses, notification_type):
-    results = notifications_dao.dao_get_notifications_by_to_field(
+def search_for_notification_by_to_field(
+    service_id, search_term, statuses, notification_type, keyset=False, cursor=None, page_size=None, exact_match=False
+):
+    if not keyset:
+        results = notifications_dao.dao_get_notifications_by_to_field(
+            service_id=service_id,
+            search_term=search_term,
+            statuses=statuses,
+            notification_type=notification_type,
+            exact_match=exact_match
+        )
+        return jsonify(
+            notifications=notification_with_template_schema.dump(results, many=True).data
+        ), 200
+
+    page_size = page_size or current_app.config.get('PAGE_SIZE')
+    page = notifications_dao.dao_get_notifications_by_to_field(
         service_id=service_id,
         search_term=search_term,
         statuses=statuses,
-        notification_type=notification_type
+        notification_type=notification_type,
+        keyset=True,
+        cursor=cursor,
+        page_size=page_size,
+        exact_match=exact_match
     )
+
+    kwargs = request.args.to_dict()
+    kwargs['service_id'] = service_id
+
     return jsonify(
-        notifications=notification_with_template_schema.dump(results, many=True).data
+        notifications=notification_with_template_schema.dump(page.items, many=True).data,
+        page_size=page_size,
+        links=cursor_pagination_links(page.next_cursor, '.get_all_notifications_for_service', **kwargs)
     ), 200
 
 
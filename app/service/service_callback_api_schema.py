@@ -35,7 +35,8 @@ create_service_callback_api_request_schema = {
             }
         },
         "callback_type": {"enum": SERVICE_CALLBACK_TYPES},
-        "callback_channel": {"enum": CALLBACK_CHANNEL_TYPES}
+        "callback_channel": {"enum": CALLBACK_CHANNEL_TYPES},
+        "batch_callbacks": {"type": "boolean"}
     },
     "required": ["url", "callback_channel", "callback_type"]
 }
@@ -55,11 +56,13 @@ update_service_callback_api_request_schema = {
             }
         },
         "callback_type": {"enum": SERVICE_CALLBACK_TYPES},
-        "callback_channel": {"enum": CALLBACK_CHANNEL_TYPES}
+        "callback_channel": {"enum": CALLBACK_CHANNEL_TYPES},
+        "batch_callbacks": {"type": "boolean"}
     },
     "anyOf": [
         {"required": ["url"]},
         {"required": ["bearer_token"]},
-        {"required": ["notification_statuses"]}
+        {"required": ["notification_statuses"]},
+        {"required": ["batch_callbacks"]}
     ]
 }
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class TemplateCache:
+    """
+    A per-process, least recently used cache of template versions, keyed by (template_id, version).
+
+    A template version never changes once it has been saved (editing a template creates a new version), so entries
+    never expire; the least recently used entry is evicted when the cache is full.  Entries are plain dictionaries of
+    the template's column values, detached from any database session, suitable for the notifications_utils template
+    classes.  This only saves loading the template from the database: the template objects, which parse its
+    placeholders, and the email branding options are still built for each notification, as the objects hold the
+    notification's personalisation and a service's branding can change without a new template version.
+    """
+
+    STATSD_PREFIX = 'template-cache'
+
+    def __init__(self):
+        self.enabled = False
+        self.statsd_client = None
+        self.max_size = 0
+        self._templates = OrderedDict()
+        self._lock = Lock()
+
+    def init_app(self, app, statsd_client):
+        self.enabled = app.config['TEMPLATE_CACHE_ENABLED']
+        self.max_size = app.config['TEMPLATE_CACHE_MAX_SIZE']
+        self.statsd_client = statsd_client
+        self.clear()
+
+    def get_template_dict(self, template_id, version, fetch):
+        """
+        Return the cached template dictionary for the given template version, or call fetch() to load the template
+        model and cache its column values.
+        """
+
+        if not self.enabled:
+            return template_to_dict(fetch())
+
+        key = (str(template_id), int(version))
+
+        with self._lock:
+            template_dict = self._templates.get(key)
+            if template_dict is not None:
+                self._templates.move_to_end(key)
+
+        if template_dict is not None:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.hit')
+            return template_dict
+
+        self.statsd_client.incr(f'{self.STATSD_PREFIX}.miss')
+        template_dict = template_to_dict(fetch())
+
+        with self._lock:
+            self._templates[key] = template_dict
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+
+        return template_dict
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def __len__(self):
+        return len(self._templates)
+
+
+def template_to_dict(template):
+    return {column.name: getattr(template, column.name) for column in template.__table__.columns}
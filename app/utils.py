@@ -1,3 +1,5 @@
+import base64
+import json
 import os
 
 from datetime import datetime, timedelta
@@ -22,6 +24,34 @@ def pagination_links(pagination, endpoint, **kwargs):
     return links
 
 
+def cursor_pagination_links(next_cursor, endpoint, **kwargs):
+    kwargs.pop('page', None)
+    links = {}
+    if next_cursor:
+        links['next'] = url_for(endpoint, **dict(kwargs, cursor=next_cursor))
+    return links
+
+
+def encode_cursor(values):
+    """
+    Encode the sort key of the last row on a page as an opaque token, which is passed back to get the next page.
+    """
+    return base64.urlsafe_b64encode(json.dumps([str(value) for value in values]).encode('utf-8')).decode('utf-8')
+
+
+def decode_cursor(cursor):
+    """
+    Return the values encoded in a cursor as strings.  Raises ValueError if the cursor was not made by encode_cursor.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+
 def url_with_token(data, url, config, base_url=None):
     from notifications_utils.url_safe_token import generate_token
     token = generate_token(data, config['SECRET_KEY'], config['DANGEROUS_SALT'])
@@ -63,6 +63,22 @@ class BadRequestError(InvalidRequest):
         self.message = message if message else self.message
 
 
+class BulkNotificationsError(BadRequestError):
+    """
+    None of the recipients of a bulk request could be sent to.  errors lists why, with the index of each recipient.
+    """
+
+    def __init__(self, errors):
+        super().__init__(message='None of the notifications could be sent')
+        self.errors = errors
+
+    def to_dict_v2(self):
+        return {
+            'status_code': self.status_code,
+            'errors': self.errors
+        }
+
+
 class PDFNotReadyError(BadRequestError):
     def __init__(self):
         super().__init__(message='PDF not available yet, try again later', status_code=400)
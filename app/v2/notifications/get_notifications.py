@@ -70,9 +70,12 @@ def get_notifications():
     if 'include_jobs' in _data:
         _data['include_jobs'] = _data['include_jobs'][0]
 
+    if 'cursor' in _data:
+        _data['cursor'] = _data['cursor'][0]
+
     data = validate(_data, get_notifications_request)
 
-    paginated_notifications = notifications_dao.get_notifications_for_service(
+    page = notifications_dao.get_notifications_for_service(
         str(authenticated_service.id),
         filter_dict=data,
         key_type=api_user.key_type,
@@ -80,21 +83,26 @@ def get_notifications():
         older_than=data.get('older_than'),
         client_reference=data.get('reference'),
         page_size=current_app.config.get('API_PAGE_SIZE'),
-        include_jobs=data.get('include_jobs')
+        count_pages=False,
+        include_jobs=data.get('include_jobs'),
+        keyset=True,
+        cursor=data.get('cursor')
     )
 
-    def _build_links(notifications):
+    def _build_links(next_cursor):
         _links = {
             'current': url_for(".get_notifications", _external=True, **data),
         }
 
-        if len(notifications):
-            next_query_params = dict(data, older_than=notifications[-1].id)
+        if next_cursor:
+            # The cursor already starts the next page after the last notification on this one.
+            next_query_params = {key: value for key, value in data.items() if key != 'older_than'}
+            next_query_params['cursor'] = next_cursor
             _links['next'] = url_for(".get_notifications", _external=True, **next_query_params)
 
         return _links
 
     return jsonify(
-        notifications=[notification.serialize() for notification in paginated_notifications.items],
-        links=_build_links(paginated_notifications.items)
+        notifications=[notification.serialize() for notification in page.items],
+        links=_build_links(page.next_cursor)
     ), 200
@@ -88,7 +88,8 @@ get_notifications_request = {
             }
         },
         "include_jobs": {"enum": ["true", "True"]},
-        "older_than": uuid
+        "older_than": uuid,
+        "cursor": {"type": "string"}
     },
     "additionalProperties": False,
 }
@@ -265,6 +266,92 @@ post_email_response = {
     "required": ["id", "content", "uri", "template"]
 }
 
+bulk_sms_recipient = {
+    "type": "object",
+    "properties": {
+        "reference": {"type": "string"},
+        "phone_number": {"type": "string", "format": "phone_number"},
+        "personalisation": personalisation,
+        "billing_code": {"type": ["string", "null"], "maxLength": 256},
+    },
+    "required": ["phone_number"],
+    "additionalProperties": False
+}
+
+post_bulk_sms_request = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "description": "POST bulk sms notifications schema",
+    "type": "object",
+    "title": "POST v2/notifications/sms/bulk",
+    "properties": {
+        "template_id": uuid,
+        "sms_sender_id": uuid,
+        "recipients": {
+            "type": "array",
+            "items": bulk_sms_recipient,
+            "minItems": 1
+        },
+    },
+    "required": ["template_id", "recipients"],
+    "additionalProperties": False
+}
+
+bulk_email_recipient = {
+    "type": "object",
+    "properties": {
+        "reference": {"type": "string"},
+        "email_address": {"type": "string", "format": "email_address"},
+        "personalisation": personalisation,
+        "billing_code": {"type": ["string", "null"], "maxLength": 256},
+    },
+    "required": ["email_address"],
+    "additionalProperties": False
+}
+
+post_bulk_email_request = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "description": "POST bulk email notifications schema",
+    "type": "object",
+    "title": "POST v2/notifications/email/bulk",
+    "properties": {
+        "template_id": uuid,
+        "email_reply_to_id": uuid,
+        "recipients": {
+            "type": "array",
+            "items": bulk_email_recipient,
+            "minItems": 1
+        },
+    },
+    "required": ["template_id", "recipients"],
+    "additionalProperties": False
+}
+
+post_bulk_notifications_response = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "description": "POST bulk notifications response schema",
+    "type": "object",
+    "title": "response v2/notifications/{sms,email}/bulk",
+    "properties": {
+        "data": {
+            "type": "array",
+            "items": {"anyOf": [post_sms_response, post_email_response]}
+        },
+        "errors": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "error": {"type": "string"},
+                    "message": {"type": "string"}
+                },
+                "required": ["index", "error", "message"]
+            }
+        }
+    },
+    "required": ["data", "errors"]
+}
+
 post_letter_request = {
     "$schema": "http://json-schema.org/draft-04/schema#",
     "description": "POST letter notification schema",
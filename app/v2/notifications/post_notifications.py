@@ -3,7 +3,7 @@ import functools
 
 import werkzeug
 from flask import request, jsonify, current_app, abort
-from notifications_utils.recipients import try_validate_and_format_phone_number
+from notifications_utils.recipients import try_validate_and_format_phone_number, InvalidEmailError
 
 from app import api_user, authenticated_service, notify_celery, attachment_store
 from app.attachments.mimetype import extract_and_validate_mimetype
@@ -33,9 +33,13 @@ from app.notifications.process_letter_notifications import (
     create_letter_notification
 )
 from app.notifications.process_notifications import (
+    build_notification,
+    get_cached_template_dict,
     persist_notification,
+    persist_notifications,
     persist_scheduled_notification,
     send_notification_to_queue,
+    send_notifications_to_queue,
     simulated_recipient,
     send_to_queue_for_recipient_info_based_on_recipient_identifier,
 )
@@ -45,11 +49,14 @@ from app.notifications.validators import (
     check_service_can_schedule_notification,
     check_service_has_permission,
     validate_template,
+    validate_template_for_service,
+    validate_personalisation,
     check_service_email_reply_to_id,
     check_service_sms_sender_id
 )
 from app.schema_validation import validate
-from app.v2.errors import BadRequestError
+from app.utils import get_template_instance
+from app.v2.errors import BadRequestError, BulkNotificationsError
 from app.v2.notifications import v2_notification_blueprint
 from app.v2.notifications.create_response import (
     create_post_sms_response_from_notification,
@@ -60,7 +67,9 @@ from app.v2.notifications.notification_schemas import (
     post_sms_request,
     post_email_request,
     post_letter_request,
-    post_precompiled_letter_request
+    post_precompiled_letter_request,
+    post_bulk_sms_request,
+    post_bulk_email_request
 )
 
 
@@ -199,6 +208,162 @@ def post_notification(notification_type):
     return jsonify(resp), 201
 
 
+@v2_notification_blueprint.route('/<notification_type>/bulk', methods=['POST'])
+def post_bulk_notifications(notification_type):
+    if not is_feature_enabled(FeatureFlag.BULK_NOTIFICATIONS_ENABLED):
+        return jsonify(result='error', message="Not Implemented"), 501
+
+    try:
+        request_json = request.get_json()
+    except werkzeug.exceptions.BadRequest as e:
+        raise BadRequestError(message=f"Error decoding arguments: {e.description}", status_code=400)
+
+    if notification_type == EMAIL_TYPE:
+        form = validate(request_json, post_bulk_email_request)
+    elif notification_type == SMS_TYPE:
+        form = validate(request_json, post_bulk_sms_request)
+    else:
+        abort(404)
+
+    max_recipients = current_app.config['BULK_NOTIFICATIONS_MAX_RECIPIENTS']
+    if len(form['recipients']) > max_recipients:
+        raise BadRequestError(message=f"A bulk request can have at most {max_recipients} recipients")
+
+    check_service_has_permission(notification_type, authenticated_service.permissions)
+
+    check_rate_limiting(authenticated_service, api_user, notification_count=len(form['recipients']))
+
+    template = validate_template_for_service(form['template_id'], authenticated_service, notification_type)
+    template_with_content = get_template_instance(get_cached_template_dict(template), {})
+
+    reply_to = get_reply_to_text(notification_type, form, template)
+
+    notifications, errors = process_bulk_sms_or_email_notifications(
+        form=form,
+        notification_type=notification_type,
+        api_key=api_user,
+        template=template,
+        template_with_content=template_with_content,
+        service=authenticated_service,
+        reply_to_text=reply_to
+    )
+
+    data = []
+    for notification, content, subject in notifications:
+        if notification_type == SMS_TYPE:
+            data.append(create_post_sms_response_from_notification(
+                notification=notification,
+                content=content,
+                from_number=reply_to,
+                url_root=request.url_root,
+                scheduled_for=None
+            ))
+        else:
+            data.append(create_post_email_response_from_notification(
+                notification=notification,
+                content=content,
+                subject=subject,
+                url_root=request.url_root,
+                scheduled_for=None
+            ))
+
+    if not data:
+        raise BulkNotificationsError(errors)
+
+    return jsonify(data=data, errors=errors), 201
+
+
+def process_bulk_sms_or_email_notifications(
+        *, form, notification_type, api_key, template, template_with_content, service, reply_to_text=None
+):
+    """
+    Validate and render each recipient of a bulk request against the same template, persist the valid
+    notifications with one INSERT, and enqueue them together.  Returns a list of (notification, content, subject)
+    tuples for the accepted recipients, and a list of errors, with the index of the recipient, for the others.
+    """
+
+    accepted = []
+    errors = []
+
+    for index, recipient in enumerate(form['recipients']):
+        try:
+            accepted.append((index, *_build_bulk_notification(
+                recipient=recipient,
+                notification_type=notification_type,
+                api_key=api_key,
+                template=template,
+                template_with_content=template_with_content,
+                service=service,
+                reply_to_text=reply_to_text
+            )))
+        except BadRequestError as e:
+            errors.append({"index": index, "error": e.__class__.__name__, "message": e.message})
+        except InvalidEmailError as e:
+            errors.append({"index": index, "error": e.__class__.__name__, "message": str(e)})
+
+    to_send = [notification for _, notification, _, simulated in accepted if not simulated]
+    persist_notifications(to_send)
+
+    queue_name = QueueNames.PRIORITY if template.process_type == PRIORITY else None
+    failed = send_notifications_to_queue(
+        to_send,
+        research_mode=service.research_mode,
+        queue=queue_name,
+        sms_sender_id=form.get("sms_sender_id")
+    )
+    failed_ids = {notification.id for notification in failed}
+
+    notifications = []
+    for index, notification, rendered, _ in accepted:
+        if notification.id in failed_ids:
+            errors.append({
+                "index": index,
+                "error": "InternalError",
+                "message": "Unable to queue notification for delivery"
+            })
+        else:
+            notifications.append((notification, rendered['content'], rendered.get('subject')))
+
+    return notifications, errors
+
+
+def _build_bulk_notification(*, recipient, notification_type, api_key, template, template_with_content, service,
+                             reply_to_text):
+    form_send_to = recipient["email_address" if (notification_type == EMAIL_TYPE) else "phone_number"]
+    personalisation = recipient.get('personalisation') or {}
+
+    if any(isinstance(value, dict) for value in personalisation.values()):
+        raise BadRequestError(message="Attachments are not supported for bulk notifications")
+
+    send_to = validate_and_format_recipient(
+        send_to=form_send_to,
+        key_type=api_key.key_type,
+        service=service,
+        notification_type=notification_type
+    )
+
+    validate_personalisation(template_with_content, personalisation)
+    rendered = {'content': str(template_with_content)}
+    if notification_type == EMAIL_TYPE:
+        rendered['subject'] = template_with_content.subject
+
+    notification = build_notification(
+        template_id=template.id,
+        template_version=template.version,
+        recipient=form_send_to,
+        service=service,
+        personalisation=personalisation,
+        notification_type=notification_type,
+        api_key_id=api_key.id,
+        key_type=api_key.key_type,
+        client_reference=recipient.get("reference"),
+        reply_to_text=reply_to_text,
+        billing_code=recipient.get("billing_code")
+    )
+
+    return notification, rendered, simulated_recipient(send_to, notification_type)
+
+
 def process_sms_or_email_notification(*, form, notification_type, api_key, template, service, reply_to_text=None):
     form_send_to = form["email_address" if (notification_type == EMAIL_TYPE) else "phone_number"]
 
@@ -9,6 +9,7 @@ from app.va.identifier import (
     FHIR_FORMAT_SUFFIXES,
     transform_from_fhir_format
 )
+from app.va.mtls_session import MtlsSession
 from app.va.mpi import (
     MpiNonRetryableException,
     MpiRetryableException,
@@ -44,12 +45,13 @@ def _get_nested_value_from_response_body(response_body, keys, default=None):
 class MpiClient:
     SYSTEM_IDENTIFIER = "200ENTF"
 
-    def init_app(self, logger, url, ssl_cert_path, ssl_key_path, statsd_client):
+    def init_app(self, logger, url, ssl_cert_path, ssl_key_path, statsd_client, **session_options):
         self.logger = logger
         self.base_url = url
         self.ssl_cert_path = ssl_cert_path
         self.ssl_key_path = ssl_key_path
         self.statsd_client = statsd_client
+        self.session = MtlsSession(ssl_cert_path, ssl_key_path, statsd_client, 'clients.mpi', **session_options)
 
     def get_va_profile_id(self, notification):
         recipient_identifiers = notification.recipient_identifiers.values()
@@ -78,10 +80,9 @@ class MpiClient:
         self.logger.info(f"Querying MPI with {fhir_identifier} for notification {notification_id}")
         start_time = monotonic()
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/psim_webservice/fhir/Patient/{fhir_identifier}",
-                params={'-sender': self.SYSTEM_IDENTIFIER},
-                cert=(self.ssl_cert_path, self.ssl_key_path)
+                params={'-sender': self.SYSTEM_IDENTIFIER}
             )
             response.raise_for_status()
         except requests.HTTPError as e:
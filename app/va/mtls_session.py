@@ -0,0 +1,139 @@
+import os
+import random
+from itertools import takewhile
+from threading import Lock, local
+from time import monotonic
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+RETRYABLE_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+class _JitteredRetry(Retry):
+    """
+    Retry with "full jitter" exponential backoff, so that workers retrying against a struggling host spread their
+    retries out rather than retrying in step.  A Retry-After header on a 429 or 503 is honoured instead.
+    """
+
+    MAX_BACKOFF = 10
+
+    def get_backoff_time(self):
+        consecutive_errors = len(list(takewhile(lambda x: x.redirect_location is None, reversed(self.history))))
+        if consecutive_errors == 0:
+            return 0
+        return random.uniform(0, min(self.MAX_BACKOFF, self.backoff_factor * (2 ** (consecutive_errors - 1))))
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    on_connect = None
+
+    def connect(self):
+        start = monotonic()
+        super().connect()
+        self.on_connect(monotonic() - start)
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """
+    An adapter whose HTTPS connections report how long they took to connect, including the TLS handshake.
+    """
+
+    def __init__(self, on_connect, **kwargs):
+        # Set before HTTPAdapter.__init__, which calls init_poolmanager
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        connection_cls = type('TimedHTTPSConnection', (_TimedHTTPSConnection,), {
+            'on_connect': staticmethod(self._on_connect)
+        })
+        pool_cls = type('TimedHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': connection_cls})
+        self.poolmanager.pool_classes_by_scheme = {**self.poolmanager.pool_classes_by_scheme, 'https': pool_cls}
+
+
+class MtlsSession:
+    """
+    A keep-alive, mutual TLS session to one of the VA's internal APIs, so that lookups reuse connections instead of
+    making a TLS handshake, and loading the client certificate, for every request.
+
+    Each worker process has its own session, made on its first request, as connections cannot be shared with
+    processes forked from it.  Requests have separate connect and read timeouts, and GET requests that fail to connect
+    or get a 429 or 5xx response are retried a bounded number of times with jittered backoff.  Once the retries are
+    used up, the last response is returned so that callers handle it as before.
+
+    Alongside the callers' request-time timers, {statsd_prefix}.request-time.handshake times each new connection and
+    {statsd_prefix}.request-time.request times the rest of each request.
+    """
+
+    def __init__(
+        self, ssl_cert_path, ssl_key_path, statsd_client, statsd_prefix,
+        pool_size=10, timeout=(5, 30), max_retries=2, retry_backoff=0.5
+    ):
+        self.cert = (ssl_cert_path, ssl_key_path)
+        self.statsd_client = statsd_client
+        self.statsd_prefix = statsd_prefix
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._session = None
+        self._pid = None
+        self._lock = Lock()
+        self._local = local()
+
+    def get(self, url, **kwargs):
+        session = self._get_session()
+        self._local.handshake_time = 0
+        start = monotonic()
+
+        try:
+            return session.get(url, timeout=self.timeout, **kwargs)
+        finally:
+            handshake_time = self._local.handshake_time
+            if handshake_time:
+                self.statsd_client.incr(f'{self.statsd_prefix}.connection.new')
+            else:
+                self.statsd_client.incr(f'{self.statsd_prefix}.connection.reused')
+            request_time = monotonic() - start - handshake_time
+            self.statsd_client.timing(f'{self.statsd_prefix}.request-time.request', request_time)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+    def _get_session(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._session = self._create_session()
+                self._pid = os.getpid()
+            return self._session
+
+    def _create_session(self):
+        retry = _JitteredRetry(
+            total=self.max_retries,
+            backoff_factor=self.retry_backoff,
+            status_forcelist=RETRYABLE_STATUS_CODES,
+            allowed_methods=['GET'],
+            raise_on_status=False,
+        )
+        adapter = _TimedHTTPAdapter(
+            self._on_connect, pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry
+        )
+
+        session = Session()
+        session.cert = self.cert
+        session.mount('https://', adapter)
+        session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry))
+        return session
+
+    def _on_connect(self, elapsed_time):
+        self._local.handshake_time = getattr(self._local, 'handshake_time', 0) + elapsed_time
+        self.statsd_client.timing(f'{self.statsd_prefix}.request-time.handshake', elapsed_time)
@@ -0,0 +1,188 @@
+import base64
+import hashlib
+import hmac
+from threading import Event, Lock
+from time import monotonic, sleep
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.va.identifier import IdentifierType
+
+
+class _Lookup:
+    """
+    An upstream lookup in progress in this process, which other lookups of the same key wait for.
+    """
+
+    def __init__(self):
+        self.done = Event()
+        self.value = None
+        self.exception = None
+
+
+class RecipientLookupCache:
+    """
+    A short-lived cache in Redis of the results of looking up recipients: the VA Profile ID for a recipient identifier
+    from MPI, and the email address or phone number for a VA Profile ID from VA Profile.  A veteran who is sent several
+    notifications within minutes, such as an SMS and an email from one campaign, is then looked up once.
+
+    Cached values are encrypted, and keys are an HMAC of the identifier, so Redis holds no readable PII.  Values expire
+    after RECIPIENT_LOOKUP_CACHE_TTL seconds, and evict() removes everything cached for an identifier.
+
+    Lookups of the same key are coalesced: within a process, concurrent lookups wait for the first one, and across
+    processes, the first to take a short-lived lock in Redis looks the value up while the others wait up to
+    RECIPIENT_LOOKUP_COALESCE_TIMEOUT seconds for it to appear in the cache before looking it up themselves.
+
+    Failed lookups are not cached.  If Redis is unavailable, every lookup goes upstream.
+    """
+
+    STATSD_PREFIX = 'recipient-lookup-cache'
+    KEY_PREFIX = 'recipient-lookup'
+    POLL_INTERVAL = 0.1
+
+    def __init__(self):
+        self.enabled = False
+        self.statsd_client = None
+        self.redis_store = None
+        self.logger = None
+        self.ttl = 300
+        self.coalesce_timeout = 10
+        self._fernet = None
+        self._key_secret = None
+        self._lookups = {}
+        self._lock = Lock()
+
+    def init_app(self, app, statsd_client, redis_store):
+        self.enabled = app.config['RECIPIENT_LOOKUP_CACHE_ENABLED']
+        self.ttl = app.config['RECIPIENT_LOOKUP_CACHE_TTL']
+        self.coalesce_timeout = app.config['RECIPIENT_LOOKUP_COALESCE_TIMEOUT']
+        self.statsd_client = statsd_client
+        self.redis_store = redis_store
+        self.logger = app.logger
+
+        # Separate keys for encrypting values and for hashing identifiers, both derived from the app's secret
+        secret = '{}{}'.format(app.config['SECRET_KEY'], app.config['DANGEROUS_SALT']).encode('utf-8')
+        self._fernet = Fernet(base64.urlsafe_b64encode(hmac.new(secret, b'value', hashlib.sha256).digest()))
+        self._key_secret = hmac.new(secret, b'key', hashlib.sha256).digest()
+
+    @property
+    def active(self):
+        return self.enabled and self.redis_store is not None and self.redis_store.active
+
+    def get_va_profile_id(self, id_type, id_value, fetch):
+        """
+        Return the VA Profile ID for a recipient identifier, calling fetch() to look it up if it is not cached.
+        """
+        return self._get('va-profile-id', id_type, id_value, fetch)
+
+    def get_contact_info(self, va_profile_id, notification_type, fetch):
+        """
+        Return the email address or phone number, by notification_type, for a VA Profile ID, calling fetch() to look it
+        up if it is not cached.
+        """
+        return self._get(notification_type, IdentifierType.VA_PROFILE_ID.value, va_profile_id, fetch)
+
+    def evict(self, id_type, id_value):
+        """
+        Remove everything cached for an identifier, given as an id_type from IdentifierType and its value.  A VA
+        Profile ID's contact information is removed along with its own VA Profile ID lookup.
+        """
+        if not self.active:
+            return
+
+        kinds = ['va-profile-id'] + (['email', 'sms'] if id_type == IdentifierType.VA_PROFILE_ID.value else [])
+        self.redis_store.delete(*[self._key(kind, id_type, id_value) for kind in kinds])
+
+    def _get(self, kind, id_type, id_value, fetch):
+        if not self.active:
+            return fetch()
+
+        key = self._key(kind, id_type, id_value)
+
+        value = self._read(key)
+        if value is not None:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.{kind}.hit')
+            return value
+
+        self.statsd_client.incr(f'{self.STATSD_PREFIX}.{kind}.miss')
+
+        with self._lock:
+            lookup = self._lookups.get(key)
+            leader = lookup is None
+            if leader:
+                lookup = self._lookups[key] = _Lookup()
+
+        if not leader:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.{kind}.coalesced')
+            lookup.done.wait()
+            if lookup.exception is not None:
+                raise lookup.exception
+            return lookup.value
+
+        try:
+            lookup.value = self._fetch_once(key, fetch)
+            return lookup.value
+        except Exception as e:
+            lookup.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._lookups[key]
+            lookup.done.set()
+
+    def _fetch_once(self, key, fetch):
+        lock_key = f'{key}-lock'
+
+        locked = self._try_lock(lock_key)
+        if not locked:
+            deadline = monotonic() + self.coalesce_timeout
+            while monotonic() < deadline:
+                sleep(self.POLL_INTERVAL)
+                value = self._read(key)
+                if value is not None:
+                    return value
+
+        try:
+            value = fetch()
+            self._write(key, value)
+            return value
+        finally:
+            if locked:
+                self._unlock(lock_key)
+
+    def _key(self, kind, id_type, id_value):
+        identifier = hmac.new(self._key_secret, f'{id_type}:{id_value}'.encode('utf-8'), hashlib.sha256).hexdigest()
+        return f'{self.KEY_PREFIX}-{kind}-{identifier}'
+
+    def _read(self, key):
+        try:
+            cached = self.redis_store.get(key)
+            if cached is None:
+                return None
+            return self._fernet.decrypt(cached, ttl=self.ttl).decode('utf-8')
+        except InvalidToken:
+            return None
+        except Exception:
+            self.logger.exception('Failed to read from the recipient lookup cache')
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.error')
+            return None
+
+    def _write(self, key, value):
+        try:
+            self.redis_store.set(key, self._fernet.encrypt(str(value).encode('utf-8')), ex=self.ttl)
+        except Exception:
+            self.logger.exception('Failed to write to the recipient lookup cache')
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.error')
+
+    def _try_lock(self, lock_key):
+        try:
+            return bool(self.redis_store.redis_store.set(lock_key, 1, nx=True, ex=self.coalesce_timeout))
+        except Exception:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.error')
+            return True
+
+    def _unlock(self, lock_key):
+        try:
+            self.redis_store.delete(lock_key)
+        except Exception:
+            self.statsd_client.incr(f'{self.STATSD_PREFIX}.error')
@@ -1,37 +1,68 @@
+import os
 import requests
 import jwt
 import time
 import json
+from threading import Lock
 
 
 class VAOnsiteClient:
     __VA_ONSITE_USER = 'va_notify'
+    JWT_LIFETIME_SECONDS = 60
+    # A cached JWT is replaced when it has less than this many seconds left
+    JWT_REFRESH_SECONDS = 10
 
-    def init_app(self, logger, url: str, va_onsite_secret: str):
+    def init_app(
+        self, logger, url: str, va_onsite_secret: str, timeout: tuple = (3, 10), failure_threshold: int = 5,
+        reset_seconds: int = 60
+    ):
         """Initializes the VAOnsiteClient with appropriate data.
 
         :param logger: the application logger
         :param url: the url to send the information to in a string format
         :param va_onsite_secret: the secret key in string format used to validate the connection
+        :param timeout: the connect and read timeouts, in seconds, of each POST request
+        :param failure_threshold: the number of consecutive failed POST requests after which requests are skipped
+        :param reset_seconds: how long requests are skipped for before VA Onsite is tried again
         """
         self.logger = logger
         self.url_base = url
         self.va_onsite_secret = va_onsite_secret
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self._lock = Lock()
+        self._session = None
+        self._pid = None
+        self._jwt = None
+        self._jwt_expires_at = 0
+        self._consecutive_failures = 0
+        self._open_until = 0
 
     def post_onsite_notification(self, data: dict):
         """Returns the JSON that is retrieved from the `POST` request sent to onsite_notifications
 
+        Requests are not sent, and None is returned, for reset_seconds after failure_threshold consecutive requests
+        have failed, so that an unavailable VA Onsite does not hold up the workers sending to it.
+
         :param data: The dict onsite_notifications is expecting to see
         """
         self.logger.info(f"Calling VAOnsiteClient.post_onsite_notification")
+
+        if self._is_circuit_open():
+            self.logger.warning('Skipping POST to onsite_notifications after repeated failures')
+            return None
+
         self.logger.info(f"Sending this data with POST request to onsite_notifications: {data}")
 
         response = None
 
         try:
-            response = requests.post(url=f'{ self.url_base }/v0/onsite_notifications',
-                                     data=json.dumps(data),
-                                     headers=self._build_header())
+            response = self._get_session().post(url=f'{self.url_base}/v0/onsite_notifications',
+                                                data=json.dumps(data),
+                                                headers=self._build_header(),
+                                                timeout=self.timeout)
 
             self.logger.info(f'onsite_notifications POST response: status_code={response.status_code}, '
                              f'json={response.json()}')
@@ -39,15 +70,24 @@ class VAOnsiteClient:
         except Exception as e:
             self.logger.exception(e)
 
+        self._record_result(response is not None and response.status_code < 500 and response.status_code != 429)
         return response
 
     def _build_header(self) -> dict:
         """Returns the dict of the header to be sent with the JWT"""
         return {
             'Content-Type': 'application/json',
-            'Authorization': f'Bearer {self._encode_jwt(self.__VA_ONSITE_USER, self.va_onsite_secret)}'
+            'Authorization': f'Bearer {self._get_jwt()}'
         }
 
+    def _get_jwt(self) -> str:
+        """Returns a JWT, reusing the last one made until it is about to expire"""
+        with self._lock:
+            if time.time() >= self._jwt_expires_at - self.JWT_REFRESH_SECONDS:
+                self._jwt_expires_at = int(time.time()) + self.JWT_LIFETIME_SECONDS
+                self._jwt = self._encode_jwt(self.__VA_ONSITE_USER, self.va_onsite_secret)
+            return self._jwt
+
     def _encode_jwt(self, user: str, secret_key: str, algo: str = 'ES256'):
         """Returns the JWT encoded using the given algorithm
 
@@ -59,7 +99,34 @@ class VAOnsiteClient:
         data = {
             'user': user,
             'iat': current_timestamp,
-            'exp': current_timestamp + 60
+            'exp': current_timestamp + self.JWT_LIFETIME_SECONDS
         }
 
         return jwt.encode(data, secret_key, algorithm=algo)
+
+    def _get_session(self) -> requests.Session:
+        """Returns a keep-alive session for this process, as connections cannot be shared with forked processes"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._session = requests.Session()
+                self._pid = os.getpid()
+            return self._session
+
+    def _is_circuit_open(self) -> bool:
+        with self._lock:
+            return time.monotonic() < self._open_until
+
+    def _record_result(self, succeeded: bool):
+        with self._lock:
+            if succeeded:
+                self._consecutive_failures = 0
+                return
+
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold:
+                # Until the circuit closes after a successful request, each failure keeps it open for another period
+                self._open_until = time.monotonic() + self.reset_seconds
+                self.logger.warning(
+                    f'{self._consecutive_failures} consecutive POSTs to onsite_notifications failed, skipping '
+                    f'them for {self.reset_seconds} seconds'
+                )
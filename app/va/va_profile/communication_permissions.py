@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app import statsd_client, va_profile_client
+from app.dao.va_profile_local_cache_dao import (
+    get_va_profile_local_cache_permissions,
+    save_va_profile_local_cache_permission,
+)
+from app.models import RecipientIdentifier, VA_NOTIFY_TO_VA_PROFILE_COMMUNICATION_CHANNEL_IDS
+from app.va.identifier import IdentifierType
+from app.va.va_profile.va_profile_client import CommunicationItemNotFoundException
+
+
+def is_communication_allowed(va_profile_id, va_profile_item_id, notification_id, notification_type) -> bool:
+    """
+    Return whether a recipient allows a communication item on the channel for notification_type, from
+    va_profile_local_cache if it has a fresh permission, otherwise from VA Profile.
+
+    Raises the exceptions VAProfileClient.get_is_communication_allowed does, including
+    CommunicationItemNotFoundException if VA Profile has no permission for the communication item.
+    """
+    is_allowed = get_communication_permissions([
+        (va_profile_id, va_profile_item_id, notification_type, notification_id)
+    ])[(va_profile_id, va_profile_item_id, notification_type)]
+
+    if is_allowed is None:
+        raise CommunicationItemNotFoundException
+    return is_allowed
+
+
+def get_communication_permissions(lookups):
+    """
+    Resolve permissions for (va_profile_id, va_profile_item_id, notification_type, notification_id) lookups.
+    Permissions cached in va_profile_local_cache are read in one query.  Those that are missing or were cached more
+    than VA_PROFILE_LOCAL_CACHE_MAX_AGE_DAYS ago are requested from VA Profile and written back to the cache.
+
+    Returns a dictionary of (va_profile_id, va_profile_item_id, notification_type) to whether the communication is
+    allowed, or None if VA Profile has no permission for the communication item.
+    """
+    lookups = list(lookups)
+    cache_keys = {
+        (va_profile_id, va_profile_item_id, notification_type): _cache_key(
+            va_profile_id, va_profile_item_id, notification_type
+        )
+        for va_profile_id, va_profile_item_id, notification_type, _ in lookups
+    }
+    cached = get_va_profile_local_cache_permissions(key for key in cache_keys.values() if key is not None)
+    fresh_after = datetime.utcnow() - timedelta(days=current_app.config['VA_PROFILE_LOCAL_CACHE_MAX_AGE_DAYS'])
+
+    permissions = {}
+    for va_profile_id, va_profile_item_id, notification_type, notification_id in lookups:
+        lookup_key = (va_profile_id, va_profile_item_id, notification_type)
+        if lookup_key in permissions:
+            continue
+
+        cache_key = cache_keys[lookup_key]
+        permission = cached.get(cache_key)
+
+        if permission is not None and permission.cached_at >= fresh_after:
+            statsd_client.incr('va-profile-local-cache.permission.hit')
+            permissions[lookup_key] = permission.allowed
+            continue
+
+        statsd_client.incr(
+            'va-profile-local-cache.permission.{}'.format('miss' if permission is None else 'stale')
+        )
+        permissions[lookup_key] = _get_and_cache_permission(
+            va_profile_id, va_profile_item_id, notification_id, notification_type, cache_key
+        )
+
+    return permissions
+
+
+def _get_and_cache_permission(va_profile_id, va_profile_item_id, notification_id, notification_type, cache_key):
+    identifier = RecipientIdentifier(id_type=IdentifierType.VA_PROFILE_ID.value, id_value=va_profile_id)
+    requested_at = datetime.utcnow()
+
+    try:
+        is_allowed, source_datetime = va_profile_client.get_communication_permission(
+            identifier, va_profile_item_id, notification_id, notification_type
+        )
+    except CommunicationItemNotFoundException:
+        return None
+
+    if cache_key is not None:
+        # The permission's own date orders it against those the VA Profile opt in/out lambda saves
+        save_va_profile_local_cache_permission(
+            *cache_key, allowed=is_allowed, source_datetime=source_datetime or requested_at
+        )
+
+    return is_allowed
+
+
+def _cache_key(va_profile_id, va_profile_item_id, notification_type):
+    # va_profile_local_cache only has integer VA Profile ids and the channels VA Profile has ids for
+    try:
+        return (
+            int(va_profile_id),
+            int(va_profile_item_id),
+            VA_NOTIFY_TO_VA_PROFILE_COMMUNICATION_CHANNEL_IDS[notification_type],
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
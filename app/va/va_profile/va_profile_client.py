@@ -2,6 +2,7 @@ from enum import Enum
 
 import requests
 import iso8601
+import pytz
 from time import monotonic
 from http.client import responses
 from app.va.va_profile import (
@@ -11,6 +12,7 @@ from app.va.va_profile import (
 )
 from app.va.identifier import is_fhir_format, transform_from_fhir_format, transform_to_fhir_format, OIDS, IdentifierType
 from app.va.va_profile.exceptions import VAProfileIDNotFoundException
+from app.va.mtls_session import MtlsSession
 
 
 class CommunicationItemNotFoundException(Exception):
@@ -35,12 +37,15 @@ class VAProfileClient:
     PHONE_BIO_TYPE = 'telephones'
     TX_AUDIT_ID = 'txAuditId'
 
-    def init_app(self, logger, va_profile_url, ssl_cert_path, ssl_key_path, statsd_client):
+    def init_app(self, logger, va_profile_url, ssl_cert_path, ssl_key_path, statsd_client, **session_options):
         self.logger = logger
         self.va_profile_url = va_profile_url
         self.ssl_cert_path = ssl_cert_path
         self.ssl_key_path = ssl_key_path
         self.statsd_client = statsd_client
+        self.session = MtlsSession(
+            ssl_cert_path, ssl_key_path, statsd_client, 'clients.va-profile', **session_options
+        )
 
     def get_email(self, va_profile_id):
         if is_fhir_format(va_profile_id):
@@ -77,9 +82,21 @@ class VAProfileClient:
     def get_is_communication_allowed(
             self, recipient_identifier, communication_item_id: str, notification_id: str, notification_type: str
     ) -> bool:
+        self.logger.info(f'Called get_is_communication_allowed for notification {notification_id}')
+        is_allowed, _ = self.get_communication_permission(
+            recipient_identifier, communication_item_id, notification_id, notification_type
+        )
+        return is_allowed
+
+    def get_communication_permission(
+            self, recipient_identifier, communication_item_id: str, notification_id: str, notification_type: str
+    ) -> tuple:
+        """
+        Returns whether the communication is allowed, and when VA Profile recorded that as a naive UTC datetime, or
+        None if VA Profile didn't say.
+        """
         from app.models import VA_NOTIFY_TO_VA_PROFILE_NOTIFICATION_TYPES
 
-        self.logger.info(f'Called get_is_communication_allowed for notification {notification_id}')
         recipient_id = transform_to_fhir_format(recipient_identifier)
         identifier_type = IdentifierType(recipient_identifier.id_type)
         oid = OIDS.get(identifier_type)
@@ -103,7 +120,10 @@ class VAProfileClient:
             if bio['communicationChannelName'] == VA_NOTIFY_TO_VA_PROFILE_NOTIFICATION_TYPES[notification_type]:
                 self.logger.info(f'Value of allowed is {bio["allowed"]} for notification {notification_id}')
                 self.statsd_client.incr("clients.va-profile.get-communication-item-permission.success")
-                return bio['allowed'] is True
+                source_datetime = None
+                if bio.get('sourceDate'):
+                    source_datetime = iso8601.parse_date(bio['sourceDate']).astimezone(pytz.utc).replace(tzinfo=None)
+                return bio['allowed'] is True, source_datetime
 
         self.logger.info(f'Recipient {recipient_id} did not have permission for communication item '
                          f'{communication_item_id} and channel {notification_type} for notification {notification_id}')
@@ -117,7 +137,7 @@ class VAProfileClient:
         self.logger.info(f"Querying VA Profile with ID {va_profile_id}")
 
         try:
-            response = requests.get(url, cert=(self.ssl_cert_path, self.ssl_key_path))
+            response = self.session.get(url)
             response.raise_for_status()
 
         except requests.HTTPError as e:
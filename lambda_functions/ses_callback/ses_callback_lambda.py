@@ -6,6 +6,13 @@ import uuid
 
 ROUTING_KEY = "delivery-receipts"
 
+# When greater than 1, receipts are sent to the batch task in groups of up to this many.
+RECEIPT_BATCH_SIZE = int(os.getenv('RECEIPT_BATCH_SIZE', 0))
+
+# SQS messages can be at most 256KB.  Receipts are base64 encoded twice on their way into a message, which makes them
+# 16/9 times as big, and the task and envelope around them take up to a few KB.
+MAX_BATCH_BYTES = (256 * 1024 - 4 * 1024) * 9 // 16
+
 
 def lambda_handler(event, context):
     sqs = boto3.resource('sqs')
@@ -13,50 +20,76 @@ def lambda_handler(event, context):
         QueueName=f"{os.getenv('NOTIFICATION_QUEUE_PREFIX')}{ROUTING_KEY}"
     )
 
-    for record in event["Records"]:
-        task = {
-            "task": "process-ses-result",
-            "id": str(uuid.uuid4()),
-            "args": [
-                {
-                    "Message": record["Sns"]["Message"]
-                }
-            ],
-            "kwargs": {},
-            "retries": 0,
-            "eta": None,
-            "expires": None,
-            "utc": True,
-            "callbacks": None,
-            "errbacks": None,
-            "timelimit": [
-                None,
-                None
-            ],
-            "taskset": None,
-            "chord": None
-        }
-        envelope = {
-            "body": base64.b64encode(bytes(json.dumps(task), 'utf-8')).decode("utf-8"),
-            "content-encoding": "utf-8",
-            "content-type": "application/json",
-            "headers": {},
-            "properties": {
-                "reply_to": str(uuid.uuid4()),
-                "correlation_id": str(uuid.uuid4()),
-                "delivery_mode": 2,
-                "delivery_info": {
-                    "priority": 0,
-                    "exchange": "default",
-                    "routing_key": ROUTING_KEY
-                },
-                "body_encoding": "base64",
-                "delivery_tag": str(uuid.uuid4())
-            }
-        }
-        msg = base64.b64encode(bytes(json.dumps(envelope), 'utf-8')).decode("utf-8")
-        queue.send_message(MessageBody=msg)
+    messages = [{"Message": record["Sns"]["Message"]} for record in event["Records"]]
+
+    if RECEIPT_BATCH_SIZE > 1:
+        for batch in batch_messages(messages):
+            send_task(queue, "process-ses-results-batch", [batch])
+    else:
+        for message in messages:
+            send_task(queue, "process-ses-result", [message])
 
     return {
         'statusCode': 200
     }
+
+
+def batch_messages(messages):
+    """
+    Group messages into batches of up to RECEIPT_BATCH_SIZE messages that fit into an SQS message.
+    """
+    batch = []
+    batch_bytes = 0
+    for message in messages:
+        # json.dumps escapes non-ASCII characters, so each character is one byte; 2 more separate it from the next
+        message_bytes = len(json.dumps(message)) + 2
+        if batch and (len(batch) == RECEIPT_BATCH_SIZE or batch_bytes + message_bytes > MAX_BATCH_BYTES):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(message)
+        batch_bytes += message_bytes
+
+    if batch:
+        yield batch
+
+
+def send_task(queue, task_name, args):
+    task = {
+        "task": task_name,
+        "id": str(uuid.uuid4()),
+        "args": args,
+        "kwargs": {},
+        "retries": 0,
+        "eta": None,
+        "expires": None,
+        "utc": True,
+        "callbacks": None,
+        "errbacks": None,
+        "timelimit": [
+            None,
+            None
+        ],
+        "taskset": None,
+        "chord": None
+    }
+    envelope = {
+        "body": base64.b64encode(bytes(json.dumps(task), 'utf-8')).decode("utf-8"),
+        "content-encoding": "utf-8",
+        "content-type": "application/json",
+        "headers": {},
+        "properties": {
+            "reply_to": str(uuid.uuid4()),
+            "correlation_id": str(uuid.uuid4()),
+            "delivery_mode": 2,
+            "delivery_info": {
+                "priority": 0,
+                "exchange": "default",
+                "routing_key": ROUTING_KEY
+            },
+            "body_encoding": "base64",
+            "delivery_tag": str(uuid.uuid4())
+        }
+    }
+    msg = base64.b64encode(bytes(json.dumps(envelope), 'utf-8')).decode("utf-8")
+    queue.send_message(MessageBody=msg)
@@ -0,0 +1,28 @@
+"""
+
+Revision ID: 0352_service_callback_batching
+Revises: 0351_user_service_roles
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0352_service_callback_batching'
+down_revision = '0351_user_service_roles'
+
+
+def upgrade():
+    op.add_column(
+        'service_callback',
+        sa.Column('batch_callbacks', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+    op.add_column(
+        'service_callback_history',
+        sa.Column('batch_callbacks', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+
+
+def downgrade():
+    op.drop_column('service_callback_history', 'batch_callbacks')
+    op.drop_column('service_callback', 'batch_callbacks')
@@ -0,0 +1,22 @@
+"""
+
+Revision ID: 0353_job_checkpoints
+Revises: 0352_service_callback_batching
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0353_job_checkpoints'
+down_revision = '0352_service_callback_batching'
+
+
+def upgrade():
+    op.add_column('jobs', sa.Column('rows_processed', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('jobs', sa.Column('bytes_processed', sa.BigInteger(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('jobs', 'bytes_processed')
+    op.drop_column('jobs', 'rows_processed')
@@ -0,0 +1,41 @@
+"""
+
+Revision ID: 0354_ft_notification_status_hourly
+Revises: 0353_job_checkpoints
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0354_ft_notification_status_hourly'
+down_revision = '0353_job_checkpoints'
+
+
+def upgrade():
+    op.create_table(
+        'ft_notification_status_hourly',
+        sa.Column('service_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('template_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('notification_type', sa.Text(), nullable=False),
+        sa.Column('key_type', sa.Text(), nullable=False),
+        sa.Column('notification_status', sa.Text(), nullable=False),
+        sa.Column('notification_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            'service_id', 'hour', 'template_id', 'notification_type', 'key_type', 'notification_status'
+        )
+    )
+    op.create_table(
+        'ft_notification_status_hourly_watermark',
+        sa.Column('bst_date', sa.Date(), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('bst_date')
+    )
+
+
+def downgrade():
+    op.drop_table('ft_notification_status_hourly_watermark')
+    op.drop_table('ft_notification_status_hourly')
@@ -0,0 +1,28 @@
+"""
+
+Revision ID: 0355_notification_purge_checkpoints
+Revises: 0354_ft_notification_status_hourly
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0355_notification_purge_checkpoints'
+down_revision = '0354_ft_notification_status_hourly'
+
+
+def upgrade():
+    op.create_table(
+        'notification_purge_checkpoints',
+        sa.Column('notification_type', sa.Text(), nullable=False),
+        sa.Column('scope', sa.Text(), nullable=False),
+        sa.Column('cutoff', sa.DateTime(), nullable=False),
+        sa.Column('purged_to', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('notification_type', 'scope')
+    )
+
+
+def downgrade():
+    op.drop_table('notification_purge_checkpoints')
@@ -0,0 +1,32 @@
+"""
+
+Revision ID: 0356_notification_recipient_search
+Revises: 0355_notification_purge_checkpoints
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = '0356_notification_recipient_search'
+down_revision = '0355_notification_purge_checkpoints'
+
+
+def upgrade():
+    # notifications is too busy to lock while the indexes are built, and CREATE INDEX CONCURRENTLY can't run in a
+    # transaction, hence autocommit_block
+    with op.get_context().autocommit_block():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_normalised_to_trgm "
+            "ON notifications USING gin (normalised_to gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_service_id_normalised_to "
+            "ON notifications (service_id, normalised_to)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_notifications_service_id_normalised_to")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_notifications_normalised_to_trgm")
@@ -0,0 +1,27 @@
+"""
+
+Revision ID: 0357_notifications_keyset_index
+Revises: 0356_notification_recipient_search
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = '0357_notifications_keyset_index'
+down_revision = '0356_notification_recipient_search'
+
+
+def upgrade():
+    # Keyset pages of a service's notifications are ordered by created_at and then id, which
+    # ix_notifications_service_id_created_at can't return in order when created_at ties.  notifications is too busy to
+    # lock while the index is built, and CREATE INDEX CONCURRENTLY can't run in a transaction, hence autocommit_block
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_service_id_created_at_id "
+            "ON notifications (service_id, created_at, id)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_notifications_service_id_created_at_id")
@@ -0,0 +1,24 @@
+"""
+
+Revision ID: 0358_va_profile_local_cache_cached_at
+Revises: 0357_notifications_keyset_index
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0358_va_profile_local_cache_cached_at'
+down_revision = '0357_notifications_keyset_index'
+
+
+def upgrade():
+    # The default is evaluated once for the existing rows, so the table is not rewritten
+    op.add_column(
+        'va_profile_local_cache',
+        sa.Column('cached_at', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_column('va_profile_local_cache', 'cached_at')
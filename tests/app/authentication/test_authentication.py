@@ -6,16 +6,17 @@ from datetime import datetime
 from flask_jwt_extended import create_access_token
 from jwt import ExpiredSignatureError
 
-from app.dao.services_dao import dao_add_user_to_service
+from app.dao.services_dao import dao_add_user_to_service, dao_fetch_service_by_id_with_api_keys
 from tests.app.db import create_user, create_service
 from tests.conftest import set_config_values
 
 import pytest
 from flask import json, current_app, request
 from freezegun import freeze_time
+from sqlalchemy import inspect
 from notifications_python_client.authentication import create_jwt_token
 
-from app import api_user
+from app import api_user, service_api_key_cache
 from app.dao.api_key_dao import get_unsigned_secrets, save_model_api_key, get_unsigned_secret, expire_api_key
 from app.models import ApiKey, KEY_TYPE_NORMAL, PERMISSION_LIST, Permission
 from app.authentication.auth import AuthError, validate_admin_auth, validate_service_api_key_auth, \
@@ -325,6 +326,59 @@ def test_should_return_403_when_token_is_expired(client,
     assert exc.value.api_key_id == sample_api_key.id
 
 
+@pytest.fixture
+def enable_service_api_key_cache(mocker):
+    mocker.patch.object(service_api_key_cache, 'enabled', True)
+    service_api_key_cache.clear()
+    yield
+    service_api_key_cache.clear()
+
+
+def test_should_fetch_service_once_when_service_api_key_cache_enabled(
+        client, sample_api_key, mocker, enable_service_api_key_cache
+):
+    fetch_mock = mocker.patch(
+        'app.authentication.auth.dao_fetch_service_by_id_with_api_keys',
+        wraps=dao_fetch_service_by_id_with_api_keys
+    )
+    token = __create_token(sample_api_key.service_id)
+
+    for _ in range(2):
+        response = client.get('/notifications', headers={'Authorization': 'Bearer {}'.format(token)})
+        assert response.status_code == 200
+
+    fetch_mock.assert_called_once_with(str(sample_api_key.service_id))
+    assert service_api_key_cache.get_matched_api_key_id(sample_api_key.service_id) == sample_api_key.id
+
+
+def test_cached_service_is_not_expired_by_requests_using_it(
+        client, sample_api_key, enable_service_api_key_cache
+):
+    token = __create_token(sample_api_key.service_id)
+
+    for _ in range(2):
+        response = client.get('/notifications', headers={'Authorization': 'Bearer {}'.format(token)})
+        assert response.status_code == 200
+
+    _, service = service_api_key_cache._services.get(str(sample_api_key.service_id))
+    assert not inspect(service).expired_attributes
+    assert not any(inspect(api_key).expired_attributes for api_key in service.api_keys)
+
+
+def test_should_not_allow_revoked_key_when_service_api_key_cache_enabled(
+        client, sample_api_key, enable_service_api_key_cache
+):
+    token = __create_token(sample_api_key.service_id)
+    response = client.get('/notifications', headers={'Authorization': 'Bearer {}'.format(token)})
+    assert response.status_code == 200
+
+    expire_api_key(service_id=sample_api_key.service_id, api_key_id=sample_api_key.id)
+
+    response = client.get('/notifications', headers={'Authorization': 'Bearer {}'.format(token)})
+    assert response.status_code == 403
+    assert json.loads(response.get_data())['message'] == 'Invalid token: API key revoked'
+
+
 def __create_token(service_id):
     return create_jwt_token(secret=get_unsigned_secrets(service_id)[0],
                             client_id=str(service_id))
@@ -0,0 +1,126 @@
+import pytest
+
+from app import db
+from app.authentication.service_api_key_cache import ServiceApiKeyCache
+from tests.conftest import set_config_values
+
+
+@pytest.fixture
+def redis_store(mocker):
+    # Shared by every cache made in a test, as Redis is shared by every process.
+    versions = {}
+    return mocker.Mock(
+        active=True,
+        get=mocker.Mock(side_effect=versions.get),
+        incr=mocker.Mock(side_effect=lambda key: versions.update({key: versions.get(key, 0) + 1}))
+    )
+
+
+@pytest.fixture
+def make_service_api_key_cache(notify_api, mocker, redis_store):
+    def _make_service_api_key_cache():
+        cache = ServiceApiKeyCache()
+        with set_config_values(notify_api, {
+            'SERVICE_API_KEY_CACHE_ENABLED': True,
+            'SERVICE_API_KEY_CACHE_MAX_SIZE': 10,
+            'SERVICE_API_KEY_CACHE_TTL': 30,
+        }):
+            cache.init_app(notify_api, mocker.Mock(), redis_store)
+        return cache
+
+    return _make_service_api_key_cache
+
+
+@pytest.fixture
+def service_api_key_cache(make_service_api_key_cache):
+    return make_service_api_key_cache()
+
+
+def test_get_service_fetches_on_miss_and_caches_result(service_api_key_cache, mocker):
+    fetch = mocker.Mock(return_value='service')
+
+    assert service_api_key_cache.get_service('some-id', fetch) == 'service'
+    assert service_api_key_cache.get_service('some-id', fetch) == 'service'
+
+    fetch.assert_called_once_with('some-id')
+    service_api_key_cache.statsd_client.incr.assert_has_calls([
+        mocker.call('authentication.service-api-key-cache.miss'),
+        mocker.call('authentication.service-api-key-cache.hit'),
+    ])
+    service_api_key_cache.statsd_client.timing.assert_called_once()
+
+
+def test_get_service_does_not_cache_when_disabled(service_api_key_cache, mocker):
+    service_api_key_cache.enabled = False
+    fetch = mocker.Mock(return_value='service')
+
+    service_api_key_cache.get_service('some-id', fetch)
+    service_api_key_cache.get_service('some-id', fetch)
+
+    assert fetch.call_count == 2
+    service_api_key_cache.statsd_client.incr.assert_not_called()
+
+
+def test_get_service_does_not_cache_errors(service_api_key_cache, mocker):
+    fetch = mocker.Mock(side_effect=[ValueError, 'service'])
+
+    with pytest.raises(ValueError):
+        service_api_key_cache.get_service('some-id', fetch)
+
+    assert service_api_key_cache.get_service('some-id', fetch) == 'service'
+
+
+def test_invalidate_removes_service_and_matched_api_key(service_api_key_cache, mocker):
+    fetch = mocker.Mock(return_value='service')
+    service_api_key_cache.get_service('some-id', fetch)
+    service_api_key_cache.set_matched_api_key_id('some-id', 'key-id')
+    assert service_api_key_cache.get_matched_api_key_id('some-id') == 'key-id'
+
+    service_api_key_cache.invalidate('some-id')
+    db.session.commit()
+
+    assert service_api_key_cache.get_matched_api_key_id('some-id') is None
+    service_api_key_cache.get_service('some-id', fetch)
+    assert fetch.call_count == 2
+
+
+def test_invalidate_makes_other_processes_fetch_service_again(make_service_api_key_cache, mocker):
+    cache = make_service_api_key_cache()
+    other_process_cache = make_service_api_key_cache()
+    fetch = mocker.Mock(return_value='service')
+    other_process_cache.get_service('some-id', fetch)
+    other_process_cache.set_matched_api_key_id('some-id', 'revoked-key-id')
+
+    cache.invalidate('some-id')
+    db.session.commit()
+
+    fetch.return_value = 'service without revoked key'
+    assert other_process_cache.get_service('some-id', fetch) == 'service without revoked key'
+    assert other_process_cache.get_matched_api_key_id('some-id') is None
+
+
+def test_invalidate_waits_for_transaction_to_commit(service_api_key_cache, redis_store, mocker):
+    fetch = mocker.Mock(return_value='service')
+    service_api_key_cache.get_service('some-id', fetch)
+
+    service_api_key_cache.invalidate('some-id')
+    redis_store.incr.assert_not_called()
+    service_api_key_cache.get_service('some-id', fetch)
+    assert fetch.call_count == 1
+
+    db.session.rollback()
+    db.session.commit()
+
+    redis_store.incr.assert_not_called()
+    service_api_key_cache.get_service('some-id', fetch)
+    assert fetch.call_count == 1
+
+
+def test_get_service_uses_cached_service_when_redis_is_unavailable(service_api_key_cache, redis_store, mocker):
+    redis_store.active = False
+    fetch = mocker.Mock(return_value='service')
+
+    service_api_key_cache.get_service('some-id', fetch)
+    service_api_key_cache.get_service('some-id', fetch)
+
+    fetch.assert_called_once_with('some-id')
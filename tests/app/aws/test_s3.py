@@ -12,6 +12,7 @@ from app.aws.s3 import (
     filter_s3_bucket_objects_within_date_range,
     remove_transformed_dvla_file,
     get_list_of_files_by_suffix,
+    stream_job_from_s3,
 )
 from tests.app.conftest import datetime_in_past
 
@@ -34,6 +35,21 @@ def test_get_s3_file_makes_correct_call(notify_api, mocker):
     )
 
 
+@pytest.mark.parametrize('start_byte, expected_kwargs', [
+    (0, {}),
+    (12, {'Range': 'bytes=12-'}),
+])
+def test_stream_job_from_s3_yields_lines_across_chunks(notify_api, mocker, start_byte, expected_kwargs):
+    get_s3_mock = mocker.patch('app.aws.s3.get_s3_object')
+    body = get_s3_mock.return_value.get.return_value['Body']
+    body.iter_chunks.return_value = [b'phone number\n+1650', b'2532222\n', b'+16502532223']
+
+    lines = list(stream_job_from_s3('service-id', 'job-id', start_byte=start_byte))
+
+    assert lines == [b'phone number\n', b'+16502532222\n', b'+16502532223']
+    get_s3_mock.return_value.get.assert_called_once_with(**expected_kwargs)
+
+
 def test_remove_transformed_dvla_file_makes_correct_call(notify_api, mocker):
     s3_mock = mocker.patch('app.aws.s3.get_s3_object')
     fake_uuid = '5fbf9799-6b9b-4dbb-9a4e-74a939f3bb49'
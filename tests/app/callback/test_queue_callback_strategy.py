@@ -2,7 +2,7 @@ import pytest
 from botocore.exceptions import ClientError
 
 from app.callback.queue_callback_strategy import QueueCallbackStrategy
-from app.celery.exceptions import NonRetryableException
+from app.celery.exceptions import NonRetryableException, PartialBatchException
 from app.models import ServiceCallback, DELIVERY_STATUS_CALLBACK_TYPE, COMPLAINT_CALLBACK_TYPE, \
     INBOUND_SMS_CALLBACK_TYPE
 
@@ -107,3 +107,48 @@ def test_send_callback_increments_statsd_client_with_non_retryable_error(mocker,
         )
 
     mock_statsd_client.incr.assert_called_with(f"callback.queue.{DELIVERY_STATUS_CALLBACK_TYPE}.non_retryable_error")
+
+
+def test_send_callback_batch_enqueues_messages_in_one_batch(mocker, notify_api):
+    mock_send_message_batch = mocker.patch('app.callback.sqs_client.SQSClient.send_message_batch', return_value=[])
+
+    mock_callback = mocker.Mock(  # nosec
+        ServiceCallback,
+        url='http://some_url',
+        bearer_token='some token',
+        callback_type=DELIVERY_STATUS_CALLBACK_TYPE
+    )
+
+    QueueCallbackStrategy.send_callback_batch(
+        callback=mock_callback,
+        payloads=[{'message': 'hello'}, {'message': 'world'}],
+        logging_tags={'log': 'some log'},
+    )
+
+    mock_send_message_batch.assert_called_once_with(
+        url='http://some_url',
+        message_bodies=[{'message': 'hello'}, {'message': 'world'}],
+        message_attributes={
+            "CallbackType": {"DataType": "String", "StringValue": DELIVERY_STATUS_CALLBACK_TYPE},
+        }
+    )
+
+
+def test_send_callback_batch_raises_partial_batch_exception_with_messages_that_failed(mocker, notify_api):
+    mocker.patch('app.callback.sqs_client.SQSClient.send_message_batch', return_value=[{'message': 'world'}])
+
+    mock_callback = mocker.Mock(  # nosec
+        ServiceCallback,
+        url='http://some_url',
+        bearer_token='some token',
+        callback_type=DELIVERY_STATUS_CALLBACK_TYPE
+    )
+
+    with pytest.raises(PartialBatchException) as e:
+        QueueCallbackStrategy.send_callback_batch(
+            callback=mock_callback,
+            payloads=[{'message': 'hello'}, {'message': 'world'}],
+            logging_tags={'log': 'some log'},
+        )
+
+    assert e.value.failed_payloads == [{'message': 'world'}]
@@ -95,3 +95,83 @@ def test_send_message_raises_client_error_on_client_exception(sqs_stub, sqs_clie
 
     with pytest.raises(ClientError):
         sqs_client.send_message(url, body, message_attributes)
+
+
+@pytest.mark.parametrize('url, expected_group_id', [
+    ('http://some_url', None),
+    ('http://some_url.fifo', 'http://some_url.fifo'),
+])
+def test_send_message_batch_sends_up_to_ten_messages_per_request(sqs_stub, sqs_client, url, expected_group_id):
+    bodies = [{"message": i} for i in range(12)]
+    attributes = {"ContentType": {"StringValue": "application/json", "DataType": "String"}}
+
+    for chunk in (bodies[:10], bodies[10:]):
+        entries = []
+        for i, body in enumerate(chunk):
+            entry = {'Id': str(i), 'MessageBody': json.dumps(body), 'MessageAttributes': attributes}
+            if expected_group_id:
+                entry['MessageGroupId'] = expected_group_id
+            entries.append(entry)
+        sqs_stub.add_response(
+            'send_message_batch',
+            expected_params={'QueueUrl': url, 'Entries': entries},
+            service_response={
+                'Successful': [
+                    {'Id': entry['Id'], 'MessageId': 'some-id', 'MD5OfMessageBody': 'some-md5'} for entry in entries
+                ],
+                'Failed': []
+            }
+        )
+
+    assert sqs_client.send_message_batch(url, bodies) == []
+
+
+def _batch_response(successful_ids, failed_ids):
+    return {
+        'Successful': [{'Id': i, 'MessageId': 'some-id', 'MD5OfMessageBody': 'some-md5'} for i in successful_ids],
+        'Failed': [{'Id': i, 'SenderFault': False, 'Code': 'InternalError'} for i in failed_ids]
+    }
+
+
+def _entry(entry_id, body, url='http://some_url'):
+    entry = {
+        'Id': entry_id,
+        'MessageBody': json.dumps(body),
+        'MessageAttributes': {"ContentType": {"StringValue": "application/json", "DataType": "String"}}
+    }
+    if 'fifo' in url:
+        entry['MessageGroupId'] = url
+    return entry
+
+
+def test_send_message_batch_resends_only_failed_messages(sqs_stub, sqs_client):
+    bodies = [{"message": "hello"}, {"message": "world"}]
+    sqs_stub.add_response(
+        'send_message_batch',
+        expected_params={'QueueUrl': 'http://some_url', 'Entries': [_entry('0', bodies[0]), _entry('1', bodies[1])]},
+        service_response=_batch_response(['0'], ['1'])
+    )
+    sqs_stub.add_response(
+        'send_message_batch',
+        expected_params={'QueueUrl': 'http://some_url', 'Entries': [_entry('0', bodies[1])]},
+        service_response=_batch_response(['0'], [])
+    )
+
+    assert sqs_client.send_message_batch('http://some_url', bodies) == []
+
+
+def test_send_message_batch_returns_failed_messages(sqs_stub, sqs_client):
+    bodies = [{"message": "hello"}, {"message": "world"}]
+    sqs_stub.add_response('send_message_batch', service_response=_batch_response(['0'], ['1']))
+    for _ in range(sqs_client.batch_max_attempts - 1):
+        sqs_stub.add_response('send_message_batch', service_response=_batch_response([], ['0']))
+
+    assert sqs_client.send_message_batch('http://some_url', bodies) == [{"message": "world"}]
+
+
+def test_send_message_batch_does_not_resend_to_fifo_queue_out_of_order(sqs_stub, sqs_client):
+    url = 'http://some_url.fifo'
+    bodies = [{"message": i} for i in range(12)]
+    sqs_stub.add_response('send_message_batch', service_response=_batch_response(['0', '2'], ['1']))
+
+    assert sqs_client.send_message_batch(url, bodies) == [{"message": 1}, {"message": 10}, {"message": 11}]
@@ -5,7 +5,8 @@ import requests_mock
 from requests import RequestException
 
 from app.callback.webhook_callback_strategy import WebhookCallbackStrategy
-from app.celery.exceptions import RetryableException, NonRetryableException
+from app.callback.webhook_session_pool import WebhookHostBusyError
+from app.celery.exceptions import HostBusyException, RetryableException, NonRetryableException
 from app.models import ServiceCallback
 
 
@@ -78,7 +79,7 @@ def test_send_callback_increments_statsd_client_with_retryable_error_for_status_
 
 
 def test_send_callback_raises_retryable_exception_with_request_exception(notify_api, mock_callback, mocker):
-    mocker.patch("app.callback.webhook_callback_strategy.request", side_effect=RequestException())
+    mocker.patch("app.callback.webhook_callback_strategy.webhook_session_pool.post", side_effect=RequestException())
     with pytest.raises(RetryableException):
         WebhookCallbackStrategy.send_callback(
             callback=mock_callback,
@@ -90,7 +91,7 @@ def test_send_callback_raises_retryable_exception_with_request_exception(notify_
 def test_send_callback_increments_statsd_client_with_retryable_error_for_request_exception(
         notify_api, mock_callback, mock_statsd_client, mocker
 ):
-    mocker.patch("app.callback.webhook_callback_strategy.request", side_effect=RequestException())
+    mocker.patch("app.callback.webhook_callback_strategy.webhook_session_pool.post", side_effect=RequestException())
     with pytest.raises(RetryableException):
         WebhookCallbackStrategy.send_callback(
             callback=mock_callback,
@@ -127,3 +128,16 @@ def test_send_callback_increments_statsd_client_with_non_retryable_error_for_sta
             )
 
     mock_statsd_client.incr.assert_called_with(f"callback.webhook.{mock_callback.callback_type}.non_retryable_error")
+
+
+def test_send_callback_raises_host_busy_exception_if_host_is_busy(notify_api, mock_callback, mocker):
+    mocker.patch(
+        "app.callback.webhook_callback_strategy.webhook_session_pool.post",
+        side_effect=WebhookHostBusyError('20 callbacks already in flight to http://some_url')
+    )
+    with pytest.raises(HostBusyException):
+        WebhookCallbackStrategy.send_callback(
+            callback=mock_callback,
+            payload={'message': 'hello'},
+            logging_tags={'log': 'some log'}
+        )
@@ -0,0 +1,100 @@
+import pytest
+import requests_mock
+
+from app.callback.webhook_session_pool import WebhookSessionPool, WebhookHostBusyError
+from tests.conftest import set_config_values
+
+
+@pytest.fixture
+def redis_store(mocker):
+    redis_store = mocker.Mock(active=True)
+    redis_store.redis_store.pipeline.return_value.execute.return_value = [0, 1, 1, True]
+    return redis_store
+
+
+@pytest.fixture
+def session_pool(notify_api, mocker, redis_store):
+    pool = WebhookSessionPool()
+    with set_config_values(notify_api, {
+        'WEBHOOK_POOL_SIZE': 2,
+        'WEBHOOK_CONNECT_TIMEOUT': 1,
+        'WEBHOOK_READ_TIMEOUT': 5,
+        'WEBHOOK_MAX_IN_FLIGHT_PER_HOST': 2,
+    }):
+        pool.init_app(notify_api, mocker.Mock(), redis_store)
+    return pool
+
+
+def test_post_uses_one_session_per_host(session_pool):
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post('https://some.host/callback', status_code=200)
+        request_mock.post('https://other.host/callback', status_code=200)
+
+        session_pool.post('https://some.host/callback', data='{}', headers={})
+        session_pool.post('https://some.host/callback?again', data='{}', headers={})
+        session_pool.post('https://other.host/callback', data='{}', headers={})
+
+    assert request_mock.call_count == 3
+    assert request_mock.request_history[0].timeout == (1, 5)
+    assert set(session_pool._sessions) == {'https://some.host', 'https://other.host'}
+    session_pool.statsd_client.incr.assert_called_with('callback.webhook.connection.reused')
+
+
+def test_post_releases_in_flight_slot(session_pool, redis_store):
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post('https://some.host/callback', status_code=200)
+        session_pool.post('https://some.host/callback', data='{}', headers={})
+
+    pipeline = redis_store.redis_store.pipeline.return_value
+    token = list(pipeline.zadd.call_args[0][1])[0]
+    pipeline.zadd.assert_called_once()
+    assert pipeline.zadd.call_args[0][0] == 'webhook-in-flight-https://some.host'
+    redis_store.redis_store.zrem.assert_called_once_with('webhook-in-flight-https://some.host', token)
+
+
+def test_post_raises_when_host_is_at_its_in_flight_limit(session_pool, redis_store):
+    redis_store.redis_store.pipeline.return_value.execute.return_value = [0, 1, 3, True]
+
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post('https://some.host/callback', status_code=200)
+        with pytest.raises(WebhookHostBusyError):
+            session_pool.post('https://some.host/callback', data='{}', headers={})
+
+    assert request_mock.call_count == 0
+    redis_store.redis_store.zrem.assert_called_once()
+    session_pool.statsd_client.incr.assert_called_with('callback.webhook.host-limit-reached')
+
+
+def test_post_does_not_limit_in_flight_callbacks_without_redis(session_pool, redis_store):
+    redis_store.active = False
+
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post('https://some.host/callback', status_code=200)
+        session_pool.post('https://some.host/callback', data='{}', headers={})
+
+    assert request_mock.call_count == 1
+    redis_store.redis_store.pipeline.assert_not_called()
+
+
+def test_post_does_not_limit_in_flight_callbacks_if_redis_fails(session_pool, redis_store):
+    redis_store.redis_store.pipeline.return_value.execute.side_effect = ConnectionError
+    redis_store.redis_store.zrem.side_effect = ConnectionError
+
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post('https://some.host/callback', status_code=200)
+        session_pool.post('https://some.host/callback', data='{}', headers={})
+
+    assert request_mock.call_count == 1
+    redis_store.redis_store.zrem.assert_not_called()
+    session_pool.statsd_client.incr.assert_any_call('callback.webhook.host-limit-unavailable')
+
+
+def test_post_releases_in_flight_slot_even_if_redis_fails(session_pool, redis_store):
+    redis_store.redis_store.zrem.side_effect = ConnectionError
+
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post('https://some.host/callback', status_code=200)
+        response = session_pool.post('https://some.host/callback', data='{}', headers={})
+
+    assert response.status_code == 200
+    redis_store.redis_store.zrem.assert_called_once()
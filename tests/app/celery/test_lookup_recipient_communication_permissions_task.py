@@ -6,9 +6,11 @@ from app.celery.lookup_recipient_communication_permissions_task import (
     lookup_recipient_communication_permissions,
     recipient_has_given_permission
 )
+from app.feature_flags import FeatureFlag
 from app.models import NOTIFICATION_PREFERENCES_DECLINED, SMS_TYPE, RecipientIdentifier, Notification
 from app.va.va_profile.va_profile_client import VAProfileClient
 from app.va.identifier import IdentifierType
+from tests.app.factories.feature_flag import mock_feature_flag
 
 
 @pytest.fixture
@@ -131,6 +133,28 @@ def test_recipient_has_given_permission_should_return_true_if_user_grants_permis
     )
 
 
+def test_recipient_has_given_permission_uses_local_cache_when_enabled(
+        client, mocker, mock_communication_item
+):
+    mock_feature_flag(mocker, FeatureFlag.VA_PROFILE_LOCAL_CACHE_PERMISSIONS_ENABLED, 'True')
+    mocked_va_profile_client = mocker.patch(
+        'app.celery.lookup_recipient_communication_permissions_task.va_profile_client'
+    )
+    mock_is_communication_allowed = mocker.patch(
+        'app.celery.lookup_recipient_communication_permissions_task.is_communication_allowed', return_value=False
+    )
+
+    mock_task = mocker.Mock()
+    assert not recipient_has_given_permission(
+        mock_task, 'VAPROFILEID', '1', 'some-notification-id', SMS_TYPE, 'some-communication-id'
+    )
+
+    mock_is_communication_allowed.assert_called_once_with(
+        '1', 'some-va-profile-item-id', 'some-notification-id', SMS_TYPE
+    )
+    mocked_va_profile_client.get_is_communication_allowed.assert_not_called()
+
+
 @pytest.mark.parametrize(('notification_type'), ['sms', 'email'])
 def test_recipient_has_given_permission_is_called_with_va_profile_id(
     client, mocker, notification_type
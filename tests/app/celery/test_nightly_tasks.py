@@ -15,7 +15,9 @@ from app.celery.nightly_tasks import (
     delete_inbound_sms,
     delete_letter_notifications_older_than_retention,
     delete_sms_notifications_older_than_retention,
+    maintain_notification_partitions,
     raise_alert_if_letter_notifications_still_sending,
+    reconcile_notification_stats_counters,
     remove_letter_csv_files,
     remove_sms_email_csv_files,
     remove_transformed_dvla_files,
@@ -28,7 +30,10 @@ from app.celery.nightly_tasks import (
 from app.celery.service_callback_tasks import create_delivery_status_callback_data
 from app.clients.performance_platform.performance_platform_client import PerformancePlatformClient
 from app.config import QueueNames
+from app.dao.notification_partitions_dao import NotificationPartition
+from app.dao.service_callback_api_dao import get_service_delivery_status_callback_api_for_service
 from app.exceptions import NotificationTechnicalFailureException
+from app.feature_flags import FeatureFlag
 from app.models import (
     LETTER_TYPE,
     SMS_TYPE,
@@ -46,6 +51,8 @@ from tests.app.db import (
 )
 
 from tests.app.conftest import datetime_in_past
+from tests.app.factories.feature_flag import mock_feature_flag
+from tests.conftest import set_config, set_config_values
 
 
 def mock_s3_get_list_match(bucket_name, subfolder='', suffix='', last_modified=None):
@@ -175,6 +182,22 @@ def test_should_call_delete_letter_notifications_more_than_week_in_task(notify_a
     mocked.assert_called_once_with('letter')
 
 
+@pytest.mark.parametrize('task, notification_type', [
+    (delete_sms_notifications_older_than_retention, 'sms'),
+    (delete_email_notifications_older_than_retention, 'email'),
+    (delete_letter_notifications_older_than_retention, 'letter'),
+])
+def test_delete_notifications_tasks_use_batched_purge_when_enabled(notify_api, mocker, task, notification_type):
+    mock_feature_flag(mocker, FeatureFlag.BATCHED_RETENTION_PURGE_ENABLED, 'True')
+    mock_purge = mocker.patch('app.celery.nightly_tasks.purge_notifications_older_than_retention_by_type')
+    mock_delete = mocker.patch('app.celery.nightly_tasks.delete_notifications_older_than_retention_by_type')
+
+    task()
+
+    mock_purge.assert_called_once_with(notification_type)
+    mock_delete.assert_not_called()
+
+
 def test_update_status_of_notifications_after_timeout(notify_api, sample_template):
     with notify_api.test_request_context():
         not1 = create_notification(
@@ -239,6 +262,29 @@ def test_timeout_notifications_sends_status_update_to_service(client, sample_tem
     mocked.assert_called_once_with([callback_id, str(notification.id), encrypted_data], queue=QueueNames.CALLBACKS)
 
 
+def test_timeout_notifications_looks_up_callback_api_once_per_service_and_status(notify_api, sample_template, mocker):
+    create_service_callback_api(service=sample_template.service, notification_statuses=NOTIFICATION_STATUS_TYPES_FAILED)
+    mocked = mocker.patch('app.celery.service_callback_tasks.send_delivery_status_to_service.apply_async')
+    mock_get_callback_api = mocker.patch(
+        'app.celery.nightly_tasks.get_service_delivery_status_callback_api_for_service',
+        wraps=get_service_delivery_status_callback_api_for_service
+    )
+    for _ in range(3):
+        create_notification(
+            template=sample_template,
+            status='sending',
+            created_at=datetime.utcnow() - timedelta(
+                seconds=current_app.config.get('SENDING_NOTIFICATIONS_TIMEOUT_PERIOD') + 10))
+
+    with set_config(notify_api, 'TIMEOUT_NOTIFICATIONS_BATCH_SIZE', 2):
+        timeout_notifications()
+
+    mock_get_callback_api.assert_called_once_with(
+        service_id=sample_template.service_id, notification_status='temporary-failure'
+    )
+    assert mocked.call_count == 3
+
+
 def test_send_daily_performance_stats_calls_does_not_send_if_inactive(client, mocker):
     send_mock = mocker.patch(
         'app.celery.nightly_tasks.total_sent_notifications.send_total_notifications_sent_for_day_stats')  # noqa
@@ -550,3 +596,86 @@ def test_letter_not_raise_alert_if_no_files_do_not_cause_error(mocker, notify_db
     letter_raise_alert_if_no_ack_file_for_zip()
 
     assert mock_file_list.call_count == 2
+
+
+@freeze_time('2021-06-15T14:20:00')
+def test_reconcile_notification_stats_counters(notify_api, mocker):
+    counter = mocker.patch('app.celery.nightly_tasks.notification_stats_counter')
+    counter.active = True
+    counter.reconcile.side_effect = lambda start_date, end_date, fetch_rows: fetch_rows()
+    mock_fetch = mocker.patch(
+        'app.celery.nightly_tasks.dao_fetch_notification_stats_by_hour', return_value=['row']
+    )
+
+    reconcile_notification_stats_counters()
+
+    # midnight yesterday, local time, in UTC until the end of the current hour
+    mock_fetch.assert_called_once_with(datetime(2021, 6, 14, 4, 0), datetime(2021, 6, 15, 15, 0))
+    assert counter.reconcile.call_args[0][:2] == (datetime(2021, 6, 14, 4, 0), datetime(2021, 6, 15, 15, 0))
+
+
+@freeze_time('2021-06-15T02:20:00')
+def test_reconcile_notification_stats_counters_uses_local_date(notify_api, mocker):
+    counter = mocker.patch('app.celery.nightly_tasks.notification_stats_counter')
+    counter.active = True
+    counter.reconcile.side_effect = lambda start_date, end_date, fetch_rows: fetch_rows()
+    mock_fetch = mocker.patch('app.celery.nightly_tasks.dao_fetch_notification_stats_by_hour', return_value=[])
+
+    reconcile_notification_stats_counters()
+
+    # still the 14th locally, so from midnight on the 13th
+    mock_fetch.assert_called_once_with(datetime(2021, 6, 13, 4, 0), datetime(2021, 6, 15, 3, 0))
+
+
+def test_reconcile_notification_stats_counters_does_nothing_when_counters_inactive(notify_api, mocker):
+    counter = mocker.patch('app.celery.nightly_tasks.notification_stats_counter')
+    counter.active = False
+    mock_fetch = mocker.patch('app.celery.nightly_tasks.dao_fetch_notification_stats_by_hour')
+
+    reconcile_notification_stats_counters()
+
+    mock_fetch.assert_not_called()
+    counter.reconcile.assert_not_called()
+
+
+@freeze_time('2021-06-15T14:20:00')
+def test_maintain_notification_partitions_creates_and_drops_partitions(notify_api, mocker):
+    mocker.patch('app.celery.nightly_tasks.dao_is_partitioned', return_value=True)
+    mock_create = mocker.patch('app.celery.nightly_tasks.dao_create_partitions', return_value=[])
+    mock_drop_notifications = mocker.patch(
+        'app.celery.nightly_tasks.drop_notification_partitions_older_than_retention', return_value=[]
+    )
+    mocker.patch('app.celery.nightly_tasks.dao_get_partitions', return_value=[
+        NotificationPartition('notification_history_legacy', None, datetime(2021, 5, 16, 4, 0)),
+        NotificationPartition(
+            'notification_history_p20210516', datetime(2021, 5, 16, 4, 0), datetime(2021, 5, 17, 4, 0)
+        ),
+    ])
+    mock_drop_partition = mocker.patch('app.celery.nightly_tasks.dao_drop_partition')
+
+    with set_config_values(notify_api, {
+        'NOTIFICATION_PARTITIONS_AHEAD_DAYS': 14,
+        'NOTIFICATION_HISTORY_PARTITION_RETENTION_DAYS': 30,
+    }):
+        maintain_notification_partitions()
+
+    assert mock_create.call_args_list == [
+        call('notifications', datetime(2021, 6, 29, 14, 20)),
+        call('notification_history', datetime(2021, 6, 29, 14, 20)),
+    ]
+    mock_drop_notifications.assert_called_once_with()
+    mock_drop_partition.assert_called_once_with('notification_history', 'notification_history_legacy')
+
+
+def test_maintain_notification_partitions_does_nothing_for_tables_that_are_not_partitioned(notify_api, mocker):
+    mocker.patch('app.celery.nightly_tasks.dao_is_partitioned', return_value=False)
+    mock_create = mocker.patch('app.celery.nightly_tasks.dao_create_partitions')
+    mock_drop_notifications = mocker.patch('app.celery.nightly_tasks.drop_notification_partitions_older_than_retention')
+    mock_drop_partition = mocker.patch('app.celery.nightly_tasks.dao_drop_partition')
+
+    with set_config(notify_api, 'NOTIFICATION_HISTORY_PARTITION_RETENTION_DAYS', 30):
+        maintain_notification_partitions()
+
+    mock_create.assert_not_called()
+    mock_drop_notifications.assert_not_called()
+    mock_drop_partition.assert_not_called()
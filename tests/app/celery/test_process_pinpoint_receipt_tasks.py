@@ -130,10 +130,65 @@ def test_process_pinpoint_results_should_not_update_notification_status_if_statu
     mock_callback.assert_not_called()
 
 
-def pinpoint_notification_callback_record(reference, event_type='_SMS.SUCCESS', record_status='DELIVERED'):
+def test_process_pinpoint_results_batch_updates_notifications_and_queues_callbacks_together(
+        mocker, db_session, sample_template
+):
+    mocker.patch('app.celery.process_pinpoint_receipt_tasks.is_feature_enabled', return_value=True)
+    mock_callbacks = mocker.patch('app.notifications.process_client_response.check_and_queue_callback_tasks')
+
+    sending = create_notification(sample_template, reference='ref-1', status=NOTIFICATION_SENDING)
+    sent = create_notification(sample_template, reference='ref-2', status=NOTIFICATION_SENT)
+    delivered = create_notification(sample_template, reference='ref-3', status=NOTIFICATION_DELIVERED)
+
+    assert process_pinpoint_receipt_tasks.process_pinpoint_results_batch([
+        pinpoint_notification_callback_record(reference='ref-1', event_timestamp=1553104954322),
+        pinpoint_notification_callback_record(
+            reference='ref-2', event_type='_SMS.FAILURE', record_status='SPAM', event_timestamp=1553104954322
+        ),
+        pinpoint_notification_callback_record(
+            reference='ref-3', event_type='_SMS.FAILURE', record_status='SPAM', event_timestamp=1553104954322
+        ),
+        # an earlier event for ref-1, received after the later one
+        pinpoint_notification_callback_record(
+            reference='ref-1', event_type='_SMS.BUFFERED', record_status='SUCCESSFUL', event_timestamp=1553104954000
+        ),
+    ])
+
+    assert notifications_dao.get_notification_by_id(sending.id).status == NOTIFICATION_DELIVERED
+    assert notifications_dao.get_notification_by_id(sent.id).status == NOTIFICATION_PERMANENT_FAILURE
+    assert notifications_dao.get_notification_by_id(delivered.id).status == NOTIFICATION_DELIVERED
+
+    mock_callbacks.assert_called_once()
+    assert {notification.id for notification in mock_callbacks.call_args[0][0]} == {sending.id, sent.id}
+
+
+def test_process_pinpoint_results_batch_retries_receipts_for_new_notifications_only(
+        mocker, db_session, sample_template
+):
+    mocker.patch('app.celery.process_pinpoint_receipt_tasks.is_feature_enabled', return_value=True)
+    mocker.patch('app.notifications.process_client_response.check_and_queue_callback_tasks')
+    mock_retry = mocker.patch('app.celery.process_pinpoint_receipt_tasks.process_pinpoint_results_batch.retry')
+
+    notification = create_notification(sample_template, reference='ref-1', status=NOTIFICATION_SENDING)
+    now_in_ms = int(datetime.datetime.utcnow().timestamp() * 1000)
+    new_receipt = pinpoint_notification_callback_record(reference='ref-new', event_timestamp=now_in_ms)
+
+    process_pinpoint_receipt_tasks.process_pinpoint_results_batch([
+        pinpoint_notification_callback_record(reference='ref-1', event_timestamp=now_in_ms),
+        new_receipt,
+        pinpoint_notification_callback_record(reference='ref-old'),
+    ])
+
+    assert notifications_dao.get_notification_by_id(notification.id).status == NOTIFICATION_DELIVERED
+    mock_retry.assert_called_once_with(args=[[new_receipt]], queue='retry-tasks')
+
+
+def pinpoint_notification_callback_record(
+        reference, event_type='_SMS.SUCCESS', record_status='DELIVERED', event_timestamp=1553104954322
+):
     pinpoint_message = {
         "event_type": event_type,
-        "event_timestamp": 1553104954322,
+        "event_timestamp": event_timestamp,
         "arrival_timestamp": 1553104954064,
         "event_version": "3.1",
         "application": {
@@ -242,6 +242,46 @@ def test_ses_callback_should_not_retry_if_notification_is_old(client, notify_db,
         assert mock_retry.call_count == 0
 
 
+def test_process_ses_results_batch_updates_notifications_and_queues_callbacks_together(
+        sample_email_template, mocker
+):
+    mock_callbacks = mocker.patch('app.notifications.process_client_response.check_and_queue_callback_tasks')
+    mock_dup = mocker.patch('app.celery.process_ses_receipts_tasks.notifications_dao.duplicate_update_warning')
+    sending = create_notification(sample_email_template, reference='ref1', status='sending')
+    pending = create_notification(sample_email_template, reference='ref2', status='pending')
+    delivered = create_notification(sample_email_template, reference='ref3', status='delivered')
+
+    assert process_ses_receipts_tasks.process_ses_results_batch([
+        ses_notification_callback(reference='ref1'),
+        ses_soft_bounce_callback(reference='ref2'),
+        ses_notification_callback(reference='ref3'),
+    ])
+
+    assert get_notification_by_id(sending.id).status == 'delivered'
+    assert get_notification_by_id(pending.id).status == 'temporary-failure'
+    mock_dup.assert_called_once_with(delivered, 'delivered')
+
+    mock_callbacks.assert_called_once()
+    assert {notification.id for notification in mock_callbacks.call_args[0][0]} == {sending.id, pending.id}
+
+
+def test_process_ses_results_batch_retries_receipts_for_new_notifications_only(
+        sample_email_template, mocker
+):
+    mock_retry = mocker.patch('app.celery.process_ses_receipts_tasks.process_ses_results_batch.retry')
+    notification = create_notification(sample_email_template, reference='ref1', status='sending')
+    new_receipt = ses_notification_callback(reference='ref-new')
+
+    with freeze_time('2017-11-17T12:14:03.646Z'):
+        process_ses_receipts_tasks.process_ses_results_batch([
+            ses_notification_callback(reference='ref1'),
+            new_receipt,
+        ])
+
+    assert get_notification_by_id(notification.id).status == 'delivered'
+    mock_retry.assert_called_once_with(args=[[new_receipt]], queue='retry-tasks')
+
+
 def test_ses_callback_does_not_call_send_delivery_status_if_no_db_entry(
         client,
         notify_db_session,
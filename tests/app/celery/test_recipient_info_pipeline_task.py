@@ -0,0 +1,175 @@
+import uuid
+
+import pytest
+from celery.exceptions import Retry
+
+from app.celery.recipient_info_pipeline_task import (
+    CONTACT_INFO_STAGE,
+    MPI_STAGE,
+    ONSITE_STAGE,
+    PERMISSIONS_STAGE,
+    lookup_recipient_info,
+)
+from app.exceptions import NotificationPermanentFailureException, NotificationTechnicalFailureException
+from app.models import (
+    NOTIFICATION_PERMANENT_FAILURE,
+    NOTIFICATION_PREFERENCES_DECLINED,
+    NOTIFICATION_TECHNICAL_FAILURE,
+    SMS_TYPE,
+    RecipientIdentifier,
+)
+from app.va.identifier import IdentifierType
+from app.va.mpi import BeneficiaryDeceasedException, MpiRetryableException
+from app.va.va_profile import VAProfileRetryableException
+
+EXAMPLE_VA_PROFILE_ID = '135'
+notification_id = str(uuid.uuid4())
+
+
+@pytest.fixture
+def notification(mocker):
+    return mocker.Mock(
+        id=notification_id,
+        notification_type=SMS_TYPE,
+        to=None,
+        template=mocker.Mock(id='some-template-id', communication_item_id='some-communication-item-id'),
+        recipient_identifiers={
+            IdentifierType.VA_PROFILE_ID.value: RecipientIdentifier(
+                notification_id=notification_id,
+                id_type=IdentifierType.VA_PROFILE_ID.value,
+                id_value=EXAMPLE_VA_PROFILE_ID
+            )
+        }
+    )
+
+
+@pytest.fixture
+def pipeline(mocker, notification):
+    mocker.patch('app.celery.recipient_info_pipeline_task.get_notification_by_id', return_value=notification)
+    mocker.patch(
+        'app.celery.recipient_info_pipeline_task.get_communication_item',
+        return_value=mocker.Mock(va_profile_item_id=5)
+    )
+    return mocker.Mock(
+        set_va_profile_id=mocker.patch('app.celery.recipient_info_pipeline_task.set_va_profile_id'),
+        get_contact_info=mocker.patch(
+            'app.celery.recipient_info_pipeline_task.get_contact_info', return_value='+16502532222'
+        ),
+        get_recipient_permission=mocker.patch(
+            'app.celery.recipient_info_pipeline_task.get_recipient_permission', return_value=True
+        ),
+        send_va_onsite_notification_task=mocker.patch(
+            'app.celery.recipient_info_pipeline_task.send_va_onsite_notification_task'
+        ),
+        dao_update_notification=mocker.patch('app.celery.recipient_info_pipeline_task.dao_update_notification'),
+        update_notification_status_by_id=mocker.patch(
+            'app.celery.recipient_info_pipeline_task.update_notification_status_by_id'
+        ),
+        retry=mocker.patch('app.celery.recipient_info_pipeline_task.lookup_recipient_info.retry'),
+    )
+
+
+def test_lookup_recipient_info_runs_every_stage(client, notification, pipeline):
+    lookup_recipient_info(notification_id, onsite_enabled=True, check_permissions=True)
+
+    pipeline.set_va_profile_id.assert_not_called()
+    pipeline.get_contact_info.assert_called_once_with(EXAMPLE_VA_PROFILE_ID, SMS_TYPE, notification_id)
+    pipeline.get_recipient_permission.assert_called_once_with(
+        IdentifierType.VA_PROFILE_ID.value, EXAMPLE_VA_PROFILE_ID, notification_id, SMS_TYPE, 5
+    )
+    pipeline.send_va_onsite_notification_task.apply_async.assert_called_once_with(
+        args=(EXAMPLE_VA_PROFILE_ID, 'some-template-id', True), queue='onsite-notification-tasks'
+    )
+    assert notification.to == '+16502532222'
+    pipeline.dao_update_notification.assert_called_once_with(notification)
+    pipeline.update_notification_status_by_id.assert_not_called()
+    pipeline.retry.assert_not_called()
+
+
+def test_lookup_recipient_info_looks_up_va_profile_id_first(client, notification, pipeline):
+    va_profile_identifier = notification.recipient_identifiers.pop(IdentifierType.VA_PROFILE_ID.value)
+    pipeline.set_va_profile_id.side_effect = lambda notification: notification.recipient_identifiers.update(
+        {IdentifierType.VA_PROFILE_ID.value: va_profile_identifier}
+    )
+
+    lookup_recipient_info(notification_id)
+
+    pipeline.set_va_profile_id.assert_called_once_with(notification)
+    pipeline.get_contact_info.assert_called_once_with(EXAMPLE_VA_PROFILE_ID, SMS_TYPE, notification_id)
+    pipeline.get_recipient_permission.assert_not_called()
+    pipeline.send_va_onsite_notification_task.apply_async.assert_not_called()
+
+
+def test_lookup_recipient_info_fails_notification_for_permanent_mpi_error(client, notification, pipeline):
+    notification.recipient_identifiers.clear()
+    pipeline.set_va_profile_id.side_effect = BeneficiaryDeceasedException
+
+    with pytest.raises(NotificationPermanentFailureException):
+        lookup_recipient_info(notification_id)
+
+    pipeline.update_notification_status_by_id.assert_called_once_with(
+        notification_id, NOTIFICATION_PERMANENT_FAILURE, status_reason=BeneficiaryDeceasedException.failure_reason
+    )
+    pipeline.get_contact_info.assert_not_called()
+
+
+def test_lookup_recipient_info_retries_mpi_stage(client, notification, pipeline):
+    notification.recipient_identifiers.clear()
+    pipeline.set_va_profile_id.side_effect = MpiRetryableException
+    pipeline.retry.side_effect = Retry
+
+    with pytest.raises(Retry):
+        lookup_recipient_info(notification_id, stage_retries={MPI_STAGE: 3})
+
+    assert pipeline.retry.call_args[1]['kwargs']['stage_retries'] == {MPI_STAGE: 4}
+    pipeline.get_contact_info.assert_not_called()
+
+
+def test_lookup_recipient_info_stops_if_recipient_declined(client, notification, pipeline):
+    pipeline.get_recipient_permission.return_value = False
+
+    lookup_recipient_info(notification_id, check_permissions=True)
+
+    pipeline.update_notification_status_by_id.assert_called_once_with(
+        notification_id, NOTIFICATION_PREFERENCES_DECLINED, status_reason='Contact preferences set to false'
+    )
+    pipeline.retry.assert_not_called()
+
+
+def test_lookup_recipient_info_retries_only_failed_stages(client, notification, pipeline):
+    pipeline.get_contact_info.side_effect = VAProfileRetryableException
+
+    lookup_recipient_info(notification_id, onsite_enabled=True, check_permissions=True)
+
+    pipeline.retry.assert_called_once()
+    assert pipeline.retry.call_args[1]['args'] == [notification_id]
+    assert pipeline.retry.call_args[1]['kwargs'] == {
+        'onsite_enabled': True,
+        'check_permissions': True,
+        'completed_stages': sorted([ONSITE_STAGE, PERMISSIONS_STAGE]),
+        'stage_retries': {CONTACT_INFO_STAGE: 1},
+    }
+    pipeline.dao_update_notification.assert_not_called()
+
+
+def test_lookup_recipient_info_skips_completed_stages_on_retry(client, notification, pipeline):
+    lookup_recipient_info(
+        notification_id, onsite_enabled=True, check_permissions=True,
+        completed_stages=[ONSITE_STAGE, PERMISSIONS_STAGE], stage_retries={CONTACT_INFO_STAGE: 1}
+    )
+
+    pipeline.send_va_onsite_notification_task.apply_async.assert_not_called()
+    pipeline.get_recipient_permission.assert_not_called()
+    assert notification.to == '+16502532222'
+
+
+def test_lookup_recipient_info_fails_notification_when_stage_retries_run_out(client, notification, pipeline):
+    pipeline.get_recipient_permission.side_effect = VAProfileRetryableException
+
+    with pytest.raises(NotificationTechnicalFailureException):
+        lookup_recipient_info(notification_id, check_permissions=True, stage_retries={PERMISSIONS_STAGE: 5})
+
+    pipeline.update_notification_status_by_id.assert_called_once_with(
+        notification_id, NOTIFICATION_TECHNICAL_FAILURE, status_reason=VAProfileRetryableException.failure_reason
+    )
+    pipeline.retry.assert_not_called()
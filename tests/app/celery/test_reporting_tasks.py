@@ -21,8 +21,11 @@ from app.models import (
     EMAIL_TYPE,
     SMS_TYPE, FactNotificationStatus
 )
-from tests.app.db import create_service, create_template, create_notification, create_rate, create_letter_rate
+from tests.app.db import (
+    create_service, create_template, create_notification, create_notification_history, create_rate, create_letter_rate
+)
 from tests.app.factories.feature_flag import mock_feature_flag
+from tests.conftest import set_config
 
 
 def mocker_get_rate(
@@ -503,6 +506,41 @@ def test_create_nightly_notification_status_for_day_respects_local_timezone(samp
     assert noti_status[0].notification_status == 'created'
 
 
+@freeze_time('2019-01-05')
+@pytest.mark.parametrize('chunk_size', [0, 1])
+def test_create_nightly_notification_status_for_day_set_based(notify_db_session, notify_api, mocker, chunk_size):
+    mock_feature_flag(mocker, FeatureFlag.NIGHTLY_NOTIFICATION_STATUS_SET_BASED_ENABLED, 'True')
+    mock_timing = mocker.patch('app.celery.reporting_tasks.statsd_client.timing')
+    first_service = create_service(service_name='First Service')
+    first_template = create_template(service=first_service)
+    second_service = create_service(service_name='second Service')
+    second_template = create_template(service=second_service, template_type='email')
+
+    create_notification(template=first_template, status='delivered', created_at=datetime(2019, 1, 1, 12, 0))
+    create_notification(template=first_template, status='delivered', created_at=datetime(2019, 1, 1, 13, 0))
+    create_notification(template=first_template, status='delivered')
+    create_notification_history(
+        template=second_template, status='temporary-failure', created_at=datetime(2019, 1, 1, 12, 0)
+    )
+
+    with set_config(notify_api, 'NIGHTLY_NOTIFICATION_STATUS_SERVICE_CHUNK_SIZE', chunk_size):
+        create_nightly_notification_status_for_day('2019-01-01')
+
+    new_data = FactNotificationStatus.query.order_by(FactNotificationStatus.notification_type).all()
+
+    assert len(new_data) == 2
+    assert new_data[0].bst_date == date(2019, 1, 1)
+    assert new_data[0].service_id == second_service.id
+    assert new_data[0].notification_status == 'temporary-failure'
+    assert new_data[0].notification_count == 1
+    assert new_data[1].service_id == first_service.id
+    assert new_data[1].notification_status == 'delivered'
+    assert new_data[1].notification_count == 2
+
+    expected_path = 'set-based-chunked' if chunk_size else 'set-based'
+    assert mock_timing.call_args[0][0] == f'tasks.create-nightly-notification-status-for-day.{expected_path}'
+
+
 def test_generate_daily_notification_status_csv_report(notify_api, mocker):
     service_id = uuid.uuid4()
     template_id = uuid.uuid4()
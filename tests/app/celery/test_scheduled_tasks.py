@@ -352,6 +352,42 @@ def test_replay_created_notifications(
     mocked.assert_called_once()
 
 
+def test_replay_created_notifications_does_not_replay_a_notification_twice_in_overlapping_runs(
+    notify_db_session, sample_email_template, mocker
+):
+    mocked = mocker.patch('app.celery.provider_tasks.deliver_email.apply_async')
+    older_than = (60 * 60 * 4) + (60 * 15)  # 4 hours 15 minutes
+    for _ in range(3):
+        create_notification(template=sample_email_template,
+                            created_at=datetime.utcnow() - timedelta(seconds=older_than),
+                            status='created')
+
+    replay_created_notifications()
+    replay_created_notifications()
+
+    assert mocked.call_count == 3
+
+
+def test_replay_created_notifications_logs_only_notifications_that_were_queued(
+    notify_db_session, sample_email_template, mocker
+):
+    older_than = (60 * 60 * 4) + (60 * 15)  # 4 hours 15 minutes
+    for _ in range(3):
+        create_notification(template=sample_email_template,
+                            created_at=datetime.utcnow() - timedelta(seconds=older_than),
+                            status='created')
+    mocker.patch(
+        'app.celery.scheduled_tasks.send_notifications_to_queue', side_effect=lambda group, **kwargs: group[:1]
+    )
+    mock_logger = mocker.patch('app.celery.scheduled_tasks.current_app.logger.info')
+
+    replay_created_notifications()
+
+    mock_logger.assert_called_once_with(
+        "Sent 2 email notifications to the delivery queue because the notification status was created."
+    )
+
+
 def test_check_job_status_task_does_not_raise_error(sample_template):
     create_job(
         template=sample_template,
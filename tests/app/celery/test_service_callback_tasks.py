@@ -4,17 +4,22 @@ from datetime import datetime
 
 import pytest
 import requests_mock
+from celery.exceptions import Retry
 from flask import current_app
 from freezegun import freeze_time
 from sqlalchemy.exc import SQLAlchemyError
 
 from app import (DATETIME_FORMAT, encryption)
-from app.celery.exceptions import NonRetryableException
+from app.callback.webhook_session_pool import WebhookHostBusyError
+from app.celery.exceptions import NonRetryableException, PartialBatchException
 from app.celery.service_callback_tasks import (
+    RELEASE_LOCK_SCRIPT,
     send_complaint_to_service,
     send_complaint_to_vanotify,
     check_and_queue_callback_task,
+    check_and_queue_callback_tasks,
     publish_complaint,
+    send_delivery_status_batch_to_service,
     send_inbound_sms_to_service
 )
 
@@ -22,6 +27,7 @@ from app.config import QueueNames
 from app.exceptions import NotificationTechnicalFailureException
 from app.models import Notification, ServiceCallback, Complaint, Service, Template, INBOUND_SMS_CALLBACK_TYPE
 from app.model import User
+from tests.conftest import set_config_values
 from tests.app.db import (
     create_complaint,
     create_notification,
@@ -278,6 +284,329 @@ def test_check_and_queue_callback_task_queues_task_if_service_callback_api_exist
     )
 
 
+@pytest.mark.parametrize('buffered, expected_countdown', [
+    (1, 2.5),
+    (100, 0),
+])
+def test_check_and_queue_callback_task_buffers_status_update_for_batched_callback(
+        notify_api, mocker, buffered, expected_countdown
+):
+    mock_notification = create_mock_notification(mocker)
+    mock_service_callback_api = mocker.Mock(ServiceCallback, id=uuid.uuid4(), batch_callbacks=True)
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store', active=True)
+    mock_redis.redis_store.rpush.return_value = buffered
+
+    mocker.patch(
+        'app.celery.service_callback_tasks.get_service_delivery_status_callback_api_for_service',
+        return_value=mock_service_callback_api
+    )
+    mocker.patch('app.celery.service_callback_tasks.create_delivery_status_callback_data', return_value='data')
+    mock_send_delivery_status = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_to_service.apply_async'
+    )
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+
+    with set_config_values(notify_api, {
+        'SERVICE_CALLBACK_BATCH_SIZE': 100,
+        'SERVICE_CALLBACK_BATCH_LINGER_MS': 2500,
+    }):
+        check_and_queue_callback_task(mock_notification)
+
+    mock_redis.redis_store.rpush.assert_called_once_with(
+        f'service-callback-batch-{mock_service_callback_api.id}', 'data'
+    )
+    mock_send_delivery_status.assert_not_called()
+    mock_send_batch.assert_called_once_with(
+        [str(mock_service_callback_api.id)], queue=QueueNames.CALLBACKS, countdown=expected_countdown, producer=None
+    )
+
+
+def test_check_and_queue_callback_task_does_not_queue_batch_until_it_is_full(notify_api, mocker):
+    mock_service_callback_api = mocker.Mock(ServiceCallback, id=uuid.uuid4(), batch_callbacks=True)
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store', active=True)
+    mock_redis.redis_store.rpush.return_value = 2
+
+    mocker.patch(
+        'app.celery.service_callback_tasks.get_service_delivery_status_callback_api_for_service',
+        return_value=mock_service_callback_api
+    )
+    mocker.patch('app.celery.service_callback_tasks.create_delivery_status_callback_data', return_value='data')
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+
+    check_and_queue_callback_task(create_mock_notification(mocker))
+
+    mock_send_batch.assert_not_called()
+
+
+def test_check_and_queue_callback_task_sends_status_update_on_its_own_if_redis_fails(notify_api, mocker):
+    mock_service_callback_api = mocker.Mock(ServiceCallback, id=uuid.uuid4(), batch_callbacks=True)
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store', active=True)
+    mock_redis.redis_store.rpush.side_effect = ConnectionError
+
+    mocker.patch(
+        'app.celery.service_callback_tasks.get_service_delivery_status_callback_api_for_service',
+        return_value=mock_service_callback_api
+    )
+    mocker.patch('app.celery.service_callback_tasks.create_delivery_status_callback_data', return_value='data')
+    mock_send_delivery_status = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_to_service.apply_async'
+    )
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+    mock_notification = create_mock_notification(mocker)
+
+    check_and_queue_callback_task(mock_notification)
+
+    mock_send_batch.assert_not_called()
+    mock_send_delivery_status.assert_called_once_with(
+        [mock_service_callback_api.id, str(mock_notification.id), 'data'],
+        queue=QueueNames.CALLBACKS
+    )
+
+
+def test_send_delivery_status_batch_to_service_posts_buffered_updates_as_one_request(notify_db_session, mocker):
+    callback_api, template = _set_up_test_data('sms', 'delivery_status')
+    notifications = [create_notification(template=template, status='delivered') for _ in range(2)]
+    encrypted_status_updates = [
+        _set_up_data_for_status_update(callback_api, notification) for notification in notifications
+    ]
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store')
+    mock_redis.redis_store.set.return_value = True
+    mock_redis.redis_store.lrange.return_value = [
+        status_update.encode('utf-8') for status_update in encrypted_status_updates
+    ]
+    mock_redis.redis_store.llen.return_value = 0
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+    key = f'service-callback-batch-{callback_api.id}'
+
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post(callback_api.url, json={}, status_code=200)
+        send_delivery_status_batch_to_service(callback_api.id)
+
+    assert request_mock.call_count == 1
+    assert [payload['id'] for payload in request_mock.request_history[0].json()] == [
+        str(notification.id) for notification in notifications
+    ]
+    assert request_mock.request_history[0].headers["Authorization"] == f"Bearer {callback_api.bearer_token}"
+    mock_redis.redis_store.ltrim.assert_called_once_with(key, 2, -1)
+    lock_token = mock_redis.redis_store.set.call_args[0][1]
+    mock_redis.redis_store.eval.assert_called_once_with(RELEASE_LOCK_SCRIPT, 1, f'{key}-lock', lock_token)
+    mock_redis.redis_store.delete.assert_not_called()
+    mock_send_batch.assert_not_called()
+
+
+def test_send_delivery_status_batch_to_service_keeps_buffered_updates_until_they_are_sent(
+        notify_db_session, mocker
+):
+    callback_api, template = _set_up_test_data('sms', 'delivery_status')
+    notification = create_notification(template=template, status='delivered')
+    encrypted_status_update = _set_up_data_for_status_update(callback_api, notification)
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store')
+    mock_redis.redis_store.set.return_value = True
+    mock_redis.redis_store.lrange.return_value = [encrypted_status_update.encode('utf-8')]
+    mock_redis.redis_store.llen.return_value = 1
+    mocker.patch(
+        'app.celery.service_callback_tasks._send_status_update_batch', side_effect=SQLAlchemyError
+    )
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+
+    with pytest.raises(SQLAlchemyError):
+        send_delivery_status_batch_to_service(callback_api.id)
+
+    mock_redis.redis_store.ltrim.assert_not_called()
+    mock_redis.redis_store.eval.assert_called_once()
+    mock_send_batch.assert_called_once_with(
+        [str(callback_api.id)],
+        queue=QueueNames.CALLBACKS,
+        countdown=send_delivery_status_batch_to_service.default_retry_delay
+    )
+
+
+def test_send_delivery_status_batch_to_service_removes_buffered_updates_handed_to_a_retry(
+        notify_db_session, mocker
+):
+    callback_api, template = _set_up_test_data('sms', 'delivery_status')
+    notifications = [create_notification(template=template, status='delivered') for _ in range(2)]
+    encrypted_status_updates = [
+        _set_up_data_for_status_update(callback_api, notification) for notification in notifications
+    ]
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store')
+    mock_redis.redis_store.set.return_value = True
+    mock_redis.redis_store.lrange.return_value = [
+        status_update.encode('utf-8') for status_update in encrypted_status_updates
+    ]
+    mock_redis.redis_store.llen.return_value = 3
+    mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.retry', side_effect=Retry
+    )
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post(callback_api.url, json={}, status_code=501)
+        with pytest.raises(Retry):
+            send_delivery_status_batch_to_service(callback_api.id)
+
+    mock_redis.redis_store.ltrim.assert_called_once_with(f'service-callback-batch-{callback_api.id}', 2, -1)
+    mock_send_batch.assert_called_once_with([str(callback_api.id)], queue=QueueNames.CALLBACKS, countdown=0)
+
+
+def test_send_delivery_status_batch_to_service_leaves_locked_buffer_to_task_holding_lock(
+        notify_db_session, mocker
+):
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store')
+    mock_redis.redis_store.set.return_value = None
+
+    send_delivery_status_batch_to_service(uuid.uuid4())
+
+    mock_redis.redis_store.lrange.assert_not_called()
+    mock_redis.redis_store.eval.assert_not_called()
+
+
+def test_send_delivery_status_batch_to_service_requeues_buffer_if_redis_fails_to_lock_it(
+        notify_db_session, mocker
+):
+    callback_id = uuid.uuid4()
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store')
+    mock_redis.redis_store.set.side_effect = ConnectionError
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+
+    send_delivery_status_batch_to_service(callback_id)
+
+    mock_redis.redis_store.lrange.assert_not_called()
+    mock_send_batch.assert_called_once_with(
+        [str(callback_id)],
+        queue=QueueNames.CALLBACKS,
+        countdown=send_delivery_status_batch_to_service.default_retry_delay
+    )
+
+
+def test_send_delivery_status_batch_to_service_requeues_buffer_if_redis_fails_to_read_it(
+        notify_db_session, mocker
+):
+    callback_id = uuid.uuid4()
+    mock_redis = mocker.patch('app.celery.service_callback_tasks.redis_store')
+    mock_redis.redis_store.set.return_value = True
+    mock_redis.redis_store.lrange.side_effect = ConnectionError
+    mock_redis.redis_store.llen.side_effect = ConnectionError
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+
+    with pytest.raises(ConnectionError):
+        send_delivery_status_batch_to_service(callback_id)
+
+    mock_send_batch.assert_called_once_with(
+        [str(callback_id)],
+        queue=QueueNames.CALLBACKS,
+        countdown=send_delivery_status_batch_to_service.default_retry_delay
+    )
+
+
+def test_send_delivery_status_batch_to_service_retries_the_same_batch(notify_db_session, mocker):
+    callback_api, template = _set_up_test_data('sms', 'delivery_status')
+    notification = create_notification(template=template, status='delivered')
+    encrypted_status_updates = [_set_up_data_for_status_update(callback_api, notification)]
+    mock_send_buffered = mocker.patch('app.celery.service_callback_tasks._send_buffered_status_updates')
+    mock_retry = mocker.patch('app.celery.service_callback_tasks.send_delivery_status_batch_to_service.retry')
+
+    with requests_mock.Mocker() as request_mock:
+        request_mock.post(callback_api.url, json={}, status_code=501)
+        send_delivery_status_batch_to_service(callback_api.id, encrypted_status_updates)
+
+    mock_send_buffered.assert_not_called()
+    mock_retry.assert_called_once_with(
+        args=[callback_api.id, encrypted_status_updates], queue=QueueNames.RETRY
+    )
+
+
+def test_send_delivery_status_batch_to_service_retries_only_updates_that_were_not_sent(notify_db_session, mocker):
+    callback_api, template = _set_up_test_data('sms', 'delivery_status')
+    notifications = [create_notification(template=template, status='delivered') for _ in range(2)]
+    encrypted_status_updates = [
+        _set_up_data_for_status_update(callback_api, notification) for notification in notifications
+    ]
+    mocker.patch(
+        'app.models.ServiceCallback.send_batch',
+        side_effect=PartialBatchException('1 of 2 messages were not sent', [{'id': str(notifications[1].id)}])
+    )
+    mock_retry = mocker.patch('app.celery.service_callback_tasks.send_delivery_status_batch_to_service.retry')
+
+    send_delivery_status_batch_to_service(callback_api.id, encrypted_status_updates)
+
+    mock_retry.assert_called_once_with(
+        args=[callback_api.id, encrypted_status_updates[1:]], queue=QueueNames.RETRY
+    )
+
+
+def test_check_and_queue_callback_tasks_sends_queue_callbacks_in_batches(notify_api, mocker):
+    mock_service_callback_api = mocker.Mock(
+        ServiceCallback, id=uuid.uuid4(), batch_callbacks=False, callback_channel='queue'
+    )
+    mocker.patch(
+        'app.celery.service_callback_tasks.get_service_delivery_status_callback_api_for_service',
+        return_value=mock_service_callback_api
+    )
+    mocker.patch(
+        'app.celery.service_callback_tasks.create_delivery_status_callback_data',
+        side_effect=[f'data {i}' for i in range(12)]
+    )
+    mock_send_delivery_status = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_to_service.apply_async'
+    )
+    mock_send_batch = mocker.patch(
+        'app.celery.service_callback_tasks.send_delivery_status_batch_to_service.apply_async'
+    )
+    mocker.patch('app.celery.service_callback_tasks.notify_celery.producer_or_acquire')
+    service_id = uuid.uuid4()
+    notifications = [mocker.Mock(Notification, service_id=service_id, status='delivered') for _ in range(12)]
+
+    check_and_queue_callback_tasks(notifications)
+
+    mock_send_delivery_status.assert_not_called()
+    assert [call[0][0] for call in mock_send_batch.call_args_list] == [
+        [str(mock_service_callback_api.id), [f'data {i}' for i in range(10)]],
+        [str(mock_service_callback_api.id), ['data 10', 'data 11']],
+    ]
+
+
+def test_send_delivery_status_to_service_defers_callback_to_busy_host_without_using_a_retry(
+        notify_api, notify_db_session, mocker
+):
+    from app.celery.service_callback_tasks import send_delivery_status_to_service
+    callback_api, template = _set_up_test_data('sms', 'delivery_status')
+    notification = create_notification(template=template, status='delivered')
+    encrypted_data = _set_up_data_for_status_update(callback_api, notification)
+    mocker.patch(
+        'app.callback.webhook_callback_strategy.webhook_session_pool.post',
+        side_effect=WebhookHostBusyError('20 callbacks already in flight')
+    )
+    mock_retry = mocker.patch('app.celery.service_callback_tasks.send_delivery_status_to_service.retry')
+    mock_apply_async = mocker.patch('app.celery.service_callback_tasks.send_delivery_status_to_service.apply_async')
+
+    send_delivery_status_to_service(callback_api.id, notification.id, encrypted_status_update=encrypted_data)
+
+    mock_retry.assert_not_called()
+    mock_apply_async.assert_called_once_with(
+        [callback_api.id, notification.id, encrypted_data],
+        queue=QueueNames.RETRY,
+        countdown=notify_api.config['WEBHOOK_HOST_BUSY_RETRY_DELAY'],
+        retries=0
+    )
+
+
 def test_publish_complaint_results_in_invoking_handler(mocker, notify_api):
     notification_db = mocker.patch("app.dao.notifications_dao.update_notification_status_by_reference")
 
@@ -1,3 +1,4 @@
+import io
 import uuid
 from datetime import datetime, timedelta
 from unittest.mock import Mock, call
@@ -56,7 +57,7 @@ from tests.app.db import (
     create_notification_history
 )
 from tests.app.factories.feature_flag import mock_feature_flag
-from tests.conftest import set_config_values
+from tests.conftest import set_config, set_config_values
 
 
 class AnyStringWith(str):
@@ -414,6 +415,166 @@ def test_process_row_sends_letter_task(template_type, research_mode, expected_fu
         {},
         queue=expected_queue
     )
+
+# -------------- chunked job tests -------------- #
+
+
+@pytest.fixture
+def mock_producer(mocker):
+    return mocker.patch('app.celery.tasks.notify_celery.producer_or_acquire')
+
+
+def test_get_job_chunks_splits_rows_and_repeats_header():
+    lines = io.BytesIO('phone number,name\n+16502532221,a\n+16502532222,"b\nc"\n+16502532223,d\n'.encode('utf-8'))
+
+    chunks = list(tasks.get_job_chunks(lines, 2))
+
+    assert chunks == [
+        (0, 2, 'phone number,name\r\n+16502532221,a\r\n+16502532222,"b\nc"\r\n', 52),
+        (2, 1, 'phone number,name\r\n+16502532223,d\r\n', 67),
+    ]
+
+
+def test_get_job_chunks_starts_from_offset():
+    data = 'phone number,name\n+16502532221,a\n+16502532222,b\n'.encode('utf-8')
+
+    chunks = list(tasks.get_job_chunks(
+        io.BytesIO(data[33:]), 2, header=['phone number', 'name'], first_row_number=1, offset=33
+    ))
+
+    assert chunks == [(1, 1, 'phone number,name\r\n+16502532222,b\r\n', len(data))]
+
+
+def test_get_job_chunks_handles_empty_file():
+    assert list(tasks.get_job_chunks(io.BytesIO(b''), 2)) == []
+
+
+def _stream_job(csv_data):
+    data = csv_data.encode('utf-8')
+
+    def stream_job_from_s3(service_id, job_id, start_byte=0):
+        return io.BytesIO(data[start_byte:])
+
+    return stream_job_from_s3
+
+
+def test_should_process_sms_job_in_chunks(notify_api, sample_job, mocker, mock_producer):
+    mock_feature_flag(mocker, FeatureFlag.JOB_CHUNKED_PROCESSING_ENABLED, 'True')
+    mocker.patch('app.celery.tasks.s3.stream_job_from_s3', side_effect=_stream_job(load_example_csv('multiple_sms')))
+    mock_save_batch = mocker.patch('app.celery.tasks.save_batch.apply_async')
+    mock_save_sms = mocker.patch('app.celery.tasks.save_sms.apply_async')
+    encrypt = mocker.patch('app.encryption.encrypt', return_value="something_encrypted")
+
+    with set_config(notify_api, 'JOB_CHUNK_SIZE', 4):
+        process_job(sample_job.id)
+
+    s3.stream_job_from_s3.assert_called_once_with(str(sample_job.service.id), str(sample_job.id))
+    mock_save_sms.assert_not_called()
+    assert mock_save_batch.call_count == 3
+
+    batches = [call_args[0][0] for call_args in encrypt.call_args_list]
+    assert [len(batch['notifications']) for batch in batches] == [4, 4, 2]
+    assert [row['row_number'] for batch in batches for row in batch['notifications']] == list(range(10))
+    assert batches[0]['notifications'][0]['to'] == '+441234123121'
+    assert batches[0]['job'] == str(sample_job.id)
+    assert batches[0]['template_version'] == sample_job.template.version
+
+    args, kwargs = mock_save_batch.call_args
+    assert args == ((str(sample_job.service_id), "something_encrypted"), {})
+    assert kwargs['queue'] == QueueNames.DATABASE
+
+    job = jobs_dao.dao_get_job_by_id(sample_job.id)
+    assert job.job_status == JOB_STATUS_FINISHED
+    assert job.rows_processed == 10
+    assert job.bytes_processed == len(load_example_csv('multiple_sms').encode('utf-8'))
+
+
+def _batch_json(template, job, rows):
+    return {
+        "template": str(template.id),
+        "template_version": template.version,
+        "job": str(job.id),
+        "notifications": [
+            {"id": str(uuid.uuid4()), "to": to, "row_number": row_number, "personalisation": {}}
+            for row_number, to in rows
+        ]
+    }
+
+
+def test_save_batch_saves_notifications_and_enqueues_delivery(sample_job, mocker, mock_producer):
+    mock_deliver_sms = mocker.patch('app.celery.provider_tasks.deliver_sms.apply_async')
+    batch = _batch_json(sample_job.template, sample_job, [(0, '+16502532221'), (1, '+16502532222')])
+
+    tasks.save_batch(str(sample_job.service_id), encryption.encrypt(batch))
+
+    notifications = Notification.query.order_by(Notification.job_row_number).all()
+    assert [str(notification.id) for notification in notifications] == [row['id'] for row in batch['notifications']]
+    assert [notification.job_row_number for notification in notifications] == [0, 1]
+    assert all(notification.job_id == sample_job.id for notification in notifications)
+    assert all(notification.status == 'created' for notification in notifications)
+    assert all(notification.key_type == KEY_TYPE_NORMAL for notification in notifications)
+    assert mock_deliver_sms.call_count == 2
+    assert mock_deliver_sms.call_args[1]['queue'] == QueueNames.SEND_SMS
+
+
+def test_save_batch_skips_rows_that_already_have_notifications(sample_job, mocker, mock_producer):
+    mock_deliver_sms = mocker.patch('app.celery.provider_tasks.deliver_sms.apply_async')
+    create_notification(sample_job.template, sample_job, 0)
+    batch = _batch_json(sample_job.template, sample_job, [(0, '+16502532221'), (1, '+16502532222')])
+
+    tasks.save_batch(str(sample_job.service_id), encryption.encrypt(batch))
+
+    assert Notification.query.count() == 2
+    assert Notification.query.filter(Notification.job_row_number == 1).one().to == '+16502532222'
+    mock_deliver_sms.assert_called_once()
+
+
+def test_save_batch_retries_if_notifications_cannot_be_enqueued(sample_job, mocker, mock_producer):
+    mocker.patch('app.celery.provider_tasks.deliver_sms.apply_async', side_effect=Exception('broker error'))
+    mock_retry = mocker.patch('app.celery.tasks.save_batch.retry', side_effect=Retry)
+    batch = _batch_json(sample_job.template, sample_job, [(0, '+16502532221')])
+
+    with pytest.raises(Retry):
+        tasks.save_batch(str(sample_job.service_id), encryption.encrypt(batch))
+
+    assert Notification.query.count() == 0
+    mock_retry.assert_called_once_with(queue=QueueNames.RETRY)
+
+
+def test_process_incomplete_job_in_chunks_resumes_from_checkpoint(notify_api, mocker, sample_template, mock_producer):
+    mock_feature_flag(mocker, FeatureFlag.JOB_CHUNKED_PROCESSING_ENABLED, 'True')
+    csv_data = load_example_csv('multiple_sms')
+    mock_stream = mocker.patch('app.celery.tasks.s3.stream_job_from_s3', side_effect=_stream_job(csv_data))
+    mock_save_batch = mocker.patch('app.celery.tasks.save_batch.apply_async')
+    mock_last_notification = mocker.patch('app.celery.tasks.dao_get_last_notification_added_for_job_id')
+    encrypt = mocker.patch('app.encryption.encrypt', return_value="something_encrypted")
+
+    # The header and the first four rows have been processed.
+    checkpoint = len(''.join(csv_data.splitlines(keepends=True)[:5]).encode('utf-8'))
+    job = create_job(template=sample_template, notification_count=10,
+                     created_at=datetime.utcnow() - timedelta(hours=2),
+                     scheduled_for=datetime.utcnow() - timedelta(minutes=31),
+                     processing_started=datetime.utcnow() - timedelta(minutes=31),
+                     job_status=JOB_STATUS_ERROR,
+                     rows_processed=4,
+                     bytes_processed=checkpoint)
+
+    with set_config(notify_api, 'JOB_CHUNK_SIZE', 4):
+        process_incomplete_job(str(job.id))
+
+    assert mock_stream.call_args_list[-1] == call(str(job.service_id), str(job.id), start_byte=checkpoint)
+    mock_last_notification.assert_not_called()
+    assert mock_save_batch.call_count == 2
+    batches = [call_args[0][0] for call_args in encrypt.call_args_list]
+    assert [[row['row_number'] for row in batch['notifications']] for batch in batches] == [[4, 5, 6, 7], [8, 9]]
+    assert batches[0]['notifications'][0]['to'] == '+441234123125'
+
+    completed_job = Job.query.filter(Job.id == job.id).one()
+    assert completed_job.job_status == JOB_STATUS_FINISHED
+    assert completed_job.rows_processed == 10
+    assert completed_job.bytes_processed == len(csv_data.encode('utf-8'))
+
+
 # -------- save_sms and save_email tests -------- #
 
 
@@ -8,8 +8,11 @@ from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.orm.exc import NoResultFound
 
 
+from app import db
 from app.dao.notifications_dao import (
+    dao_claim_notifications_not_yet_sent,
     dao_create_notification,
+    dao_create_notifications,
     dao_created_scheduled_notification,
     dao_delete_notification_by_id,
     dao_get_last_notification_added_for_job_id,
@@ -19,6 +22,7 @@ from app.dao.notifications_dao import (
     dao_timeout_notifications,
     dao_update_notification,
     dao_update_notifications_by_reference,
+    dao_update_notification_statuses,
     delete_notifications_older_than_retention_by_type,
     get_notification_by_id,
     get_notification_for_job,
@@ -32,8 +36,8 @@ from app.dao.notifications_dao import (
     dao_get_notification_by_reference,
     dao_get_notifications_by_references,
     dao_get_notification_history_by_reference,
-    notifications_not_yet_sent,
 )
+from app.errors import InvalidRequest
 from app.models import (
     Job,
     Notification,
@@ -62,6 +66,7 @@ from tests.app.db import (
     create_template,
     create_notification_history
 )
+from tests.conftest import set_config
 
 
 def test_should_have_decorated_notifications_dao_functions():
@@ -295,6 +300,46 @@ def test_create_notification_creates_notification_with_personalisation(sample_te
     assert {'name': 'Jo'} == notification_from_db.personalisation
 
 
+def test_dao_create_notifications_inserts_all_notifications(sample_template):
+    assert Notification.query.count() == 0
+
+    notifications = [Notification(**_notification_json(sample_template)) for _ in range(3)]
+    for notification in notifications:
+        notification.billable_units = None
+
+    dao_create_notifications(notifications)
+
+    assert Notification.query.count() == 3
+    for notification_from_db in Notification.query.all():
+        assert notification_from_db.status == 'created'
+        assert notification_from_db.billable_units == 0
+        assert notification_from_db.international is False
+    assert {n.id for n in Notification.query.all()} == {n.id for n in notifications}
+
+
+def test_dao_update_notification_statuses_only_updates_transient_notifications(sample_template):
+    sending = create_notification(sample_template, status=NOTIFICATION_SENDING)
+    pending = create_notification(sample_template, status=NOTIFICATION_PENDING)
+    delivered = create_notification(sample_template, status=NOTIFICATION_DELIVERED)
+
+    updated = dao_update_notification_statuses([
+        (sending, NOTIFICATION_DELIVERED),
+        (pending, 'permanent-failure'),
+        (delivered, 'permanent-failure'),
+    ])
+
+    assert updated == [sending, pending]
+    assert sending.status == NOTIFICATION_DELIVERED
+    assert sending.updated_at is not None
+    assert pending.status == NOTIFICATION_TEMPORARY_FAILURE
+    assert delivered.status == NOTIFICATION_DELIVERED
+
+    db.session.expire_all()
+    assert get_notification_by_id(sending.id).status == NOTIFICATION_DELIVERED
+    assert get_notification_by_id(pending.id).status == NOTIFICATION_TEMPORARY_FAILURE
+    assert get_notification_by_id(delivered.id).status == NOTIFICATION_DELIVERED
+
+
 def test_save_notification_creates_sms(sample_template, sample_job):
     assert Notification.query.count() == 0
 
@@ -702,12 +747,29 @@ def test_dao_timeout_notifications(sample_template):
     assert Notification.query.get(sending.id).status == 'sending'
     assert Notification.query.get(pending.id).status == 'pending'
     assert Notification.query.get(delivered.id).status == 'delivered'
-    technical_failure_notifications, temporary_failure_notifications = dao_timeout_notifications(1)
+    timed_out = list(dao_timeout_notifications(1, batch_size=10))
     assert Notification.query.get(created.id).status == 'technical-failure'
     assert Notification.query.get(sending.id).status == 'temporary-failure'
     assert Notification.query.get(pending.id).status == 'temporary-failure'
     assert Notification.query.get(delivered.id).status == 'delivered'
-    assert len(technical_failure_notifications + temporary_failure_notifications) == 3
+    assert [(status, [notification.id for notification in notifications]) for status, notifications in timed_out] == [
+        ('technical-failure', [created.id]),
+        ('temporary-failure', [sending.id]),
+        ('temporary-failure', [pending.id]),
+    ]
+
+
+def test_dao_timeout_notifications_updates_in_batches(sample_template):
+    with freeze_time(datetime.utcnow() - timedelta(minutes=2)):
+        notifications = [create_notification(sample_template, status='sending') for _ in range(5)]
+
+    timed_out = list(dao_timeout_notifications(1, batch_size=2))
+
+    assert [len(batch) for _, batch in timed_out] == [2, 2, 1]
+    assert {notification.id for _, batch in timed_out for notification in batch} == {
+        notification.id for notification in notifications
+    }
+    assert all(batch[0].service_id == sample_template.service_id for _, batch in timed_out)
 
 
 def test_dao_timeout_notifications_only_updates_for_older_notifications(sample_template):
@@ -721,8 +783,7 @@ def test_dao_timeout_notifications_only_updates_for_older_notifications(sample_t
     assert Notification.query.get(sending.id).status == 'sending'
     assert Notification.query.get(pending.id).status == 'pending'
     assert Notification.query.get(delivered.id).status == 'delivered'
-    technical_failure_notifications, temporary_failure_notifications = dao_timeout_notifications(1)
-    assert len(technical_failure_notifications + temporary_failure_notifications) == 0
+    assert list(dao_timeout_notifications(1, batch_size=10)) == []
 
 
 def test_dao_timeout_notifications_doesnt_affect_letters(sample_letter_template):
@@ -737,7 +798,7 @@ def test_dao_timeout_notifications_doesnt_affect_letters(sample_letter_template)
     assert Notification.query.get(pending.id).status == 'pending'
     assert Notification.query.get(delivered.id).status == 'delivered'
 
-    technical_failure_notifications, temporary_failure_notifications = dao_timeout_notifications(1)
+    assert list(dao_timeout_notifications(1, batch_size=10)) == []
 
 
 def test_should_return_notifications_excluding_jobs_by_default(sample_template, sample_job, sample_api_key):
@@ -781,6 +842,67 @@ def test_should_not_count_pages_when_given_a_flag(sample_user, sample_template):
     assert pagination.items[0].id == notification.id
 
 
+def test_get_notifications_for_service_keyset_pages_by_created_at_and_id(sample_template):
+    created_at = datetime(2021, 6, 15, 12, 0)
+    same_time = sorted(
+        [create_notification(sample_template, created_at=created_at) for _ in range(2)],
+        key=lambda notification: notification.id,
+        reverse=True
+    )
+    older = create_notification(sample_template, created_at=created_at - timedelta(minutes=1))
+    newer = create_notification(sample_template, created_at=created_at + timedelta(minutes=1))
+
+    pages = []
+    cursor = None
+    for _ in range(3):
+        page = get_notifications_for_service(
+            sample_template.service_id, page_size=2, count_pages=False, keyset=True, cursor=cursor
+        )
+        pages.append([notification.id for notification in page.items])
+        cursor = page.next_cursor
+        assert page.total is None
+
+    assert pages == [[newer.id, same_time[0].id], [same_time[1].id, older.id], []]
+    assert cursor is None
+
+
+def test_get_notifications_for_service_keyset_counts_pages_when_asked(sample_template):
+    create_notification(sample_template)
+    create_notification(sample_template)
+
+    page = get_notifications_for_service(sample_template.service_id, page_size=1, keyset=True)
+
+    assert len(page.items) == 1
+    assert page.total == 2
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'WyJub3QgYSBkYXRlIiwgIjEiXQ==', 'WyIxIl0='])
+def test_get_notifications_for_service_keyset_rejects_invalid_cursor(sample_template, cursor):
+    with pytest.raises(InvalidRequest) as e:
+        get_notifications_for_service(sample_template.service_id, keyset=True, cursor=cursor)
+
+    assert e.value.message == 'Invalid cursor'
+    assert e.value.status_code == 400
+
+
+def test_get_notifications_for_job_keyset_pages_by_job_row_number(sample_job):
+    notifications = [
+        create_notification(template=sample_job.template, job=sample_job, job_row_number=row_number)
+        for row_number in (2, 0, 1)
+    ]
+
+    first_page = get_notifications_for_job(
+        sample_job.service_id, sample_job.id, page_size=2, count_pages=False, keyset=True
+    )
+    second_page = get_notifications_for_job(
+        sample_job.service_id, sample_job.id, page_size=2, keyset=True, cursor=first_page.next_cursor
+    )
+
+    assert first_page.items == [notifications[1], notifications[2]]
+    assert second_page.items == [notifications[0]]
+    assert second_page.total == 3
+
+
 def test_get_notifications_created_by_api_or_csv_are_returned_correctly_excluding_test_key_notifications(
         notify_db,
         notify_db_session,
@@ -1361,6 +1483,87 @@ def test_dao_get_notifications_by_to_field_orders_by_created_at_desc(sample_temp
     assert notifications[1].id == notification_a_minute_ago.id
 
 
+def test_dao_get_notifications_by_to_field_matches_complete_email_address_exactly_if_asked_to(
+    sample_email_template, mocker
+):
+    mock_incr = mocker.patch('app.dao.notifications_dao.statsd_client.incr')
+    notification = create_notification(
+        template=sample_email_template, to_field='jack@gmail.com', normalised_to='jack@gmail.com'
+    )
+    create_notification(template=sample_email_template, to_field='hijack@gmail.com', normalised_to='hijack@gmail.com')
+
+    results = dao_get_notifications_by_to_field(
+        notification.service_id, 'jack@gmail.com', notification_type='email', exact_match=True
+    )
+
+    assert [result.id for result in results] == [notification.id]
+    mock_incr.assert_called_once_with('dao.notifications-search-by-recipient.exact')
+
+
+def test_dao_get_notifications_by_to_field_matches_complete_email_address_within_others(
+    sample_email_template, mocker
+):
+    mock_incr = mocker.patch('app.dao.notifications_dao.statsd_client.incr')
+    notification = create_notification(
+        template=sample_email_template, to_field='jack@gmail.com', normalised_to='jack@gmail.com',
+        created_at=datetime(2021, 6, 15, 12, 1)
+    )
+    other_notification = create_notification(
+        template=sample_email_template, to_field='hijack@gmail.com', normalised_to='hijack@gmail.com',
+        created_at=datetime(2021, 6, 15, 12, 0)
+    )
+
+    results = dao_get_notifications_by_to_field(notification.service_id, 'jack@gmail.com', notification_type='email')
+
+    assert [result.id for result in results] == [notification.id, other_notification.id]
+    mock_incr.assert_called_once_with('dao.notifications-search-by-recipient.substring')
+
+
+def test_dao_get_notifications_by_to_field_returns_at_most_max_results(notify_api, sample_template):
+    for _ in range(3):
+        create_notification(template=sample_template, to_field='+16502532222', normalised_to='+16502532222')
+
+    with set_config(notify_api, 'NOTIFICATION_SEARCH_MAX_RESULTS', 2):
+        results = dao_get_notifications_by_to_field(sample_template.service_id, '650', notification_type='sms')
+
+    assert len(results) == 2
+
+
+def test_dao_get_notifications_by_to_field_pages_by_cursor(sample_template):
+    notifications = [
+        create_notification(
+            template=sample_template,
+            to_field='+16502532222',
+            normalised_to='+16502532222',
+            created_at=datetime(2021, 6, 15, 12, minute),
+        )
+        for minute in range(3)
+    ]
+
+    first_page = dao_get_notifications_by_to_field(
+        sample_template.service_id, '+16502532222', notification_type='sms', keyset=True, page_size=2
+    )
+    second_page = dao_get_notifications_by_to_field(
+        sample_template.service_id, '+16502532222', notification_type='sms', keyset=True,
+        cursor=first_page.next_cursor, page_size=2
+    )
+
+    assert [notification.id for notification in first_page.items] == [notifications[2].id, notifications[1].id]
+    assert [notification.id for notification in second_page.items] == [notifications[0].id]
+    assert first_page.total is None
+
+
+def test_dao_get_notifications_by_to_field_logs_query_plan(notify_api, sample_template, mocker):
+    mock_logger = mocker.patch('app.dao.notifications_dao.current_app.logger.info')
+
+    with set_config(notify_api, 'NOTIFICATION_SEARCH_LOG_QUERY_PLAN', True):
+        dao_get_notifications_by_to_field(sample_template.service_id, '650', notification_type='sms')
+
+    message = mock_logger.call_args[0][0]
+    assert message.startswith('Search by recipient (substring) query plan:')
+    assert 'notifications' in message
+
+
 def test_dao_get_last_notification_added_for_job_id_valid_job_id(sample_template):
     job = create_job(template=sample_template, notification_count=10,
                      created_at=datetime.utcnow() - timedelta(hours=2),
@@ -1542,7 +1745,7 @@ def test_dao_get_notification_history_by_reference_with_no_matches_raises_error(
 @pytest.mark.parametrize("notification_type",
                          ["letter", "email", "sms"]
                          )
-def test_notifications_not_yet_sent(sample_service, notification_type):
+def test_dao_claim_notifications_not_yet_sent(sample_service, notification_type):
     older_than = 4  # number of seconds the notification can not be older than
     template = create_template(service=sample_service, template_type=notification_type)
     old_notification = create_notification(template=template,
@@ -1553,15 +1756,15 @@ def test_notifications_not_yet_sent(sample_service, notification_type):
                         status='sending')
     create_notification(template=template, created_at=datetime.utcnow(), status='created')
 
-    results = notifications_not_yet_sent(older_than, notification_type)
-    assert len(results) == 1
-    assert results[0] == old_notification
+    results = list(dao_claim_notifications_not_yet_sent(older_than, notification_type, 10, claim_seconds=600))
+    assert results == [[old_notification]]
+    assert old_notification.updated_at is not None
 
 
 @pytest.mark.parametrize("notification_type",
                          ["letter", "email", "sms"]
                          )
-def test_notifications_not_yet_sent_return_no_rows(sample_service, notification_type):
+def test_dao_claim_notifications_not_yet_sent_return_no_rows(sample_service, notification_type):
     older_than = 5  # number of seconds the notification can not be older than
     template = create_template(service=sample_service, template_type=notification_type)
     create_notification(template=template,
@@ -1572,8 +1775,35 @@ def test_notifications_not_yet_sent_return_no_rows(sample_service, notification_
                         status='sending')
     create_notification(template=template, created_at=datetime.utcnow(), status='delivered')
 
-    results = notifications_not_yet_sent(older_than, notification_type)
-    assert len(results) == 0
+    results = list(dao_claim_notifications_not_yet_sent(older_than, notification_type, 10, claim_seconds=600))
+    assert results == []
+
+
+def test_dao_claim_notifications_not_yet_sent_pages_by_id(sample_template):
+    notifications = [
+        create_notification(
+            template=sample_template, created_at=datetime.utcnow() - timedelta(seconds=10), status='created'
+        )
+        for _ in range(5)
+    ]
+
+    results = list(dao_claim_notifications_not_yet_sent(5, 'sms', 2, claim_seconds=600))
+
+    assert [len(page) for page in results] == [2, 2, 1]
+    assert [notification.id for page in results for notification in page] == sorted(
+        notification.id for notification in notifications
+    )
+
+
+def test_dao_claim_notifications_not_yet_sent_skips_recently_claimed_notifications(sample_template):
+    with freeze_time(datetime.utcnow() - timedelta(minutes=5)):
+        claimed = create_notification(
+            template=sample_template, created_at=datetime.utcnow() - timedelta(seconds=10), status='created'
+        )
+        list(dao_claim_notifications_not_yet_sent(5, 'sms', 10, claim_seconds=600))
+
+    assert list(dao_claim_notifications_not_yet_sent(5, 'sms', 10, claim_seconds=600)) == []
+    assert list(dao_claim_notifications_not_yet_sent(5, 'sms', 10, claim_seconds=60)) == [[claimed]]
 
 
 def test_update_notification_status_updates_failure_reason(sample_job, mocker):
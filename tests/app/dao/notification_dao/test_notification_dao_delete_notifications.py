@@ -7,11 +7,23 @@ import pytest
 from flask import current_app
 from freezegun import freeze_time
 
+from app import db
+from app.dao import notifications_dao
+from app.dao.notification_partitions_dao import NotificationPartition
 from app.dao.notifications_dao import (
     delete_notifications_older_than_retention_by_type,
-    insert_update_notification_history
+    drop_notification_partitions_older_than_retention,
+    insert_update_notification_history,
+    purge_notifications_older_than_retention_by_type,
+)
+from app.models import (
+    Notification,
+    NotificationHistory,
+    NotificationPurgeCheckpoint,
+    RecipientIdentifier,
+    SMS_TYPE,
+    EMAIL_TYPE,
 )
-from app.models import Notification, NotificationHistory, RecipientIdentifier, SMS_TYPE, EMAIL_TYPE
 from app.notifications.process_notifications import persist_notification
 from app.va.identifier import IdentifierType
 from tests.app.db import (
@@ -367,3 +379,105 @@ def test_insert_update_notification_history_updates_history_with_billing_code(sa
     history = NotificationHistory.query.get(notification_2.id)
     assert history.billing_code == 'TESTCODE'
     assert not NotificationHistory.query.get(notification_1.id)
+
+
+@pytest.mark.parametrize('notification_type', ['sms', 'email', 'letter'])
+def test_purge_notifications_for_days_of_retention(sample_service, notification_type, mocker):
+    mock_get_s3 = mocker.patch("app.dao.notifications_dao.get_s3_bucket_objects")
+    create_test_data(notification_type, sample_service)
+    assert Notification.query.count() == 9
+
+    deleted = purge_notifications_older_than_retention_by_type(notification_type)
+
+    assert deleted == 2
+    assert Notification.query.count() == 7
+    assert Notification.query.filter_by(notification_type=notification_type).count() == 1
+    assert NotificationHistory.query.count() == 2
+    if notification_type == 'letter':
+        assert mock_get_s3.call_count == 2
+    else:
+        mock_get_s3.assert_not_called()
+
+
+def test_purge_notifications_deletes_test_key_notifications_without_copying_them(sample_template):
+    create_notification(template=sample_template, key_type='test', created_at=datetime.utcnow() - timedelta(days=8))
+    create_notification(template=sample_template, created_at=datetime.utcnow() - timedelta(days=8))
+
+    assert purge_notifications_older_than_retention_by_type('sms') == 2
+
+    assert Notification.query.count() == 0
+    assert NotificationHistory.query.count() == 1
+
+
+@freeze_time('2021-06-15 12:00')
+def test_purge_notifications_records_checkpoint_after_each_slice(sample_template, mocker):
+    create_notification(template=sample_template, created_at=datetime(2021, 6, 1, 10, 30))
+    create_notification(template=sample_template, created_at=datetime(2021, 6, 1, 12, 30))
+    save_checkpoint = mocker.patch(
+        'app.dao.notifications_dao._save_purge_checkpoint',
+        wraps=notifications_dao._save_purge_checkpoint
+    )
+
+    purge_notifications_older_than_retention_by_type('sms')
+
+    # midnight a week ago, local time, in UTC
+    cutoff = datetime(2021, 6, 8, 4, 0)
+    purged_to = [call[0][3] for call in save_checkpoint.call_args_list]
+    assert purged_to[0] == datetime(2021, 6, 1, 11, 0)
+    assert purged_to[-1] == cutoff
+    assert purged_to == sorted(purged_to)
+
+    checkpoint = NotificationPurgeCheckpoint.query.one()
+    assert (checkpoint.notification_type, checkpoint.scope) == ('sms', 'default')
+    assert checkpoint.cutoff == cutoff
+    assert checkpoint.purged_to == cutoff
+    assert Notification.query.count() == 0
+
+
+@freeze_time('2021-06-15 12:00')
+def test_purge_notifications_resumes_from_checkpoint_with_same_cutoff(sample_template):
+    before_checkpoint = create_notification(template=sample_template, created_at=datetime(2021, 6, 1, 10, 30))
+    create_notification(template=sample_template, created_at=datetime(2021, 6, 7, 10, 30))
+    db.session.add(NotificationPurgeCheckpoint(
+        notification_type='sms',
+        scope='default',
+        cutoff=datetime(2021, 6, 8, 4, 0),
+        purged_to=datetime(2021, 6, 5, 0, 0)
+    ))
+    db.session.commit()
+
+    assert purge_notifications_older_than_retention_by_type('sms') == 1
+
+    assert Notification.query.all() == [before_checkpoint]
+
+
+@freeze_time('2021-06-15 12:00')
+def test_purge_notifications_ignores_checkpoint_with_different_cutoff(sample_template):
+    create_notification(template=sample_template, created_at=datetime(2021, 6, 1, 10, 30))
+    db.session.add(NotificationPurgeCheckpoint(
+        notification_type='sms',
+        scope='default',
+        cutoff=datetime(2021, 6, 7, 4, 0),
+        purged_to=datetime(2021, 6, 7, 4, 0)
+    ))
+    db.session.commit()
+
+    assert purge_notifications_older_than_retention_by_type('sms') == 1
+    assert NotificationPurgeCheckpoint.query.one().purged_to == datetime(2021, 6, 8, 4, 0)
+
+
+@freeze_time('2021-06-15 12:00')
+def test_drop_notification_partitions_drops_partitions_older_than_default_retention(sample_service, mocker):
+    create_service_data_retention(service=sample_service, notification_type='sms', days_of_retention=30)
+    create_service_data_retention(service=sample_service, notification_type='email', days_of_retention=3)
+    partitions = [
+        NotificationPartition('notifications_legacy', None, datetime(2021, 6, 8, 4, 0)),
+        NotificationPartition('notifications_p20210608', datetime(2021, 6, 8, 4, 0), datetime(2021, 6, 9, 4, 0)),
+    ]
+    mocker.patch('app.dao.notifications_dao.dao_get_partitions', return_value=partitions)
+    mock_drop = mocker.patch('app.dao.notifications_dao._drop_notification_partition')
+
+    assert drop_notification_partitions_older_than_retention() == ['notifications_legacy']
+
+    # only services that keep notifications for longer than 7 days are copied out of the partition
+    mock_drop.assert_called_once_with(partitions[0], [(sample_service.id, 'sms', datetime(2021, 5, 16, 4, 0))])
@@ -20,10 +20,15 @@ from app.dao.fact_notification_status_dao import (
     get_total_notifications_sent_for_api_key,
     get_last_send_for_api_key,
     get_api_key_ranked_by_notifications_created, fetch_template_usage_for_service_with_given_template,
-    fetch_notification_statuses_per_service_and_template_for_date, fetch_delivered_notification_stats_by_month
+    fetch_notification_statuses_per_service_and_template_for_date, fetch_delivered_notification_stats_by_month,
+    rebuild_fact_notification_status_for_day,
+    rebuild_fact_notification_status_for_day_in_chunks,
+    refresh_fact_notification_status_hourly,
 )
 from app.models import (
     FactNotificationStatus,
+    FactNotificationStatusHourly,
+    FactNotificationStatusHourlyWatermark,
     KEY_TYPE_NORMAL,
     KEY_TYPE_TEST,
     KEY_TYPE_TEAM,
@@ -125,6 +130,209 @@ def test__update_fact_notification_status_updates_row(notify_db_session):
     assert updated_fact_data[0].notification_count == 2
 
 
+def test_rebuild_fact_notification_status_for_day(notify_db_session):
+    local_now = convert_utc_to_local_timezone(datetime.utcnow())
+    first_service = create_service(service_name='First Service')
+    first_template = create_template(service=first_service)
+    second_service = create_service(service_name='second Service')
+    second_template = create_template(service=second_service, template_type='email')
+    third_service = create_service(service_name='third Service')
+    third_template = create_template(service=third_service, template_type='letter')
+
+    create_notification(template=first_template, status='delivered')
+    create_notification(template=first_template, status='delivered')
+    create_notification(template=first_template, created_at=local_now - timedelta(days=1))
+    # history is only used for a service and notification type with nothing left in notifications
+    create_notification_history(template=first_template, status='delivered')
+    create_notification_history(template=second_template, status='temporary-failure')
+    create_notification_history(template=second_template, created_at=local_now - timedelta(days=1))
+    create_notification(template=third_template, status='created')
+    create_notification(template=third_template, status='created', key_type=KEY_TYPE_TEST)
+
+    rows = rebuild_fact_notification_status_for_day(local_now.date())
+
+    new_fact_data = FactNotificationStatus.query.order_by(FactNotificationStatus.notification_type).all()
+
+    assert rows == 3
+    assert len(new_fact_data) == 3
+    assert all(row.bst_date == local_now.date() for row in new_fact_data)
+    assert all(row.job_id == UUID('00000000-0000-0000-0000-000000000000') for row in new_fact_data)
+    assert [
+        (row.service_id, row.template_id, row.notification_type, row.notification_status, row.notification_count)
+        for row in new_fact_data
+    ] == [
+        (second_service.id, second_template.id, 'email', 'temporary-failure', 1),
+        (third_service.id, third_template.id, 'letter', 'created', 1),
+        (first_service.id, first_template.id, 'sms', 'delivered', 2),
+    ]
+
+
+def test_rebuild_fact_notification_status_for_day_matches_per_service_path(notify_db_session):
+    local_now = convert_utc_to_local_timezone(datetime.utcnow())
+    service = create_service()
+    sms_template = create_template(service=service)
+    email_template = create_template(service=service, template_type='email')
+    job = create_job(template=sms_template)
+
+    create_notification(template=sms_template, status='delivered', job=job)
+    create_notification(template=sms_template, status='permanent-failure', status_reason='bad number')
+    create_notification(template=email_template, status='sending')
+    create_notification_history(template=email_template, status='delivered')
+
+    process_day = local_now.date()
+    update_fact_notification_status(fetch_notification_status_for_day(process_day=local_now), process_day)
+    expected = _fact_notification_status_rows()
+
+    rebuild_fact_notification_status_for_day(process_day)
+
+    assert _fact_notification_status_rows() == expected
+
+
+def test_rebuild_fact_notification_status_for_day_replaces_rows_for_day_only(notify_db_session):
+    local_now = convert_utc_to_local_timezone(datetime.utcnow())
+    template = create_template(service=create_service())
+    create_ft_notification_status(local_now.date(), template=template, count=10)
+    create_ft_notification_status(local_now.date() - timedelta(days=1), template=template, count=10)
+    create_notification(template=template, status='delivered')
+
+    rebuild_fact_notification_status_for_day(local_now.date())
+
+    rows = FactNotificationStatus.query.order_by(FactNotificationStatus.bst_date).all()
+    assert [(row.bst_date, row.notification_count) for row in rows] == [
+        (local_now.date() - timedelta(days=1), 10),
+        (local_now.date(), 1),
+    ]
+
+
+def test_rebuild_fact_notification_status_for_day_only_replaces_given_services(notify_db_session):
+    local_now = convert_utc_to_local_timezone(datetime.utcnow())
+    first_template = create_template(service=create_service(service_name='First Service'))
+    second_template = create_template(service=create_service(service_name='second Service'))
+    create_ft_notification_status(local_now.date(), template=second_template, count=10)
+    create_notification(template=first_template, status='delivered')
+    create_notification(template=second_template, status='delivered')
+
+    rows = rebuild_fact_notification_status_for_day(local_now.date(), service_ids=[first_template.service_id])
+
+    assert rows == 1
+    counts = {row.service_id: row.notification_count for row in FactNotificationStatus.query.all()}
+    assert counts == {first_template.service_id: 1, second_template.service_id: 10}
+
+
+def test_rebuild_fact_notification_status_for_day_in_chunks(notify_db_session, mocker):
+    local_now = convert_utc_to_local_timezone(datetime.utcnow())
+    templates = [create_template(service=create_service(service_name=f'service {i}')) for i in range(3)]
+    for template in templates:
+        create_notification(template=template, status='delivered')
+    rebuild = mocker.patch(
+        'app.dao.fact_notification_status_dao.rebuild_fact_notification_status_for_day',
+        wraps=rebuild_fact_notification_status_for_day
+    )
+
+    rows = rebuild_fact_notification_status_for_day_in_chunks(local_now.date(), chunk_size=2)
+
+    assert rows == 3
+    assert rebuild.call_count == 2
+    assert [len(call[0][1]) for call in rebuild.call_args_list] == [2, 1]
+    assert FactNotificationStatus.query.count() == 3
+
+
+def _fact_notification_status_rows():
+    return sorted(
+        (
+            row.bst_date, row.template_id, row.service_id, row.job_id, row.notification_type, row.key_type,
+            row.notification_status, row.status_reason, row.notification_count
+        )
+        for row in FactNotificationStatus.query.all()
+    )
+
+
+def test_refresh_fact_notification_status_hourly_counts_todays_notifications_by_hour(notify_db_session):
+    template = create_template(service=create_service())
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 6, 15, 12, 10))
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 6, 15, 12, 50))
+    create_notification(template=template, status='sending', created_at=datetime(2021, 6, 15, 13, 5))
+    # yesterday, local time
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 6, 15, 3, 59))
+
+    with freeze_time('2021-06-15T14:30:00'):
+        hours = refresh_fact_notification_status_hourly()
+
+    rows = FactNotificationStatusHourly.query.order_by(FactNotificationStatusHourly.hour).all()
+    assert hours == 2
+    assert [(row.hour, row.notification_status, row.notification_count) for row in rows] == [
+        (datetime(2021, 6, 15, 12), 'delivered', 2),
+        (datetime(2021, 6, 15, 13), 'sending', 1),
+    ]
+    watermark = FactNotificationStatusHourlyWatermark.query.one()
+    assert watermark.bst_date == date(2021, 6, 15)
+    assert watermark.watermark == datetime(2021, 6, 15, 14, 30)
+
+
+def test_refresh_fact_notification_status_hourly_only_recounts_hours_changed_since_last_refresh(notify_db_session):
+    template = create_template(service=create_service())
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 6, 15, 10, 0))
+    sending = create_notification(template=template, status='sending', created_at=datetime(2021, 6, 15, 11, 0))
+
+    with freeze_time('2021-06-15T14:30:00'):
+        refresh_fact_notification_status_hourly()
+
+    sending.status = 'delivered'
+    sending.updated_at = datetime(2021, 6, 15, 14, 40)
+    create_notification(template=template, status='created', created_at=datetime(2021, 6, 15, 14, 45))
+
+    with freeze_time('2021-06-15T14:50:00'):
+        hours = refresh_fact_notification_status_hourly()
+
+    rows = FactNotificationStatusHourly.query.order_by(FactNotificationStatusHourly.hour).all()
+    assert hours == 2
+    assert [(row.hour, row.notification_status, row.notification_count) for row in rows] == [
+        (datetime(2021, 6, 15, 10), 'delivered', 1),
+        (datetime(2021, 6, 15, 11), 'delivered', 1),
+        (datetime(2021, 6, 15, 14), 'created', 1),
+    ]
+
+
+def test_refresh_fact_notification_status_hourly_removes_previous_days(notify_db_session):
+    template = create_template(service=create_service())
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 6, 14, 12, 0))
+
+    with freeze_time('2021-06-14T14:30:00'):
+        refresh_fact_notification_status_hourly()
+
+    with freeze_time('2021-06-15T14:30:00'):
+        hours = refresh_fact_notification_status_hourly()
+
+    assert hours == 0
+    assert FactNotificationStatusHourly.query.count() == 0
+    assert [row.bst_date for row in FactNotificationStatusHourlyWatermark.query.all()] == [date(2021, 6, 15)]
+
+
+@pytest.mark.parametrize('by_template', [False, True])
+def test_fetch_notification_status_for_service_for_today_uses_hourly_rollup_and_tail(notify_db_session, by_template):
+    template = create_template(service=create_service())
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 6, 15, 12, 10))
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 6, 15, 13, 10))
+
+    with freeze_time('2021-06-15T14:30:00'):
+        refresh_fact_notification_status_hourly()
+
+    # created after the refresh, so only counted by the tail query
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 6, 15, 14, 35))
+    create_notification(template=template, status='created', created_at=datetime(2021, 6, 15, 14, 40))
+    create_notification(template=template, status='created', created_at=datetime(2021, 6, 15, 14, 40), key_type='test')
+
+    with freeze_time('2021-06-15T14:45:00'):
+        results = fetch_notification_status_for_service_for_today_and_7_previous_days(
+            template.service_id, by_template=by_template
+        )
+
+    assert sorted((row.notification_type, row.status, row.count) for row in results) == [
+        ('sms', 'created', 1),
+        ('sms', 'delivered', 3),
+    ]
+
+
 def test_fetch_notification_status_for_service_by_month(notify_db_session):
     service_1 = create_service(service_name='service_1')
     service_2 = create_service(service_name='service_2')
@@ -17,6 +17,7 @@ from app.dao.fact_billing_dao import (
     fetch_monthly_billing_for_year,
     get_rate,
     get_rates_for_billing,
+    upsert_fact_billing_for_day,
     fetch_sms_free_allowance_remainder,
     fetch_sms_billing_for_all_services,
     fetch_letter_costs_for_all_services, fetch_letter_line_items_for_all_services)
@@ -296,6 +297,72 @@ def test_fetch_billing_data_for_day_bills_correctly_for_status(notify_db_session
     assert 3 == letter_results[0][7]
 
 
+def test_fetch_billing_data_for_day_uses_history_only_for_purged_services_and_types(notify_db_session):
+    process_day = datetime.utcnow() - timedelta(days=8)
+    service = create_service()
+    purged_service = create_service(service_name='Purged service')
+    sms_template = create_template(service=service, template_type='sms')
+    email_template = create_template(service=service, template_type='email')
+    purged_template = create_template(service=purged_service, template_type='sms')
+
+    create_notification(template=sms_template, status='delivered', created_at=process_day)
+    create_notification_history(template=sms_template, status='delivered', created_at=process_day)
+    create_notification_history(template=email_template, status='delivered', created_at=process_day)
+    create_notification_history(template=purged_template, status='delivered', created_at=process_day)
+    create_notification_history(template=purged_template, status='delivered', created_at=process_day)
+
+    results = fetch_billing_data_for_day(convert_utc_to_local_timezone(process_day))
+
+    counts = {(row.service_id, row.notification_type): row.notifications_sent for row in results}
+    assert counts == {
+        (service.id, 'sms'): 1,
+        (service.id, 'email'): 1,
+        (purged_service.id, 'sms'): 2,
+    }
+
+
+def test_upsert_fact_billing_for_day_inserts_and_updates_rows(notify_db_session):
+    create_rate(start_date=datetime.utcnow() - timedelta(days=1), value=0.0158, notification_type='sms')
+    service = create_service()
+    sms_template = create_template(service=service, template_type='sms')
+    email_template = create_template(service=service, template_type='email')
+    create_notification(template=sms_template, status='delivered')
+    create_notification(template=email_template, status='delivered')
+    today = convert_utc_to_local_timezone(datetime.utcnow()).date()
+
+    assert upsert_fact_billing_for_day(fetch_billing_data_for_day(today), today) == 2
+
+    create_notification(template=sms_template, status='delivered')
+    assert upsert_fact_billing_for_day(fetch_billing_data_for_day(today), today) == 2
+
+    rows = {row.notification_type: row for row in FactBilling.query.all()}
+    assert len(rows) == 2
+    assert rows['sms'].notifications_sent == 2
+    assert rows['sms'].rate == Decimal('0.0158')
+    assert rows['email'].notifications_sent == 1
+    assert rows['email'].rate == 0
+
+
+def test_upsert_fact_billing_for_day_combines_data_for_the_same_row(notify_db_session):
+    create_rate(start_date=datetime.utcnow() - timedelta(days=1), value=0.0158, notification_type='sms')
+    service = create_service()
+    template = create_template(service=service, template_type='sms')
+    create_notification(template=template, status='delivered', rate_multiplier=1, billable_units=1)
+    create_notification(template=template, status='delivered', rate_multiplier=None, billable_units=2)
+    today = convert_utc_to_local_timezone(datetime.utcnow()).date()
+
+    assert upsert_fact_billing_for_day(fetch_billing_data_for_day(today), today) == 1
+
+    row = FactBilling.query.one()
+    assert row.notifications_sent == 2
+    assert row.billable_units == 3
+
+
+def test_upsert_fact_billing_for_day_does_nothing_without_data(notify_db_session):
+    assert upsert_fact_billing_for_day([], date(2018, 4, 1)) == 0
+    assert FactBilling.query.count() == 0
+
+
 def test_get_rates_for_billing(notify_db_session):
     create_rate(start_date=datetime.utcnow(), value=12, notification_type='email')
     create_rate(start_date=datetime.utcnow(), value=22, notification_type='sms')
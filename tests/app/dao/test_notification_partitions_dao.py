@@ -0,0 +1,117 @@
+from datetime import datetime
+
+import pytest
+from freezegun import freeze_time
+
+from app import db
+from app.dao.notification_partitions_dao import (
+    NotificationPartition,
+    dao_create_partitions,
+    dao_drop_partition,
+    dao_get_partitions,
+    dao_is_partitioned,
+    _create_cascade_delete_trigger,
+)
+from tests.conftest import set_config
+
+
+@pytest.fixture
+def partitioned_table(notify_db_session):
+    db.session.execute(
+        'CREATE TABLE test_partitioned (id UUID NOT NULL, created_at TIMESTAMP NOT NULL) '
+        'PARTITION BY RANGE (created_at)'
+    )
+    db.session.commit()
+
+    yield 'test_partitioned'
+
+    db.session.rollback()
+    db.session.execute('DROP TABLE test_partitioned')
+    db.session.commit()
+
+
+def test_dao_is_partitioned(partitioned_table):
+    assert dao_is_partitioned(partitioned_table)
+    assert not dao_is_partitioned('notifications')
+
+
+@freeze_time('2021-06-15T14:20:00')
+def test_dao_create_partitions_creates_daily_partitions_from_local_midnight(partitioned_table):
+    created = dao_create_partitions(partitioned_table, datetime(2021, 6, 17, 12, 0))
+
+    assert created == ['test_partitioned_p20210615', 'test_partitioned_p20210616', 'test_partitioned_p20210617']
+    assert dao_get_partitions(partitioned_table) == [
+        NotificationPartition('test_partitioned_p20210615', datetime(2021, 6, 15, 4, 0), datetime(2021, 6, 16, 4, 0)),
+        NotificationPartition('test_partitioned_p20210616', datetime(2021, 6, 16, 4, 0), datetime(2021, 6, 17, 4, 0)),
+        NotificationPartition('test_partitioned_p20210617', datetime(2021, 6, 17, 4, 0), datetime(2021, 6, 18, 4, 0)),
+    ]
+
+
+@freeze_time('2021-06-15T14:20:00')
+def test_dao_create_partitions_continues_from_latest_partition(partitioned_table):
+    dao_create_partitions(partitioned_table, datetime(2021, 6, 16, 0, 0))
+
+    assert dao_create_partitions(partitioned_table, datetime(2021, 6, 16, 0, 0)) == []
+    assert dao_create_partitions(partitioned_table, datetime(2021, 6, 17, 0, 0)) == ['test_partitioned_p20210616']
+
+
+@freeze_time('2021-06-16T14:20:00')
+def test_dao_create_partitions_creates_weekly_partitions_from_monday(notify_api, partitioned_table):
+    with set_config(notify_api, 'NOTIFICATION_PARTITION_INTERVAL', 'week'):
+        created = dao_create_partitions(partitioned_table, datetime(2021, 6, 22, 0, 0))
+
+    assert created == ['test_partitioned_p20210614', 'test_partitioned_p20210621']
+    assert dao_get_partitions(partitioned_table)[0] == NotificationPartition(
+        'test_partitioned_p20210614', datetime(2021, 6, 14, 4, 0), datetime(2021, 6, 21, 4, 0)
+    )
+
+
+@freeze_time('2021-06-15T14:20:00')
+def test_dao_get_partitions_ignores_default_partition(partitioned_table):
+    db.session.execute('CREATE TABLE test_partitioned_default PARTITION OF test_partitioned DEFAULT')
+    db.session.execute(
+        "CREATE TABLE test_partitioned_legacy PARTITION OF test_partitioned "
+        "FOR VALUES FROM (MINVALUE) TO ('2021-06-15 04:00:00')"
+    )
+
+    assert dao_get_partitions(partitioned_table) == [
+        NotificationPartition('test_partitioned_legacy', None, datetime(2021, 6, 15, 4, 0)),
+    ]
+
+
+@freeze_time('2021-06-15T14:20:00')
+def test_dao_drop_partition(partitioned_table):
+    dao_create_partitions(partitioned_table, datetime(2021, 6, 17, 0, 0))
+
+    dao_drop_partition(partitioned_table, 'test_partitioned_p20210615')
+
+    assert [partition.name for partition in dao_get_partitions(partitioned_table)] == ['test_partitioned_p20210616']
+    assert not db.session.execute("SELECT to_regclass('test_partitioned_p20210615')").scalar()
+
+
+@freeze_time('2021-06-15T14:20:00')
+def test_cascade_delete_trigger_deletes_referencing_rows(partitioned_table):
+    db.session.execute('CREATE TABLE test_referencing (test_partitioned_id UUID NOT NULL)')
+    _create_cascade_delete_trigger(
+        partitioned_table, 'test_referencing', 'test_partitioned_id', 'test_referencing_test_partitioned_id_fkey'
+    )
+    dao_create_partitions(partitioned_table, datetime(2021, 6, 16, 0, 0))
+    db.session.execute(
+        "INSERT INTO test_partitioned VALUES "
+        "('9a1d2ffa-7a48-4e3b-9f0a-b93d2e5a5d71', '2021-06-15 12:00'), "
+        "('0c2f6b1e-5f5d-4a2b-8e6a-4d0bbc1bd8a4', '2021-06-15 12:00')"
+    )
+    db.session.execute(
+        "INSERT INTO test_referencing VALUES "
+        "('9a1d2ffa-7a48-4e3b-9f0a-b93d2e5a5d71'), ('0c2f6b1e-5f5d-4a2b-8e6a-4d0bbc1bd8a4')"
+    )
+
+    db.session.execute("DELETE FROM test_partitioned WHERE id = '9a1d2ffa-7a48-4e3b-9f0a-b93d2e5a5d71'")
+
+    assert db.session.execute('SELECT test_partitioned_id::text FROM test_referencing').fetchall() == [
+        ('0c2f6b1e-5f5d-4a2b-8e6a-4d0bbc1bd8a4',)
+    ]
+
+    db.session.execute('DROP TABLE test_referencing')
+    db.session.execute('DROP FUNCTION test_referencing_test_partitioned_id_fkey() CASCADE')
+    db.session.commit()
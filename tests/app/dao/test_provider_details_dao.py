@@ -448,9 +448,11 @@ def test_toggle_sms_provider_should_not_switch_provider_if_no_alternate_provider
     mock_dao_switch_sms_provider_to_provider_with_identifier = mocker.patch(
         'app.dao.provider_details_dao.dao_switch_sms_provider_to_provider_with_identifier'
     )
+    mock_invalidate = mocker.patch('app.dao.provider_details_dao.provider_routing_cache.invalidate')
     dao_toggle_sms_provider('some-identifier')
 
     mock_dao_switch_sms_provider_to_provider_with_identifier.assert_not_called()
+    mock_invalidate.assert_not_called()
 
 
 def test_toggle_sms_provider_switches_provider(
@@ -461,11 +463,13 @@ def test_toggle_sms_provider_switches_provider(
     [inactive_provider, old_provider, alternative_provider] = setup_sms_providers
     mocker.patch('app.provider_details.switch_providers.get_user_by_id', return_value=sample_user)
     mocker.patch('app.dao.provider_details_dao.get_alternative_sms_provider', return_value=alternative_provider)
+    mock_invalidate = mocker.patch('app.dao.provider_details_dao.provider_routing_cache.invalidate')
     dao_toggle_sms_provider(old_provider.identifier)
     new_provider = get_current_provider('sms')
 
     assert new_provider.identifier != old_provider.identifier
     assert new_provider.priority < old_provider.priority
+    mock_invalidate.assert_called_once_with()
 
 
 def test_toggle_sms_provider_switches_when_provider_priorities_are_equal(
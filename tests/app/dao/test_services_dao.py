@@ -1,4 +1,5 @@
 import uuid
+from collections import Counter
 from datetime import datetime
 
 import pytest
@@ -23,6 +24,7 @@ from app.dao.services_dao import (
     dao_fetch_todays_stats_for_service,
     fetch_todays_total_message_count,
     dao_fetch_todays_stats_for_all_services,
+    dao_fetch_notification_stats_by_hour,
     dao_suspend_service,
     dao_resume_service,
     dao_fetch_active_users_for_service,
@@ -970,6 +972,82 @@ def test_dao_fetch_todays_total_message_count_returns_0_when_no_messages_for_tod
     assert fetch_todays_total_message_count(uuid.uuid4()) == 0
 
 
+def test_dao_fetch_todays_total_message_count_counts_every_type_and_status(notify_db_session):
+    service = create_service()
+    sms_template = create_template(service=service)
+    email_template = create_template(service=service, template_type='email')
+    create_notification(template=sms_template, status='delivered')
+    create_notification(template=sms_template, status='created')
+    create_notification(template=email_template, status='sending')
+    create_notification(template=email_template, key_type=KEY_TYPE_TEST)
+
+    assert fetch_todays_total_message_count(service.id) == 3
+
+
+def test_dao_fetch_todays_total_message_count_uses_notification_stats_counters(notify_db_session, mocker):
+    service_id = uuid.uuid4()
+    get_counts = mocker.patch('app.dao.services_dao.notification_stats_counter.get_counts', return_value={
+        str(service_id): Counter({
+            ('sms', KEY_TYPE_NORMAL, 'delivered'): 2,
+            ('email', KEY_TYPE_NORMAL, 'sending'): 1,
+            ('sms', KEY_TYPE_TEST, 'delivered'): 5,
+        })
+    })
+
+    assert fetch_todays_total_message_count(service_id) == 3
+    get_counts.assert_called_once_with(mocker.ANY, mocker.ANY, service_ids=[service_id])
+
+
+def test_dao_fetch_todays_stats_for_service_uses_notification_stats_counters(notify_db_session, mocker):
+    service_id = uuid.uuid4()
+    mocker.patch('app.dao.services_dao.notification_stats_counter.get_counts', return_value={
+        str(service_id): Counter({
+            ('sms', KEY_TYPE_NORMAL, 'delivered'): 2,
+            ('sms', KEY_TYPE_TEAM, 'delivered'): 1,
+            ('email', KEY_TYPE_NORMAL, 'sending'): 0,
+            ('sms', KEY_TYPE_TEST, 'created'): 5,
+        })
+    })
+
+    stats = dao_fetch_todays_stats_for_service(service_id)
+
+    assert [(row.notification_type, row.status, row.count) for row in stats] == [('sms', 'delivered', 3)]
+
+
+def test_dao_fetch_todays_stats_for_all_services_uses_notification_stats_counters(notify_db_session, mocker):
+    service1 = create_service(service_name='service 1', email_from='service.1')
+    service2 = create_service(service_name='service 2', email_from='service.2')
+    mocker.patch('app.dao.services_dao.notification_stats_counter.get_counts', return_value={
+        str(service1.id): Counter({
+            ('email', KEY_TYPE_NORMAL, 'created'): 1,
+            ('sms', KEY_TYPE_TEST, 'created'): 1,
+        })
+    })
+
+    stats = dao_fetch_todays_stats_for_all_services(include_from_test_key=False)
+
+    stats = {(row.service_id, row.notification_type, row.status): row.count for row in stats}
+    assert stats == {
+        (service1.id, 'email', 'created'): 1,
+        (service2.id, None, None): None,
+    }
+
+
+def test_dao_fetch_notification_stats_by_hour(notify_db_session):
+    template = create_template(service=create_service())
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 1, 1, 10, 5))
+    create_notification(template=template, status='delivered', created_at=datetime(2021, 1, 1, 10, 55))
+    create_notification(template=template, status='created', created_at=datetime(2021, 1, 1, 11, 0))
+    create_notification(template=template, status='created', created_at=datetime(2021, 1, 1, 12, 0))
+
+    rows = dao_fetch_notification_stats_by_hour(datetime(2021, 1, 1, 10), datetime(2021, 1, 1, 12))
+
+    assert sorted(rows) == [
+        (template.service_id, datetime(2021, 1, 1, 10), 'sms', KEY_TYPE_NORMAL, 'delivered', 2),
+        (template.service_id, datetime(2021, 1, 1, 11), 'sms', KEY_TYPE_NORMAL, 'created', 1),
+    ]
+
+
 def test_dao_fetch_todays_stats_for_all_services_includes_all_services(notify_db_session):
     # two services, each with an email and sms notification
     service1 = create_service(service_name='service 1', email_from='service.1')
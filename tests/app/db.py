@@ -415,7 +415,9 @@ def create_job(
         scheduled_for=None,
         processing_started=None,
         original_file_name='some.csv',
-        archived=False
+        archived=False,
+        rows_processed=0,
+        bytes_processed=0
 ):
     data = {
         'id': uuid.uuid4(),
@@ -430,7 +432,9 @@ def create_job(
         'job_status': job_status,
         'scheduled_for': scheduled_for,
         'processing_started': processing_started,
-        'archived': archived
+        'archived': archived,
+        'rows_processed': rows_processed,
+        'bytes_processed': bytes_processed
     }
     job = Job(**data)
     dao_create_job(job)
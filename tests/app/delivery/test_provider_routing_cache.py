@@ -0,0 +1,115 @@
+import pytest
+
+from app.delivery.provider_routing_cache import ProviderRoutingCache
+from tests.conftest import set_config_values
+
+
+@pytest.fixture
+def redis_store(mocker):
+    return mocker.Mock(active=True, **{'get.return_value': b'1'})
+
+
+@pytest.fixture
+def provider_routing_cache(notify_api, mocker, redis_store):
+    cache = ProviderRoutingCache()
+    with set_config_values(notify_api, {
+        'PROVIDER_ROUTING_CACHE_ENABLED': True,
+        'PROVIDER_ROUTING_CACHE_TTL': 60,
+        'PROVIDER_ROUTING_VERSION_CHECK_INTERVAL': 0,
+    }):
+        cache.init_app(notify_api, mocker.Mock(), redis_store)
+    return cache
+
+
+def _provider(mocker, identifier, notification_type='sms', priority=10, active=True, supports_international=False):
+    return mocker.Mock(
+        id=f'{identifier}-id',
+        identifier=identifier,
+        notification_type=notification_type,
+        priority=priority,
+        active=active,
+        supports_international=supports_international
+    )
+
+
+def test_get_active_providers_returns_active_providers_in_priority_order(provider_routing_cache, mocker):
+    fetch = mocker.Mock(return_value=[
+        _provider(mocker, 'pinpoint', priority=20),
+        _provider(mocker, 'twilio', priority=10, supports_international=True),
+        _provider(mocker, 'inactive', priority=5, active=False),
+        _provider(mocker, 'ses', notification_type='email'),
+    ])
+
+    providers = provider_routing_cache.get_active_providers('sms', False, fetch)
+    international_providers = provider_routing_cache.get_active_providers('sms', True, fetch)
+
+    assert [provider.identifier for provider in providers] == ['twilio', 'pinpoint']
+    assert [provider.identifier for provider in international_providers] == ['twilio']
+    fetch.assert_called_once_with()
+
+
+def test_get_active_providers_excludes_providers_disabled_by_config(provider_routing_cache, notify_api, mocker):
+    fetch = mocker.Mock(return_value=[
+        _provider(mocker, 'govdelivery', notification_type='email', priority=5),
+        _provider(mocker, 'ses', notification_type='email', priority=10),
+    ])
+
+    with set_config_values(notify_api, {'GOVDELIVERY_EMAIL_CLIENT_ENABLED': False}):
+        providers = provider_routing_cache.get_active_providers('email', False, fetch)
+
+    assert [provider.identifier for provider in providers] == ['ses']
+
+
+def test_get_provider_returns_inactive_providers(provider_routing_cache, mocker):
+    fetch = mocker.Mock(return_value=[_provider(mocker, 'twilio', active=False)])
+
+    provider = provider_routing_cache.get_provider('twilio-id', fetch)
+
+    assert provider.identifier == 'twilio'
+    assert not provider.active
+    assert provider_routing_cache.get_provider('unknown-id', fetch) is None
+
+
+def test_routing_table_is_rebuilt_when_version_changes(provider_routing_cache, redis_store, mocker):
+    fetch = mocker.Mock(return_value=[_provider(mocker, 'twilio')])
+
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+    assert fetch.call_count == 1
+
+    redis_store.get.return_value = b'2'
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+
+    assert fetch.call_count == 2
+
+
+def test_version_is_not_checked_within_check_interval(provider_routing_cache, redis_store, mocker):
+    provider_routing_cache.version_check_interval = 60
+    fetch = mocker.Mock(return_value=[_provider(mocker, 'twilio')])
+
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+    redis_store.get.return_value = b'2'
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+
+    assert fetch.call_count == 1
+
+
+def test_routing_table_is_rebuilt_after_ttl(provider_routing_cache, mocker):
+    provider_routing_cache.ttl = 0
+    fetch = mocker.Mock(return_value=[_provider(mocker, 'twilio')])
+
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+
+    assert fetch.call_count == 2
+
+
+def test_invalidate_increments_version_and_clears_table(provider_routing_cache, redis_store, mocker):
+    fetch = mocker.Mock(return_value=[_provider(mocker, 'twilio')])
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+
+    provider_routing_cache.invalidate()
+    provider_routing_cache.get_active_providers('sms', False, fetch)
+
+    redis_store.incr.assert_called_once_with(ProviderRoutingCache.VERSION_KEY)
+    assert fetch.call_count == 2
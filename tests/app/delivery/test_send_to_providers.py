@@ -15,6 +15,7 @@ from app.clients.email import EmailClient
 from app.dao import (provider_details_dao, notifications_dao)
 from app.dao.provider_details_dao import dao_switch_sms_provider_to_provider_with_identifier
 from app.delivery import send_to_providers
+from app.delivery.provider_routing_cache import ProviderRoute
 from app.delivery.send_to_providers import load_provider
 from app.exceptions import NotificationTechnicalFailureException, InvalidProviderException
 from app.feature_flags import FeatureFlag
@@ -82,6 +83,24 @@ def test_should_return_highest_priority_active_provider(restore_provider_details
     assert send_to_providers.provider_to_use(sample_notification).name == first.identifier
 
 
+def test_should_use_provider_routing_cache_if_enabled(mocker, sample_notification):
+    mocker.patch('app.delivery.send_to_providers.provider_routing_cache.enabled', True)
+    mock_get_active_providers = mocker.patch(
+        'app.delivery.send_to_providers.provider_routing_cache.get_active_providers',
+        return_value=[mocker.Mock(identifier='twilio')]
+    )
+    mock_get_provider_details = mocker.patch(
+        'app.delivery.send_to_providers.get_provider_details_by_notification_type'
+    )
+
+    assert send_to_providers.provider_to_use(sample_notification).name == 'twilio'
+
+    mock_get_active_providers.assert_called_once_with(
+        'sms', sample_notification.international, provider_details_dao.get_all_provider_details
+    )
+    mock_get_provider_details.assert_not_called()
+
+
 def test_should_not_use_active_but_disabled_provider(mocker):
     active_provider = mocker.Mock(active=True)
     mocker.patch(
@@ -253,6 +272,46 @@ def test_send_sms_should_use_template_version_from_notification_not_latest(
     assert not persisted_notification.personalisation
 
 
+@pytest.fixture
+def enable_template_cache(mocker):
+    mocker.patch.object(app.template_cache, 'enabled', True)
+    app.template_cache.clear()
+    yield
+    app.template_cache.clear()
+
+
+def test_send_sms_loads_each_template_version_once_when_template_cache_enabled(
+        sample_template_with_placeholders,
+        mock_sms_client,
+        enable_template_cache,
+        mocker
+):
+    sample_template_with_placeholders.service.prefix_sms = True
+    get_template = mocker.patch(
+        'app.delivery.send_to_providers.dao_get_template_by_id',
+        return_value=sample_template_with_placeholders
+    )
+    notifications = [
+        create_notification(
+            template=sample_template_with_placeholders,
+            to_field='+16502532222',
+            personalisation={'name': name}
+        )
+        for name in ('Jo', 'Sam')
+    ]
+
+    for notification in notifications:
+        send_to_providers.send_sms_to_provider(notification)
+
+    get_template.assert_called_once_with(
+        sample_template_with_placeholders.id, sample_template_with_placeholders.version
+    )
+    assert [call[1]['content'] for call in mock_sms_client.send_sms.call_args_list] == [
+        'Sample service: Hello Jo\nYour thing is due soon',
+        'Sample service: Hello Sam\nYour thing is due soon',
+    ]
+
+
 @pytest.mark.parametrize('research_mode,key_type', [
     (True, KEY_TYPE_NORMAL),
     (False, KEY_TYPE_TEST)
@@ -908,6 +967,19 @@ def test_load_provider_returns_provider_details_if_provider_is_active(fake_uuid,
     assert provider_details == mocked_provider_details
 
 
+def test_load_provider_returns_cached_provider_route_if_routing_cache_is_enabled(fake_uuid, mocker):
+    route = ProviderRoute(
+        id=fake_uuid, identifier='ses', notification_type='email', priority=10, active=True,
+        supports_international=False
+    )
+    mocker.patch('app.delivery.send_to_providers.provider_routing_cache.enabled', True)
+    mocker.patch('app.delivery.send_to_providers.provider_routing_cache.get_provider', return_value=route)
+    mock_get_provider_details = mocker.patch('app.delivery.send_to_providers.get_provider_details_by_id')
+
+    assert load_provider(fake_uuid) == route
+    mock_get_provider_details.assert_not_called()
+
+
 def test_provider_to_use_should_return_template_provider(mocker):
     mocker.patch.dict(os.environ, {'TEMPLATE_SERVICE_PROVIDERS_ENABLED': 'True'})
     client_name = 'template-client'
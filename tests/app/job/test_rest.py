@@ -574,6 +574,25 @@ def test_get_job_by_id(admin_request, sample_job):
     assert resp_json['data']['created_by']['name'] == 'Test User'
 
 
+@pytest.mark.parametrize('job_status, rows_processed, expected_progress', [
+    ('pending', 0, 0),
+    ('in progress', 4, 40),
+    ('finished', 4, 100),
+])
+def test_get_job_by_id_returns_processing_progress(
+    admin_request, sample_template, job_status, rows_processed, expected_progress
+):
+    job = create_job(
+        sample_template, notification_count=10, job_status=job_status, rows_processed=rows_processed, bytes_processed=99
+    )
+
+    resp_json = admin_request.get('job.get_job_by_service_and_job_id', service_id=job.service_id, job_id=job.id)
+
+    assert resp_json['data']['processing_progress'] == expected_progress
+    assert resp_json['data']['rows_processed'] == rows_processed
+    assert 'bytes_processed' not in resp_json['data']
+
+
 def test_get_job_by_id_should_return_summed_statistics(admin_request, sample_job):
     job_id = str(sample_job.id)
     service_id = sample_job.service.id
@@ -0,0 +1,171 @@
+from collections import Counter
+from datetime import datetime
+import uuid
+
+import pytest
+
+from app import db
+from app.notifications.notification_stats_counter import NotificationStatsCounter
+from tests.conftest import set_config_values
+
+
+@pytest.fixture
+def redis_store(mocker):
+    return mocker.Mock(active=True, **{'get.return_value': b'2021-01-01T00'})
+
+
+@pytest.fixture
+def notification_stats_counter(notify_api, mocker, redis_store):
+    counter = NotificationStatsCounter()
+    with set_config_values(notify_api, {
+        'NOTIFICATION_STATS_COUNTERS_ENABLED': True,
+        'NOTIFICATION_STATS_COUNTERS_TTL': 3600,
+    }):
+        counter.init_app(notify_api, mocker.Mock(), redis_store)
+    return counter
+
+
+def _notification(mocker, service_id, status='created', created_at=datetime(2021, 1, 1, 10, 15)):
+    return mocker.Mock(
+        service_id=service_id, notification_type='sms', key_type='normal', status=status, created_at=created_at
+    )
+
+
+def test_record_created_increments_hourly_bucket(notification_stats_counter, redis_store, mocker):
+    service_id = uuid.uuid4()
+    pipeline = redis_store.redis_store.pipeline.return_value
+
+    notification_stats_counter.record_created([_notification(mocker, service_id), _notification(mocker, service_id)])
+    pipeline.execute.assert_not_called()
+    db.session.commit()
+
+    assert pipeline.hincrby.call_args_list == [
+        mocker.call(f'notification-stats-{service_id}-2021-01-01T10', 'sms:normal:created', 1),
+        mocker.call(f'notification-stats-{service_id}-2021-01-01T10', 'sms:normal:created', 1),
+    ]
+    pipeline.sadd.assert_called_with('notification-stats-services-2021-01-01T10', str(service_id))
+    pipeline.execute.assert_called_once_with()
+
+
+def test_record_status_changes_moves_count_between_statuses(notification_stats_counter, redis_store, mocker):
+    service_id = uuid.uuid4()
+    pipeline = redis_store.redis_store.pipeline.return_value
+
+    notification_stats_counter.record_status_changes([
+        (_notification(mocker, service_id), 'sending', 'delivered'),
+        (_notification(mocker, service_id), 'delivered', 'delivered'),
+    ])
+    db.session.commit()
+
+    assert pipeline.hincrby.call_args_list == [
+        mocker.call(f'notification-stats-{service_id}-2021-01-01T10', 'sms:normal:sending', -1),
+        mocker.call(f'notification-stats-{service_id}-2021-01-01T10', 'sms:normal:delivered', 1),
+    ]
+
+
+def test_record_created_discards_increments_when_transaction_is_rolled_back(
+        notification_stats_counter, redis_store, mocker
+):
+    notification_stats_counter.record_created([_notification(mocker, uuid.uuid4())])
+    db.session.rollback()
+    db.session.commit()
+
+    redis_store.redis_store.pipeline.assert_not_called()
+
+
+def test_record_created_does_nothing_when_disabled(notification_stats_counter, redis_store, mocker):
+    notification_stats_counter.enabled = False
+
+    notification_stats_counter.record_created([_notification(mocker, uuid.uuid4())])
+    db.session.commit()
+
+    redis_store.redis_store.pipeline.assert_not_called()
+
+
+def test_record_created_logs_redis_errors(notification_stats_counter, redis_store, mocker):
+    redis_store.redis_store.pipeline.return_value.execute.side_effect = Exception('redis down')
+
+    notification_stats_counter.record_created([_notification(mocker, uuid.uuid4())])
+    db.session.commit()
+
+    notification_stats_counter.statsd_client.incr.assert_called_with('notification-stats-counter.error')
+
+
+def test_get_counts_adds_up_hourly_buckets(notification_stats_counter, redis_store):
+    service_id = str(uuid.uuid4())
+    redis_store.redis_store.pipeline.return_value.execute.return_value = [
+        {b'sms:normal:delivered': b'2', b'sms:test:created': b'1'},
+        {b'sms:normal:delivered': b'3'},
+    ]
+
+    counts = notification_stats_counter.get_counts(
+        datetime(2021, 1, 1, 10), datetime(2021, 1, 1, 12), service_ids=[service_id]
+    )
+
+    assert counts == {
+        service_id: Counter({('sms', 'normal', 'delivered'): 5, ('sms', 'test', 'created'): 1})
+    }
+
+
+def test_get_counts_for_all_services_reads_services_from_hourly_sets(notification_stats_counter, redis_store):
+    service_id = str(uuid.uuid4())
+    redis_store.redis_store.sunion.return_value = {service_id.encode('utf-8')}
+    redis_store.redis_store.pipeline.return_value.execute.return_value = [{b'email:normal:sending': b'1'}]
+
+    counts = notification_stats_counter.get_counts(datetime(2021, 1, 1, 10), datetime(2021, 1, 1, 11))
+
+    redis_store.redis_store.sunion.assert_called_once_with(['notification-stats-services-2021-01-01T10'])
+    assert counts == {service_id: Counter({('email', 'normal', 'sending'): 1})}
+
+
+@pytest.mark.parametrize('complete_from', [None, b'2021-01-01T11'])
+def test_get_counts_returns_none_before_counts_are_complete(notification_stats_counter, redis_store, complete_from):
+    redis_store.get.return_value = complete_from
+
+    assert notification_stats_counter.get_counts(datetime(2021, 1, 1, 10), datetime(2021, 1, 1, 12)) is None
+    redis_store.redis_store.pipeline.assert_not_called()
+
+
+def test_reconcile_moves_counts_to_rows_and_records_complete_from(notification_stats_counter, redis_store, mocker):
+    service_id = uuid.uuid4()
+    redis = redis_store.redis_store
+    redis.smembers.side_effect = [{b'old-service'}, {str(service_id).encode('utf-8')}]
+    redis.get.return_value = None
+    pipeline = redis.pipeline.return_value
+    pipeline.execute.side_effect = [
+        [{b'sms:normal:created': b'2'}, {b'sms:normal:delivered': b'3'}],
+        [],
+    ]
+    rows = [(service_id, datetime(2021, 1, 1, 11), 'sms', 'normal', 'delivered', 4)]
+
+    assert notification_stats_counter.reconcile(
+        datetime(2021, 1, 1, 10), datetime(2021, 1, 1, 12), lambda: rows
+    ) == rows
+
+    assert redis.pipeline.call_args_list == [mocker.call(transaction=False), mocker.call(transaction=True)]
+    pipeline.delete.assert_not_called()
+    assert pipeline.hincrby.call_args_list == [
+        mocker.call('notification-stats-old-service-2021-01-01T10', 'sms:normal:created', -2),
+        mocker.call(f'notification-stats-{service_id}-2021-01-01T11', 'sms:normal:delivered', 1),
+    ]
+    redis.set.assert_called_once_with('notification-stats-complete-from', '2021-01-01T10')
+
+
+def test_reconcile_keeps_increments_made_while_rows_are_fetched(notification_stats_counter, redis_store, mocker):
+    service_id = uuid.uuid4()
+    redis = redis_store.redis_store
+    redis.smembers.side_effect = [set(), set()]
+    pipeline = redis.pipeline.return_value
+    pipeline.execute.side_effect = [[], [], []]
+
+    def fetch_rows():
+        notification_stats_counter.record_created([_notification(mocker, service_id)])
+        db.session.commit()
+        return []
+
+    notification_stats_counter.reconcile(datetime(2021, 1, 1, 10), datetime(2021, 1, 1, 12), fetch_rows)
+
+    # The increment is written as it commits, and is not then moved back to the rows
+    pipeline.hincrby.assert_called_once_with(
+        f'notification-stats-{service_id}-2021-01-01T10', 'sms:normal:created', 1
+    )
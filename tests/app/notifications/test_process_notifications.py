@@ -12,6 +12,7 @@ from app.celery.lookup_recipient_communication_permissions_task import lookup_re
 from app.celery.contact_information_tasks import lookup_contact_info
 from app.celery.lookup_va_profile_id_task import lookup_va_profile_id
 from app.celery.onsite_notification_tasks import send_va_onsite_notification_task
+from app.celery.recipient_info_pipeline_task import lookup_recipient_info
 from app.celery.provider_tasks import deliver_email, deliver_sms
 from app.feature_flags import FeatureFlag
 from app.models import (
@@ -24,8 +25,10 @@ from app.models import (
     SMS_TYPE,
     RecipientIdentifier)
 from app.notifications.process_notifications import (
+    build_notification,
     create_content_for_notification,
     persist_notification,
+    persist_notifications,
     persist_scheduled_notification,
     send_notification_to_queue,
     simulated_recipient,
@@ -252,6 +255,33 @@ def test_persist_notification_increments_cache_if_key_exists(sample_template, sa
     mock_incr.assert_called_once_with(str(sample_template.service_id) + "-2016-01-01-count", )
 
 
+@freeze_time("2016-01-01 11:09:00.061258")
+def test_persist_notifications_increments_cache_once_by_number_of_notifications(
+        sample_template, sample_api_key, mocker
+):
+    mock_redis = mocker.patch('app.notifications.process_notifications.redis_store')
+    mock_redis.get.return_value = 1
+    notifications = [
+        build_notification(
+            template_id=sample_template.id,
+            template_version=sample_template.version,
+            recipient=recipient,
+            service=sample_template.service,
+            personalisation={},
+            notification_type='sms',
+            api_key_id=sample_api_key.id,
+            key_type=sample_api_key.key_type
+        )
+        for recipient in ('+16502532222', '+16502532223')
+    ]
+
+    persist_notifications(notifications)
+
+    assert Notification.query.count() == 2
+    mock_redis.incr.assert_not_called()
+    mock_redis.redis_store.incrby.assert_called_once_with(str(sample_template.service_id) + "-2016-01-01-count", 2)
+
+
 @pytest.mark.parametrize(
     "research_mode, requested_queue, notification_type, key_type, expected_queue, expected_tasks",
     [
@@ -867,7 +897,6 @@ def test_persist_notification_should_not_persist_recipient_identifier_if_none_pr
         IdentifierType.VA_PROFILE_ID.value,
         EMAIL_TYPE,
         [
-            send_va_onsite_notification_task,
             lookup_contact_info,
             lookup_recipient_communication_permissions,
             deliver_email
@@ -877,7 +906,6 @@ def test_persist_notification_should_not_persist_recipient_identifier_if_none_pr
         IdentifierType.VA_PROFILE_ID.value,
         SMS_TYPE,
         [
-            send_va_onsite_notification_task,
             lookup_contact_info,
             lookup_recipient_communication_permissions,
             deliver_sms
@@ -888,7 +916,6 @@ def test_persist_notification_should_not_persist_recipient_identifier_if_none_pr
         EMAIL_TYPE,
         [
             lookup_va_profile_id,
-            send_va_onsite_notification_task,
             lookup_contact_info,
             lookup_recipient_communication_permissions,
             deliver_email
@@ -899,7 +926,6 @@ def test_persist_notification_should_not_persist_recipient_identifier_if_none_pr
         SMS_TYPE,
         [
             lookup_va_profile_id,
-            send_va_onsite_notification_task,
             lookup_contact_info,
             lookup_recipient_communication_permissions,
             deliver_sms
@@ -917,7 +943,7 @@ def test_send_notification_to_correct_queue_to_lookup_contact_info(
 ):
     mocker.patch(
         'app.notifications.process_notifications.is_feature_enabled',
-        return_value=True
+        side_effect=lambda feature_flag: feature_flag != FeatureFlag.RECIPIENT_INFO_PIPELINE_ENABLED
     )
 
     mocked_chain = mocker.patch('app.notifications.process_notifications.chain')
@@ -943,6 +969,86 @@ def test_send_notification_to_correct_queue_to_lookup_contact_info(
         assert called_task.name == expected_task.name
 
 
+def test_send_notification_posts_onsite_notification_outside_chain_for_va_profile_id(
+        client,
+        mocker,
+        sample_sms_template_with_html
+):
+    mocker.patch('app.notifications.process_notifications.is_feature_enabled', return_value=False)
+    mocked_chain = mocker.patch('app.notifications.process_notifications.chain')
+    mocked_onsite = mocker.patch(
+        'app.notifications.process_notifications.send_va_onsite_notification_task.apply_async'
+    )
+
+    notification = Notification(
+        id=str(uuid.uuid4()),
+        notification_type=SMS_TYPE,
+        template=sample_sms_template_with_html
+    )
+
+    send_to_queue_for_recipient_info_based_on_recipient_identifier(
+        notification, IdentifierType.VA_PROFILE_ID.value, 'some_id_value', None, onsite_enabled=True
+    )
+
+    mocked_onsite.assert_called_once_with(
+        args=('some_id_value', sample_sms_template_with_html.id, True), queue='onsite-notification-tasks'
+    )
+    assert [task.name for task in mocked_chain.call_args[0]] == [lookup_contact_info.name, deliver_sms.name]
+
+
+def test_send_notification_links_onsite_notification_to_va_profile_id_lookup(
+        client,
+        mocker,
+        sample_sms_template_with_html
+):
+    mocker.patch('app.notifications.process_notifications.is_feature_enabled', return_value=False)
+    mocked_chain = mocker.patch('app.notifications.process_notifications.chain')
+
+    notification = Notification(
+        id=str(uuid.uuid4()),
+        notification_type=SMS_TYPE,
+        template=sample_sms_template_with_html
+    )
+
+    send_to_queue_for_recipient_info_based_on_recipient_identifier(
+        notification, IdentifierType.ICN.value, 'some_id_value', None, onsite_enabled=True
+    )
+
+    lookup_task, contact_info_task, deliver_task = mocked_chain.call_args[0]
+    assert lookup_task.name == lookup_va_profile_id.name
+    [onsite_task] = lookup_task.options['link']
+    assert onsite_task.name == send_va_onsite_notification_task.name
+    assert onsite_task.args == (sample_sms_template_with_html.id, True)
+    assert onsite_task.options['queue'] == 'onsite-notification-tasks'
+
+
+@pytest.mark.parametrize('id_type', [IdentifierType.VA_PROFILE_ID.value, IdentifierType.ICN.value])
+def test_send_notification_to_recipient_info_pipeline_when_enabled(
+        client,
+        mocker,
+        id_type,
+        sample_sms_template_with_html
+):
+    mocker.patch('app.notifications.process_notifications.is_feature_enabled', return_value=True)
+    mocked_chain = mocker.patch('app.notifications.process_notifications.chain')
+
+    notification = Notification(
+        id=str(uuid.uuid4()),
+        notification_type=SMS_TYPE,
+        template=sample_sms_template_with_html
+    )
+
+    send_to_queue_for_recipient_info_based_on_recipient_identifier(
+        notification, id_type, 'some_id_value', uuid.uuid4(), onsite_enabled=True
+    )
+
+    pipeline_task, deliver_task = mocked_chain.call_args[0]
+    assert pipeline_task.name == lookup_recipient_info.name
+    assert pipeline_task.args == (notification.id, True, True)
+    assert pipeline_task.options['queue'] == 'lookup-va-profile-id-tasks'
+    assert deliver_task.name == deliver_sms.name
+
+
 def test_send_notification_with_sms_sender_rate_limit_uses_rate_limit_delivery_task(
         client,
         mocker
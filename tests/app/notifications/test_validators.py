@@ -148,6 +148,24 @@ def test_check_service_message_limit_over_message_limit_fails(key_type, sample_s
         )
 
 
+@pytest.mark.parametrize('key_type', ['team', 'normal'])
+def test_check_service_message_limit_fails_if_bulk_request_would_exceed_limit(
+        notify_db_session,
+        key_type,
+        mocker):
+    current_app.config['API_MESSAGE_LIMIT_ENABLED'] = True
+
+    mocker.patch('app.redis_store.get', return_value=2)
+    mocker.patch('app.notifications.validators.services_dao')
+
+    service = create_service(restricted=True, message_limit=4)
+    check_service_over_daily_message_limit(key_type, service, notification_count=2)
+
+    with pytest.raises(TooManyRequestsError) as e:
+        check_service_over_daily_message_limit(key_type, service, notification_count=3)
+    assert e.value.message == 'Exceeded send limits (4) for today'
+
+
 @pytest.mark.parametrize('key_type', ['team', 'normal'])
 def test_check_service_message_limit_in_cache_over_message_limit_fails(
         notify_db_session,
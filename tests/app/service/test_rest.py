@@ -2,6 +2,7 @@ import json
 import uuid
 from datetime import datetime, timedelta, date
 from unittest.mock import ANY
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 from flask import url_for, current_app
@@ -2300,6 +2301,24 @@ def test_search_for_notification_by_to_field_return_empty_list_if_there_is_no_ma
     assert len(notifications) == 0
 
 
+def test_search_for_notification_by_to_field_matches_exactly_if_asked_to(client, sample_email_template):
+    notification = create_notification(
+        sample_email_template, to_field='jack@gmail.com', normalised_to='jack@gmail.com'
+    )
+    create_notification(sample_email_template, to_field='hijack@gmail.com', normalised_to='hijack@gmail.com')
+
+    response = client.get(
+        '/service/{}/notifications?to={}&template_type={}&exact_match=True'.format(
+            notification.service_id, 'jack@gmail.com', 'email'
+        ),
+        headers=[create_authorization_header()]
+    )
+    notifications = json.loads(response.get_data(as_text=True))['notifications']
+
+    assert response.status_code == 200
+    assert [n['id'] for n in notifications] == [str(notification.id)]
+
+
 def test_search_for_notification_by_to_field_return_multiple_matches(client, sample_template, sample_email_template):
     notification1 = create_notification(sample_template, to_field='+16502532222', normalised_to='+16502532222')
     notification2 = create_notification(sample_template, to_field=' +165 0253 2222 ', normalised_to='+16502532222')
@@ -3420,3 +3439,58 @@ def test_delete_smtp_relay_for_service_returns_201_if_success(mocker, client, no
 
     delete_mock.assert_called_once()
     assert resp.status_code == 201
+
+
+def test_get_all_notifications_for_service_pages_by_cursor(admin_request, sample_template):
+    older_notification = create_notification(sample_template, created_at=datetime(2021, 6, 15, 12, 0))
+    newer_notification = create_notification(sample_template, created_at=datetime(2021, 6, 15, 12, 1))
+
+    first_page = admin_request.get(
+        'service.get_all_notifications_for_service',
+        service_id=sample_template.service_id,
+        page_size=1,
+        count_pages=False,
+        cursor=''
+    )
+    cursor = parse_qs(urlparse(first_page['links']['next']).query)['cursor'][0]
+    second_page = admin_request.get(
+        'service.get_all_notifications_for_service',
+        service_id=sample_template.service_id,
+        page_size=1,
+        count_pages=False,
+        cursor=cursor
+    )
+
+    assert [n['id'] for n in first_page['notifications']] == [str(newer_notification.id)]
+    assert first_page['total'] is None
+    assert [n['id'] for n in second_page['notifications']] == [str(older_notification.id)]
+
+
+def test_search_for_notification_by_to_field_pages_by_cursor(admin_request, sample_template):
+    older_notification = create_notification(
+        sample_template, to_field='+16502532222', normalised_to='+16502532222', created_at=datetime(2021, 6, 15, 12, 0)
+    )
+    newer_notification = create_notification(
+        sample_template, to_field='+16502532222', normalised_to='+16502532222', created_at=datetime(2021, 6, 15, 12, 1)
+    )
+
+    first_page = admin_request.get(
+        'service.get_all_notifications_for_service',
+        service_id=sample_template.service_id,
+        to='+16502532222',
+        template_type='sms',
+        page_size=1,
+        cursor=''
+    )
+    cursor = parse_qs(urlparse(first_page['links']['next']).query)['cursor'][0]
+    second_page = admin_request.get(
+        'service.get_all_notifications_for_service',
+        service_id=sample_template.service_id,
+        to='+16502532222',
+        template_type='sms',
+        page_size=1,
+        cursor=cursor
+    )
+
+    assert [n['id'] for n in first_page['notifications']] == [str(newer_notification.id)]
+    assert [n['id'] for n in second_page['notifications']] == [str(older_notification.id)]
@@ -0,0 +1,69 @@
+import pytest
+
+from app.template.template_cache import TemplateCache
+from tests.conftest import set_config_values
+
+
+@pytest.fixture
+def template_cache(notify_api, mocker):
+    cache = TemplateCache()
+    with set_config_values(notify_api, {
+        'TEMPLATE_CACHE_ENABLED': True,
+        'TEMPLATE_CACHE_MAX_SIZE': 2,
+    }):
+        cache.init_app(notify_api, mocker.Mock())
+    return cache
+
+
+def test_get_template_dict_fetches_on_miss_and_caches_result(template_cache, sample_template, mocker):
+    fetch = mocker.Mock(return_value=sample_template)
+
+    first = template_cache.get_template_dict(sample_template.id, sample_template.version, fetch)
+    second = template_cache.get_template_dict(sample_template.id, sample_template.version, fetch)
+
+    assert first is second
+    assert first['content'] == sample_template.content
+    assert first['template_type'] == sample_template.template_type
+    assert '_sa_instance_state' not in first
+    fetch.assert_called_once_with()
+    template_cache.statsd_client.incr.assert_has_calls([
+        mocker.call('template-cache.miss'),
+        mocker.call('template-cache.hit'),
+    ])
+
+
+def test_get_template_dict_caches_each_version_separately(template_cache, sample_template, mocker):
+    fetch = mocker.Mock(return_value=sample_template)
+
+    template_cache.get_template_dict(sample_template.id, 1, fetch)
+    template_cache.get_template_dict(sample_template.id, 2, fetch)
+
+    assert fetch.call_count == 2
+
+
+def test_get_template_dict_evicts_least_recently_used(template_cache, sample_template, mocker):
+    fetch = mocker.Mock(return_value=sample_template)
+
+    template_cache.get_template_dict('template-1', 1, fetch)
+    template_cache.get_template_dict('template-2', 1, fetch)
+    template_cache.get_template_dict('template-1', 1, fetch)
+    template_cache.get_template_dict('template-3', 1, fetch)
+
+    assert len(template_cache) == 2
+    assert fetch.call_count == 3
+
+    template_cache.get_template_dict('template-1', 1, fetch)
+    assert fetch.call_count == 3
+    template_cache.get_template_dict('template-2', 1, fetch)
+    assert fetch.call_count == 4
+
+
+def test_get_template_dict_does_not_cache_when_disabled(template_cache, sample_template, mocker):
+    template_cache.enabled = False
+    fetch = mocker.Mock(return_value=sample_template)
+
+    template_cache.get_template_dict(sample_template.id, sample_template.version, fetch)
+    template_cache.get_template_dict(sample_template.id, sample_template.version, fetch)
+
+    assert fetch.call_count == 2
+    template_cache.statsd_client.incr.assert_not_called()
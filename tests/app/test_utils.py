@@ -4,6 +4,8 @@ import pytest
 from freezegun import freeze_time
 
 from app.utils import (
+    decode_cursor,
+    encode_cursor,
     get_local_timezone_midnight,
     get_local_timezone_midnight_in_utc,
     get_midnight_for_day_before,
@@ -79,3 +81,15 @@ def test_update_dct_to_str():
     expected = ' '.join(expected).strip()
 
     assert result == expected
+
+
+def test_decode_cursor_returns_encoded_values_as_strings():
+    cursor = encode_cursor([datetime(2021, 6, 15, 12, 0, 0, 123), 7])
+
+    assert decode_cursor(cursor) == ['2021-06-15 12:00:00.000123', '7']
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'e30=', 'WzFd'])
+def test_decode_cursor_rejects_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -1,10 +1,13 @@
 import datetime
+from urllib.parse import urlparse
+
 import pytest
 from flask import json, url_for
 
 from app import DATETIME_FORMAT
 from app.va.identifier import IdentifierType
 from tests import create_authorization_header
+from tests.conftest import set_config
 from tests.app.db import (
     create_notification,
     create_template,
@@ -535,6 +538,38 @@ def test_get_all_notifications_filter_by_id(client, sample_template):
     assert json_response['notifications'][0]['id'] == str(older_notification.id)
 
 
+def test_get_all_notifications_next_link_pages_by_cursor(client, notify_api, sample_template):
+    older_notification = create_notification(template=sample_template, created_at=datetime.datetime(2021, 6, 15, 12, 0))
+    newer_notification = create_notification(template=sample_template, created_at=datetime.datetime(2021, 6, 15, 12, 1))
+    auth_header = create_authorization_header(service_id=sample_template.service_id)
+
+    with set_config(notify_api, 'API_PAGE_SIZE', 1):
+        first_page = json.loads(client.get(
+            path='/v2/notifications', headers=[('Content-Type', 'application/json'), auth_header]
+        ).get_data(as_text=True))
+        next_link = urlparse(first_page['links']['next'])
+        next_path = '{}?{}'.format(next_link.path, next_link.query)
+        second_page = json.loads(client.get(
+            path=next_path, headers=[('Content-Type', 'application/json'), auth_header]
+        ).get_data(as_text=True))
+
+    assert [n['id'] for n in first_page['notifications']] == [str(newer_notification.id)]
+    assert '?cursor=' in first_page['links']['next']
+    assert [n['id'] for n in second_page['notifications']] == [str(older_notification.id)]
+
+
+def test_get_all_notifications_invalid_cursor(client, sample_notification):
+    auth_header = create_authorization_header(service_id=sample_notification.service_id)
+    response = client.get(
+        path='/v2/notifications?cursor=not-a-cursor',
+        headers=[('Content-Type', 'application/json'), auth_header])
+
+    json_response = json.loads(response.get_data(as_text=True))
+
+    assert response.status_code == 400
+    assert json_response['errors'][0]['message'] == 'Invalid cursor'
+
+
 def test_get_all_notifications_filter_by_id_invalid_id(client, sample_notification):
     auth_header = create_authorization_header(service_id=sample_notification.service_id)
     response = client.get(
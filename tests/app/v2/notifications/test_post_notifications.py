@@ -22,7 +22,11 @@ from flask import json, current_app
 
 from app.schema_validation import validate
 from app.v2.errors import RateLimitError
-from app.v2.notifications.notification_schemas import post_sms_response, post_email_response
+from app.v2.notifications.notification_schemas import (
+    post_sms_response,
+    post_email_response,
+    post_bulk_notifications_response
+)
 from app.va.identifier import IdentifierType
 from app.config import QueueNames
 from app.feature_flags import FeatureFlag
@@ -37,6 +41,7 @@ from tests.app.db import (
     create_api_key
 )
 from tests.app.factories.feature_flag import mock_feature_flag
+from tests.conftest import set_config
 from . import post_send_notification
 
 
@@ -1270,3 +1275,137 @@ def test_post_notification_returns_400_when_billing_code_length_exceeds_max(clie
 
     assert response.status_code == 400
     assert 'too long' in response.json['errors'][0]['message']
+
+
+@pytest.fixture
+def enable_bulk_notifications(mocker):
+    mock_feature_flag(mocker, FeatureFlag.BULK_NOTIFICATIONS_ENABLED, 'True')
+    mocker.patch('app.notifications.process_notifications.notify_celery.producer_or_acquire')
+
+
+def post_bulk_notifications(client, service, notification_type, payload):
+    return client.post(
+        path=f"/v2/notifications/{notification_type}/bulk",
+        data=json.dumps(payload),
+        headers=[('Content-Type', 'application/json'), create_authorization_header(service_id=service.id)]
+    )
+
+
+def test_post_bulk_notifications_returns_501_when_feature_flag_disabled(client, sample_template, mocker):
+    mock_feature_flag(mocker, FeatureFlag.BULK_NOTIFICATIONS_ENABLED, 'False')
+
+    data = {
+        'template_id': str(sample_template.id),
+        'recipients': [{'phone_number': '+16502532222'}]
+    }
+
+    response = post_bulk_notifications(client, sample_template.service, 'sms', data)
+
+    assert response.status_code == 501
+    assert Notification.query.count() == 0
+
+
+def test_post_bulk_sms_notifications_persists_and_enqueues_every_recipient(
+        client, sample_template_with_placeholders, mock_deliver_sms, enable_bulk_notifications
+):
+    data = {
+        'template_id': str(sample_template_with_placeholders.id),
+        'recipients': [
+            {'phone_number': '+16502532222', 'personalisation': {' Name': 'Jo'}, 'reference': 'first'},
+            {'phone_number': '+16502532223', 'personalisation': {' Name': 'Sam'}, 'reference': 'second'},
+        ]
+    }
+
+    response = post_bulk_notifications(client, sample_template_with_placeholders.service, 'sms', data)
+
+    assert response.status_code == 201
+    resp_json = response.get_json()
+    assert validate(resp_json, post_bulk_notifications_response) == resp_json
+    assert resp_json['errors'] == []
+
+    notifications = Notification.query.order_by(Notification.client_reference).all()
+    assert len(notifications) == 2
+    assert [n.normalised_to for n in notifications] == ['+16502532222', '+16502532223']
+    assert all(n.status == NOTIFICATION_CREATED for n in notifications)
+    assert {item['id'] for item in resp_json['data']} == {str(n.id) for n in notifications}
+    assert [item['content']['body'] for item in resp_json['data']] == [
+        'Hello Jo\nYour thing is due soon',
+        'Hello Sam\nYour thing is due soon',
+    ]
+    assert mock_deliver_sms.call_count == 2
+
+
+def test_post_bulk_email_notifications_returns_errors_for_invalid_recipients(
+        client, sample_email_template_with_placeholders, mock_deliver_email, enable_bulk_notifications
+):
+    data = {
+        'template_id': str(sample_email_template_with_placeholders.id),
+        'recipients': [
+            {'email_address': 'one@example.com', 'personalisation': {'name': 'Jo'}},
+            {'email_address': 'two@example.com'},
+        ]
+    }
+
+    response = post_bulk_notifications(client, sample_email_template_with_placeholders.service, 'email', data)
+
+    assert response.status_code == 201
+    resp_json = response.get_json()
+    assert len(resp_json['data']) == 1
+    assert resp_json['data'][0]['content']['subject'] == 'Jo'
+    assert resp_json['errors'] == [
+        {'index': 1, 'error': 'BadRequestError', 'message': 'Missing personalisation: name'}
+    ]
+    assert Notification.query.count() == 1
+    assert mock_deliver_email.call_count == 1
+
+
+def test_post_bulk_notifications_returns_400_when_no_recipient_can_be_sent_to(
+        client, sample_email_template_with_placeholders, mock_deliver_email, enable_bulk_notifications
+):
+    data = {
+        'template_id': str(sample_email_template_with_placeholders.id),
+        'recipients': [{'email_address': 'one@example.com'}, {'email_address': 'two@example.com'}]
+    }
+
+    response = post_bulk_notifications(client, sample_email_template_with_placeholders.service, 'email', data)
+
+    assert response.status_code == 400
+    assert response.get_json() == {
+        'status_code': 400,
+        'errors': [
+            {'index': 0, 'error': 'BadRequestError', 'message': 'Missing personalisation: name'},
+            {'index': 1, 'error': 'BadRequestError', 'message': 'Missing personalisation: name'},
+        ]
+    }
+    assert Notification.query.count() == 0
+    mock_deliver_email.assert_not_called()
+
+
+def test_post_bulk_notifications_rejects_too_many_recipients(
+        client, notify_api, sample_template, enable_bulk_notifications
+):
+    data = {
+        'template_id': str(sample_template.id),
+        'recipients': [{'phone_number': '+16502532222'}, {'phone_number': '+16502532223'}]
+    }
+
+    with set_config(notify_api, 'BULK_NOTIFICATIONS_MAX_RECIPIENTS', 1):
+        response = post_bulk_notifications(client, sample_template.service, 'sms', data)
+
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['message'] == 'A bulk request can have at most 1 recipients'
+    assert Notification.query.count() == 0
+
+
+def test_post_bulk_notifications_checks_daily_limit_for_every_recipient(
+        client, sample_template, mocker, enable_bulk_notifications
+):
+    check_mock = mocker.patch('app.v2.notifications.post_notifications.check_rate_limiting')
+    data = {
+        'template_id': str(sample_template.id),
+        'recipients': [{'phone_number': '+16502532222'}, {'phone_number': '+16502532223'}]
+    }
+
+    post_bulk_notifications(client, sample_template.service, 'sms', data)
+
+    assert check_mock.call_args[1] == {'notification_count': 2}
@@ -0,0 +1,78 @@
+import pytest
+import requests_mock
+from urllib3.util.retry import RequestHistory
+
+from app.va.mtls_session import MtlsSession, _JitteredRetry
+
+
+@pytest.fixture
+def mtls_session(mocker):
+    return MtlsSession(
+        'some_cert.pem', 'some_key.pem', mocker.Mock(), 'clients.some-api',
+        pool_size=2, timeout=(1, 5), max_retries=3, retry_backoff=0.5
+    )
+
+
+def test_get_reuses_session_with_client_certificate_and_timeouts(mtls_session):
+    with requests_mock.Mocker() as request_mock:
+        request_mock.get('https://some.host/some-path', json={})
+
+        mtls_session.get('https://some.host/some-path')
+        session = mtls_session._session
+        mtls_session.get('https://some.host/some-path', params={'a': 'b'})
+
+    assert mtls_session._session is session
+    assert request_mock.request_history[0].cert == ('some_cert.pem', 'some_key.pem')
+    assert request_mock.request_history[0].timeout == (1, 5)
+    assert request_mock.request_history[1].qs == {'a': ['b']}
+    mtls_session.statsd_client.incr.assert_called_with('clients.some-api.connection.reused')
+
+
+def test_get_makes_new_session_in_forked_process(mtls_session, mocker):
+    mocker.patch('app.va.mtls_session.os.getpid', side_effect=[1, 1, 2, 2])
+
+    with requests_mock.Mocker() as request_mock:
+        request_mock.get('https://some.host/some-path', json={})
+
+        mtls_session.get('https://some.host/some-path')
+        parent_session = mtls_session._session
+        mtls_session.get('https://some.host/some-path')
+
+    assert mtls_session._session is not parent_session
+
+
+def test_get_times_handshake_separately_from_request(mtls_session, mocker):
+    def get_over_new_connection(*args, **kwargs):
+        mtls_session._on_connect(0.25)
+        return mocker.Mock()
+
+    session = mtls_session._get_session()
+    mocker.patch.object(session, 'get', side_effect=get_over_new_connection)
+    mocker.patch('app.va.mtls_session.monotonic', side_effect=[10, 11])
+
+    mtls_session.get('https://some.host/some-path')
+
+    mtls_session.statsd_client.timing.assert_any_call('clients.some-api.request-time.handshake', 0.25)
+    mtls_session.statsd_client.incr.assert_called_once_with('clients.some-api.connection.new')
+    mtls_session.statsd_client.timing.assert_called_with('clients.some-api.request-time.request', 0.75)
+
+
+def test_session_retries_get_requests_on_retryable_responses(mtls_session):
+    retry = mtls_session._get_session().get_adapter('https://some.host').max_retries
+
+    assert isinstance(retry, _JitteredRetry)
+    assert retry.total == 3
+    assert set(retry.status_forcelist) == {429, 500, 502, 503, 504}
+    assert not retry.raise_on_status
+    assert retry.is_retry('GET', 503)
+    assert not retry.is_retry('POST', 503)
+
+
+@pytest.mark.parametrize('errors, max_backoff', [(0, 0), (1, 0.5), (3, 2), (10, 10)])
+def test_jittered_retry_backs_off_up_to_exponential_limit(mocker, errors, max_backoff):
+    mocker.patch('app.va.mtls_session.random.uniform', side_effect=lambda low, high: high)
+    retry = _JitteredRetry(
+        total=20, backoff_factor=0.5, history=tuple(RequestHistory('GET', '/', None, 503, None) for _ in range(errors))
+    )
+
+    assert retry.get_backoff_time() == max_backoff
@@ -0,0 +1,126 @@
+from threading import Event, Thread
+
+import pytest
+
+from app.va.recipient_lookup_cache import RecipientLookupCache
+from tests.conftest import set_config_values
+
+
+@pytest.fixture
+def redis_store(mocker):
+    data = {}
+    redis_store = mocker.Mock(active=True, data=data)
+    redis_store.get.side_effect = data.get
+    redis_store.set.side_effect = lambda key, value, ex=None: data.__setitem__(key, value)
+    redis_store.delete.side_effect = lambda *keys: [data.pop(key, None) for key in keys]
+    redis_store.redis_store.set.return_value = True
+    return redis_store
+
+
+@pytest.fixture
+def recipient_lookup_cache(notify_api, mocker, redis_store):
+    cache = RecipientLookupCache()
+    with set_config_values(notify_api, {
+        'RECIPIENT_LOOKUP_CACHE_ENABLED': True,
+        'RECIPIENT_LOOKUP_CACHE_TTL': 300,
+        'RECIPIENT_LOOKUP_COALESCE_TIMEOUT': 1,
+    }):
+        cache.init_app(notify_api, mocker.Mock(), redis_store)
+    return cache
+
+
+def test_get_contact_info_caches_encrypted_value_under_hashed_key(recipient_lookup_cache, redis_store, mocker):
+    fetch = mocker.Mock(return_value='test@example.com')
+
+    assert recipient_lookup_cache.get_contact_info('1234', 'email', fetch) == 'test@example.com'
+    assert recipient_lookup_cache.get_contact_info('1234', 'email', fetch) == 'test@example.com'
+
+    fetch.assert_called_once_with()
+    [(key, value)] = redis_store.data.items()
+    assert '1234' not in key
+    assert b'test@example.com' not in value
+    redis_store.redis_store.set.assert_called_once_with(f'{key}-lock', 1, nx=True, ex=1)
+    redis_store.delete.assert_called_once_with(f'{key}-lock')
+
+
+def test_get_contact_info_caches_each_channel_separately(recipient_lookup_cache, mocker):
+    assert recipient_lookup_cache.get_contact_info('1234', 'email', lambda: 'test@example.com') == 'test@example.com'
+    assert recipient_lookup_cache.get_contact_info('1234', 'sms', lambda: '+16502532222') == '+16502532222'
+
+
+def test_get_va_profile_id_does_not_cache_failed_lookups(recipient_lookup_cache, redis_store, mocker):
+    fetch = mocker.Mock(side_effect=[Exception('MPI is down'), '1234'])
+
+    with pytest.raises(Exception):
+        recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', fetch)
+
+    assert recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', fetch) == '1234'
+    assert fetch.call_count == 2
+
+
+def test_get_va_profile_id_calls_fetch_when_disabled(recipient_lookup_cache, redis_store, mocker):
+    recipient_lookup_cache.enabled = False
+    fetch = mocker.Mock(return_value='1234')
+
+    recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', fetch)
+    recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', fetch)
+
+    assert fetch.call_count == 2
+    redis_store.get.assert_not_called()
+
+
+def test_concurrent_lookups_in_a_process_share_one_upstream_call(recipient_lookup_cache, mocker):
+    fetching = Event()
+    waiting = Event()
+    release = Event()
+    recipient_lookup_cache.statsd_client.incr.side_effect = (
+        lambda metric: waiting.set() if metric.endswith('.coalesced') else None
+    )
+
+    def fetch():
+        fetching.set()
+        release.wait()
+        return '1234'
+
+    second_fetch = mocker.Mock(return_value='5678')
+    results = []
+    first = Thread(target=lambda: results.append(recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', fetch)))
+    first.start()
+    fetching.wait()
+
+    second = Thread(
+        target=lambda: results.append(recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', second_fetch))
+    )
+    second.start()
+    waiting.wait()
+    release.set()
+    first.join()
+    second.join()
+
+    assert results == ['1234', '1234']
+    second_fetch.assert_not_called()
+
+
+def test_lookup_waits_for_another_process_looking_up_the_same_key(recipient_lookup_cache, redis_store, mocker):
+    redis_store.redis_store.set.return_value = None
+    # Another process holds the lock, and caches the VA Profile ID while this one waits
+    redis_store.get.side_effect = [None, None, recipient_lookup_cache._fernet.encrypt(b'1234')]
+    mocker.patch('app.va.recipient_lookup_cache.sleep')
+    fetch = mocker.Mock()
+
+    assert recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', fetch) == '1234'
+
+    fetch.assert_not_called()
+    redis_store.delete.assert_not_called()
+
+
+def test_evict_removes_va_profile_id_and_contact_info(recipient_lookup_cache, redis_store):
+    recipient_lookup_cache.get_va_profile_id('VAPROFILEID', '1234', lambda: '1234')
+    recipient_lookup_cache.get_contact_info('1234', 'email', lambda: 'test@example.com')
+    recipient_lookup_cache.get_contact_info('1234', 'sms', lambda: '+16502532222')
+    recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', lambda: '1234')
+
+    recipient_lookup_cache.evict('VAPROFILEID', '1234')
+
+    assert len(redis_store.data) == 1
+    assert recipient_lookup_cache.get_va_profile_id('ICN', 'some-icn', lambda: None) == '1234'
@@ -67,3 +67,36 @@ def test_post_onsite_notification_returns_200(rmock, test_va_onsite_client):
     auth = request.headers.get('Authorization')
     regex = re.compile(r'Bearer ([\w-]+\.){2}[\w-]+')
     assert regex.match(auth)
+
+
+def test_post_onsite_notification_reuses_jwt_until_it_is_about_to_expire(rmock, test_va_onsite_client, mocker):
+    rmock.post(f'{MOCK_VA_ONSITE_URL}/v0/onsite_notifications', json={}, status_code=200)
+    mock_time = mocker.patch('app.va.va_onsite.va_onsite_client.time.time', return_value=1000)
+
+    test_va_onsite_client.post_onsite_notification({})
+    mock_time.return_value = 1049
+    test_va_onsite_client.post_onsite_notification({})
+    mock_time.return_value = 1050
+    test_va_onsite_client.post_onsite_notification({})
+
+    first, second, third = [request.headers['Authorization'] for request in rmock.request_history]
+    assert first == second
+    assert third != first
+    assert rmock.request_history[0].timeout == (3, 10)
+
+
+def test_post_onsite_notification_skips_requests_after_repeated_failures(rmock, test_va_onsite_client, mocker):
+    rmock.post(f'{MOCK_VA_ONSITE_URL}/v0/onsite_notifications', status_code=503)
+    mock_monotonic = mocker.patch('app.va.va_onsite.va_onsite_client.time.monotonic', return_value=100)
+
+    for _ in range(test_va_onsite_client.failure_threshold):
+        test_va_onsite_client.post_onsite_notification({})
+
+    assert test_va_onsite_client.post_onsite_notification({}) is None
+    assert rmock.call_count == test_va_onsite_client.failure_threshold
+
+    mock_monotonic.return_value = 100 + test_va_onsite_client.reset_seconds
+    rmock.post(f'{MOCK_VA_ONSITE_URL}/v0/onsite_notifications', json={}, status_code=200)
+
+    assert test_va_onsite_client.post_onsite_notification({}).status_code == requests.codes.ok
+    assert test_va_onsite_client._consecutive_failures == 0
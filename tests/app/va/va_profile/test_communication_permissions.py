@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.dao.va_profile_local_cache_dao import get_va_profile_local_cache_permissions
+from app.models import EMAIL_TYPE, SMS_TYPE, VAProfileLocalCache
+from app.va.va_profile.communication_permissions import get_communication_permissions, is_communication_allowed
+from app.va.va_profile.va_profile_client import CommunicationItemNotFoundException
+
+
+@pytest.fixture
+def mock_va_profile_client(mocker):
+    return mocker.patch('app.va.va_profile.communication_permissions.va_profile_client')
+
+
+@pytest.fixture
+def mock_statsd(mocker):
+    return mocker.patch('app.va.va_profile.communication_permissions.statsd_client')
+
+
+def create_cached_permission(allowed, source_datetime=None, cached_at=None):
+    permission = VAProfileLocalCache(
+        va_profile_id=1,
+        communication_item_id=5,
+        communication_channel_id=1,
+        allowed=allowed,
+        source_datetime=source_datetime or datetime.utcnow(),
+        cached_at=cached_at or datetime.utcnow(),
+    )
+    db.session.add(permission)
+    db.session.commit()
+    return permission
+
+
+def test_is_communication_allowed_answers_from_local_cache(notify_db_session, mock_va_profile_client, mock_statsd):
+    create_cached_permission(allowed=False)
+
+    assert not is_communication_allowed('1', 5, 'some-notification-id', SMS_TYPE)
+
+    mock_va_profile_client.get_communication_permission.assert_not_called()
+    mock_statsd.incr.assert_called_once_with('va-profile-local-cache.permission.hit')
+
+
+def test_is_communication_allowed_caches_va_profile_permission_on_miss(
+    notify_db_session, mock_va_profile_client, mock_statsd
+):
+    mock_va_profile_client.get_communication_permission.return_value = (True, datetime(2021, 8, 2, 17, 11, 16))
+
+    assert is_communication_allowed('1', 5, 'some-notification-id', EMAIL_TYPE)
+
+    identifier, *args = mock_va_profile_client.get_communication_permission.call_args[0]
+    assert (identifier.id_type, identifier.id_value) == ('VAPROFILEID', '1')
+    assert args == [5, 'some-notification-id', EMAIL_TYPE]
+    mock_statsd.incr.assert_called_once_with('va-profile-local-cache.permission.miss')
+
+    permission = VAProfileLocalCache.query.one()
+    assert permission.va_profile_id == 1
+    assert permission.communication_item_id == 5
+    assert permission.communication_channel_id == 2
+    assert permission.allowed
+    assert permission.source_datetime == datetime(2021, 8, 2, 17, 11, 16)
+
+
+def test_is_communication_allowed_refreshes_stale_permission(
+    notify_api, notify_db_session, mock_va_profile_client, mock_statsd
+):
+    max_age = timedelta(days=notify_api.config['VA_PROFILE_LOCAL_CACHE_MAX_AGE_DAYS'])
+    stale_at = datetime.utcnow() - max_age - timedelta(days=1)
+    create_cached_permission(allowed=False, source_datetime=stale_at, cached_at=stale_at)
+    mock_va_profile_client.get_communication_permission.return_value = (True, datetime.utcnow())
+
+    assert is_communication_allowed('1', 5, 'some-notification-id', SMS_TYPE)
+
+    mock_statsd.incr.assert_called_once_with('va-profile-local-cache.permission.stale')
+    permission = VAProfileLocalCache.query.one()
+    assert permission.allowed
+    assert permission.cached_at > stale_at
+
+
+def test_is_communication_allowed_uses_old_permission_cached_recently(
+    notify_api, notify_db_session, mock_va_profile_client, mock_statsd
+):
+    max_age = timedelta(days=notify_api.config['VA_PROFILE_LOCAL_CACHE_MAX_AGE_DAYS'])
+    # as the VA Profile opt in/out lambda saves a permission that the recipient set long ago
+    create_cached_permission(allowed=True, source_datetime=datetime.utcnow() - max_age - timedelta(days=1))
+
+    assert is_communication_allowed('1', 5, 'some-notification-id', SMS_TYPE)
+
+    mock_va_profile_client.get_communication_permission.assert_not_called()
+    mock_statsd.incr.assert_called_once_with('va-profile-local-cache.permission.hit')
+
+
+def test_is_communication_allowed_marks_unchanged_permission_as_cached_now(
+    notify_api, notify_db_session, mock_va_profile_client
+):
+    max_age = timedelta(days=notify_api.config['VA_PROFILE_LOCAL_CACHE_MAX_AGE_DAYS'])
+    source_datetime = datetime(2021, 8, 2, 17, 11, 16)
+    stale_at = datetime.utcnow() - max_age - timedelta(days=1)
+    create_cached_permission(allowed=True, source_datetime=source_datetime, cached_at=stale_at)
+    mock_va_profile_client.get_communication_permission.return_value = (True, source_datetime)
+
+    assert is_communication_allowed('1', 5, 'some-notification-id', SMS_TYPE)
+
+    db.session.expire_all()
+    assert VAProfileLocalCache.query.one().cached_at > stale_at
+
+
+def test_is_communication_allowed_raises_if_va_profile_has_no_permission(notify_db_session, mock_va_profile_client):
+    mock_va_profile_client.get_communication_permission.side_effect = CommunicationItemNotFoundException
+
+    with pytest.raises(CommunicationItemNotFoundException):
+        is_communication_allowed('1', 5, 'some-notification-id', SMS_TYPE)
+
+    assert VAProfileLocalCache.query.count() == 0
+
+
+def test_get_communication_permissions_reads_cache_in_one_query(notify_db_session, mock_va_profile_client, mocker):
+    create_cached_permission(allowed=True)
+    mock_va_profile_client.get_communication_permission.return_value = (False, datetime.utcnow())
+    mock_get_cached = mocker.patch(
+        'app.va.va_profile.communication_permissions.get_va_profile_local_cache_permissions',
+        wraps=get_va_profile_local_cache_permissions
+    )
+
+    permissions = get_communication_permissions([
+        ('1', 5, SMS_TYPE, 'notification-1'),
+        ('1', 5, SMS_TYPE, 'notification-2'),
+        ('1', 5, EMAIL_TYPE, 'notification-3'),
+        ('not-an-int', 5, SMS_TYPE, 'notification-4'),
+    ])
+
+    assert permissions == {
+        ('1', 5, SMS_TYPE): True,
+        ('1', 5, EMAIL_TYPE): False,
+        ('not-an-int', 5, SMS_TYPE): False,
+    }
+    mock_get_cached.assert_called_once()
+    assert mock_va_profile_client.get_communication_permission.call_count == 2
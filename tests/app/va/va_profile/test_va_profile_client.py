@@ -1,3 +1,5 @@
+from datetime import datetime
+
 import pytest
 from requests import RequestException
 from requests_mock import ANY
@@ -573,7 +575,7 @@ def test_get_email_raises_non_retryable_exception(notify_api, rmock, test_va_pro
 
 def test_should_throw_va_retryable_exception_when_request_exception_is_thrown(
         test_va_profile_client, mocker):
-    mocker.patch('app.va.va_profile.va_profile_client.requests.get', side_effect=RequestException)
+    mocker.patch.object(test_va_profile_client.session, 'get', side_effect=RequestException)
 
     with pytest.raises(VAProfileRetryableException) as e:
         test_va_profile_client.get_email('1')
@@ -777,3 +779,27 @@ class TestCommunicationPermissions:
         assert test_va_profile_client.get_is_communication_allowed(
             recipient_identifier, 'some-valid-id', 'some-notification-id', SMS_TYPE
         )
+        assert test_va_profile_client.get_communication_permission(
+            recipient_identifier, 'some-valid-id', 'some-notification-id', SMS_TYPE
+        ) == (True, datetime(2021, 7, 28, 19, 58, 47))
+
+    def test_get_communication_permission_returns_source_date_in_utc(self, test_va_profile_client, rmock):
+        response = {
+            "txAuditId": "01941ff7-8f0c-4713-87ca-8cd4df1a1c46",
+            "status": "COMPLETED_SUCCESS",
+            "bios": [
+                {
+                    "sourceDate": "2021-07-28T15:58:47-04:00",
+                    "communicationChannelName": "Text",
+                    "communicationItemId": 'some-valid-id',
+                    "allowed": True
+                }
+            ]
+        }
+        rmock.get(ANY, json=response, status_code=200)
+
+        recipient_identifier = RecipientIdentifier(id_type='VAPROFILEID', id_value='1')
+
+        assert test_va_profile_client.get_communication_permission(
+            recipient_identifier, 'some-valid-id', 'some-notification-id', SMS_TYPE
+        ) == (True, datetime(2021, 7, 28, 19, 58, 47))
@@ -198,3 +198,58 @@ def test_lambda_handler_queue_name_with_message(mocker):
     mocker.patch(CALLBACK_LAMBDA_BOTO, new=mock_boto)
 
     lambda_handler(event, mocker.Mock())
+
+
+def test_lambda_handler_sends_receipts_in_batches(mocker):
+    mock_queue = mocker.Mock()
+
+    mock_sqs = mocker.Mock()
+    mock_sqs.get_queue_by_name.return_value = mock_queue
+
+    mock_boto = mocker.Mock()
+    mock_boto.resource.return_value = mock_sqs
+
+    mocker.patch(CALLBACK_LAMBDA_BOTO, new=mock_boto)
+    mocker.patch('lambda_functions.ses_callback.ses_callback_lambda.RECEIPT_BATCH_SIZE', 2)
+
+    event = {
+        "Records": [{"Sns": {"Message": f"message {i}"}} for i in range(3)]
+    }
+
+    lambda_handler(event, mocker.Mock())
+
+    tasks = [
+        json.loads(base64.b64decode(json.loads(base64.b64decode(call[1]['MessageBody']))['body']))
+        for call in mock_queue.send_message.call_args_list
+    ]
+    assert [task['task'] for task in tasks] == ['process-ses-results-batch', 'process-ses-results-batch']
+    assert tasks[0]['args'] == [[{"Message": "message 0"}, {"Message": "message 1"}]]
+    assert tasks[1]['args'] == [[{"Message": "message 2"}]]
+
+
+def test_lambda_handler_splits_batches_that_would_be_too_big_for_sqs(mocker):
+    mock_queue = mocker.Mock()
+
+    mock_sqs = mocker.Mock()
+    mock_sqs.get_queue_by_name.return_value = mock_queue
+
+    mock_boto = mocker.Mock()
+    mock_boto.resource.return_value = mock_sqs
+
+    mocker.patch(CALLBACK_LAMBDA_BOTO, new=mock_boto)
+    mocker.patch('lambda_functions.ses_callback.ses_callback_lambda.RECEIPT_BATCH_SIZE', 10)
+    # Room for two of the messages below, which are each 26 bytes with their separator
+    mocker.patch('lambda_functions.ses_callback.ses_callback_lambda.MAX_BATCH_BYTES', 60)
+
+    event = {
+        "Records": [{"Sns": {"Message": f"message {i}"}} for i in range(3)]
+    }
+
+    lambda_handler(event, mocker.Mock())
+
+    tasks = [
+        json.loads(base64.b64decode(json.loads(base64.b64decode(call[1]['MessageBody']))['body']))
+        for call in mock_queue.send_message.call_args_list
+    ]
+    assert tasks[0]['args'] == [[{"Message": "message 0"}, {"Message": "message 1"}]]
+    assert tasks[1]['args'] == [[{"Message": "message 2"}]]